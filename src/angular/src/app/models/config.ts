@@ -32,6 +32,13 @@ export interface Lftp {
   net_max_retries: number | null;
   net_reconnect_interval_base: number | null;
   net_reconnect_interval_multiplier: number | null;
+  bandwidth_schedule: string | null;
+  auto_tune_connections: boolean | null;
+  auto_tune_min_connections: number | null;
+  auto_tune_max_connections: number | null;
+  bundle_small_files: boolean | null;
+  bundle_min_files: number | null;
+  bundle_max_avg_file_size: number | null;
 }
 
 export interface Controller {
@@ -42,11 +49,15 @@ export interface Controller {
   use_local_path_as_extract_path: boolean | null;
   staging_path: string | null;
   use_staging: boolean | null;
+  model_build_workers: number | null;
+  model_build_mode: string | null;
+  download_order: string | null;
 }
 
 export interface Web {
   port: number | null;
   api_key: string | null;
+  server_mode: string | null;
 }
 
 export interface AutoQueue {
@@ -122,6 +133,13 @@ export const DEFAULT_LFTP: Lftp = {
   net_max_retries: null,
   net_reconnect_interval_base: null,
   net_reconnect_interval_multiplier: null,
+  bandwidth_schedule: null,
+  auto_tune_connections: null,
+  auto_tune_min_connections: null,
+  auto_tune_max_connections: null,
+  bundle_small_files: null,
+  bundle_min_files: null,
+  bundle_max_avg_file_size: null,
 };
 
 export const DEFAULT_CONTROLLER: Controller = {
@@ -132,11 +150,15 @@ export const DEFAULT_CONTROLLER: Controller = {
   use_local_path_as_extract_path: null,
   staging_path: null,
   use_staging: null,
+  model_build_workers: null,
+  model_build_mode: null,
+  download_order: null,
 };
 
 export const DEFAULT_WEB: Web = {
   port: null,
   api_key: null,
+  server_mode: null,
 };
 
 export const DEFAULT_AUTOQUEUE: AutoQueue = {
@@ -77,6 +77,25 @@ describe('modelFileFromJson', () => {
     expect(result.pair_id).toBeNull();
   });
 
+  it('should parse throughput and the eta band from JSON', () => {
+    const result = modelFileFromJson(makeJson({ eta_low: 8, eta_high: 14, throughput: 2048 }));
+    expect(result.eta_low).toBe(8);
+    expect(result.eta_high).toBe(14);
+    expect(result.throughput).toBe(2048);
+  });
+
+  it('should default throughput and the eta band to null when missing', () => {
+    const result = modelFileFromJson(makeJson());
+    expect(result.eta_low).toBeNull();
+    expect(result.eta_high).toBeNull();
+    expect(result.throughput).toBeNull();
+  });
+
+  it('should parse priority from JSON and default it to 0', () => {
+    expect(modelFileFromJson(makeJson({ priority: 5 })).priority).toBe(5);
+    expect(modelFileFromJson(makeJson()).priority).toBe(0);
+  });
+
   it('should fall back to DEFAULT for unknown state strings', () => {
     const result = modelFileFromJson(makeJson({ state: 'UNKNOWN_STATE' }));
     expect(result.state).toBe(ModelFileState.DEFAULT);
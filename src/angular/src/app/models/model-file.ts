@@ -11,6 +11,10 @@ export interface ModelFile {
   state: ModelFileState;
   downloading_speed: number;
   eta: number;
+  eta_low: number | null;
+  eta_high: number | null;
+  throughput: number | null;
+  priority: number;
   full_path: string;
   is_extractable: boolean;
   local_created_timestamp: Date | null;
@@ -61,6 +65,10 @@ export interface ModelFileJson {
   state: string;
   downloading_speed: number;
   eta: number;
+  eta_low?: number | null;
+  eta_high?: number | null;
+  throughput?: number | null;
+  priority?: number;
   full_path: string;
   is_extractable: boolean;
   local_created_timestamp: number | null;
@@ -85,6 +93,10 @@ export function modelFileFromJson(json: ModelFileJson): ModelFile {
     state: STATE_LOOKUP[json.state.toUpperCase()] ?? ModelFileState.DEFAULT,
     downloading_speed: json.downloading_speed,
     eta: json.eta,
+    eta_low: json.eta_low ?? null,
+    eta_high: json.eta_high ?? null,
+    throughput: json.throughput ?? null,
+    priority: json.priority ?? 0,
     full_path: json.full_path,
     is_extractable: json.is_extractable,
     local_created_timestamp:
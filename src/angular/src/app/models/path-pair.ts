@@ -6,4 +6,5 @@ export interface PathPair {
   enabled: boolean;
   auto_queue: boolean;
   arr_target_ids: string[];
+  priority?: number;
 }
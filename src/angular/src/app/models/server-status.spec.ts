@@ -70,6 +70,83 @@ describe('serverStatusFromJson', () => {
     expect(result.controller.noEnabledPairs).toBe(true);
   });
 
+  it('should map transfer speeds', () => {
+    const json = makeJson({
+      transfer: { download_speed: 300, pair_download_speeds: { p1: 100, p2: 200 } },
+    });
+
+    const result = serverStatusFromJson(json);
+
+    expect(result.transfer.downloadSpeed).toBe(300);
+    expect(result.transfer.pairDownloadSpeeds).toEqual({ p1: 100, p2: 200 });
+  });
+
+  it('should default transfer speeds when missing', () => {
+    const result = serverStatusFromJson(makeJson());
+
+    expect(result.transfer.downloadSpeed).toBe(0);
+    expect(result.transfer.pairDownloadSpeeds).toEqual({});
+    expect(result.transfer.autoTune).toEqual({});
+    expect(result.transfer.rateLimit).toBeNull();
+    expect(result.transfer.maxTotalConnections).toBe(0);
+    expect(result.transfer.scheduleWindow).toBeNull();
+    expect(result.transfer.lftpLatency).toEqual({});
+  });
+
+  it('should map effective limits', () => {
+    const json = makeJson({
+      transfer: {
+        download_speed: 0,
+        pair_download_speeds: {},
+        rate_limit: '500K',
+        max_total_connections: 4,
+        schedule_window: 'Mon-Fri 08:00-18:00 rate=500K connections=4',
+      },
+    });
+
+    const result = serverStatusFromJson(json);
+
+    expect(result.transfer.rateLimit).toBe('500K');
+    expect(result.transfer.maxTotalConnections).toBe(4);
+    expect(result.transfer.scheduleWindow).toBe('Mon-Fri 08:00-18:00 rate=500K connections=4');
+  });
+
+  it('should map auto-tune state', () => {
+    const json = makeJson({
+      transfer: {
+        download_speed: 0,
+        pair_download_speeds: {},
+        auto_tune: {
+          'seedbox:22': { connections: 8, min_chunk_size: 1048576, converged: true, last_decision: 'settled' },
+        },
+      },
+    });
+
+    const result = serverStatusFromJson(json);
+
+    expect(result.transfer.autoTune).toEqual({
+      'seedbox:22': { connections: 8, minChunkSize: 1048576, converged: true, lastDecision: 'settled' },
+    });
+  });
+
+  it('should map lftp command latency', () => {
+    const json = makeJson({
+      transfer: {
+        download_speed: 0,
+        pair_download_speeds: {},
+        lftp_latency: {
+          'seedbox:22': { commands: 42, last_ms: 12.5, average_ms: 10.1, max_ms: 80 },
+        },
+      },
+    });
+
+    const result = serverStatusFromJson(json);
+
+    expect(result.transfer.lftpLatency).toEqual({
+      'seedbox:22': { commands: 42, lastMs: 12.5, averageMs: 10.1, maxMs: 80 },
+    });
+  });
+
   it('should handle null timestamps', () => {
     const result = serverStatusFromJson(makeJson());
 
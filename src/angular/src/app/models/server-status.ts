@@ -1,3 +1,23 @@
+/**
+ * State of the connection auto-tuner of one remote host.
+ */
+export interface AutoTuneStatus {
+  connections: number;
+  minChunkSize: number;
+  converged: boolean;
+  lastDecision: string | null;
+}
+
+/**
+ * Round trip time of the lftp commands sent to one remote host.
+ */
+export interface LftpLatencyStatus {
+  commands: number;
+  lastMs: number;
+  averageMs: number;
+  maxMs: number;
+}
+
 /**
  * ServerStatus model.
  */
@@ -13,6 +33,15 @@ export interface ServerStatus {
     latestRemoteScanError: string | null;
     noEnabledPairs: boolean;
   };
+  transfer: {
+    downloadSpeed: number;
+    pairDownloadSpeeds: Record<string, number>;
+    autoTune: Record<string, AutoTuneStatus>;
+    rateLimit: string | null;
+    maxTotalConnections: number;
+    scheduleWindow: string | null;
+    lftpLatency: Record<string, LftpLatencyStatus>;
+  };
 }
 
 /**
@@ -31,6 +60,18 @@ export interface ServerStatusJson {
     latest_remote_scan_error: string | null;
     no_enabled_pairs: boolean;
   };
+  transfer?: {
+    download_speed: number;
+    pair_download_speeds: Record<string, number>;
+    auto_tune?: Record<
+      string,
+      { connections: number; min_chunk_size: number; converged: boolean; last_decision: string | null }
+    >;
+    rate_limit?: string | null;
+    max_total_connections?: number;
+    schedule_window?: string | null;
+    lftp_latency?: Record<string, { commands: number; last_ms: number; average_ms: number; max_ms: number }>;
+  };
 }
 
 export function serverStatusFromJson(json: ServerStatusJson): ServerStatus {
@@ -44,6 +85,26 @@ export function serverStatusFromJson(json: ServerStatusJson): ServerStatus {
     latestRemoteScanTime = new Date(1000 * +json.controller.latest_remote_scan_time);
   }
 
+  const autoTune: Record<string, AutoTuneStatus> = {};
+  for (const [host, state] of Object.entries(json.transfer?.auto_tune ?? {})) {
+    autoTune[host] = {
+      connections: state.connections,
+      minChunkSize: state.min_chunk_size,
+      converged: state.converged,
+      lastDecision: state.last_decision,
+    };
+  }
+
+  const lftpLatency: Record<string, LftpLatencyStatus> = {};
+  for (const [host, latency] of Object.entries(json.transfer?.lftp_latency ?? {})) {
+    lftpLatency[host] = {
+      commands: latency.commands,
+      lastMs: latency.last_ms,
+      averageMs: latency.average_ms,
+      maxMs: latency.max_ms,
+    };
+  }
+
   return {
     server: {
       up: json.server.up,
@@ -56,5 +117,14 @@ export function serverStatusFromJson(json: ServerStatusJson): ServerStatus {
       latestRemoteScanError: json.controller.latest_remote_scan_error,
       noEnabledPairs: json.controller.no_enabled_pairs,
     },
+    transfer: {
+      downloadSpeed: json.transfer?.download_speed ?? 0,
+      pairDownloadSpeeds: json.transfer?.pair_download_speeds ?? {},
+      autoTune,
+      rateLimit: json.transfer?.rate_limit ?? null,
+      maxTotalConnections: json.transfer?.max_total_connections ?? 0,
+      scheduleWindow: json.transfer?.schedule_window ?? null,
+      lftpLatency,
+    },
   };
 }
@@ -29,6 +29,15 @@ function makeStatus(overrides: Partial<{
       noEnabledPairs: false,
       ...overrides.controller,
     },
+    transfer: {
+      downloadSpeed: 0,
+      pairDownloadSpeeds: {},
+      autoTune: {},
+      rateLimit: null,
+      maxTotalConnections: 0,
+      scheduleWindow: null,
+      lftpLatency: {},
+    },
   };
 }
 
@@ -121,6 +121,32 @@ export const OPTIONS_CONTEXT_DISCOVERY: IOptionsContext = {
       description: 'How often the downloading information is updated',
       requiresRestart: true,
     },
+    {
+      type: OptionType.Text,
+      label: 'Model Build Workers',
+      valuePath: ['controller', 'model_build_workers'],
+      description: 'Number of path pairs whose file lists are rebuilt in parallel (1 builds them one at a time)',
+      requiresRestart: true,
+    },
+    {
+      type: OptionType.Select,
+      label: 'Model Build Mode',
+      valuePath: ['controller', 'model_build_mode'],
+      description: 'Build pair file lists in worker threads, or in worker processes for very large libraries',
+      choices: ['thread', 'process'],
+      requiresRestart: true,
+    },
+    {
+      type: OptionType.Select,
+      label: 'Download Order',
+      valuePath: ['controller', 'download_order'],
+      description:
+        'Order in which queued files start downloading, after their priority.\n' +
+        'fifo: in the order they were queued; smallest_first: smallest files first; ' +
+        'oldest_first: files that appeared on the server first',
+      choices: ['fifo', 'smallest_first', 'oldest_first'],
+      requiresRestart: false,
+    },
   ],
 };
 
@@ -177,9 +203,58 @@ export const OPTIONS_CONTEXT_CONNECTIONS: IOptionsContext = {
       label: 'Bandwidth Limit',
       valuePath: ['lftp', 'net_limit_rate'],
       description:
-        'Download speed limit. Supports suffixes: K, M (e.g. 500K, 2M). ' +
-        '0 or empty for unlimited.\n' +
-        '(net:limit-rate)',
+        'Total download speed limit, shared by all path pairs and connections. ' +
+        'Supports suffixes: K, M (e.g. 500K, 2M). 0 or empty for unlimited.\n' +
+        '(net:limit-total-rate)',
+    },
+    {
+      type: OptionType.Text,
+      label: 'Bandwidth Schedule',
+      valuePath: ['lftp', 'bandwidth_schedule'],
+      description:
+        'Time windows with their own bandwidth limit and max total connections, separated by ";". ' +
+        'The first window matching the current time applies; otherwise the limits above do.\n' +
+        'e.g. Mon-Fri 08:00-23:00 rate=2M connections=4; 23:00-08:00 rate=0',
+    },
+    {
+      type: OptionType.Checkbox,
+      label: 'Auto-Tune Connections Per File',
+      valuePath: ['lftp', 'auto_tune_connections'],
+      description:
+        'Adjust the connections per file and the min chunk size to what gives the best speed on your link, ' +
+        'trying one change about every minute. Overrides the values above while enabled.',
+    },
+    {
+      type: OptionType.Text,
+      label: 'Auto-Tune Min Connections Per File',
+      valuePath: ['lftp', 'auto_tune_min_connections'],
+      description: 'Fewest connections per file the auto-tuner will try',
+    },
+    {
+      type: OptionType.Text,
+      label: 'Auto-Tune Max Connections Per File',
+      valuePath: ['lftp', 'auto_tune_max_connections'],
+      description: 'Most connections per file the auto-tuner will try',
+    },
+    {
+      type: OptionType.Checkbox,
+      label: 'Bundle Directories of Small Files',
+      valuePath: ['lftp', 'bundle_small_files'],
+      description:
+        'Download directories with many small files as a single tar stream over ssh instead of file by file. ' +
+        'Needs tar on the remote server. Not used while a rate limit is in effect.',
+    },
+    {
+      type: OptionType.Text,
+      label: 'Bundle Min Files',
+      valuePath: ['lftp', 'bundle_min_files'],
+      description: 'Fewest files a directory must have to be bundled',
+    },
+    {
+      type: OptionType.Text,
+      label: 'Bundle Max Average File Size',
+      valuePath: ['lftp', 'bundle_max_avg_file_size'],
+      description: 'Largest average file size, in bytes, of a directory to be bundled',
     },
   ],
 };
@@ -202,6 +277,14 @@ export const OPTIONS_CONTEXT_OTHER: IOptionsContext = {
       description: 'Require this key for API access. Leave empty to disable.',
       requiresRestart: true,
     },
+    {
+      type: OptionType.Select,
+      label: 'Web Server Mode',
+      valuePath: ['web', 'server_mode'],
+      description: 'Serve requests on a thread pool, or on a single event loop for many concurrent browser tabs',
+      choices: ['threaded', 'asyncio'],
+      requiresRestart: true,
+    },
   ],
 };
 
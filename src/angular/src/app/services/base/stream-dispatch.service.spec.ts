@@ -41,10 +41,10 @@ class MockEventSource {
     this.onerror?.(new Event("error"));
   }
 
-  simulateEvent(name: string, data: string): void {
+  simulateEvent(name: string, data: string, lastEventId = ""): void {
     const handlers = this.listeners.get(name) || [];
     for (const handler of handlers) {
-      handler(new MessageEvent(name, { data }));
+      handler(new MessageEvent(name, { data, lastEventId }));
     }
   }
 }
@@ -285,6 +285,49 @@ describe("StreamDispatchService", () => {
     expect(latestEventSource().url).toBe("/server/stream");
   });
 
+  it("should add stream params requested by handlers", () => {
+    service.registerHandler({
+      ...makeHandler(["model-init"]),
+      getStreamParams: () => ({ model_children: "false" }),
+    });
+    service.setApiKey("key");
+    service.start();
+
+    expect(latestEventSource().url).toBe(
+      "/server/stream?model_children=false&api_key=key",
+    );
+  });
+
+  // --- Resume ---
+
+  it("should send the last event id when reconnecting", () => {
+    vi.useFakeTimers();
+    service.registerHandler(makeHandler(["model-added"]));
+    service.setApiKey("key");
+    service.start();
+
+    latestEventSource().simulateEvent("model-added", "{}", "ab12.7");
+    latestEventSource().simulateError();
+    vi.advanceTimersByTime(3000);
+
+    expect(latestEventSource().url).toBe(
+      "/server/stream?api_key=key&last_event_id=ab12.7",
+    );
+  });
+
+  it("should keep the last event id when an event has none", () => {
+    vi.useFakeTimers();
+    service.registerHandler(makeHandler(["model-added", "status"]));
+    service.start();
+
+    latestEventSource().simulateEvent("model-added", "{}", "ab12.7");
+    latestEventSource().simulateEvent("status", "{}");
+    latestEventSource().simulateError();
+    vi.advanceTimersByTime(3000);
+
+    expect(latestEventSource().url).toBe("/server/stream?last_event_id=ab12.7");
+  });
+
   // --- Stale EventSource guard ---
 
   it("should ignore error from a stale EventSource after API key change", () => {
@@ -10,6 +10,9 @@ export interface StreamEventHandler {
   /** Event names this handler is interested in. */
   getEventNames(): string[];
 
+  /** Optional query parameters this handler needs on the stream URL. */
+  getStreamParams?(): Record<string, string>;
+
   /** Called when the SSE connection opens. */
   onConnected(): void;
 
@@ -43,6 +46,8 @@ export class StreamDispatchService {
   }
 
   private apiKey: string | null = null;
+  // SSE id of the last event received, sent on reconnect so the server can resume the stream
+  private lastEventId: string | null = null;
   private eventSource: EventSource | null = null;
   private retryTimeout: ReturnType<typeof setTimeout> | null = null;
 
@@ -70,14 +75,27 @@ export class StreamDispatchService {
   }
 
   private connectStream(): void {
-    const url = this.apiKey
-      ? `${this.STREAM_URL}?api_key=${encodeURIComponent(this.apiKey)}`
-      : this.STREAM_URL;
+    const params: string[] = [];
+    for (const handler of this.handlers) {
+      for (const [key, value] of Object.entries(handler.getStreamParams?.() ?? {})) {
+        params.push(`${encodeURIComponent(key)}=${encodeURIComponent(value)}`);
+      }
+    }
+    if (this.apiKey) {
+      params.push(`api_key=${encodeURIComponent(this.apiKey)}`);
+    }
+    if (this.lastEventId) {
+      params.push(`last_event_id=${encodeURIComponent(this.lastEventId)}`);
+    }
+    const url = params.length ? `${this.STREAM_URL}?${params.join('&')}` : this.STREAM_URL;
     const eventSource = new EventSource(url);
     this.eventSource = eventSource;
 
     for (const eventName of Array.from(this.eventNameToHandler.keys())) {
       eventSource.addEventListener(eventName, (event: MessageEvent) => {
+        if (event.lastEventId) {
+          this.lastEventId = event.lastEventId;
+        }
         this.zone.run(() => {
           this.eventNameToHandler.get(eventName)!.onEvent(eventName, event.data);
         });
@@ -4,7 +4,7 @@ import { of } from "rxjs";
 import { ModelFileService } from "./model-file.service";
 import { StreamDispatchService } from "../base/stream-dispatch.service";
 import { LoggerService } from "../utils/logger.service";
-import { RestService } from "../utils/rest.service";
+import { RestService, WebReaction } from "../utils/rest.service";
 import { ModelFile } from "../../models/model-file";
 
 function makeFileJson(name: string, state = "DEFAULT") {
@@ -29,11 +29,14 @@ function makeFileJson(name: string, state = "DEFAULT") {
 describe("ModelFileService", () => {
   let service: ModelFileService;
   let mockStreamDispatch: { registerHandler: ReturnType<typeof vi.fn> };
-  let mockRestService: { sendRequest: ReturnType<typeof vi.fn> };
+  let mockRestService: {
+    sendRequest: ReturnType<typeof vi.fn>;
+    sendPost: ReturnType<typeof vi.fn>;
+  };
 
   beforeEach(() => {
     mockStreamDispatch = { registerHandler: vi.fn() };
-    mockRestService = { sendRequest: vi.fn() };
+    mockRestService = { sendRequest: vi.fn(), sendPost: vi.fn() };
     TestBed.configureTestingModule({
       providers: [
         ModelFileService,
@@ -66,6 +69,10 @@ describe("ModelFileService", () => {
     ]);
   });
 
+  it("should request root files only from the stream", () => {
+    expect(service.getStreamParams()).toEqual({ model_children: "false" });
+  });
+
   it("should replace all files on model-init event", () => {
     const data = JSON.stringify([makeFileJson("file1"), makeFileJson("file2")]);
     service.onEvent("model-init", data);
@@ -159,16 +166,17 @@ describe("ModelFileService", () => {
     expect(result!.size).toBe(1);
   });
 
-  it("should clear all files on disconnect", () => {
+  it("should keep files on disconnect so a resumed stream can continue", () => {
     service.onEvent(
       "model-init",
       JSON.stringify([makeFileJson("file1"), makeFileJson("file2")]),
     );
     service.onDisconnected();
+    service.onEvent("model-added", JSON.stringify({ new_file: makeFileJson("file3") }));
 
     let result: Map<string, ModelFile> | undefined;
     service.files$.subscribe((f) => (result = f));
-    expect(result!.size).toBe(0);
+    expect(result!.size).toBe(3);
   });
 
   it("should call RestService.sendRequest with double-encoded filename for queue", () => {
@@ -225,4 +233,67 @@ describe("ModelFileService", () => {
       "/server/command/delete_remote/" + encoded,
     );
   });
+
+  // --- Batch commands ---
+
+  it("should send files as one batch and map the results", () => {
+    mockRestService.sendPost.mockReturnValue(
+      of({
+        success: true,
+        data: JSON.stringify({
+          results: [
+            { action: "queue", file: "a", pair_id: "p1", success: true, error: null },
+            { action: "queue", file: "b", pair_id: null, success: false, error: "Lftp error" },
+          ],
+        }),
+        errorMessage: null,
+      }),
+    );
+    const files = [
+      { name: "a", pair_id: "p1" } as ModelFile,
+      { name: "b", pair_id: null } as ModelFile,
+    ];
+
+    let result: WebReaction[] | undefined;
+    service.batch("queue", files).subscribe((r) => (result = r));
+
+    expect(mockRestService.sendPost).toHaveBeenCalledWith("/server/command/batch", {
+      commands: [
+        { action: "queue", file: "a", pair_id: "p1" },
+        { action: "queue", file: "b", pair_id: null },
+      ],
+    });
+    expect(result).toEqual([
+      { success: true, data: null, errorMessage: null },
+      { success: false, data: null, errorMessage: "Lftp error" },
+    ]);
+  });
+
+  it("should fail every file when the batch request fails", () => {
+    const failure = { success: false, data: null, errorMessage: "Forbidden" };
+    mockRestService.sendPost.mockReturnValue(of(failure));
+    const files = [{ name: "a" } as ModelFile, { name: "b" } as ModelFile];
+
+    let result: WebReaction[] | undefined;
+    service.batch("stop", files).subscribe((r) => (result = r));
+
+    expect(result).toEqual([failure, failure]);
+  });
+
+  it("should split large batches into several requests", () => {
+    mockRestService.sendPost.mockImplementation((_url: string, body: { commands: unknown[] }) =>
+      of({
+        success: true,
+        data: JSON.stringify({ results: body.commands.map(() => ({ success: true, error: null })) }),
+        errorMessage: null,
+      }),
+    );
+    const files = Array.from({ length: 1500 }, (_, i) => ({ name: `f${i}` }) as ModelFile);
+
+    let result: WebReaction[] | undefined;
+    service.batch("queue", files).subscribe((r) => (result = r));
+
+    expect(mockRestService.sendPost).toHaveBeenCalledTimes(2);
+    expect(result!.length).toBe(1500);
+  });
 });
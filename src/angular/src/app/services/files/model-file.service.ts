@@ -1,5 +1,6 @@
 import { Injectable, inject } from '@angular/core';
-import { BehaviorSubject, Observable } from 'rxjs';
+import { BehaviorSubject, Observable, from } from 'rxjs';
+import { concatMap, map, reduce } from 'rxjs/operators';
 
 import { StreamEventHandler, StreamDispatchService } from '../base/stream-dispatch.service';
 import { LoggerService } from '../utils/logger.service';
@@ -7,6 +8,14 @@ import { RestService, WebReaction } from '../utils/rest.service';
 import { ModelFile, ModelFileJson, modelFileFromJson } from '../../models/model-file';
 import { fileKey } from './file-key';
 
+export type ModelFileAction = 'queue' | 'stop' | 'extract' | 'delete_local' | 'delete_remote' | 'validate';
+
+interface BatchResultJson {
+  file: string;
+  success: boolean;
+  error: string | null;
+}
+
 @Injectable({ providedIn: 'root' })
 export class ModelFileService implements StreamEventHandler {
   private readonly EVENT_INIT = 'model-init';
@@ -14,6 +23,9 @@ export class ModelFileService implements StreamEventHandler {
   private readonly EVENT_UPDATED = 'model-updated';
   private readonly EVENT_REMOVED = 'model-removed';
 
+  // Server limit on the number of commands per batch request
+  private static readonly MAX_BATCH_SIZE = 1000;
+
   private readonly logger = inject(LoggerService);
   private readonly restService = inject(RestService);
   private readonly streamDispatch = inject(StreamDispatchService);
@@ -30,6 +42,11 @@ export class ModelFileService implements StreamEventHandler {
     return [this.EVENT_INIT, this.EVENT_ADDED, this.EVENT_UPDATED, this.EVENT_REMOVED];
   }
 
+  getStreamParams(): Record<string, string> {
+    // The dashboard only shows root files, so skip their subtrees
+    return { model_children: 'false' };
+  }
+
   queue(file: ModelFile): Observable<WebReaction> {
     this.logger.debug('Queue model file: ' + file.name);
     return this.restService.sendRequest(this.commandUrl('queue', file));
@@ -60,6 +77,38 @@ export class ModelFileService implements StreamEventHandler {
     return this.restService.sendRequest(this.commandUrl('validate', file));
   }
 
+  /**
+   * Run one action on many files with as few requests as possible
+   * Emits one reaction per file, in order
+   */
+  batch(action: ModelFileAction, files: ModelFile[]): Observable<WebReaction[]> {
+    this.logger.debug(`Batch ${action} of ${files.length} model files`);
+    const chunks: ModelFile[][] = [];
+    for (let i = 0; i < files.length; i += ModelFileService.MAX_BATCH_SIZE) {
+      chunks.push(files.slice(i, i + ModelFileService.MAX_BATCH_SIZE));
+    }
+    return from(chunks).pipe(
+      concatMap((chunk) => this.sendBatch(action, chunk)),
+      reduce((all, reactions) => all.concat(reactions), [] as WebReaction[]),
+    );
+  }
+
+  private sendBatch(action: ModelFileAction, files: ModelFile[]): Observable<WebReaction[]> {
+    const commands = files.map((f) => ({ action, file: f.name, pair_id: f.pair_id }));
+    return this.restService.sendPost('/server/command/batch', { commands }).pipe(
+      map((reaction) => {
+        if (!reaction.success) {
+          // The whole request failed
+          return files.map(() => reaction);
+        }
+        const results: BatchResultJson[] = JSON.parse(reaction.data ?? '{}').results ?? [];
+        return results.map((r): WebReaction => r.success
+          ? { success: true, data: null, errorMessage: null }
+          : { success: false, data: null, errorMessage: r.error });
+      }),
+    );
+  }
+
   private commandUrl(action: string, file: ModelFile): string {
     const fileNameEncoded = encodeURIComponent(encodeURIComponent(file.name));
     let url = `/server/command/${action}/${fileNameEncoded}`;
@@ -78,7 +127,8 @@ export class ModelFileService implements StreamEventHandler {
   }
 
   onDisconnected(): void {
-    this.filesSubject.next(new Map());
+    // Keep the files: on reconnect the server either resumes the stream
+    // from the last event id, or sends a fresh model-init
   }
 
   private parseEvent(name: string, data: string): void {
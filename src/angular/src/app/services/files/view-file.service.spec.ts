@@ -22,6 +22,10 @@ function makeModelFile(
     state: ModelFileState.DEFAULT,
     downloading_speed: 0,
     eta: 0,
+    eta_low: null,
+    eta_high: null,
+    throughput: null,
+    priority: 0,
     full_path: "/path/" + overrides.name,
     is_extractable: false,
     local_created_timestamp: null,
@@ -44,6 +48,7 @@ describe("ViewFileService", () => {
     extract: ReturnType<typeof vi.fn>;
     deleteLocal: ReturnType<typeof vi.fn>;
     deleteRemote: ReturnType<typeof vi.fn>;
+    batch: ReturnType<typeof vi.fn>;
   };
 
   beforeEach(() => {
@@ -56,6 +61,7 @@ describe("ViewFileService", () => {
       extract: vi.fn(),
       deleteLocal: vi.fn(),
       deleteRemote: vi.fn(),
+      batch: vi.fn(),
     };
     TestBed.configureTestingModule({
       providers: [
@@ -555,6 +561,41 @@ describe("ViewFileService", () => {
     expect(files.find((f) => f.pairId === "pair-b")!.isChecked).toBe(false);
   });
 
+  // --- Bulk actions ---
+
+  it("should send checked queueable files as one batch", () => {
+    const mfA = makeModelFile({ name: "a", pair_id: "pair-a", remote_size: 100 });
+    const mfB = makeModelFile({ name: "b", pair_id: "pair-b", remote_size: 100 });
+    const downloading = makeModelFile({ name: "c", remote_size: 100, state: ModelFileState.DOWNLOADING });
+    emitModelFiles([mfA, mfB, downloading]);
+    mockModelFileService.batch.mockReturnValue(
+      of([
+        { success: true, data: null, errorMessage: null },
+        { success: false, data: null, errorMessage: "Lftp error" },
+      ]),
+    );
+
+    service.checkAll();
+    let result: WebReaction[] | undefined;
+    service.bulkQueue().subscribe((r) => (result = r));
+
+    expect(mockModelFileService.batch).toHaveBeenCalledTimes(1);
+    expect(mockModelFileService.batch).toHaveBeenCalledWith("queue", [mfA, mfB]);
+    expect(mockModelFileService.queue).not.toHaveBeenCalled();
+    expect(result!.map((r) => r.success)).toEqual([true, false]);
+  });
+
+  it("should not send a batch when no checked file qualifies", () => {
+    emitModelFiles([makeModelFile({ name: "a", remote_size: 100 })]);
+
+    service.checkAll();
+    let result: WebReaction[] | undefined;
+    service.bulkStop().subscribe((r) => (result = r));
+
+    expect(mockModelFileService.batch).not.toHaveBeenCalled();
+    expect(result).toEqual([]);
+  });
+
   it("should delegate queue() to the correct model file when same-name files have different pair_ids", () => {
     const mfA = makeModelFile({ name: "movie.mkv", pair_id: "pair-a", remote_size: 100 });
     const mfB = makeModelFile({ name: "movie.mkv", pair_id: "pair-b", remote_size: 200 });
@@ -1,9 +1,9 @@
 import { Injectable, inject } from '@angular/core';
-import { BehaviorSubject, Observable, of, from } from 'rxjs';
-import { mergeMap, toArray } from 'rxjs/operators';
+import { BehaviorSubject, Observable, of } from 'rxjs';
+import { map } from 'rxjs/operators';
 
 import { LoggerService } from '../utils/logger.service';
-import { ModelFileService } from './model-file.service';
+import { ModelFileAction, ModelFileService } from './model-file.service';
 import { PathPairsService } from '../settings/path-pairs.service';
 import { WebReaction } from '../utils/rest.service';
 import { ModelFile, ModelFileState } from '../../models/model-file';
@@ -191,33 +191,39 @@ export class ViewFileService {
   }
 
   bulkQueue(): Observable<WebReaction[]> {
-    return this.bulkAction(f => f.isQueueable, f => this.queue(f));
+    return this.bulkAction(f => f.isQueueable, 'queue');
   }
 
   bulkStop(): Observable<WebReaction[]> {
-    return this.bulkAction(f => f.isStoppable, f => this.stop(f));
+    return this.bulkAction(f => f.isStoppable, 'stop');
   }
 
   bulkDeleteLocal(): Observable<WebReaction[]> {
-    return this.bulkAction(f => f.isLocallyDeletable, f => this.deleteLocal(f), 4);
+    return this.bulkAction(f => f.isLocallyDeletable, 'delete_local');
   }
 
   bulkDeleteRemote(): Observable<WebReaction[]> {
-    return this.bulkAction(f => f.isRemotelyDeletable, f => this.deleteRemote(f), 4);
+    return this.bulkAction(f => f.isRemotelyDeletable, 'delete_remote');
   }
 
-  private bulkAction(
-    filter: (f: ViewFile) => boolean,
-    action: (f: ViewFile) => Observable<WebReaction>,
-    concurrency = Infinity
-  ): Observable<WebReaction[]> {
+  private bulkAction(filter: (f: ViewFile) => boolean, action: ModelFileAction): Observable<WebReaction[]> {
     const checked = this.files.filter(f => this.checkedSet.has(viewFileKey(f)) && filter(f));
-    if (checked.length === 0) {
-      return of([]);
+    const modelFiles: ModelFile[] = [];
+    const notFound: WebReaction[] = [];
+    for (const f of checked) {
+      const modelFile = this.prevModelFiles.get(viewFileKey(f));
+      if (modelFile) {
+        modelFiles.push(modelFile);
+      } else {
+        notFound.push({ success: false, data: null, errorMessage: `File '${f.name}' not found` });
+      }
+    }
+    if (modelFiles.length === 0) {
+      return of(notFound);
     }
-    return from(checked).pipe(
-      mergeMap(f => action(f), concurrency),
-      toArray()
+    // One batch request instead of a request per file
+    return this.modelFileService.batch(action, modelFiles).pipe(
+      map(reactions => [...reactions, ...notFound])
     );
   }
 
@@ -33,8 +33,8 @@ describe("ServerStatusService", () => {
     );
   });
 
-  it("should return ['status'] from getEventNames()", () => {
-    expect(service.getEventNames()).toEqual(["status"]);
+  it("should return ['status', 'status-delta'] from getEventNames()", () => {
+    expect(service.getEventNames()).toEqual(["status", "status-delta"]);
   });
 
   it("should parse and push status on onEvent", () => {
@@ -61,6 +61,47 @@ describe("ServerStatusService", () => {
     expect(result!.controller.latestRemoteScanFailed).toBe(false);
   });
 
+  it("should apply status-delta events to the last status", () => {
+    const statusJson: ServerStatusJson = {
+      server: { up: true, error_msg: "" },
+      controller: {
+        latest_local_scan_time: "1700000000",
+        latest_remote_scan_time: null,
+        latest_remote_scan_failed: false,
+        latest_remote_scan_error: null,
+        no_enabled_pairs: false,
+      },
+      transfer: { download_speed: 0, pair_download_speeds: {} },
+    };
+    service.onEvent("status", JSON.stringify(statusJson));
+    service.onEvent(
+      "status-delta",
+      JSON.stringify({
+        transfer: { download_speed: 300, pair_download_speeds: { p1: 300 } },
+      }),
+    );
+
+    let result: ServerStatus | undefined;
+    service.status$.subscribe((s) => (result = s));
+    expect(result!.server.up).toBe(true);
+    expect(result!.controller.latestLocalScanTime).toEqual(
+      new Date(1000 * 1700000000),
+    );
+    expect(result!.transfer.downloadSpeed).toBe(300);
+    expect(result!.transfer.pairDownloadSpeeds).toEqual({ p1: 300 });
+  });
+
+  it("should ignore status-delta events before the first status", () => {
+    service.onEvent(
+      "status-delta",
+      JSON.stringify({ server: { up: true, error_msg: null } }),
+    );
+
+    let result: ServerStatus | undefined;
+    service.status$.subscribe((s) => (result = s));
+    expect(result!.server.up).toBe(false);
+  });
+
   it("should reset to disconnected status on onDisconnected()", () => {
     // First set a connected status
     const statusJson: ServerStatusJson = {
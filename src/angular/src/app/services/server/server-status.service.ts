@@ -21,21 +21,42 @@ export class ServerStatusService implements StreamEventHandler {
       latestRemoteScanError: null,
       noEnabledPairs: false,
     },
+    transfer: {
+      downloadSpeed: 0,
+      pairDownloadSpeeds: {},
+      autoTune: {},
+      rateLimit: null,
+      maxTotalConnections: 0,
+      scheduleWindow: null,
+      lftpLatency: {},
+    },
   });
 
   readonly status$: Observable<ServerStatus> = this.statusSubject.asObservable();
 
+  // Last full status received, which status-delta events are applied to
+  private statusJson: ServerStatusJson | null = null;
+
   constructor() {
     this.streamDispatch.registerHandler(this);
   }
 
   getEventNames(): string[] {
-    return ['status'];
+    return ['status', 'status-delta'];
   }
 
-  onEvent(_eventName: string, data: string): void {
-    const statusJson: ServerStatusJson = JSON.parse(data);
-    this.statusSubject.next(serverStatusFromJson(statusJson));
+  onEvent(eventName: string, data: string): void {
+    if (eventName === 'status-delta') {
+      if (this.statusJson == null) {
+        // Nothing to apply the changes to
+        return;
+      }
+      const delta: Partial<ServerStatusJson> = JSON.parse(data);
+      this.statusJson = { ...this.statusJson, ...delta };
+    } else {
+      this.statusJson = JSON.parse(data);
+    }
+    this.statusSubject.next(serverStatusFromJson(this.statusJson!));
   }
 
   onConnected(): void {
@@ -43,6 +64,7 @@ export class ServerStatusService implements StreamEventHandler {
   }
 
   onDisconnected(): void {
+    this.statusJson = null;
     this.statusSubject.next({
       server: {
         up: false,
@@ -55,6 +77,15 @@ export class ServerStatusService implements StreamEventHandler {
         latestRemoteScanError: null,
         noEnabledPairs: false,
       },
+      transfer: {
+        downloadSpeed: 0,
+        pairDownloadSpeeds: {},
+        autoTune: {},
+        rateLimit: null,
+        maxTotalConnections: 0,
+        scheduleWindow: null,
+        lftpLatency: {},
+      },
     });
   }
 }
@@ -36,6 +36,13 @@ function makeConfig(overrides: Partial<Config> = {}): Config {
       net_max_retries: null,
       net_reconnect_interval_base: null,
       net_reconnect_interval_multiplier: null,
+      bandwidth_schedule: '',
+      auto_tune_connections: false,
+      auto_tune_min_connections: 1,
+      auto_tune_max_connections: 32,
+      bundle_small_files: false,
+      bundle_min_files: 500,
+      bundle_max_avg_file_size: 1048576,
     },
     controller: {
       interval_ms_remote_scan: 30000,
@@ -45,8 +52,11 @@ function makeConfig(overrides: Partial<Config> = {}): Config {
       use_local_path_as_extract_path: true,
       staging_path: null,
       use_staging: false,
+      model_build_workers: 4,
+      model_build_mode: "thread",
+      download_order: "fifo",
     },
-    web: { port: 8080, api_key: "test-key" },
+    web: { port: 8080, api_key: "test-key", server_mode: "threaded" },
     autoqueue: {
       enabled: false,
       patterns_only: false,
@@ -153,7 +163,7 @@ describe("ConfigService", () => {
   });
 
   it("should sync API key to StreamDispatchService on successful config load", () => {
-    const config = makeConfig({ web: { port: 8080, api_key: "my-key" } });
+    const config = makeConfig({ web: { port: 8080, api_key: "my-key", server_mode: "threaded" } });
     mockRestService.sendRequest.mockReturnValue(
       of({ success: true, data: JSON.stringify(config), errorMessage: null }),
     );
@@ -298,7 +308,7 @@ describe("ConfigService", () => {
   });
 
   it("should update BehaviorSubject on successful set", () => {
-    const config = makeConfig({ web: { port: 8080, api_key: "old" } });
+    const config = makeConfig({ web: { port: 8080, api_key: "old", server_mode: "threaded" } });
     mockRestService.sendRequest
       .mockReturnValueOnce(
         of({ success: true, data: JSON.stringify(config), errorMessage: null }),
@@ -314,7 +324,7 @@ describe("ConfigService", () => {
   });
 
   it("should not update BehaviorSubject when set request fails", () => {
-    const config = makeConfig({ web: { port: 8080, api_key: "old" } });
+    const config = makeConfig({ web: { port: 8080, api_key: "old", server_mode: "threaded" } });
     mockRestService.sendRequest
       .mockReturnValueOnce(
         of({ success: true, data: JSON.stringify(config), errorMessage: null }),
@@ -330,7 +340,7 @@ describe("ConfigService", () => {
   });
 
   it("should sync API key to StreamDispatchService when web.api_key is set", () => {
-    const config = makeConfig({ web: { port: 8080, api_key: "old" } });
+    const config = makeConfig({ web: { port: 8080, api_key: "old", server_mode: "threaded" } });
     mockRestService.sendRequest
       .mockReturnValueOnce(
         of({ success: true, data: JSON.stringify(config), errorMessage: null }),
@@ -405,7 +415,7 @@ describe("ConfigService", () => {
   });
 
   it("should not sync API key when setting a non-api_key option", () => {
-    const config = makeConfig({ web: { port: 8080, api_key: "old" } });
+    const config = makeConfig({ web: { port: 8080, api_key: "old", server_mode: "threaded" } });
     mockRestService.sendRequest
       .mockReturnValueOnce(
         of({ success: true, data: JSON.stringify(config), errorMessage: null }),
@@ -136,4 +136,32 @@ describe("RestService", () => {
     req.flush("");
   });
 
+  // --- POST ---
+
+  it("should POST the body and return the response text", () => {
+    let result: WebReaction | undefined;
+    service.sendPost("/server/command/batch", { commands: [] }).subscribe((r) => (result = r));
+
+    const req = httpTesting.expectOne("/server/command/batch");
+    expect(req.request.method).toBe("POST");
+    expect(req.request.body).toEqual({ commands: [] });
+    expect(req.request.responseType).toBe("text");
+    req.flush('{"results": []}');
+
+    expect(result!.success).toBe(true);
+    expect(result!.data).toBe('{"results": []}');
+  });
+
+  it("should return a failed WebReaction for a failed POST", () => {
+    let result: WebReaction | undefined;
+    service.sendPost("/server/command/batch", {}).subscribe((r) => (result = r));
+
+    httpTesting
+      .expectOne("/server/command/batch")
+      .flush("Invalid JSON", { status: 400, statusText: "Bad Request" });
+
+    expect(result!.success).toBe(false);
+    expect(result!.errorMessage).toBe("Invalid JSON");
+  });
+
 });
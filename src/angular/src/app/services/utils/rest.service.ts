@@ -17,7 +17,15 @@ export class RestService {
   private readonly http = inject(HttpClient);
 
   sendRequest(url: string): Observable<WebReaction> {
-    return this.http.get(url, { responseType: 'text' }).pipe(
+    return this.toReaction(url, this.http.get(url, { responseType: 'text' }));
+  }
+
+  sendPost(url: string, body: unknown): Observable<WebReaction> {
+    return this.toReaction(url, this.http.post(url, body, { responseType: 'text' }));
+  }
+
+  private toReaction(url: string, response$: Observable<string>): Observable<WebReaction> {
+    return response$.pipe(
       map((data) => {
         this.logger.debug('%s http response: %s', url, data);
         return { success: true, data, errorMessage: null } as WebReaction;
@@ -5,6 +5,7 @@ from .job import Job as Job
 from .context import Context as Context, Args as Args
 from .error import AppError as AppError, ServiceExit as ServiceExit, ServiceRestart as ServiceRestart
 from .constants import Constants as Constants
+from .bandwidth_schedule import BandwidthSchedule as BandwidthSchedule, ScheduleWindow as ScheduleWindow
 from .config import Config as Config, ConfigError as ConfigError
 from .persist import Persist as Persist, PersistError as PersistError, Serializable as Serializable
 from .localization import Localization as Localization
@@ -0,0 +1,123 @@
+# Copyright 2017, Inderpreet Singh, All rights reserved.
+
+import re
+from datetime import datetime
+from typing import NamedTuple
+
+_DAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+_MINUTES_PER_DAY = 24 * 60
+_MINUTES_PER_WEEK = 7 * _MINUTES_PER_DAY
+
+_TIMES_PATTERN = re.compile(r"^(?P<start>\d{1,2}:\d{2})-(?P<end>\d{1,2}:\d{2})$")
+_DAYS_PATTERN = re.compile(r"^[a-z]{3}(-[a-z]{3})?(,[a-z]{3}(-[a-z]{3})?)*$", re.IGNORECASE)
+# Same syntax as net_limit_rate, e.g. "500K" or "1.5M"
+_RATE_PATTERN = re.compile(r"^\d+(\.\d+)?[KMG]?$", re.IGNORECASE)
+
+
+class ScheduleWindow(NamedTuple):
+    """
+    A weekly time window and the limits that apply during it
+    A window that ends before it starts runs past midnight into the next day.
+    """
+
+    days: frozenset[int]  # weekdays the window starts on, Monday is 0
+    start: int  # minute of the day
+    end: int  # minute of the day, after start unless the window runs past midnight
+    rate_limit: str | None  # lftp rate, "0" for unlimited, None for the configured rate
+    max_total_connections: int | None  # 0 for unlimited, None for the configured limit
+    text: str  # the window as written
+
+    def contains(self, when: datetime) -> bool:
+        duration = (self.end - self.start) % _MINUTES_PER_DAY or _MINUTES_PER_DAY
+        minute_of_week = when.weekday() * _MINUTES_PER_DAY + when.hour * 60 + when.minute
+        return any(
+            (minute_of_week - (day * _MINUTES_PER_DAY + self.start)) % _MINUTES_PER_WEEK < duration for day in self.days
+        )
+
+
+class BandwidthSchedule:
+    """
+    Time-of-day rate limits and connection caps
+
+    Written as windows separated by ";", each as
+        [days] HH:MM-HH:MM [rate=<rate>] [connections=<n>]
+    e.g. "Mon-Fri 08:00-23:00 rate=2M connections=4; 23:00-08:00 rate=0"
+    Days are three-letter names, as ranges or lists (Mon-Fri, Sat,Sun), and
+    default to every day. The first window containing the current local
+    time applies; outside of all windows the configured limits apply.
+    """
+
+    def __init__(self, windows: list[ScheduleWindow]):
+        self.windows = windows
+
+    @staticmethod
+    def parse(text: str | None) -> "BandwidthSchedule":
+        """
+        Parse a schedule
+        :param text:
+        :return:
+        :raises ValueError: if the schedule is not valid
+        """
+        windows = [BandwidthSchedule.__parse_window(entry.strip()) for entry in (text or "").split(";")]
+        return BandwidthSchedule([w for w in windows if w is not None])
+
+    def active_window(self, when: datetime) -> ScheduleWindow | None:
+        """The window that applies at the given local time, if any"""
+        return next((w for w in self.windows if w.contains(when)), None)
+
+    @staticmethod
+    def __parse_window(entry: str) -> ScheduleWindow | None:
+        if not entry:
+            return None
+        tokens = entry.split()
+        days = frozenset(range(7))
+        if _DAYS_PATTERN.match(tokens[0]):
+            days = BandwidthSchedule.__parse_days(tokens.pop(0))
+        times = _TIMES_PATTERN.match(tokens.pop(0)) if tokens else None
+        if times is None:
+            raise ValueError(f"'{entry}' needs a time range such as 08:00-18:00")
+        start = BandwidthSchedule.__parse_time(times.group("start"), entry)
+        end = BandwidthSchedule.__parse_time(times.group("end"), entry)
+
+        options: dict[str, str] = {}
+        for token in tokens:
+            key, sep, value = token.partition("=")
+            key = key.lower()
+            if not sep or key not in ("rate", "connections") or key in options:
+                raise ValueError(f"'{entry}' has an unknown or repeated option '{token}'")
+            options[key] = value
+        if not options:
+            raise ValueError(f"'{entry}' needs a rate= or connections= limit")
+        rate = options.get("rate")
+        if rate is not None and not _RATE_PATTERN.match(rate):
+            raise ValueError(f"'{entry}' has a bad rate '{rate}'")
+        connections = options.get("connections")
+        if connections is not None and not connections.isdigit():
+            raise ValueError(f"'{entry}' has a bad number of connections '{connections}'")
+        return ScheduleWindow(
+            days=days,
+            start=start,
+            end=end,
+            rate_limit=rate.upper() if rate is not None else None,
+            max_total_connections=int(connections) if connections is not None else None,
+            text=entry,
+        )
+
+    @staticmethod
+    def __parse_days(text: str) -> frozenset[int]:
+        days: set[int] = set()
+        for part in text.lower().split(","):
+            first, _, last = part.partition("-")
+            if first not in _DAYS or (last and last not in _DAYS):
+                raise ValueError(f"Unknown day in '{text}'")
+            start = _DAYS.index(first)
+            count = (_DAYS.index(last) - start) % 7 + 1 if last else 1
+            days.update((start + i) % 7 for i in range(count))
+        return frozenset(days)
+
+    @staticmethod
+    def __parse_time(text: str, entry: str) -> int:
+        hours, minutes = (int(part) for part in text.split(":"))
+        if minutes > 59 or hours > 24 or (hours == 24 and minutes > 0):
+            raise ValueError(f"'{entry}' has a bad time '{text}'")
+        return (hours * 60 + minutes) % _MINUTES_PER_DAY
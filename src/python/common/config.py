@@ -7,6 +7,7 @@ from collections.abc import Callable
 from io import StringIO
 from typing import Any, TypeVar
 
+from .bandwidth_schedule import BandwidthSchedule
 from .error import AppError
 from .persist import Persist, PersistError
 from .types import overrides
@@ -102,6 +103,30 @@ class Checkers:
             )
         return normalized
 
+    @staticmethod
+    def model_build_mode_allowed(cls: T, name: str, value: str) -> str:  # type: ignore[reportInvalidTypeVarUse, reportSelfClsParameterName]
+        allowed = {"thread", "process"}
+        normalized = value.strip().lower() if value else ""
+        if normalized not in allowed:
+            raise ConfigError(
+                "Bad config: {}.{} ({}) must be one of: {}".format(
+                    cls.__name__, name, value, ", ".join(sorted(allowed))
+                )
+            )
+        return normalized
+
+    @staticmethod
+    def web_server_mode_allowed(cls: T, name: str, value: str) -> str:  # type: ignore[reportInvalidTypeVarUse, reportSelfClsParameterName]
+        allowed = {"threaded", "asyncio"}
+        normalized = value.strip().lower() if value else ""
+        if normalized not in allowed:
+            raise ConfigError(
+                "Bad config: {}.{} ({}) must be one of: {}".format(
+                    cls.__name__, name, value, ", ".join(sorted(allowed))
+                )
+            )
+        return normalized
+
     @staticmethod
     def log_level_allowed(cls: T, name: str, value: str) -> str:  # type: ignore[reportInvalidTypeVarUse, reportSelfClsParameterName]
         allowed = {"DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"}
@@ -114,6 +139,26 @@ class Checkers:
             )
         return normalized
 
+    @staticmethod
+    def download_order_allowed(cls: T, name: str, value: str) -> str:  # type: ignore[reportInvalidTypeVarUse, reportSelfClsParameterName]
+        allowed = {"fifo", "smallest_first", "oldest_first"}
+        normalized = value.strip().lower() if value else ""
+        if normalized not in allowed:
+            raise ConfigError(
+                "Bad config: {}.{} ({}) must be one of: {}".format(
+                    cls.__name__, name, value, ", ".join(sorted(allowed))
+                )
+            )
+        return normalized
+
+    @staticmethod
+    def bandwidth_schedule(cls: T, name: str, value: str) -> str:  # type: ignore[reportInvalidTypeVarUse, reportSelfClsParameterName]
+        try:
+            BandwidthSchedule.parse(value)
+        except ValueError as e:
+            raise ConfigError(f"Bad config: {cls.__name__}.{name}: {e}") from None
+        return value
+
 
 class InnerConfig(ABC):
     """
@@ -289,6 +334,13 @@ class Config(Persist):
         net_reconnect_interval_multiplier = PROP(
             "net_reconnect_interval_multiplier", Checkers.int_non_negative, Converters.int
         )
+        bandwidth_schedule = PROP("bandwidth_schedule", Checkers.bandwidth_schedule, Converters.null)
+        auto_tune_connections = PROP("auto_tune_connections", Checkers.null, Converters.bool)
+        auto_tune_min_connections = PROP("auto_tune_min_connections", Checkers.int_positive, Converters.int)
+        auto_tune_max_connections = PROP("auto_tune_max_connections", Checkers.int_positive, Converters.int)
+        bundle_small_files = PROP("bundle_small_files", Checkers.null, Converters.bool)
+        bundle_min_files = PROP("bundle_min_files", Checkers.int_positive, Converters.int)
+        bundle_max_avg_file_size = PROP("bundle_max_avg_file_size", Checkers.int_positive, Converters.int)
 
         def __init__(self):
             super().__init__()
@@ -315,6 +367,13 @@ class Config(Persist):
             self.net_max_retries = None
             self.net_reconnect_interval_base = None
             self.net_reconnect_interval_multiplier = None
+            self.bandwidth_schedule = ""
+            self.auto_tune_connections = False
+            self.auto_tune_min_connections = 1
+            self.auto_tune_max_connections = 32
+            self.bundle_small_files = False
+            self.bundle_min_files = 500
+            self.bundle_max_avg_file_size = 1048576
 
     class Controller(IC):
         interval_ms_remote_scan = PROP("interval_ms_remote_scan", Checkers.int_positive, Converters.int)
@@ -324,6 +383,9 @@ class Config(Persist):
         use_local_path_as_extract_path = PROP("use_local_path_as_extract_path", Checkers.null, Converters.bool)
         use_staging = PROP("use_staging", Checkers.null, Converters.bool)
         staging_path = PROP("staging_path", Checkers.string_nonempty, Converters.null)
+        model_build_workers = PROP("model_build_workers", Checkers.int_positive, Converters.int)
+        model_build_mode = PROP("model_build_mode", Checkers.model_build_mode_allowed, Converters.null)
+        download_order = PROP("download_order", Checkers.download_order_allowed, Converters.null)
 
         def __init__(self):
             super().__init__()
@@ -334,15 +396,20 @@ class Config(Persist):
             self.use_local_path_as_extract_path = None
             self.use_staging = None
             self.staging_path = None
+            self.model_build_workers = 4
+            self.model_build_mode = "thread"
+            self.download_order = "fifo"
 
     class Web(InnerConfig):
         port = PROP("port", Checkers.int_positive, Converters.int)
         api_key = PROP("api_key", Checkers.string_allow_empty, Converters.null)
+        server_mode = PROP("server_mode", Checkers.web_server_mode_allowed, Converters.null)
 
         def __init__(self):
             super().__init__()
             self.port = None
             self.api_key = ""
+            self.server_mode = "threaded"
 
     class AutoQueue(InnerConfig):
         enabled = PROP("enabled", Checkers.null, Converters.bool)
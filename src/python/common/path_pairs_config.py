@@ -24,6 +24,7 @@ class PathPair:
         enabled: bool = True,
         auto_queue: bool = True,
         arr_target_ids: list[str] | None = None,
+        priority: int = 0,
     ):
         self.id = pair_id or str(uuid.uuid4())
         self.name = name
@@ -34,6 +35,8 @@ class PathPair:
         # Order-preserving dedup so duplicates can never reach ArrNotifier and
         # produce double scan commands.
         self.arr_target_ids: list[str] = list(dict.fromkeys(arr_target_ids or []))
+        # Added to the download priority of the pair's files
+        self.priority = priority
 
     def to_dict(self) -> dict[str, Any]:
         return {
@@ -44,6 +47,7 @@ class PathPair:
             "enabled": self.enabled,
             "auto_queue": self.auto_queue,
             "arr_target_ids": list(self.arr_target_ids),
+            "priority": self.priority,
         }
 
     @staticmethod
@@ -55,6 +59,7 @@ class PathPair:
         enabled = d.get("enabled", True)
         auto_queue = d.get("auto_queue", True)
         arr_target_ids = d.get("arr_target_ids", [])
+        priority = d.get("priority", 0)
         if not isinstance(pair_id, str):
             raise TypeError(f"id must be a string, got {type(pair_id).__name__}")
         if not isinstance(name, str):
@@ -74,6 +79,8 @@ class PathPair:
             if not isinstance(tid, str):
                 raise TypeError(f"arr_target_ids entries must be strings, got {type(tid).__name__}")
             validated_ids.append(tid)
+        if not isinstance(priority, int) or isinstance(priority, bool):
+            raise TypeError(f"priority must be an integer, got {type(priority).__name__}")
         return PathPair(
             pair_id=pair_id,
             name=name,
@@ -82,6 +89,7 @@ class PathPair:
             enabled=enabled,
             auto_queue=auto_queue,
             arr_target_ids=validated_ids,
+            priority=priority,
         )
 
     def __eq__(self, other: object) -> bool:
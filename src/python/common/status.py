@@ -87,6 +87,8 @@ class Status(BaseStatus):
     Clients can use listeners to be notified when values are updated.
     Listeners can be added to the overall status for notification on
     any change, or to each component for component-specific changes.
+    Listeners that only need to read the status should use snapshot(),
+    which is copied once per change and shared between readers.
     """
 
     class CompListener(IStatusComponentListener):
@@ -96,6 +98,7 @@ class Status(BaseStatus):
             self.status = status
 
         def notify(self, name: str):
+            self.status._invalidate_snapshot()
             self.status._listeners_lock.acquire()
             for listener in self.status._listeners:
                 listener.notify()
@@ -126,20 +129,44 @@ class Status(BaseStatus):
             self.latest_remote_scan_error = None
             self.no_enabled_pairs = False
 
+    class TransferStatus(StatusComponent):
+        download_speed = StatusComponent._create_property("download_speed")
+        pair_download_speeds = StatusComponent._create_property("pair_download_speeds")
+        auto_tune = StatusComponent._create_property("auto_tune")
+        rate_limit = StatusComponent._create_property("rate_limit")
+        max_total_connections = StatusComponent._create_property("max_total_connections")
+        schedule_window = StatusComponent._create_property("schedule_window")
+        lftp_latency = StatusComponent._create_property("lftp_latency")
+
+        def __init__(self):
+            super().__init__()
+            self.download_speed = 0  # windowed bytes / sec across all pairs
+            self.pair_download_speeds = {}  # pair id -> windowed bytes / sec
+            self.rate_limit = None  # lftp rate limit in effect, None for unlimited
+            self.max_total_connections = 0  # total connections in effect, 0 for unlimited
+            self.schedule_window = None  # bandwidth schedule window in effect, if any
+            self.auto_tune = {}  # remote host -> connection auto-tuner state, empty when disabled
+            self.lftp_latency = {}  # remote host -> LFTP command latency, once it has run a command
+
     # ----- End of component definition -----
 
     # Component registration
     server = BaseStatus._create_property("server")
     controller = BaseStatus._create_property("controller")
+    transfer = BaseStatus._create_property("transfer")
 
     def __init__(self):
         self._listeners: list[IStatusListener] = []
         self._listeners_lock = Lock()
         self.__comp_listener = Status.CompListener(self)
+        self.__snapshot_lock = Lock()
+        self.__snapshot: Status | None = None
+        self.__version = 0
 
         # Component initialization
         self.server = self.__create_component(Status.ServerStatus)
         self.controller = self.__create_component(Status.ControllerStatus)
+        self.transfer = self.__create_component(Status.TransferStatus)
 
     def copy(self) -> "Status":
         copy = Status()
@@ -151,6 +178,28 @@ class Status(BaseStatus):
             src_comp.__class__.copy(src_comp, dst_comp)
         return copy
 
+    def snapshot(self) -> "Status":
+        """
+        Return a copy of the current status that is shared by all callers
+        until the next change. Callers must not modify it.
+        :return:
+        """
+        with self.__snapshot_lock:
+            if self.__snapshot is not None:
+                return self.__snapshot
+            version = self.__version
+        snapshot = self.copy()
+        with self.__snapshot_lock:
+            # Don't cache a copy that raced with a change
+            if self.__version == version:
+                self.__snapshot = snapshot
+        return snapshot
+
+    def _invalidate_snapshot(self):
+        with self.__snapshot_lock:
+            self.__version += 1
+            self.__snapshot = None
+
     def add_listener(self, listener: IStatusListener):
         self._listeners_lock.acquire()
         if listener not in self._listeners:
@@ -7,7 +7,9 @@ from .exclude_patterns import (
 )
 from .controller_job import ControllerJob as ControllerJob
 from .controller_persist import ControllerPersist as ControllerPersist
+from .download_order import DownloadPriorities as DownloadPriorities
 from .model_builder import ModelBuilder as ModelBuilder
+from .model_registry import ModelSnapshot as ModelSnapshot
 from .auto_queue import (
     AutoQueue as AutoQueue,
     AutoQueuePersist as AutoQueuePersist,
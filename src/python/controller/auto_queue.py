@@ -3,7 +3,7 @@
 import fnmatch
 import json
 from abc import ABC, abstractmethod
-from collections.abc import Callable
+from collections.abc import Callable, Collection
 
 from common import Constants, Context, Persist, PersistError, Serializable, overrides
 from model import IModelListener, ModelFile
@@ -231,6 +231,7 @@ class AutoQueue:
                 candidates.append(new_file)
         return self.__filter_candidates(
             candidates=candidates,
+            states=(ModelFile.State.DEFAULT,),
             accept=lambda f: (
                 f.remote_size is not None
                 and f.state == ModelFile.State.DEFAULT
@@ -251,6 +252,7 @@ class AutoQueue:
                 candidates.append(new_file)
         return self.__filter_candidates(
             candidates=candidates,
+            states=(ModelFile.State.DOWNLOADED,),
             accept=lambda f: (
                 f.state == ModelFile.State.DOWNLOADED
                 and f.local_size is not None
@@ -269,6 +271,7 @@ class AutoQueue:
                 candidates.append(new_file)
         return self.__filter_candidates(
             candidates=candidates,
+            states=(ModelFile.State.DOWNLOADED, ModelFile.State.EXTRACTED),
             accept=lambda f: (
                 f.remote_size is not None
                 and (
@@ -295,10 +298,10 @@ class AutoQueue:
     def __retry_delete_remote(self, files_to_delete_remote: list[_Candidate]) -> None:
         RETRY_INTERVAL = 20  # cycles between retries
         already_sent = {(name, pid) for name, pid, _ in files_to_delete_remote}
-        model_files = self.__controller.get_model_files()
+        deleted_files = self.__controller.query_model(states=(ModelFile.State.DELETED,)).files
         new_retry_cycles: dict[tuple[str, str | None], int] = {}
-        for file in model_files:
-            if file.state == ModelFile.State.DELETED and file.remote_size is not None:
+        for file in deleted_files:
+            if file.remote_size is not None:
                 retry_key = (file.name, file.pair_id)
                 count = self.__delete_remote_retry_cycles.get(retry_key, RETRY_INTERVAL)
                 if retry_key not in already_sent and count >= RETRY_INTERVAL:
@@ -328,13 +331,20 @@ class AutoQueue:
             return self.__pair_auto_queue.get(file.pair_id, False)
         return True
 
-    def __filter_candidates(self, candidates: list[ModelFile], accept: Callable[[ModelFile], bool]) -> list[_Candidate]:
+    def __filter_candidates(
+        self,
+        candidates: list[ModelFile],
+        states: Collection[ModelFile.State],
+        accept: Callable[[ModelFile], bool],
+    ) -> list[_Candidate]:
         """
         Given a list of candidate files, filter out those that match the accept criteria
         Also takes into consideration new patterns that were added
         The accept criteria is applied to candidates AND all existing files in case of
         new patterns
         :param candidates:
+        :param states: the only states accept can return True for, used to narrow
+                       the model lookup for new patterns
         :param accept:
         :return: list of (filename, pair_id, pattern) tuples
         """
@@ -355,7 +365,7 @@ class AutoQueue:
 
         # Step 2: run new pattern through all the files
         if self.__persist_listener.new_patterns:
-            model_files = self.__controller.get_model_files()
+            model_files = self.__controller.query_model(states=states).files
             for new_pattern in self.__persist_listener.new_patterns:
                 for file in model_files:
                     if accept(file) and self.__match(new_pattern, file):
@@ -19,11 +19,12 @@ if TYPE_CHECKING:
     from .controller import Controller
 
 from common import AppError, Context, MultiprocessingLogger
-from lftp import LftpError
+from lftp import LftpError, SharedLftpQueueItem
 from model import ModelError, ModelFile
 
 from .controller_persist import ControllerPersist
 from .delete import DeleteLocalProcess, DeleteRemoteProcess
+from .download_order import DownloadPriorities
 from .exclude_patterns import parse_exclude_patterns
 from .extract import ExtractProcess, ExtractRequest
 from .model_registry import ModelRegistry
@@ -78,10 +79,22 @@ class CommandPipeline:
         # Track files with pending validation so extraction-completion doesn't race the move
         self.pending_validation_keys: set[str] = set()
 
+        # Download priorities set on files by PRIORITIZE and QUEUE commands
+        self.priorities = DownloadPriorities()
+
     def queue(self, command: Controller.Command) -> None:
         """Put a command on the queue for processing."""
         self.command_queue.put(command)
 
+    def queue_many(self, commands: list[Controller.Command]) -> None:
+        """Put several commands on the queue, in order.
+
+        step() drains the whole queue, so a batch is normally processed in
+        a single step and its QUEUE commands are grouped per pair.
+        """
+        for command in commands:
+            self.command_queue.put(command)
+
     def step(self):
         """Process commands from queue.
 
@@ -97,6 +110,9 @@ class CommandPipeline:
                 _callback.on_failure(_msg)
 
         deferred: list[Controller.Command] = []
+        # Consecutive QUEUE commands are validated as they arrive and handed
+        # to lftp per pair once the run ends: pair_id -> (pair, [(command, file)])
+        pending_queues: dict[str | None, tuple[PairContext, list[tuple[Controller.Command, ModelFile]]]] = {}
 
         while not self.command_queue.empty():
             command = self.command_queue.get()
@@ -113,6 +129,15 @@ class CommandPipeline:
                 _notify_failure(command, f"File '{command.filename}' not found")
                 continue
 
+            if command.action == Controller.Command.Action.QUEUE:
+                if self._validate_queue(command, file, _notify_failure):
+                    if command.priority is not None:
+                        self._set_priority(pc, file.name, command.priority)
+                    pending_queues.setdefault(pc.pair_id, (pc, []))[1].append((command, file))
+                continue
+            # Keep the original order between queueing and any other command
+            self._flush_queues(pending_queues, _notify_failure)
+
             success = self._dispatch_command(command, file, pc, deferred, _notify_failure, Controller)
 
             if not success:
@@ -121,6 +146,8 @@ class CommandPipeline:
             for callback in command.callbacks:
                 callback.on_success()
 
+        self._flush_queues(pending_queues, _notify_failure)
+
         for cmd in deferred:
             self.command_queue.put(cmd)
 
@@ -133,10 +160,12 @@ class CommandPipeline:
         _notify_failure: Callable[[Controller.Command, str], None],
         controller_cls: type[Controller],
     ) -> bool:
-        """Dispatch a command to the appropriate handler. Returns True on success."""
+        """Dispatch a command to the appropriate handler. Returns True on success.
+
+        QUEUE commands don't come through here; step() batches them per pair.
+        """
         Action = controller_cls.Command.Action
         handlers = {
-            Action.QUEUE: lambda: self._handle_queue(command, file, pc, _notify_failure),
             Action.STOP: lambda: self._handle_stop(command, file, pc, _notify_failure),
             Action.EXTRACT: lambda: self._handle_extract(command, file, pc, _notify_failure),
             Action.DELETE_LOCAL: lambda: self._handle_delete_local(
@@ -146,31 +175,122 @@ class CommandPipeline:
                 command, file, pc, deferred, _notify_failure, controller_cls
             ),
             Action.VALIDATE: lambda: self._handle_validate(command, file, pc, _notify_failure),
+            Action.PRIORITIZE: lambda: self._handle_prioritize(command, file, pc, _notify_failure),
         }
         handler = handlers.get(command.action)
         if handler is None:
             return False
         return handler()
 
-    def _handle_queue(
+    def _validate_queue(
         self,
         command: Controller.Command,
         file: ModelFile,
-        pc: PairContext,
         _notify_failure: Callable[[Controller.Command, str], None],
     ) -> bool:
-        """Handle the QUEUE action. Returns True on success, False on failure."""
+        """Check that a file can be queued. Returns True if it can."""
         if file.remote_size is None:
             _notify_failure(command, f"File '{command.filename}' does not exist remotely")
             return False
-        try:
-            exclude = parse_exclude_patterns(self._context.config.general.exclude_patterns)
-            pc.lftp.queue(file.name, file.is_dir, exclude_patterns=exclude)
-        except LftpError as e:
-            _notify_failure(command, f"Lftp error: {e!s}")
+        return True
+
+    def _flush_queues(
+        self,
+        pending_queues: dict[str | None, tuple[PairContext, list[tuple[Controller.Command, ModelFile]]]],
+        _notify_failure: Callable[[Controller.Command, str], None],
+    ):
+        """Hand the validated QUEUE commands of each pair to lftp in one submission and notify their callbacks."""
+        if not pending_queues:
+            return
+        exclude = parse_exclude_patterns(self._context.config.general.exclude_patterns)
+        for pc, items in pending_queues.values():
+            if len(items) > 1:
+                self._logger.info(f"Queueing {len(items)} files for pair '{pc.pair_id}'")
+            queue_items = [self._queue_item(command, file, exclude) for command, file in items]
+            errors: list[LftpError | None]
+            try:
+                errors = pc.lftp.queue_many(queue_items)
+            except LftpError as e:
+                errors = [e] * len(items)
+            for (command, _), error in zip(items, errors, strict=True):
+                if error is not None:
+                    _notify_failure(command, f"Lftp error: {error!s}")
+                    continue
+                for callback in command.callbacks:
+                    callback.on_success()
+        pending_queues.clear()
+
+    def _queue_item(self, command: Controller.Command, file: ModelFile, exclude: list[str]) -> SharedLftpQueueItem:
+        bundle = self._use_bundle(command, file)
+        if bundle:
+            self._logger.info(f"Downloading '{file.name}' as a tar bundle")
+        return SharedLftpQueueItem(
+            file.name, file.is_dir, exclude_patterns=exclude, bundle=bundle, size=file.remote_size
+        )
+
+    def _use_bundle(self, command: Controller.Command, file: ModelFile) -> bool:
+        """Whether to download a file as one tar stream over ssh instead of an lftp mirror.
+
+        The command decides if it says; otherwise directories of many small
+        files are bundled while enabled in the config.
+        """
+        if not file.is_dir:
+            return False
+        if command.bundle is not None:
+            return command.bundle
+        config = self._context.config.lftp
+        if not config.bundle_small_files:
             return False
+        num_files, total_size = self._count_remote_files(file)
+        return num_files >= config.bundle_min_files and total_size <= num_files * config.bundle_max_avg_file_size
+
+    @staticmethod
+    def _count_remote_files(file: ModelFile) -> tuple[int, int]:
+        """Number and total size of the remote files in a directory, as of the last remote scan."""
+        num_files = 0
+        total_size = 0
+        frontier = [file]
+        while frontier:
+            for child in frontier.pop().get_children():
+                if child.is_dir:
+                    frontier.append(child)
+                elif child.remote_size is not None:
+                    num_files += 1
+                    total_size += child.remote_size
+        return num_files, total_size
+
+    def _handle_prioritize(
+        self,
+        command: Controller.Command,
+        file: ModelFile,
+        pc: PairContext,
+        _notify_failure: Callable[[Controller.Command, str], None],
+    ) -> bool:
+        """Handle the PRIORITIZE action. Returns True on success, False on failure."""
+        if command.priority is None:
+            _notify_failure(command, f"No priority given for file '{command.filename}'")
+            return False
+        self._set_priority(pc, file.name, command.priority)
         return True
 
+    def _set_priority(self, pc: PairContext, name: str, priority: int):
+        self.priorities.set_priority(pc.pair_id, name, priority)
+        pc.model_builder.set_priorities(self.priorities.of_pair(pc.pair_id))
+
+    def prune_priorities(self):
+        """Forget the priorities of files that are no longer waiting to download or downloading."""
+        if not len(self.priorities):
+            return
+        keys = {
+            persist_key(f.pair_id, f.name)
+            for f in self._registry.query(
+                states=(ModelFile.State.DEFAULT, ModelFile.State.QUEUED, ModelFile.State.DOWNLOADING)
+            ).files
+        }
+        self.priorities.retain(keys)
+        for pc in self._pair_contexts:
+            pc.model_builder.set_priorities(self.priorities.of_pair(pc.pair_id))
+
     def _handle_stop(
         self,
         command: Controller.Command,
@@ -0,0 +1,205 @@
+# Copyright 2017, Inderpreet Singh, All rights reserved.
+
+"""Adaptive tuning of lftp's per-file connections and chunk size.
+
+lftp splits each file into chunks of at least pget:min-chunk-size and
+downloads them over up to pget:default-n connections (mirror:use-pget-n
+inside directories). The best values depend on the link, and the link
+changes over the day. The tuner tries one neighbouring setting at a time,
+keeps it only if the throughput per downloading file measurably improves,
+and holds the best setting it found until it is time to look again.
+"""
+
+import re
+import time
+from typing import NamedTuple
+
+# lftp's default pget:min-chunk-size
+_DEFAULT_MIN_CHUNK_SIZE = 1024**2
+
+# lftp rate, e.g. "500K" or "1.5M"; "get:put" pairs are not split
+_RATE_PATTERN = re.compile(r"^(?P<number>\d+(\.\d+)?)\s*(?P<unit>[KMG]?)$", re.IGNORECASE)
+_RATE_UNITS = {"": 1, "K": 1024, "M": 1024**2, "G": 1024**3}
+
+
+def parse_rate(rate: str | None) -> int | None:
+    """
+    Bytes/sec of an lftp rate setting
+    :param rate:
+    :return: None if there is no limit, or the rate isn't a single number
+    """
+    if not rate:
+        return None
+    result = _RATE_PATTERN.match(rate.strip())
+    if result is None:
+        return None
+    value = int(float(result.group("number")) * _RATE_UNITS[result.group("unit").upper()])
+    return value if value > 0 else None
+
+
+class TuningSetting(NamedTuple):
+    connections: int  # per file
+    min_chunk_size: int  # bytes
+
+
+def connection_steps(min_connections: int, max_connections: int) -> list[int]:
+    """
+    Connection counts the tuner moves between: 1, 2, 3, 4, 6, 8, 12, 16, ...
+    limited to, and always including, the bounds
+    :param min_connections:
+    :param max_connections:
+    :return:
+    """
+    max_connections = max(min_connections, max_connections)
+    steps = {min_connections, max_connections}
+    power = 1
+    while power <= max_connections:
+        steps.update(n for n in (power, power + power // 2) if min_connections <= n <= max_connections)
+        power *= 2
+    return sorted(steps)
+
+
+class ConnectionTuner:
+    """
+    Hill-climbing tuner of one lftp process's connections per file and min chunk size
+
+    Feed it the process's throughput every cycle with sample(). After a
+    change, it waits _SETTLE_IN_SECS for the windowed throughput to reflect
+    the new setting, then averages the throughput per downloading file over
+    _MEASURE_IN_SECS. A neighbouring setting replaces the best one only if it
+    does better by _MIN_GAIN; the tuner then keeps going in the same
+    direction. Once no neighbour is better, it holds the best setting for
+    _HOLD_IN_SECS and then measures again from there.
+    Time without any downloading file doesn't count towards a measurement.
+    """
+
+    _SETTLE_IN_SECS = 30.0
+    _MEASURE_IN_SECS = 30.0
+    _MIN_GAIN = 0.05
+    _HOLD_IN_SECS = 30 * 60.0
+    # Min chunk sizes tried, as powers of two of the configured size
+    _CHUNK_SIZE_EXPONENTS = range(-3, 3)
+    # Moves in (connections, chunk size) steps
+    _MOVES = ((1, 0), (-1, 0), (0, 1), (0, -1))
+
+    def __init__(self, min_connections: int, max_connections: int, connections: int, min_chunk_size: int | None):
+        """
+        :param min_connections: lowest connections per file to try
+        :param max_connections: highest connections per file to try
+        :param connections: configured connections per file, the starting point
+        :param min_chunk_size: configured min chunk size in bytes, None for lftp's default
+        """
+        self.__connections = connection_steps(min_connections, max_connections)
+        base_chunk_size = min_chunk_size or _DEFAULT_MIN_CHUNK_SIZE
+        self.__chunk_sizes = [int(base_chunk_size * 2.0**e) for e in ConnectionTuner._CHUNK_SIZE_EXPONENTS]
+        start_connections = min(range(len(self.__connections)), key=lambda i: abs(self.__connections[i] - connections))
+        self.__best = (start_connections, list(ConnectionTuner._CHUNK_SIZE_EXPONENTS).index(0))
+        self.__best_score: float | None = None
+        self.__trial = self.__best
+        self.__moves: list[tuple[int, int]] = []
+        self.__samples: list[float] = []
+        self.__settle_start: float | None = None
+        self.__measure_start: float | None = None
+        self.__hold_until: float | None = None
+        self.last_decision: str | None = None
+
+    @property
+    def setting(self) -> TuningSetting:
+        """The setting lftp should currently use"""
+        return self.__setting(self.__trial)
+
+    @property
+    def converged(self) -> bool:
+        """True while holding the best setting found"""
+        return self.__hold_until is not None
+
+    def sample(self, throughput: float, num_files: int) -> str | None:
+        """
+        Record the current throughput
+        :param throughput: bytes/sec across all files downloading with the current setting
+        :param num_files: number of files downloading
+        :return: a description of the decision taken, if any; the setting may have changed
+        """
+        now = time.monotonic()
+        if self.__hold_until is not None:
+            if now < self.__hold_until:
+                return None
+            # The link may have changed since; measure the best setting again
+            self.__hold_until = None
+            self.__best_score = None
+            self.__trial = self.__best
+            self.__restart(now)
+            return None
+        if num_files <= 0 or self.__settle_start is None:
+            self.__restart(now)
+            return None
+        if now - self.__settle_start < ConnectionTuner._SETTLE_IN_SECS:
+            return None
+        if self.__measure_start is None:
+            self.__measure_start = now
+        self.__samples.append(throughput / num_files)
+        if now - self.__measure_start < ConnectionTuner._MEASURE_IN_SECS:
+            return None
+        score = sum(self.__samples) / len(self.__samples)
+        decision = self.__decide(score, now)
+        self.last_decision = decision
+        return decision
+
+    def __decide(self, score: float, now: float) -> str:
+        trial = self.__setting(self.__trial)
+        if self.__best_score is None or self.__trial == self.__best:
+            decision = f"measured {_format_setting(trial)} at {_format_speed(score)} per file"
+            self.__best_score = score
+            self.__moves = list(ConnectionTuner._MOVES)
+        elif score > self.__best_score * (1 + ConnectionTuner._MIN_GAIN):
+            decision = (
+                f"kept {_format_setting(trial)} at {_format_speed(score)} per file, "
+                f"up from {_format_speed(self.__best_score)}"
+            )
+            move = (self.__trial[0] - self.__best[0], self.__trial[1] - self.__best[1])
+            reverse = (-move[0], -move[1])
+            self.__moves = [move] + [m for m in ConnectionTuner._MOVES if m not in (move, reverse)]
+            self.__best = self.__trial
+            self.__best_score = score
+        else:
+            decision = (
+                f"rejected {_format_setting(trial)} at {_format_speed(score)} per file, "
+                f"best is {_format_speed(self.__best_score)}"
+            )
+
+        while self.__moves:
+            move = self.__moves.pop(0)
+            candidate = (self.__best[0] + move[0], self.__best[1] + move[1])
+            if 0 <= candidate[0] < len(self.__connections) and 0 <= candidate[1] < len(self.__chunk_sizes):
+                self.__trial = candidate
+                self.__restart(now)
+                return f"{decision}; trying {_format_setting(self.__setting(candidate))}"
+        self.__trial = self.__best
+        self.__hold_until = now + ConnectionTuner._HOLD_IN_SECS
+        return f"{decision}; settled on {_format_setting(self.__setting(self.__best))}"
+
+    def __restart(self, now: float):
+        self.__settle_start = now
+        self.__measure_start = None
+        self.__samples = []
+
+    def __setting(self, position: tuple[int, int]) -> TuningSetting:
+        return TuningSetting(
+            connections=self.__connections[position[0]], min_chunk_size=self.__chunk_sizes[position[1]]
+        )
+
+
+def _format_setting(setting: TuningSetting) -> str:
+    return f"{setting.connections} connections with {_format_size(setting.min_chunk_size)} chunks"
+
+
+def _format_size(size: float) -> str:
+    for unit in ("B", "KiB", "MiB"):
+        if size < 1024:
+            return f"{size:.3g} {unit}"
+        size /= 1024
+    return f"{size:.3g} GiB"
+
+
+def _format_speed(speed: float) -> str:
+    return f"{_format_size(speed)}/s"
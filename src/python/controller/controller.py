@@ -2,27 +2,33 @@
 
 from __future__ import annotations
 
+import contextlib
 import os
 import threading
+import time
 from abc import ABC, abstractmethod
-from collections.abc import Callable
+from collections.abc import Callable, Iterable
+from datetime import datetime
 from enum import Enum
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
     pass
 
-from common import AppOneShotProcess, Constants, Context, MultiprocessingLogger
-from lftp import Lftp
-from model import IModelListener, Model, ModelFile
+from common import AppOneShotProcess, BandwidthSchedule, Constants, Context, MultiprocessingLogger, ScheduleWindow
+from lftp import Lftp, SharedLftp
+from model import ANY_PAIR, AnyPair, IModelListener, Model, ModelError, ModelFile
+from ssh import Sshcp
 
 from .command_pipeline import CommandPipeline
+from .connection_tuner import ConnectionTuner, parse_rate
 from .controller_persist import ControllerPersist
+from .download_order import queue_order_key
 
 # my libs
 from .extract import ExtractProcess
 from .model_builder import ModelBuilder
-from .model_registry import ModelRegistry
+from .model_registry import ModelRegistry, ModelSnapshot
 from .model_updater import ModelUpdater
 from .pair_context import ControllerError, PairContext, configure_lftp, validate_config
 from .scan import ActiveScanner, LocalScanner, RemoteScanner, ScannerProcess
@@ -34,6 +40,9 @@ class Controller:
     Top-level class that controls the behaviour of the app
     """
 
+    # LFTP command latency changes with every command, so it's published at this interval
+    _LATENCY_STATUS_INTERVAL_IN_SECS = 10.0
+
     class Command:
         """
         Class by which clients of Controller can request Actions to be executed
@@ -49,6 +58,7 @@ class Controller:
             DELETE_LOCAL = 3
             DELETE_REMOTE = 4
             VALIDATE = 5
+            PRIORITIZE = 6
 
         class ICallback(ABC):
             """Command callback interface"""
@@ -63,10 +73,22 @@ class Controller:
                 """Called on action failure"""
                 pass
 
-        def __init__(self, action: Action, filename: str, pair_id: str | None = None):
+        def __init__(
+            self,
+            action: Action,
+            filename: str,
+            pair_id: str | None = None,
+            priority: int | None = None,
+            bundle: bool | None = None,
+        ):
             self.action = action
             self.filename = filename
             self.pair_id = pair_id
+            # Download priority to give the file, required for PRIORITIZE and optional for QUEUE
+            self.priority = priority
+            # For QUEUE, whether to download a directory as one tar stream over ssh,
+            # None to decide by its number and size of files
+            self.bundle = bundle
             self.callbacks: list[Controller.Command.ICallback] = []
 
         def add_callback(self, callback: ICallback):
@@ -102,6 +124,23 @@ class Controller:
         # Setup multiprocess logging (shared)
         self.__mp_logger = MultiprocessingLogger(self.logger)
 
+        # Bandwidth schedule, as last parsed from the config, and the rate limit and
+        # total connections it currently gives
+        self.__schedule = BandwidthSchedule([])
+        self.__schedule_text: str | None = None
+        self.__limits, _ = self._scheduled_limits()
+
+        # Connection auto-tuners of the hosts' LFTP instances, while auto-tuning is enabled,
+        # and the config they were created with
+        self.__tuners: dict[SharedLftp, ConnectionTuner] = {}
+        self.__tuners_config: tuple | None = None
+
+        # When LFTP command latency was last published to the status
+        self.__latency_status_time: float | None = None
+
+        # LFTP instances by remote host (address, port, user), shared by that host's pairs
+        self.__shared_lftps: dict[tuple[str | None, int | None, str | None], SharedLftp] = {}
+
         # Build pair contexts (persist state is seeded after updater creation below)
         self.__pair_contexts: list[PairContext] = self._build_pair_contexts()
 
@@ -198,14 +237,20 @@ class Controller:
         for pair in enabled_pairs:
             contexts.append(
                 self._create_pair_context(
-                    pair_id=pair.id, name=pair.name, remote_path=pair.remote_path, local_path=pair.local_path
+                    pair_id=pair.id,
+                    name=pair.name,
+                    remote_path=pair.remote_path,
+                    local_path=pair.local_path,
+                    priority=pair.priority,
                 )
             )
         return contexts
 
-    def _create_pair_context(self, pair_id: str | None, name: str, remote_path: str, local_path: str) -> PairContext:
+    def _create_pair_context(
+        self, pair_id: str | None, name: str, remote_path: str, local_path: str, priority: int = 0
+    ) -> PairContext:
         """
-        Create a fully wired PairContext with its own LFTP, scanners, and model builder.
+        Create a fully wired PairContext with its own LFTP client, scanners, and model builder.
         """
         pair_label = name or pair_id or "default"
         pair_logger = self.logger.getChild(f"Pair[{pair_label}]")
@@ -221,17 +266,8 @@ class Controller:
         else:
             effective_local_path = local_path
 
-        # LFTP instance
-        lftp = Lftp(
-            address=self.__context.config.lftp.remote_address,  # type: ignore[arg-type]
-            port=self.__context.config.lftp.remote_port,  # type: ignore[arg-type]
-            user=self.__context.config.lftp.remote_username,  # type: ignore[arg-type]
-            password=self.__password,
-        )
-        lftp.set_base_logger(pair_logger)
-        lftp.set_base_remote_dir_path(remote_path)
-        lftp.set_base_local_dir_path(effective_local_path)
-        self._configure_lftp(lftp)
+        # LFTP client of the remote host's shared LFTP instance
+        lftp = self._get_shared_lftp().client(remote_path, effective_local_path)
 
         # Scanners
         active_scanner = ActiveScanner(
@@ -296,8 +332,213 @@ class Controller:
             local_scan_process=local_scan_process,
             remote_scan_process=remote_scan_process,
             model_builder=model_builder,
+            priority=priority,
         )
 
+    def _get_shared_lftp(self) -> SharedLftp:
+        """
+        Return the LFTP instance of the remote host, creating it on first use.
+        Pairs on the same host share it, and with it the host's connection limits.
+        """
+        config = self.__context.config.lftp
+        host = (config.remote_address, config.remote_port, config.remote_username)
+        shared = self.__shared_lftps.get(host)
+        if shared is None:
+            lftp = Lftp(
+                address=config.remote_address,  # type: ignore[arg-type]
+                port=config.remote_port,  # type: ignore[arg-type]
+                user=config.remote_username,  # type: ignore[arg-type]
+                password=self.__password,
+            )
+            lftp.set_base_logger(self.logger)
+            ssh = Sshcp(
+                host=config.remote_address,  # type: ignore[arg-type]
+                port=config.remote_port,  # type: ignore[arg-type]
+                user=config.remote_username,
+                password=self.__password,
+            )
+            shared = SharedLftp(lftp, ssh=ssh, password=self.__password)
+            self._configure_shared_lftp(shared)
+            self.__shared_lftps[host] = shared
+        return shared
+
+    def _configure_shared_lftp(self, shared: SharedLftp):
+        self._configure_lftp(shared.lftp)
+        rate_limit, max_total_connections = self.__limits
+        # The rate limit is a budget for all pairs and connections of the host together
+        shared.lftp.rate_limit = 0
+        shared.lftp.total_rate_limit = rate_limit or 0
+        shared.lftp.num_max_total_connections = max_total_connections
+        shared.rate_limited = rate_limit is not None
+        shared.max_bundles = self.__context.config.lftp.num_max_parallel_downloads or 1
+        tuner = self.__tuners.get(shared)
+        if tuner is not None:
+            config = self.__context.config.lftp
+            setting = tuner.setting
+            shared.lftp.num_connections_per_root_file = setting.connections
+            # Keep the configured ratio between directory and single-file connections
+            ratio = (config.num_max_connections_per_dir_file or 1) / (config.num_max_connections_per_root_file or 1)
+            shared.lftp.num_connections_per_dir_file = max(round(setting.connections * ratio), 1)
+            shared.lftp.min_chunk_size = setting.min_chunk_size
+
+    def _order_lftp_queues(self):
+        """
+        Move queued jobs within each LFTP queue so that files start downloading
+        by priority, then in the configured download order
+        Works from the job statuses the model update read this cycle, so it
+        costs no extra round trip to LFTP.
+        """
+        pair_by_client = {pc.lftp: pc for pc in self.__pair_contexts}
+        download_order = self.__context.config.controller.download_order
+        for shared in self.__shared_lftps.values():
+            queued = shared.queued_jobs()
+            if len(queued) < 2:
+                continue
+            keys = []
+            for client, job in queued:
+                pc = pair_by_client.get(client) if client is not None else None
+                file = None
+                if pc is not None:
+                    with contextlib.suppress(ModelError):
+                        file = self.__registry.get_file(job.name, pair_id=pc.pair_id)
+                keys.append(queue_order_key(file, pc.priority if pc is not None else 0, download_order))
+            order = sorted(range(len(queued)), key=lambda i: keys[i])
+            if order != list(range(len(queued))):
+                shared.reorder_queue([queued[i][1] for i in order])
+
+    def _scheduled_limits(self) -> tuple[tuple[str | None, int], ScheduleWindow | None]:
+        """
+        The rate limit and total connections that apply now, from the bandwidth
+        schedule or else the config, and the schedule window they come from
+        :return: ((rate limit, None for unlimited; total connections, 0 for unlimited), window)
+        """
+        config = self.__context.config.lftp
+        if config.bandwidth_schedule != self.__schedule_text:
+            self.__schedule = BandwidthSchedule.parse(config.bandwidth_schedule)
+            self.__schedule_text = config.bandwidth_schedule
+        window = self.__schedule.active_window(datetime.now())
+        rate_limit = config.net_limit_rate
+        max_total_connections = config.num_max_total_connections or 0
+        if window is not None:
+            if window.rate_limit is not None:
+                rate_limit = window.rate_limit
+            if window.max_total_connections is not None:
+                max_total_connections = window.max_total_connections
+        if parse_rate(rate_limit) is None:
+            rate_limit = None
+        return (rate_limit, max_total_connections), window
+
+    def _apply_bandwidth_schedule(self):
+        """
+        Apply the limits of the bandwidth schedule window that applies now.
+        Changed limits are applied through the LFTP reconfigure path.
+        """
+        limits, window = self._scheduled_limits()
+        if limits != self.__limits:
+            rate_limit, max_total_connections = limits
+            self.logger.info(
+                "Bandwidth limits now {} and {} total connections ({})".format(
+                    rate_limit or "unlimited",
+                    max_total_connections or "unlimited",
+                    f"schedule window '{window.text}'" if window is not None else "configured limits",
+                )
+            )
+            self.__limits = limits
+            self.request_lftp_reconfigure()
+        transfer = self.__context.status.transfer
+        if transfer.rate_limit != limits[0]:
+            transfer.rate_limit = limits[0]
+        if transfer.max_total_connections != limits[1]:
+            transfer.max_total_connections = limits[1]
+        schedule_window = window.text if window is not None else None
+        if transfer.schedule_window != schedule_window:
+            transfer.schedule_window = schedule_window
+
+    def _tune_lftp_connections(self):
+        """
+        Feed each host's throughput to its connection auto-tuner, while auto-tuning is enabled.
+        Settings the tuners change are applied through the LFTP reconfigure path.
+        """
+        config = self.__context.config.lftp
+        tuners_config = (
+            config.auto_tune_min_connections,
+            config.auto_tune_max_connections,
+            config.num_max_connections_per_root_file,
+            config.pget_min_chunk_size,
+        )
+        if not config.auto_tune_connections or tuners_config != self.__tuners_config:
+            if self.__tuners:
+                # Back to the configured settings, or start over with the new ones
+                self.__tuners.clear()
+                self.request_lftp_reconfigure()
+            self.__tuners_config = tuners_config
+            if not config.auto_tune_connections:
+                if self.__context.status.transfer.auto_tune:
+                    self.__context.status.transfer.auto_tune = {}
+                return
+
+        speeds = self.__context.status.transfer.pair_download_speeds
+        num_downloading: dict[str | None, int] = {}
+        for file in self.__registry.query(states=(ModelFile.State.DOWNLOADING,)).files:
+            num_downloading[file.pair_id] = num_downloading.get(file.pair_id, 0) + 1
+        changed = False
+        auto_tune = {}
+        for (address, port, _), shared in self.__shared_lftps.items():
+            tuner = self.__tuners.get(shared)
+            if tuner is None:
+                tuner = ConnectionTuner(
+                    min_connections=config.auto_tune_min_connections or 1,
+                    max_connections=config.auto_tune_max_connections or 1,
+                    connections=config.num_max_connections_per_root_file or 1,
+                    min_chunk_size=parse_rate(config.pget_min_chunk_size),
+                )
+                self.__tuners[shared] = tuner
+                changed = True
+            pcs = [pc for pc in self.__pair_contexts if pc.lftp.shared is shared]
+            throughput = sum(speeds.get(pc.pair_id or "", 0) for pc in pcs)
+            num_files = sum(num_downloading.get(pc.pair_id, 0) for pc in pcs)
+            setting = tuner.setting
+            decision = tuner.sample(throughput, num_files)
+            host = f"{address}:{port}"
+            if decision is not None:
+                self.logger.info(f"Connection auto-tune for {host}: {decision}")
+            changed = changed or tuner.setting != setting
+            auto_tune[host] = {
+                "connections": tuner.setting.connections,
+                "min_chunk_size": tuner.setting.min_chunk_size,
+                "converged": tuner.converged,
+                "last_decision": tuner.last_decision,
+            }
+        if changed:
+            self.request_lftp_reconfigure()
+        if self.__context.status.transfer.auto_tune != auto_tune:
+            self.__context.status.transfer.auto_tune = auto_tune
+
+    def _publish_lftp_latency(self):
+        """
+        Publish the command latency of each host's LFTP instance to the status
+        """
+        now = time.monotonic()
+        if (
+            self.__latency_status_time is not None
+            and now - self.__latency_status_time < Controller._LATENCY_STATUS_INTERVAL_IN_SECS
+        ):
+            return
+        self.__latency_status_time = now
+        lftp_latency = {}
+        for (address, port, _), shared in self.__shared_lftps.items():
+            latency = shared.lftp.command_latency
+            if latency is None:
+                continue
+            lftp_latency[f"{address}:{port}"] = {
+                "commands": latency.num_commands,
+                "last_ms": round(latency.last_ms, 1),
+                "average_ms": round(latency.average_ms, 1),
+                "max_ms": round(latency.max_ms, 1),
+            }
+        if self.__context.status.transfer.lftp_latency != lftp_latency:
+            self.__context.status.transfer.lftp_latency = lftp_latency
+
     def _configure_lftp(self, lftp: Lftp):
         configure_lftp(lftp, self.__context.config)
         lftp.set_verbose_logging(self.__context.config.general.verbose)  # type: ignore[arg-type]
@@ -335,13 +576,18 @@ class Controller:
             raise ControllerError("Cannot process, controller is not started")
         if self.__needs_lftp_reconfigure.is_set():
             self.__needs_lftp_reconfigure.clear()
-            for pc in self.__pair_contexts:
-                self._configure_lftp(pc.lftp)
+            for shared in self.__shared_lftps.values():
+                self._configure_shared_lftp(shared)
             self.logger.info("Reapplied LFTP tuning settings")
         self.__pipeline.propagate_exceptions()
         self.__pipeline.cleanup()
         self.__pipeline.step()
         self.__updater.update()
+        self.__pipeline.prune_priorities()
+        self._order_lftp_queues()
+        self._apply_bandwidth_schedule()
+        self._tune_lftp_connections()
+        self._publish_lftp_latency()
 
     def exit(self):
         self.logger.debug("Exiting controller")
@@ -367,6 +613,7 @@ class Controller:
                 cp.process.join()
             for mp in self.__pipeline.active_move_processes:
                 mp.join()
+            self.__updater.shutdown()
             self.__mp_logger.stop()
 
             # Close multiprocessing queues to release file descriptors.
@@ -392,6 +639,23 @@ class Controller:
     def get_model_files(self) -> list[ModelFile]:
         return self.__registry.get_files()
 
+    def get_model_snapshot(self) -> ModelSnapshot:
+        return self.__registry.get_snapshot()
+
+    def get_model_version(self) -> int:
+        return self.__registry.version
+
+    def query_model(
+        self,
+        states: Iterable[ModelFile.State] | None = None,
+        pair_id: str | AnyPair | None = ANY_PAIR,
+        is_extractable: bool | None = None,
+        name_prefix: str | None = None,
+    ) -> ModelSnapshot:
+        return self.__registry.query(
+            states=states, pair_id=pair_id, is_extractable=is_extractable, name_prefix=name_prefix
+        )
+
     def add_model_listener(self, listener: IModelListener):
         self.__registry.add_listener(listener)
 
@@ -401,5 +665,12 @@ class Controller:
     def get_model_files_and_add_listener(self, listener: IModelListener):
         return self.__registry.get_files_and_add_listener(listener)
 
+    def get_model_snapshot_and_add_listener(self, listener: IModelListener) -> ModelSnapshot:
+        return self.__registry.get_snapshot_and_add_listener(listener)
+
     def queue_command(self, command: Command):
         self.__pipeline.queue(command)
+
+    def queue_commands(self, commands: list[Command]):
+        """Queue several commands at once; they are processed together in the next cycle"""
+        self.__pipeline.queue_many(commands)
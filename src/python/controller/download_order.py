@@ -0,0 +1,69 @@
+# Copyright 2017, Inderpreet Singh, All rights reserved.
+
+"""Download priorities and the order of the lftp queue.
+
+Queued files are downloaded by priority: the file's own priority plus the
+priority of its path pair, highest first. Files of equal priority follow the
+configured download order. lftp starts queued jobs in queue order, so the
+controller moves jobs within lftp's queue to match.
+"""
+
+import math
+
+from model import ModelFile
+
+from .persist_keys import persist_key
+
+
+class DownloadPriorities:
+    """
+    Priorities set on individual files, by pair and file name
+    Files without a priority have priority 0.
+    """
+
+    MIN_PRIORITY = -100
+    MAX_PRIORITY = 100
+
+    def __init__(self):
+        self.__priorities: dict[str | None, dict[str, int]] = {}
+
+    def set_priority(self, pair_id: str | None, name: str, priority: int):
+        if priority == 0:
+            self.__priorities.get(pair_id, {}).pop(name, None)
+        else:
+            self.__priorities.setdefault(pair_id, {})[name] = priority
+
+    def get(self, pair_id: str | None, name: str) -> int:
+        return self.__priorities.get(pair_id, {}).get(name, 0)
+
+    def of_pair(self, pair_id: str | None) -> dict[str, int]:
+        """Priorities of one pair's files, by file name"""
+        return dict(self.__priorities.get(pair_id, {}))
+
+    def retain(self, keys: set[str]):
+        """Forget the priorities of files whose persist key is not in keys"""
+        for pair_id, priorities in self.__priorities.items():
+            for name in [name for name in priorities if persist_key(pair_id, name) not in keys]:
+                del priorities[name]
+
+    def __len__(self) -> int:
+        return sum(len(priorities) for priorities in self.__priorities.values())
+
+
+def queue_order_key(file: ModelFile | None, pair_priority: int, download_order: str) -> tuple[int, float]:
+    """
+    Sort key of a queued file, smallest is downloaded first
+    :param file: the queued file, None if it is not in the model
+    :param pair_priority: priority of the file's pair
+    :param download_order: "fifo", "smallest_first" or "oldest_first"
+    :return:
+    """
+    if file is None:
+        return -pair_priority, 0.0
+    tie_breaker = 0.0
+    if download_order == "smallest_first":
+        tie_breaker = file.remote_size if file.remote_size is not None else math.inf
+    elif download_order == "oldest_first":
+        timestamp = file.remote_modified_timestamp
+        tie_breaker = timestamp.timestamp() if timestamp is not None else math.inf
+    return -(pair_priority + file.priority), tie_breaker
@@ -3,6 +3,7 @@
 import logging
 import math
 import os
+from collections import deque
 
 from lftp import LftpJobStatus
 from model import Model, ModelError, ModelFile
@@ -11,6 +12,7 @@ from model import Model, ModelError, ModelFile
 from system import SystemFile
 
 from .extract import Extract, ExtractStatus
+from .throughput import ThroughputTracker
 from .validate import ValidateStatus
 
 
@@ -39,8 +41,10 @@ class ModelBuilder:
         self.__validated_files: set[str] = set()
         self.__corrupt_files: set[str] = set()
         self.__auto_delete_remote = False
+        self.__priorities: dict[str, int] = {}
         self.__cached_model: Model | None = None
-        self.__smoothed_etas: dict[str, float] = {}
+        # per-file transfer history of the root files currently downloading
+        self.__throughput = ThroughputTracker()
 
     def set_base_logger(self, base_logger: logging.Logger):
         self.logger = base_logger.getChild("ModelBuilder")
@@ -124,6 +128,13 @@ class ModelBuilder:
         if self.__corrupt_files != prev_corrupt_files:
             self.__cached_model = None
 
+    def set_priorities(self, priorities: dict[str, int]):
+        prev_priorities = self.__priorities
+        self.__priorities = priorities
+        # Invalidate the cache
+        if self.__priorities != prev_priorities:
+            self.__cached_model = None
+
     def set_auto_delete_remote(self, enabled: bool):
         if self.__auto_delete_remote != enabled:
             self.__auto_delete_remote = enabled
@@ -142,8 +153,9 @@ class ModelBuilder:
         self.__validated_files.clear()
         self.__corrupt_files.clear()
         self.__auto_delete_remote = False
+        self.__priorities.clear()
         self.__cached_model = None
-        self.__smoothed_etas.clear()
+        self.__throughput.clear()
 
     def has_changes(self) -> bool:
         """
@@ -164,6 +176,7 @@ class ModelBuilder:
         all_file_names: set[str] = set[str]().union(
             effective_local.keys(), self.__remote_files.keys(), self.__lftp_statuses.keys()
         )
+        sampled_names: set[str] = set()
         for name in all_file_names:
             remote = self.__remote_files.get(name, None)
             local = effective_local.get(name)
@@ -189,6 +202,7 @@ class ModelBuilder:
                 raise ModelError("Mismatch in is_dir between sources")
 
             model_file = ModelFile(name, is_dir, pair_id=self.__pair_id)
+            model_file.priority = self.__priorities.get(name, 0)
             # set the file state
             # for now we only set to Queued or Downloading
             # later after all children are built, we can set to Downloaded after performing a check
@@ -208,20 +222,41 @@ class ModelBuilder:
 
             self._build_children(remote, local, status, model_file)
 
-            self._estimate_eta(model_file, name, status)
+            if self._estimate_eta(model_file, name, status):
+                sampled_names.add(name)
             incomplete_children = self._check_root_downloaded(model_file)
             self._determine_state(model_file, incomplete_children)
 
             model.add_file(model_file)
 
-        # Clean up smoothed ETAs for files no longer in model
-        stale = [k for k in self.__smoothed_etas if k not in model.get_file_names()]
-        for k in stale:
-            del self.__smoothed_etas[k]
+        # Forget the history of files that are no longer downloading
+        for name in self.__throughput.keys() - sampled_names:
+            self.__throughput.discard(name)
 
         self.__cached_model = model
         return model
 
+    def build_model_detached(self) -> tuple[Model, ThroughputTracker]:
+        """
+        Build the model and return it together with the throughput history
+        Used when the build runs on a pickled copy of this builder in a worker
+        process; the result is handed back to the original builder with attach_build()
+        :return:
+        """
+        model = self.build_model()
+        return model, self.__throughput
+
+    def attach_build(self, model: Model, throughput: ThroughputTracker):
+        """
+        Adopt a model built by build_model_detached() on a copy of this builder
+        Must only be called if no setter was called since the copy was made
+        :param model:
+        :param throughput:
+        :return:
+        """
+        self.__cached_model = model
+        self.__throughput = throughput
+
     def _build_children(
         self,
         remote: SystemFile | None,
@@ -236,11 +271,17 @@ class ModelBuilder:
         # for the pair
         # Note: in this case the frontier contains nodes that have already been process, it is
         #       merely used for traversing children
-        frontier: list[tuple[SystemFile | None, SystemFile | None, LftpJobStatus | None, ModelFile]] = []
+        frontier: deque[tuple[SystemFile | None, SystemFile | None, LftpJobStatus | None, ModelFile]] = deque()
         if remote or local:
             frontier.append((remote, local, status, root_model_file))
+        # Index the transfer states of the whole tree once, by path relative to the root
+        # Note: the first state reported for a path wins
+        transfer_states: dict[str, LftpJobStatus.TransferState] = {}
+        if status:
+            for _path, _transfer_state in status.get_active_file_transfer_states():
+                transfer_states.setdefault(_path, _transfer_state)
         while frontier:
-            _remote, _local, _status, _model_file = frontier.pop(0)
+            _remote, _local, _status, _model_file = frontier.popleft()
             _remote_children: dict[str, SystemFile] = {sf.name: sf for sf in _remote.children} if _remote else {}
             _local_children: dict[str, SystemFile] = {sf.name: sf for sf in _local.children} if _local else {}
             _all_children_names: set[str] = set[str]().union(_remote_children.keys(), _local_children.keys())
@@ -261,12 +302,10 @@ class ModelBuilder:
                 # find the transfer state (if it exists) corresponding to this child
                 # Note: transfer states are in full paths
                 # Note2: transfer states don't include root path
-                _child_status_path = os.path.join(*(_child_model_file.full_path.split(os.sep)[1:]))
                 _child_transfer_state = None
                 if _status:
-                    _child_transfer_state = next(
-                        (ts for n, ts in _status.get_active_file_transfer_states() if n == _child_status_path), None
-                    )
+                    _child_status_path = _child_model_file.full_path.partition(os.sep)[2]
+                    _child_transfer_state = transfer_states.get(_child_status_path)
                 # Set the state, first matching criteria below decides state
                 #   child is a directory: Default
                 #   child is active: Downloading
@@ -372,17 +411,16 @@ class ModelBuilder:
             if remote.timestamp_modified:
                 model_file.remote_modified_timestamp = remote.timestamp_modified
 
-    def _estimate_eta(self, model_file: ModelFile, name: str, status: LftpJobStatus | None):
-        # estimate the ETA for the root if it's not available
-        if not (
-            model_file.state == ModelFile.State.DOWNLOADING
-            and model_file.eta is None
-            and model_file.downloading_speed is not None
-            and model_file.downloading_speed > 0
-        ):
-            return
+    def _estimate_eta(self, model_file: ModelFile, name: str, status: LftpJobStatus | None) -> bool:
+        """
+        Record the progress of a downloading root file and estimate its throughput and ETA
+        The windowed estimate replaces lftp's instantaneous values once enough history
+        exists; until then lftp's ETA is used, or estimated from lftp's speed
+        :return: True if a progress sample was recorded
+        """
+        if model_file.state != ModelFile.State.DOWNLOADING:
+            return False
 
-        raw_eta = None
         # For directories, prefer LFTP's real-time transfer sizes over
         # stale filesystem sizes
         if (
@@ -392,21 +430,26 @@ class ModelBuilder:
             and status.total_transfer_state.size_remote is not None
             and status.total_transfer_state.size_remote > 0
         ):
-            remaining = max(status.total_transfer_state.size_remote - status.total_transfer_state.size_local, 0)
-            raw_eta = remaining / model_file.downloading_speed
+            transferred = status.total_transfer_state.size_local
+            remaining = max(status.total_transfer_state.size_remote - transferred, 0)
         elif model_file.transferred_size is not None and model_file.remote_size is not None:
-            remaining = max(model_file.remote_size - model_file.transferred_size, 0)
-            raw_eta = remaining / model_file.downloading_speed
-
-        if raw_eta is not None:
-            # Apply EMA smoothing (alpha=0.3) to prevent wild swings
-            alpha = 0.3
-            if name in self.__smoothed_etas:
-                smoothed = self.__smoothed_etas[name] + alpha * (raw_eta - self.__smoothed_etas[name])
-            else:
-                smoothed = raw_eta
-            self.__smoothed_etas[name] = smoothed
-            model_file.eta = math.ceil(smoothed)
+            transferred = model_file.transferred_size
+            remaining = max(model_file.remote_size - transferred, 0)
+        else:
+            return False
+
+        self.__throughput.add_sample(name, transferred)
+        estimate = self.__throughput.estimate(name)
+        if estimate is not None:
+            model_file.throughput = round(estimate.rate)
+        eta = self.__throughput.estimate_eta(name, remaining)
+        if eta is not None:
+            model_file.eta = eta.eta
+            model_file.eta_low = eta.eta_low
+            model_file.eta_high = eta.eta_high
+        elif model_file.eta is None and model_file.downloading_speed is not None and model_file.downloading_speed > 0:
+            model_file.eta = math.ceil(remaining / model_file.downloading_speed)
+        return True
 
     def _check_root_downloaded(self, model_file: ModelFile) -> bool:
         # now we can determine if root is Downloaded
@@ -8,10 +8,45 @@ controller.py as part of the controller decomposition (#394 Phase 2D).
 
 from __future__ import annotations
 
-import copy
+from collections.abc import Iterable
 from threading import RLock
+from typing import NamedTuple
 
-from model import IModelListener, Model, ModelDiff, ModelDiffUtil, ModelFile
+from model import ANY_PAIR, AnyPair, IModelListener, Model, ModelDiff, ModelDiffUtil, ModelFile
+
+
+class ModelSnapshot(NamedTuple):
+    """Immutable, versioned view of the model.
+
+    ``files`` holds frozen ModelFile instances. Files that did not change
+    between two versions are the same objects in both snapshots, so
+    publishing a new snapshot never copies file trees.
+    """
+
+    version: int
+    files: tuple[ModelFile, ...]
+
+
+class _SnapshotInvalidator(IModelListener):
+    """Internal listener that freezes incoming files and invalidates the snapshot.
+
+    Registered on the model before any external listener so that listeners
+    only ever observe frozen files.
+    """
+
+    def __init__(self, registry: ModelRegistry):
+        self._registry = registry
+
+    def file_added(self, file: ModelFile):
+        file.freeze()
+        self._registry._on_model_changed()
+
+    def file_removed(self, file: ModelFile):
+        self._registry._on_model_changed()
+
+    def file_updated(self, old_file: ModelFile, new_file: ModelFile):
+        new_file.freeze()
+        self._registry._on_model_changed()
 
 
 class ModelRegistry:
@@ -21,6 +56,12 @@ class ModelRegistry:
     The ``apply_diff`` method is also thread-safe and returns the diffs
     so the caller can process side effects outside the lock.
 
+    Readers get immutable snapshots (see ``ModelSnapshot``). A snapshot is
+    published at the end of every ``apply_diff``, so ``get_snapshot`` and
+    ``get_files`` normally return without touching the lock and never wait
+    behind the controller thread. Files in the model are frozen as soon as
+    they are added, so they can be shared with readers without copying.
+
     Direct model access (``get_file``, ``get_all_files``) is provided for
     the controller thread which doesn't need locking (single-threaded access).
     """
@@ -28,13 +69,54 @@ class ModelRegistry:
     def __init__(self, model: Model):
         self._model = model
         self._lock = RLock()
+        self._version = 0
+        # None means the published snapshot is stale and must be rebuilt
+        self._snapshot: ModelSnapshot | None = None
+        # While a diff is being applied, readers keep seeing the previous snapshot
+        self._applying_diff = False
+        self._model.add_listener(_SnapshotInvalidator(self))
 
     # --- Thread-safe public API (used by external callers) ---
 
+    @property
+    def version(self) -> int:
+        """Monotonic model version, bumped on every file add/remove/update."""
+        return self._version
+
+    def get_snapshot(self) -> ModelSnapshot:
+        """Return the latest immutable model snapshot (thread-safe)."""
+        # Reading a single attribute is atomic; only rebuild under the lock
+        snapshot = self._snapshot
+        if snapshot is not None:
+            return snapshot
+        with self._lock:
+            return self._publish_snapshot()
+
     def get_files(self) -> list[ModelFile]:
-        """Return a deep copy of all model files (thread-safe)."""
+        """Return all model files from the latest snapshot (thread-safe).
+
+        The returned files are frozen and shared; callers must not modify them.
+        """
+        return list(self.get_snapshot().files)
+
+    def query(
+        self,
+        states: Iterable[ModelFile.State] | None = None,
+        pair_id: str | AnyPair | None = ANY_PAIR,
+        is_extractable: bool | None = None,
+        name_prefix: str | None = None,
+    ) -> ModelSnapshot:
+        """Return the files matching all given criteria via the model indexes (thread-safe).
+
+        See ``Model.query``. The result is a snapshot of just the matching
+        files, with the version they were read at. The files are frozen and
+        shared.
+        """
         with self._lock:
-            return [copy.deepcopy(f) for f in self._model.get_all_files()]
+            files = self._model.query(
+                states=states, pair_id=pair_id, is_extractable=is_extractable, name_prefix=name_prefix
+            )
+            return ModelSnapshot(self._version, tuple(files))
 
     def add_listener(self, listener: IModelListener) -> None:
         """Add a model listener (thread-safe)."""
@@ -48,9 +130,17 @@ class ModelRegistry:
 
     def get_files_and_add_listener(self, listener: IModelListener) -> list[ModelFile]:
         """Add a listener and return current files atomically (thread-safe)."""
+        return list(self.get_snapshot_and_add_listener(listener).files)
+
+    def get_snapshot_and_add_listener(self, listener: IModelListener) -> ModelSnapshot:
+        """Add a listener and return the snapshot it starts from atomically (thread-safe).
+
+        The listener receives exactly the changes made after the returned
+        snapshot's version.
+        """
         with self._lock:
             self._model.add_listener(listener)
-            return [copy.deepcopy(f) for f in self._model.get_all_files()]
+            return self._publish_snapshot()
 
     # --- Mutation API (thread-safe, called from controller thread) ---
 
@@ -59,21 +149,30 @@ class ModelRegistry:
 
         The diff computation and model mutation happen atomically under the lock.
         Listeners are notified during mutation (inside the lock).
+        A new snapshot is published before the lock is released.
         The returned diffs can be used by the caller for side-effect processing
         outside the lock.
         """
         with self._lock:
-            diffs = ModelDiffUtil.diff_models(self._model, new_model)
-            for diff in diffs:
-                if diff.change == ModelDiff.Change.ADDED:
-                    assert diff.new_file is not None
-                    self._model.add_file(diff.new_file)
-                elif diff.change == ModelDiff.Change.REMOVED:
-                    assert diff.old_file is not None
-                    self._model.remove_file(diff.old_file.name, pair_id=diff.old_file.pair_id)
-                elif diff.change == ModelDiff.Change.UPDATED:
-                    assert diff.new_file is not None
-                    self._model.update_file(diff.new_file)
+            self._applying_diff = True
+            try:
+                diffs = ModelDiffUtil.diff_models(self._model, new_model)
+                for diff in diffs:
+                    if diff.change == ModelDiff.Change.ADDED:
+                        assert diff.new_file is not None
+                        self._model.add_file(diff.new_file)
+                    elif diff.change == ModelDiff.Change.REMOVED:
+                        assert diff.old_file is not None
+                        self._model.remove_file(diff.old_file.name, pair_id=diff.old_file.pair_id)
+                    elif diff.change == ModelDiff.Change.UPDATED:
+                        assert diff.new_file is not None
+                        self._model.update_file(diff.new_file)
+            finally:
+                self._applying_diff = False
+                snapshot = self._snapshot
+                if snapshot is not None and snapshot.version != self._version:
+                    self._snapshot = None
+            self._publish_snapshot()
             return diffs
 
     # --- Direct access (controller thread only, no lock needed) ---
@@ -85,3 +184,18 @@ class ModelRegistry:
     def get_all_files(self) -> list[ModelFile]:
         """Get all files (no copy). Not thread-safe — controller thread only."""
         return self._model.get_all_files()
+
+    # --- Internal ---
+
+    def _on_model_changed(self) -> None:
+        self._version += 1
+        if not self._applying_diff:
+            self._snapshot = None
+
+    def _publish_snapshot(self) -> ModelSnapshot:
+        """Rebuild the snapshot if stale. Caller must hold the lock."""
+        snapshot = self._snapshot
+        if snapshot is None or snapshot.version != self._version:
+            snapshot = ModelSnapshot(self._version, tuple(self._model.get_all_files()))
+            self._snapshot = snapshot
+        return snapshot
@@ -11,10 +11,12 @@ from __future__ import annotations
 
 import logging
 import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor, wait
 
 from common import Context
 from lftp import LftpError, LftpJobStatus
-from model import Model, ModelDiff, ModelError, ModelFile
+from model import Model, ModelDiff, ModelFile
 
 from .command_pipeline import CommandPipeline
 from .controller_persist import ControllerPersist
@@ -22,7 +24,7 @@ from .exclude_patterns import filter_excluded_files
 from .extract import ExtractCompletedResult, ExtractFailedResult, ExtractProcess, ExtractStatus, ExtractStatusResult
 from .model_registry import ModelRegistry
 from .pair_context import PairContext
-from .persist_keys import KEY_SEP, persist_key, strip_persist_key
+from .persist_keys import KEY_SEP, persist_key
 from .validate import (
     ValidateCompletedResult,
     ValidateFailedResult,
@@ -60,6 +62,8 @@ class ModelUpdater:
         self._context = context
         self._password = password
         self._logger = logger
+        # Created lazily on the first cycle that has more than one pair to rebuild
+        self._build_executor: Executor | None = None
 
     def update(self) -> None:
         # Grab the latest extract results (shared)
@@ -125,11 +129,10 @@ class ModelUpdater:
         #      same local directory already claims a file with that name.
         seen_names_by_path: dict[str, set[str]] = {}
         deferred_local_only: list[tuple[ModelFile, str]] = []
-        for pc in self._pair_contexts:
+        for pc, pair_model in zip(self._pair_contexts, self._build_pair_models(), strict=True):
             norm_path = os.path.normpath(os.path.abspath(pc.local_path))
             if norm_path not in seen_names_by_path:
                 seen_names_by_path[norm_path] = set()
-            pair_model = pc.model_builder.build_model()
             for file in pair_model.get_all_files():
                 is_local_only = file.remote_size is None and file.state == ModelFile.State.DEFAULT
                 if is_local_only:
@@ -145,6 +148,54 @@ class ModelUpdater:
 
         return new_model
 
+    def _build_pair_models(self) -> list[Model]:
+        """Build every pair's model, returned in pair order.
+
+        Pairs that need a rebuild are built on the worker pool when there is
+        more than one of them; the others return their cached model. The merge
+        in _build_aggregate_model always walks the results in pair order, so
+        the outcome does not depend on which worker finishes first.
+        """
+        start = time.monotonic()
+        stale = [pc for pc in self._pair_contexts if pc.model_builder.has_changes()]
+        executor = self._get_build_executor() if len(stale) > 1 else None
+        if executor is not None:
+            process_mode = isinstance(executor, ProcessPoolExecutor)
+            futures = [
+                executor.submit(pc.model_builder.build_model_detached if process_mode else pc.model_builder.build_model)
+                for pc in stale
+            ]
+            wait(futures)
+            for pc, future in zip(stale, futures, strict=True):
+                result = future.result()  # re-raises a worker's exception here
+                if process_mode:
+                    pc.model_builder.attach_build(*result)
+        models = [pc.model_builder.build_model() for pc in self._pair_contexts]
+        elapsed_ms = (time.monotonic() - start) * 1000
+        self._logger.debug(
+            f"Built {len(stale)}/{len(self._pair_contexts)} pair models in {elapsed_ms:.1f}ms "
+            f"({'serial' if executor is None else self._context.config.controller.model_build_mode})"
+        )
+        return models
+
+    def _get_build_executor(self) -> Executor | None:
+        """Return the model build worker pool, or None when building serially."""
+        workers = self._context.config.controller.model_build_workers or 1
+        if workers <= 1:
+            return None
+        if self._build_executor is None:
+            if self._context.config.controller.model_build_mode == "process":
+                self._build_executor = ProcessPoolExecutor(max_workers=workers)
+            else:
+                self._build_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ModelBuild")
+        return self._build_executor
+
+    def shutdown(self) -> None:
+        """Stop the model build worker pool, if one was started."""
+        if self._build_executor is not None:
+            self._build_executor.shutdown(wait=True, cancel_futures=True)
+            self._build_executor = None
+
     def _process_model_diffs(self, model_diff: list[ModelDiff]) -> None:
         """Process each diff: update persist state, auto-validate, staging moves, pending completion."""
         for diff in model_diff:
@@ -258,17 +309,23 @@ class ModelUpdater:
 
     def _prune_extracted_files(self) -> None:
         """Remove extracted-file entries for files that were deleted locally."""
+        extracted = self._persist.extracted_file_names
+        if not extracted:
+            return
+        # Walk the DELETED files only and look up the persist keys they could be stored under
+        pair_ids = {_pc.pair_id for _pc in self._pair_contexts}
         remove_extracted_keys: set[str] = set()
-        for pkey in self._persist.extracted_file_names:
-            for _pc in self._pair_contexts:
-                bare_name = strip_persist_key(pkey, _pc.pair_id)
-                if bare_name != pkey or _pc.pair_id is None:
-                    try:
-                        file = self._registry.get_file(bare_name, pair_id=_pc.pair_id)
-                        if file.state == ModelFile.State.DELETED:
-                            remove_extracted_keys.add(pkey)
-                    except ModelError:
-                        pass
+        for file in self._registry.query(states=(ModelFile.State.DELETED,)).files:
+            if file.pair_id:
+                if file.pair_id not in pair_ids:
+                    continue
+                # Current unit-separator key, and the legacy colon key
+                keys: tuple[str, ...] = (persist_key(file.pair_id, file.name), f"{file.pair_id}:{file.name}")
+            elif None in pair_ids:
+                keys = (file.name,)
+            else:
+                continue
+            remove_extracted_keys.update(k for k in keys if k in extracted)
         if remove_extracted_keys:
             self._logger.info(f"Removing from extracted list: {remove_extracted_keys}")
             self._persist.extracted_file_names.difference_update(remove_extracted_keys)
@@ -355,6 +412,25 @@ class ModelUpdater:
                 current = self._context.status.controller.latest_local_scan_time
                 if current is None or pc.latest_local_scan.timestamp > current:
                     self._context.status.controller.latest_local_scan_time = pc.latest_local_scan.timestamp
+        self._update_transfer_status()
+
+    def _update_transfer_status(self) -> None:
+        """Publish pair and global download speeds, summed over the downloading files.
+
+        Uses each file's windowed throughput, or lftp's speed until enough
+        history exists. Status listeners are only notified when a value changes.
+        """
+        pair_speeds: dict[str, int] = {}
+        for file in self._registry.query(states=(ModelFile.State.DOWNLOADING,)).files:
+            speed = file.throughput if file.throughput is not None else (file.downloading_speed or 0)
+            pair_id = file.pair_id or ""
+            pair_speeds[pair_id] = pair_speeds.get(pair_id, 0) + speed
+        transfer = self._context.status.transfer
+        total = sum(pair_speeds.values())
+        if transfer.download_speed != total:
+            transfer.download_speed = total
+        if transfer.pair_download_speeds != pair_speeds:
+            transfer.pair_download_speeds = pair_speeds
 
     def _update_pair_model_state(
         self,
@@ -9,7 +9,7 @@ Extracted from controller.py as part of the controller decomposition
 from __future__ import annotations
 
 from common import AppError, Config, Constants, Context
-from lftp import Lftp
+from lftp import Lftp, SharedLftpClient
 
 from .model_builder import ModelBuilder
 from .scan import ActiveScanner, LocalScanner, RemoteScanner, ScannerProcess, ScannerResult
@@ -25,7 +25,7 @@ class ControllerError(AppError):
 
 class PairContext:
     """
-    Holds all per-pair state: LFTP instance, scanners, scanner processes,
+    Holds all per-pair state: LFTP client, scanners, scanner processes,
     model builder, and download tracking.
     """
 
@@ -36,7 +36,7 @@ class PairContext:
         remote_path: str,
         local_path: str,
         effective_local_path: str,
-        lftp: Lftp,
+        lftp: SharedLftpClient,
         active_scanner: ActiveScanner,
         local_scanner: LocalScanner,
         remote_scanner: RemoteScanner,
@@ -44,6 +44,7 @@ class PairContext:
         local_scan_process: ScannerProcess,
         remote_scan_process: ScannerProcess,
         model_builder: ModelBuilder,
+        priority: int = 0,
     ):
         self.pair_id = pair_id
         self.name = name
@@ -58,6 +59,8 @@ class PairContext:
         self.local_scan_process = local_scan_process
         self.remote_scan_process = remote_scan_process
         self.model_builder = model_builder
+        # Download priority added to that of each of the pair's files
+        self.priority = priority
 
         # Per-pair tracking state
         self.active_downloading_file_names: list[str] = []
@@ -141,7 +144,8 @@ def configure_lftp(lftp: Lftp, config: Config) -> None:
     lftp.use_temp_file = cfg.use_temp_file  # type: ignore[assignment]
     lftp.temp_file_name = "*" + Constants.LFTP_TEMP_FILE_SUFFIX
     if cfg.net_limit_rate:
-        lftp.rate_limit = cfg.net_limit_rate
+        # A budget for all connections together; net:limit-rate would apply to each one
+        lftp.total_rate_limit = cfg.net_limit_rate
     if cfg.net_socket_buffer:
         lftp.net_socket_buffer = cfg.net_socket_buffer
     if cfg.pget_min_chunk_size:
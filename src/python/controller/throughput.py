@@ -0,0 +1,124 @@
+# Copyright 2017, Inderpreet Singh, All rights reserved.
+
+"""Windowed throughput and ETA estimation.
+
+Keeps a bounded history of (timestamp, transferred bytes) samples per key
+and derives throughput from the bytes actually transferred over a sliding
+window, rather than from the instantaneous speed lftp reports on each tick.
+A short stall or an lftp reconnect therefore lowers the estimate gradually
+instead of collapsing it.
+"""
+
+import math
+import statistics
+import time
+from collections import deque
+from itertools import pairwise
+from typing import NamedTuple
+
+
+class ThroughputEstimate(NamedTuple):
+    """Throughput over the window, with a band from the spread of the samples (bytes/sec)"""
+
+    rate: float
+    rate_low: float
+    rate_high: float
+
+
+class EtaEstimate(NamedTuple):
+    """Estimated seconds remaining, with a confidence band"""
+
+    eta: int
+    eta_low: int
+    eta_high: int | None  # None when the slowest observed rate is zero
+
+
+class ThroughputTracker:
+    """
+    Bounded ring buffer of transfer samples per key
+
+    A key is typically a root file name (per-file tracking) or a pair id
+    (per-pair tracking). Samples older than the window are dropped, except
+    that the two most recent samples are always kept so that a rate can be
+    computed after a long gap between samples.
+    """
+
+    WINDOW_IN_SECS = 30.0
+    # Minimum time span covered by the samples before an estimate is made
+    MIN_SPAN_IN_SECS = 3.0
+    MAX_SAMPLES = 64
+
+    def __init__(self):
+        self.__samples: dict[str, deque[tuple[float, int]]] = {}
+
+    def add_sample(self, key: str, transferred: int, timestamp: float | None = None):
+        """
+        Record the total number of bytes transferred so far for key
+        :param key:
+        :param transferred: cumulative bytes transferred
+        :param timestamp: monotonic time of the sample, defaults to now
+        :return:
+        """
+        now = time.monotonic() if timestamp is None else timestamp
+        samples = self.__samples.get(key)
+        if samples is None:
+            samples = deque(maxlen=ThroughputTracker.MAX_SAMPLES)
+            self.__samples[key] = samples
+        elif samples and transferred < samples[-1][1]:
+            # Transfer restarted from a smaller size, history no longer applies
+            samples.clear()
+        elif samples and now <= samples[-1][0]:
+            # Same instant as the previous sample, keep the latest value only
+            samples.pop()
+        samples.append((now, transferred))
+        while len(samples) > 2 and now - samples[0][0] > ThroughputTracker.WINDOW_IN_SECS:
+            samples.popleft()
+
+    def estimate(self, key: str) -> ThroughputEstimate | None:
+        """
+        Return the windowed throughput for key, or None if there is not enough history
+        :param key:
+        :return:
+        """
+        samples = self.__samples.get(key)
+        if not samples or len(samples) < 2:
+            return None
+        (t_first, b_first), (t_last, b_last) = samples[0], samples[-1]
+        span = t_last - t_first
+        if span < ThroughputTracker.MIN_SPAN_IN_SECS:
+            return None
+        rate = (b_last - b_first) / span
+        interval_rates = [(b1 - b0) / (t1 - t0) for (t0, b0), (t1, b1) in pairwise(samples)]
+        if len(interval_rates) >= 2:
+            rate_low, _, rate_high = statistics.quantiles(interval_rates, n=4, method="inclusive")
+        else:
+            rate_low = rate_high = rate
+        # The band always contains the windowed rate
+        return ThroughputEstimate(rate=rate, rate_low=min(rate_low, rate), rate_high=max(rate_high, rate))
+
+    def estimate_eta(self, key: str, remaining: int) -> EtaEstimate | None:
+        """
+        Return the ETA for transferring the remaining bytes of key, or None
+        if there is no usable throughput estimate
+        :param key:
+        :param remaining: bytes left to transfer
+        :return:
+        """
+        estimate = self.estimate(key)
+        if estimate is None or estimate.rate <= 0:
+            return None
+        remaining = max(remaining, 0)
+        return EtaEstimate(
+            eta=math.ceil(remaining / estimate.rate),
+            eta_low=math.ceil(remaining / estimate.rate_high),
+            eta_high=math.ceil(remaining / estimate.rate_low) if estimate.rate_low > 0 else None,
+        )
+
+    def keys(self) -> set[str]:
+        return set(self.__samples.keys())
+
+    def discard(self, key: str):
+        self.__samples.pop(key, None)
+
+    def clear(self):
+        self.__samples.clear()
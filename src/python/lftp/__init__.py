@@ -1,8 +1,19 @@
 # Copyright 2017, Inderpreet Singh, All rights reserved.
 
-from .lftp import Lftp as Lftp, LftpError as LftpError
+from .lftp import (
+    Lftp as Lftp,
+    LftpCommandLatency as LftpCommandLatency,
+    LftpError as LftpError,
+    LftpQueueItem as LftpQueueItem,
+)
 from .job_status import LftpJobStatus as LftpJobStatus
 from .job_status_parser import (
     LftpJobStatusParser as LftpJobStatusParser,
     LftpJobStatusParserError as LftpJobStatusParserError,
 )
+from .shared import (
+    SharedLftp as SharedLftp,
+    SharedLftpClient as SharedLftpClient,
+    SharedLftpQueueItem as SharedLftpQueueItem,
+)
+from .bundle import TarBundle as TarBundle
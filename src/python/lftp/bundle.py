@@ -0,0 +1,229 @@
+# Copyright 2017, Inderpreet Singh, All rights reserved.
+
+"""Download of a directory as one tar stream over ssh.
+
+Mirroring a directory over SFTP costs lftp a few round trips per file, which
+dominates when the directory holds thousands of small files. A bundle instead
+runs tar on the remote server and unpacks its output locally as it arrives,
+so the whole directory costs a single connection.
+"""
+
+import logging
+import os
+import shlex
+import time
+import warnings
+from collections import deque
+
+import pexpect
+
+from common import escape_remote_path_double, escape_remote_path_single
+
+from .job_status import LftpJobStatus
+
+# Written by the pipeline when the remote side fails; the local tar alone
+# can't tell a failed stream from an empty one
+_SOURCE_FAILED_MARKER = "__bundle_source_failed__"
+
+
+class TarBundle:
+    """
+    A tar-over-ssh download of one directory
+
+    Its status reports it as a mirror job, queued until start() and running
+    after, so it shows up in the model like any lftp job. Progress comes from
+    tar's listing of the entries it unpacked.
+    """
+
+    # Bytes read from the process per read
+    _READ_SIZE = 64 * 1024
+    # Output lines kept for the error of a failed bundle
+    _ERROR_LINES = 5
+
+    def __init__(
+        self,
+        job_id: int,
+        name: str,
+        remote_dir_path: str,
+        local_dir_path: str,
+        source_command: str,
+        size_remote: int | None = None,
+        password: str | None = None,
+    ):
+        """
+        :param job_id: id to report in the status, apart from lftp's job ids
+        :param name: name of the directory to download
+        :param remote_dir_path: remote directory containing it
+        :param local_dir_path: local directory to unpack it into
+        :param source_command: command line that writes the tar stream to stdout,
+                               e.g. ssh running remote_command()
+        :param size_remote: size of the directory on the remote server, for progress
+        :param password: ssh password, None for key authentication
+        """
+        self.__id = job_id
+        self.__name = name
+        self.__remote_path = os.path.join(remote_dir_path, name)
+        self.__local_dir_path = local_dir_path
+        self.__size_remote = size_remote
+        self.__password = password
+        self.logger = logging.getLogger("TarBundle")
+
+        self.__source_command = source_command
+        self.__process: pexpect.spawn | None = None  # type: ignore[type-arg]
+        self.__start_time: float | None = None
+        self.__size_local = 0
+        self.__num_files = 0
+        # Entry tar is unpacking, measured once tar moves on to the next
+        self.__current_entry: str | None = None
+        self.__partial_line = ""
+        self.__recent_lines: deque[str] = deque(maxlen=TarBundle._ERROR_LINES)
+        self.__password_sent = False
+        self.__source_failed = False
+        self.__running = True
+        self.error: str | None = None
+
+    def start(self):
+        """Start the download"""
+        os.makedirs(self.__local_dir_path, exist_ok=True)
+        pipeline = (
+            f"{{ {self.__source_command} || echo {_SOURCE_FAILED_MARKER} >&2; }}"
+            f" | tar -C {shlex.quote(self.__local_dir_path)} -xvf -"
+        )
+        self.logger.info(f"Bundle command: {pipeline}")
+        self.__start_time = time.monotonic()
+        with warnings.catch_warnings():
+            warnings.filterwarnings("ignore", message=".*fork.*", category=DeprecationWarning)
+            self.__process = pexpect.spawn("/bin/sh", ["-c", pipeline])
+
+    @staticmethod
+    def remote_command(remote_dir_path: str, name: str, exclude_patterns: list[str] | None = None) -> str:
+        """
+        Shell command that writes the tar stream of a remote directory to stdout
+        :param remote_dir_path: remote directory containing the directory
+        :param name: name of the directory
+        :param exclude_patterns: glob patterns of entries to leave out
+        :return:
+        """
+        # Double quotes let a leading ~ expand to $HOME
+        escape_dir = escape_remote_path_double if remote_dir_path.startswith("~") else escape_remote_path_single
+        parts = ["tar", "-C", escape_dir(remote_dir_path), "-cf", "-"]
+        parts += [f"--exclude={escape_remote_path_single(pattern)}" for pattern in exclude_patterns or []]
+        parts += ["--", escape_remote_path_single(name)]
+        return " ".join(parts)
+
+    @property
+    def name(self) -> str:
+        return self.__name
+
+    @property
+    def started(self) -> bool:
+        return self.__process is not None
+
+    @property
+    def num_files(self) -> int:
+        """Number of files unpacked so far"""
+        return self.__num_files
+
+    @property
+    def status(self) -> LftpJobStatus:
+        status = LftpJobStatus(
+            job_id=self.__id,
+            job_type=LftpJobStatus.Type.MIRROR,
+            state=LftpJobStatus.State.RUNNING if self.started else LftpJobStatus.State.QUEUED,
+            name=self.__name,
+            flags="",
+            remote_path=self.__remote_path,
+            local_path=self.__local_dir_path,
+        )
+        if self.__start_time is None:
+            return status
+        elapsed = time.monotonic() - self.__start_time
+        speed = int(self.__size_local / elapsed) if elapsed > 0 else None
+        percent = None
+        eta = None
+        if self.__size_remote:
+            percent = min(100.0 * self.__size_local / self.__size_remote, 100.0)
+            if speed:
+                eta = max(self.__size_remote - self.__size_local, 0) // speed
+        status.total_transfer_state = LftpJobStatus.TransferState(
+            size_local=self.__size_local,
+            size_remote=self.__size_remote,
+            percent_local=percent,
+            speed=speed,
+            eta=eta,
+        )
+        return status
+
+    def poll(self) -> bool:
+        """
+        Read the progress made since the last poll
+        On failure, error says what went wrong.
+        :return: True until the download has finished
+        """
+        while self.__running and self.__process is not None:
+            try:
+                data = self.__process.read_nonblocking(TarBundle._READ_SIZE, timeout=0)
+            except pexpect.TIMEOUT:
+                break
+            except pexpect.EOF:
+                self.__finish()
+                break
+            self.__consume(data.decode(errors="replace"))
+        return self.__running
+
+    def kill(self):
+        """Stop the download, leaving what was unpacked so far"""
+        if self.__running:
+            self.__running = False
+            if self.__process is not None:
+                self.__process.close(force=True)
+
+    def __consume(self, text: str):
+        self.__partial_line += text.replace("\r", "")
+        *lines, self.__partial_line = self.__partial_line.split("\n")
+        for line in lines:
+            self.__on_line(line.strip())
+        # ssh's password prompt doesn't end in a newline
+        if self.__partial_line.rstrip().lower().endswith("password:"):
+            self.__partial_line = ""
+            self.__on_password_prompt()
+
+    def __on_line(self, line: str):
+        if not line:
+            return
+        if line == _SOURCE_FAILED_MARKER:
+            self.__source_failed = True
+            return
+        self.__recent_lines.append(line)
+        self.__measure_current_entry()
+        self.__current_entry = line
+
+    def __measure_current_entry(self):
+        if self.__current_entry is None:
+            return
+        path = os.path.join(self.__local_dir_path, self.__current_entry)
+        # Lines that aren't entries, such as warnings, don't exist locally
+        if os.path.isfile(path):
+            self.__size_local += os.path.getsize(path)
+            self.__num_files += 1
+        self.__current_entry = None
+
+    def __on_password_prompt(self):
+        if self.__password is None or self.__password_sent:
+            self.kill()
+            self.error = "Incorrect password" if self.__password_sent else "ssh asked for a password"
+            return
+        self.__password_sent = True
+        assert self.__process is not None
+        self.__process.sendline(self.__password)
+
+    def __finish(self):
+        assert self.__process is not None
+        self.__running = False
+        self.__process.close()
+        self.__measure_current_entry()
+        if self.__source_failed or self.__process.exitstatus != 0:
+            details = " / ".join(self.__recent_lines) or f"exit status {self.__process.exitstatus}"
+            self.error = f"Bundle of '{self.__name}' failed: {details}"
+        else:
+            self.logger.info(f"Bundle of '{self.__name}' done, {self.__num_files} files")
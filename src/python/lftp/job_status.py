@@ -33,12 +33,24 @@ class LftpJobStatus:
         speed: int | None
         eta: int | None
 
-    def __init__(self, job_id: int, job_type: Type, state: State, name: str, flags: str):
+    def __init__(
+        self,
+        job_id: int,
+        job_type: Type,
+        state: State,
+        name: str,
+        flags: str,
+        remote_path: str | None = None,
+        local_path: str | None = None,
+    ):
         self.__id = job_id
         self.__type = job_type
         self.__state = state
         self.__name = name
         self.__flags = flags
+        # Source and destination as given in the job's command
+        self.__remote_path = remote_path
+        self.__local_path = local_path
         self.__total_transfer_state = LftpJobStatus.TransferState(None, None, None, None, None)
         # dict of active file transfer states, maps filename to their transfer state
         # there's no hierarchical info for now
@@ -60,6 +72,14 @@ class LftpJobStatus:
     def name(self) -> str:
         return self.__name
 
+    @property
+    def remote_path(self) -> str | None:
+        return self.__remote_path
+
+    @property
+    def local_path(self) -> str | None:
+        return self.__local_path
+
     @property
     def total_transfer_state(self) -> TransferState:
         return self.__total_transfer_state
@@ -85,7 +105,19 @@ class LftpJobStatus:
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, LftpJobStatus):
             return NotImplemented
-        return self.__dict__ == other.__dict__
+        # The paths only tell where a job came from, they are not part of its status
+        return self.__status_fields() == other.__status_fields()
+
+    def __status_fields(self) -> tuple[object, ...]:
+        return (
+            self.__id,
+            self.__type,
+            self.__state,
+            self.__name,
+            self.__flags,
+            self.__total_transfer_state,
+            self.__active_files_state,
+        )
 
     def __str__(self) -> str:
         return str(self.__dict__)
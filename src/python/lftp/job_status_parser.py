@@ -16,6 +16,10 @@ class LftpJobStatusParserError(AppError):
 class LftpJobStatusParser:
     """
     Parses the output of lftp's "jobs -v" command into a LftpJobStatus
+
+    All patterns are compiled once. The parser walks the output lines by
+    index and picks the patterns to try from the first character of each
+    line, so a status with thousands of chunk lines is parsed in one pass.
     """
 
     # python doesn't support partial inline-modified flags, so we need
@@ -30,7 +34,144 @@ class LftpJobStatusParser:
 
     __QUOTED_FILE_NAME_REGEX = r"`(?P<name>.*)'"
 
-    __QUEUE_DONE_REGEX = r"^\[(?P<id>\d+)\]\sDone\s\(queue\s\(.+\)\)"
+    __SIZE_M = re.compile(rf"(?P<number>\d+\.?\d*)\s*(?P<units>{__SIZE_UNITS_REGEX})?")
+    __SIZE_MULTIPLIERS = {"b": 1, "k": 1024, "m": 1024 * 1024, "g": 1024 * 1024 * 1024}
+    __ETA_M = re.compile(__TIME_UNITS_REGEX)
+
+    # Match ANSI escape sequences: ESC [ ... <letter>
+    # This covers CSI sequences including bracketed paste mode
+    __ANSI_M = re.compile(r"\x1b\[[0-9;?]*[a-zA-Z]")
+    __LOG_LINE_M = re.compile(r"^\d{4}-\d{2}-\d{2}\s\d{2}:\d{2}:\d{2}.*\s->\s.*$")
+
+    __QUEUE_DONE_M = re.compile(r"^\[(?P<id>\d+)\]\sDone\s\(queue\s\(.+\)\)")
+
+    # Queue patterns
+    __QUEUE_HEADER1_M = re.compile(
+        r"^\[\d+\] queue \(sftp://.*@.*\)"
+        rf"(?:\s+--\s+(?:\d+\.\d+|\d+)\s({__SIZE_UNITS_REGEX})\/s)?$"
+    )
+    __QUEUE_HEADER2_M = re.compile(r"^sftp://.*@.*$")
+    __QUEUE_EXECUTING_M = re.compile(r"^-\[\d+\]")
+    __QUEUE_ITEM_M = re.compile(r"^\d+\.")
+    __QUEUE_PGET_M = re.compile(
+        r"^(?P<id>\d+)\.\s+"
+        r"pget\s+"
+        r"(?P<flags>.*?)\s+"
+        r"(?P<lq>[\'\"]|)(?P<remote>.+)(?P=lq)\s+"  # greedy on purpose
+        r"(?:-o\s+)"
+        r"(?P<rq>[\'\"]|)(?P<local>.+)(?P=rq)$"  # greedy on purpose
+    )
+    __QUEUE_MIRROR_M = re.compile(
+        r"^(?P<id>\d+)\.\s+"
+        r"mirror\s+"
+        r"(?P<flags>.*?)\s+"
+        r"(?P<lq>[\'\"]|)(?P<remote>.+)(?P=lq)\s+"  # greedy on purpose
+        r"(?P<rq>[\'\"]|)(?P<local>.+)(?P=rq)$"  # greedy on purpose
+    )
+
+    # Job header patterns
+    __PGET_HEADER_M = re.compile(
+        r"^\[(?P<id>\d+)\]\s+"
+        r"pget\s+"
+        r"(?P<flags>.*?)\s+"
+        r"(?P<lq>['\"]|)(?P<remote>.+)(?P=lq)\s+"  # greedy on purpose
+        r"-o\s+"
+        r"(?P<rq>['\"]|)(?P<local>.+)(?P=rq)$"  # greedy on purpose
+    )
+    # mirror header (downloading)
+    __MIRROR_HEADER_M = re.compile(
+        r"^\[(?P<id>\d+)\]\s+"
+        r"mirror\s+"
+        r"(?P<flags>.*?)\s+"
+        r"(?P<lq>['\"]|)(?P<remote>.+)(?P=lq)\s+"  # greedy on purpose
+        r"(?P<rq>['\"]|)(?P<local>.+)(?P=rq)\s+"  # greedy on purpose
+        r"--\s+"
+        rf"(?P<szlocal>\d+\.?\d*\s?({__SIZE_UNITS_REGEX})?)"  # size=0 has no units
+        r"\/"
+        rf"(?P<szremote>\d+\.?\d*\s?({__SIZE_UNITS_REGEX})?)\s+"  # size=0 has no units
+        r"\((?P<pctlocal>\d+)%\)"
+        rf"(\s+(?P<speed>\d+\.?\d*\s?({__SIZE_UNITS_REGEX}))\/s)?$"
+    )
+    # mirror header (connecting or receiving file list)
+    # Note: this must be tried after the more restrictive mirror header above
+    __MIRROR_FL_HEADER_M = re.compile(
+        r"^\[(?P<id>\d+)\]\s+"
+        r"mirror\s+"
+        r"(?P<flags>.*?)\s+"
+        r"(?P<lq>['\"]|)(?P<remote>.+)(?P=lq)\s+"  # greedy on purpose
+        r"(?P<rq>['\"]|)(?P<local>.+)(?P=rq)$"  # greedy on purpose
+    )
+
+    __HEADER_PROGRESS_M = re.compile(r"\s+(--\s.*)?$")
+
+    # Data patterns
+    __TRANSFER_M = re.compile(r"^\\transfer\s" + __QUOTED_FILE_NAME_REGEX)
+    __CHUNK_AT_M = re.compile(
+        r"^" + __QUOTED_FILE_NAME_REGEX + r"\s+"
+        r"at\s+"
+        r"\d+\s+"  # this is NOT the local size
+        r"(?:\(\d+%\)\s+)?"  # this is NOT the local percent
+        rf"((?P<speed>\d+\.?\d*\s?({__SIZE_UNITS_REGEX}))\/s\s+)?"
+        rf"(eta:(?P<eta>{__TIME_UNITS_REGEX})\s+)?"
+        r"\s*\[(?P<desc>.*)\]$"
+    )
+    __CHUNK_AT2_M = re.compile(
+        r"^" + __QUOTED_FILE_NAME_REGEX + r"\s+"
+        r"at\s+"
+        r"\d+\s+"  # this is NOT the local size
+        r"(?:\(\d+%\))"  # this is NOT the local percent
+    )
+    __CHUNK_GOT_M = re.compile(
+        r"^" + __QUOTED_FILE_NAME_REGEX + r",\s+"
+        r"got\s+"
+        r"(?P<szlocal>\d+)\s+"
+        r"of\s+"
+        r"(?P<szremote>\d+)\s+"
+        r"\((?P<pctlocal>\d+)%\)"
+        rf"(\s+(?P<speed>\d+\.?\d*\s?({__SIZE_UNITS_REGEX}))\/s)?"
+        rf"(\seta:(?P<eta>{__TIME_UNITS_REGEX}))?"
+    )
+    __CHUNK_HEADER_M = re.compile(r"^\\chunk\s+\d+")
+    __CHMOD_HEADER_M = re.compile(r"^chmod\s(?P<name>.*)")
+    __CHMOD_M = re.compile(__QUOTED_FILE_NAME_REGEX + r"\s\[\]")
+    __MIRROR_M = re.compile(
+        r"^\\mirror\s" + __QUOTED_FILE_NAME_REGEX + r"\s+"
+        r"--\s+"
+        rf"(?P<szlocal>\d+\.?\d*\s?({__SIZE_UNITS_REGEX})?)"  # size=0 has no units
+        r"\/"
+        rf"(?P<szremote>\d+\.?\d*\s?({__SIZE_UNITS_REGEX})?)\s+"  # size=0 has no units
+        r"\((?P<pctlocal>\d+)%\)"
+        rf"(\s+(?P<speed>\d+\.?\d*\s?({__SIZE_UNITS_REGEX}))\/s)?$"
+    )
+    __MIRROR_EMPTY_M = re.compile(r"^\\mirror\s" + __QUOTED_FILE_NAME_REGEX + r"\s*$")
+
+    # Orphan progress lines lftp can emit outside a job context, e.g.:
+    #   "3.0K/s eta:3m [Receiving data]"
+    #   "10M/s eta:1h2m [Making data connection]"
+    __ORPHAN_PROGRESS_M = re.compile(
+        rf"^(?:\d+\.?\d*\s?({__SIZE_UNITS_REGEX}))\/s\s+"
+        rf"eta:({__TIME_UNITS_REGEX})\s+"
+        r"\[.*\]$"
+    )
+    # Partial progress fragments from line-wrap (seen on Unraid), e.g.:
+    #   "/s eta:25m [Receiving data]"  (tail of "347.3K/s eta:25m ...")
+    __PARTIAL_PROGRESS_M = re.compile(
+        r"^\/s\s+"
+        rf"eta:({__TIME_UNITS_REGEX})\s+"
+        r"\[.*\]$"
+    )
+    # Chunk line-wrap fragments: long filenames cause lftp chunk progress
+    # lines to wrap, producing a tail fragment like:
+    #   "tmos.7.1.DV.HDR.H.265-TheFarm.mkv' at 22283455338 (0%) 427.6K/s eta:28m [Receiving data]"
+    # These are the tail of a `filename' at <pos> (<pct>%) ... line where
+    # the leading backtick and start of the filename are on the previous line.
+    __CHUNK_WRAP_M = re.compile(
+        r"^(?:[^`\\].*)?'\s+at\s+\d+\s+"
+        r"(?:\(\d+%\)\s+)?"
+        rf"(?:(?:\d+\.?\d*\s?({__SIZE_UNITS_REGEX}))\/s\s+)?"
+        rf"(?:eta:({__TIME_UNITS_REGEX})\s+)?"
+        r"\s*\[.*\]$"
+    )
 
     def __init__(self):
         self.logger = logging.getLogger("LftpJobStatusParser")
@@ -47,16 +188,15 @@ class LftpJobStatusParser:
         """
         if size == "0":
             return 0
-        m = re.compile(rf"(?P<number>\d+\.?\d*)\s*(?P<units>{LftpJobStatusParser.__SIZE_UNITS_REGEX})?")
-        result = m.search(size)
+        result = LftpJobStatusParser.__SIZE_M.search(size)
         if not result:
             raise ValueError(f"String '{size}' does not match the size pattern")
         number = float(result.group("number"))
         unit = (result.group("units") or "b")[0].lower()
-        multipliers = {"b": 1, "k": 1024, "m": 1024 * 1024, "g": 1024 * 1024 * 1024}
-        if unit not in multipliers:
+        multiplier = LftpJobStatusParser.__SIZE_MULTIPLIERS.get(unit)
+        if multiplier is None:
             raise ValueError(f"Unrecognized unit {unit} in size string '{size}'")
-        return int(number * multipliers[unit])
+        return int(number * multiplier)
 
     @staticmethod
     def _eta_to_seconds(eta: str) -> int:
@@ -65,8 +205,7 @@ class LftpJobStatusParser:
         :param eta:
         :return:
         """
-        m = re.compile(LftpJobStatusParser.__TIME_UNITS_REGEX)
-        result = m.search(eta)
+        result = LftpJobStatusParser.__ETA_M.search(eta)
         if not result:
             raise ValueError(f"String '{eta}' does not match the eta pattern")
         # the [:-1] below remove the last character
@@ -83,10 +222,9 @@ class LftpJobStatusParser:
         These can appear in lftp output when terminal features like
         bracketed paste mode are enabled (e.g., ^[[?2004l, ^[[?2004h).
         """
-        # Match ANSI escape sequences: ESC [ ... <letter>
-        # This covers CSI sequences including bracketed paste mode
-        ansi_pattern = re.compile(r"\x1b\[[0-9;?]*[a-zA-Z]")
-        return ansi_pattern.sub("", text)
+        if "\x1b" not in text:
+            return text
+        return LftpJobStatusParser.__ANSI_M.sub("", text)
 
     def parse(self, output: str) -> list[LftpJobStatus]:
         statuses: list[LftpJobStatus] = []
@@ -104,531 +242,322 @@ class LftpJobStatusParser:
         # Order matters: first strip echo+newline pairs, then any remaining echo.
         output = output.replace("jobs -v\n", "")
         output = output.replace("jobs -v", "")
-        lines = [s.strip() for s in output.splitlines()]
-        lines = list(filter(None, lines))  # remove blank lines
-        # remove any remaining log line
-        lines = filter(lambda s: not re.match(r"^\d{4}-\d{2}-\d{2}\s\d{2}:\d{2}:\d{2}.*\s->\s.*$", s), lines)
-        lines = list(lines)
+        log_line_m = LftpJobStatusParser.__LOG_LINE_M
+        lines = [
+            line
+            for line in (s.strip() for s in output.splitlines())
+            # remove blank lines and any remaining log line
+            if line and not (line[0].isdigit() and log_line_m.match(line))
+        ]
         try:
-            statuses += self.__parse_queue(lines)
-            statuses += self.__parse_jobs(lines)
+            queue, pos = LftpJobStatusParser.__parse_queue(lines)
+            statuses += queue
+            statuses += self.__parse_jobs(lines, pos)
         except ValueError as e:
             self.logger.error(f"LftpJobStateParser error: {e!s}")
             self.logger.error(f"Status:\n{output}")
             raise LftpJobStatusParserError("Error parsing lftp job status") from e
         return statuses
 
-    def __parse_jobs(self, lines: list[str]) -> list[LftpJobStatus]:  # noqa: C901 — complexity 48, lftp output parser
-        jobs: list[LftpJobStatus] = []
+    @staticmethod
+    def __parse_queue(lines: list[str]) -> tuple[list[LftpJobStatus], int]:  # noqa: C901 — lftp output parser
+        """
+        Parse the queue section at the start of lines
+        :return: queued jobs, and the index of the first line after the queue section
+        """
+        cls = LftpJobStatusParser
+        queue: list[LftpJobStatus] = []
+        count = len(lines)
+        pos = 0
 
-        # Header patterns
-        # pget header
-        pget_header_pattern = (
-            r"^\[(?P<id>\d+)\]\s+"
-            r"pget\s+"
-            r"(?P<flags>.*?)\s+"
-            r"(?P<lq>['\"]|)(?P<remote>.+)(?P=lq)\s+"  # greedy on purpose
-            r"-o\s+"
-            r"(?P<rq>['\"]|)(?P<local>.+)(?P=rq)$"
-        )  # greedy on purpose
-        pget_header_m = re.compile(pget_header_pattern)
-
-        # mirror header (downloading)
-        mirror_header_pattern = (
-            r"^\[(?P<id>\d+)\]\s+"
-            r"mirror\s+"
-            r"(?P<flags>.*?)\s+"
-            r"(?P<lq>['\"]|)(?P<remote>.+)(?P=lq)\s+"  # greedy on purpose
-            r"(?P<rq>['\"]|)(?P<local>.+)(?P=rq)\s+"  # greedy on purpose
-            r"--\s+"
-            rf"(?P<szlocal>\d+\.?\d*\s?({LftpJobStatusParser.__SIZE_UNITS_REGEX})?)"  # size=0 has no units
-            r"\/"
-            rf"(?P<szremote>\d+\.?\d*\s?({LftpJobStatusParser.__SIZE_UNITS_REGEX})?)\s+"  # size=0 has no units
-            r"\((?P<pctlocal>\d+)%\)"
-            rf"(\s+(?P<speed>\d+\.?\d*\s?({LftpJobStatusParser.__SIZE_UNITS_REGEX}))\/s)?$"
-        )
-        mirror_header_m = re.compile(mirror_header_pattern)
-
-        # mirror header (connecting or receiving file list)
-        mirror_fl_header_pattern = (
-            r"^\[(?P<id>\d+)\]\s+"
-            r"mirror\s+"
-            r"(?P<flags>.*?)\s+"
-            r"(?P<lq>['\"]|)(?P<remote>.+)(?P=lq)\s+"  # greedy on purpose
-            r"(?P<rq>['\"]|)(?P<local>.+)(?P=rq)$"
-        )  # greedy on purpose
-        mirror_fl_header_m = re.compile(mirror_fl_header_pattern)
-
-        # Data patterns
-        filename_pattern = r"\\transfer\s" + LftpJobStatusParser.__QUOTED_FILE_NAME_REGEX
-        filename_m = re.compile(filename_pattern)
-
-        chunk_at_pattern = (
-            r"^" + LftpJobStatusParser.__QUOTED_FILE_NAME_REGEX + r"\s+"
-            r"at\s+"
-            r"\d+\s+"  # this is NOT the local size
-            r"(?:\(\d+%\)\s+)?"  # this is NOT the local percent
-            r"((?P<speed>\d+\.?\d*\s?({sz}))\/s\s+)?"
-            r"(eta:(?P<eta>{eta})\s+)?"
-            r"\s*\[(?P<desc>.*)\]$"
-        ).format(sz=LftpJobStatusParser.__SIZE_UNITS_REGEX, eta=LftpJobStatusParser.__TIME_UNITS_REGEX)
-        chunk_at_m = re.compile(chunk_at_pattern)
-
-        chunk_at2_pattern = (
-            r"^" + LftpJobStatusParser.__QUOTED_FILE_NAME_REGEX + r"\s+"
-            r"at\s+"
-            r"\d+\s+"  # this is NOT the local size
-            r"(?:\(\d+%\))"
-        )  # this is NOT the local percent
-        chunk_at2_m = re.compile(chunk_at2_pattern)
-
-        chunk_got_pattern = (
-            r"^" + LftpJobStatusParser.__QUOTED_FILE_NAME_REGEX + r",\s+"
-            r"got\s+"
-            r"(?P<szlocal>\d+)\s+"
-            r"of\s+"
-            r"(?P<szremote>\d+)\s+"
-            r"\((?P<pctlocal>\d+)%\)"
-            r"(\s+(?P<speed>\d+\.?\d*\s?({sz}))\/s)?"
-            r"(\seta:(?P<eta>{eta}))?"
-        ).format(sz=LftpJobStatusParser.__SIZE_UNITS_REGEX, eta=LftpJobStatusParser.__TIME_UNITS_REGEX)
-        chunk_got_m = re.compile(chunk_got_pattern)
-
-        chunk_header_pattern = r"\\chunk\s+\d+"
-        chunk_header_m = re.compile(chunk_header_pattern)
-
-        chmod_header_pattern = (
-            r"chmod\s"
-            r"(?P<name>.*)"
-        )
-        chmod_header_m = re.compile(chmod_header_pattern)
-
-        chmod_pattern = LftpJobStatusParser.__QUOTED_FILE_NAME_REGEX + r"\s\[\]"
-        chmod_pattern_m = re.compile(chmod_pattern)
-
-        mirror_pattern = (
-            r"\\mirror\s" + LftpJobStatusParser.__QUOTED_FILE_NAME_REGEX + r"\s+"
-            r"--\s+"
-            r"(?P<szlocal>\d+\.?\d*\s?({sz})?)"  # size=0 has no units
-            r"\/"
-            r"(?P<szremote>\d+\.?\d*\s?({sz})?)\s+"  # size=0 has no units
-            r"\((?P<pctlocal>\d+)%\)"
-            r"(\s+(?P<speed>\d+\.?\d*\s?({sz}))\/s)?$"
-        ).format(sz=LftpJobStatusParser.__SIZE_UNITS_REGEX)
-        mirror_m = re.compile(mirror_pattern)
-
-        mirror_empty_pattern = r"\\mirror\s" + LftpJobStatusParser.__QUOTED_FILE_NAME_REGEX + r"\s*$"
-        mirror_empty_m = re.compile(mirror_empty_pattern)
-
-        queue_done_m = re.compile(LftpJobStatusParser.__QUEUE_DONE_REGEX)
-
-        # Orphan progress lines lftp can emit outside a job context, e.g.:
-        #   "3.0K/s eta:3m [Receiving data]"
-        #   "10M/s eta:1h2m [Making data connection]"
-        orphan_progress_pattern = (
-            rf"^(?:\d+\.?\d*\s?({LftpJobStatusParser.__SIZE_UNITS_REGEX}))\/s\s+"
-            rf"eta:({LftpJobStatusParser.__TIME_UNITS_REGEX})\s+"
-            r"\[.*\]$"
-        )
-        orphan_progress_m = re.compile(orphan_progress_pattern)
-
-        # Partial progress fragments from line-wrap (seen on Unraid), e.g.:
-        #   "/s eta:25m [Receiving data]"  (tail of "347.3K/s eta:25m ...")
-        partial_progress_pattern = (
-            r"^\/s\s+"
-            rf"eta:({LftpJobStatusParser.__TIME_UNITS_REGEX})\s+"
-            r"\[.*\]$"
-        )
-        partial_progress_m = re.compile(partial_progress_pattern)
-
-        # Chunk line-wrap fragments: long filenames cause lftp chunk progress
-        # lines to wrap, producing a tail fragment like:
-        #   "tmos.7.1.DV.HDR.H.265-TheFarm.mkv' at 22283455338 (0%) 427.6K/s eta:28m [Receiving data]"
-        # These are the tail of a `filename' at <pos> (<pct>%) ... line where
-        # the leading backtick and start of the filename are on the previous line.
-        chunk_wrap_pattern = (
-            r"^(?:[^`\\].*)?'\s+at\s+\d+\s+"
-            r"(?:\(\d+%\)\s+)?"
-            rf"(?:(?:\d+\.?\d*\s?({LftpJobStatusParser.__SIZE_UNITS_REGEX}))\/s\s+)?"
-            rf"(?:eta:({LftpJobStatusParser.__TIME_UNITS_REGEX})\s+)?"
-            r"\s*\[.*\]$"
-        )
-        chunk_wrap_m = re.compile(chunk_wrap_pattern)
+        if count == 1:
+            if not cls.__QUEUE_DONE_M.match(lines[0]):
+                # Single unrecognized line - might be empty output, skip gracefully
+                return queue, pos
+            return queue, 1
+
+        if count < 2:
+            return queue, pos
+
+        # Look for the header lines
+        if not cls.__QUEUE_HEADER1_M.match(lines[pos]):
+            # First line doesn't match queue header - no active queue
+            # Leave the line for __parse_jobs to handle
+            return queue, pos
+        pos += 1
+        if not cls.__QUEUE_HEADER2_M.match(lines[pos]):
+            # Second line doesn't match - malformed but not fatal, return empty queue
+            return queue, pos
+        pos += 1
+        if pos == count:
+            raise ValueError("Missing queue status")
+
+        # Look for 'Now executing' lines
+        line = lines[pos]
+        pos += 1
+        if line.startswith("Now executing:"):
+            # Skip any more lines associated with 'now executing'
+            while pos < count and cls.__QUEUE_EXECUTING_M.match(lines[pos]):
+                pos += 1
+
+        # Look for the actual queue
+        if pos < count and lines[pos].startswith("Commands queued:"):
+            pos += 1
+            if pos == count:
+                raise ValueError("Missing queued commands")
+
+            # Parse the queued commands
+            while pos < count:
+                line = lines[pos]
+                if cls.__QUEUE_ITEM_M.match(line):
+                    # header line
+                    pos += 1
+                    result = cls.__QUEUE_PGET_M.match(line)
+                    if result:
+                        type_ = LftpJobStatus.Type.PGET
+                    else:
+                        result = cls.__QUEUE_MIRROR_M.match(line)
+                        if not result:
+                            raise ValueError(f"Failed to parse queue line: {line}")
+                        type_ = LftpJobStatus.Type.MIRROR
+                    queue.append(
+                        LftpJobStatus(
+                            job_id=int(result.group("id")),
+                            job_type=type_,
+                            state=LftpJobStatus.State.QUEUED,
+                            name=os.path.basename(os.path.normpath(result.group("remote"))),
+                            flags=result.group("flags"),
+                            remote_path=result.group("remote"),
+                            local_path=result.group("local"),
+                        )
+                    )
+                elif line.startswith("cd") and line[2:3].isspace():
+                    # 'cd' line after pget, ignore
+                    pos += 1
+                else:
+                    # no match, exit loop
+                    break
+
+        # Look for the done line
+        if pos < count and cls.__QUEUE_DONE_M.match(lines[pos]):
+            pos += 1
+
+        return queue, pos
+
+    def __parse_jobs(self, lines: list[str], pos: int) -> list[LftpJobStatus]:  # noqa: C901 — lftp output parser
+        cls = LftpJobStatusParser
+        jobs: list[LftpJobStatus] = []
+        count = len(lines)
 
         prev_job: LftpJobStatus | None = None
-        while lines:
-            line = lines.pop(0)
+        while pos < count:
+            line = lines[pos]
+            pos += 1
+            first = line[0]
+
+            if first == "[":
+                # Job header or the queue's Done line
+                result = cls.__PGET_HEADER_M.match(line)
+                if result:
+                    prev_job, pos = cls.__parse_pget(lines, pos, line, result)
+                    jobs.append(prev_job)
+                    continue
+                result = cls.__MIRROR_HEADER_M.match(line)
+                if result:
+                    prev_job = cls.__new_job(result, LftpJobStatus.Type.MIRROR)
+                    speed = result.group("speed")
+                    prev_job.total_transfer_state = LftpJobStatus.TransferState(
+                        cls._size_to_bytes(result.group("szlocal")),
+                        cls._size_to_bytes(result.group("szremote")),
+                        int(result.group("pctlocal")),
+                        cls._size_to_bytes(speed) if speed else None,
+                        None,  # eta
+                    )
+                    jobs.append(prev_job)
+                    continue
+                result = cls.__MIRROR_FL_HEADER_M.match(line)
+                if result:
+                    # There may be a 'Connecting' or 'cd' line ahead, but not always
+                    if pos < count and (lines[pos].startswith("Getting file list") or lines[pos].startswith("cd ")):
+                        pos += 1
+                    prev_job = cls.__new_job(result, LftpJobStatus.Type.MIRROR)
+                    jobs.append(prev_job)
+                    continue
 
-            # First line must be a valid job header.
+            # Every other line belongs to a job
             # Exception: skip known orphan progress lines that lftp emits
             # outside a job context (e.g. "3.0K/s eta:3m [Receiving data]").
-            if not (
-                prev_job or pget_header_m.match(line) or mirror_header_m.match(line) or mirror_fl_header_m.match(line)
-            ):
-                if orphan_progress_m.match(line) or partial_progress_m.match(line) or chunk_wrap_m.match(line):
+            if prev_job is None:
+                if cls.__is_orphan_progress(line):
                     self.logger.warning("Skipping orphan lftp progress line: '%s'", line)
                     continue
                 raise ValueError(f"First line is not a matching header '{line}'")
 
-            # Search for pget header
-            result = pget_header_m.search(line)
-            if result:
-                # Next line must be the sftp line
-                if len(lines) < 1 or "sftp" not in lines[0]:
-                    raise ValueError(f"Missing the 'sftp' line for pget header '{line}'")
-                lines.pop(0)  # pop the 'sftp' line
-
-                # Data line may not exist
-                result_at = None
-                result_at2 = None
-                result_got = None
-                if lines:
-                    line = lines.pop(0)  # data line
-                    result_at = chunk_at_m.search(line)
-                    result_at2 = chunk_at2_m.search(line)
-                    result_got = chunk_got_m.search(line)
-
-                id_ = int(result.group("id"))
-                name = os.path.basename(os.path.normpath(result.group("remote")))
-                flags = result.group("flags")
-                type_ = LftpJobStatus.Type.PGET
-                status = LftpJobStatus(
-                    job_id=id_, job_type=type_, state=LftpJobStatus.State.RUNNING, name=name, flags=flags
-                )
-                if result_at:
-                    if result.group("remote") != result_at.group("name"):
-                        raise ValueError(
-                            "Mismatch between pget names '{}' vs '{}'".format(
-                                result.group("remote"), result_at.group("name")
-                            )
-                        )
-                    size_local = None
-                    percent_local = None
-                    speed = None
-                    if result_at.group("speed"):
-                        speed = LftpJobStatusParser._size_to_bytes(result_at.group("speed"))
-                    eta = None
-                    if result_at.group("eta"):
-                        eta = LftpJobStatusParser._eta_to_seconds(result_at.group("eta"))
-                    transfer_state = LftpJobStatus.TransferState(
-                        size_local,
-                        None,  # size remote
-                        percent_local,
-                        speed,
-                        eta,
-                    )
-                elif result_at2:
-                    if result.group("remote") != result_at2.group("name"):
-                        raise ValueError(
-                            "Mismatch between pget names '{}' vs '{}'".format(
-                                result.group("remote"), result_at2.group("name")
-                            )
-                        )
-                    transfer_state = LftpJobStatus.TransferState(None, None, None, None, None)
-                elif result_got:
-                    got_group_basename = os.path.basename(os.path.normpath(result_got.group("name")))
-                    if got_group_basename != name:
-                        raise ValueError(f"Mismatch: filename '{name}' but chunk data for '{got_group_basename}'")
-                    size_local = int(result_got.group("szlocal"))
-                    size_remote = int(result_got.group("szremote"))
-                    percent_local = int(result_got.group("pctlocal"))
-                    speed = None
-                    if result_got.group("speed"):
-                        speed = LftpJobStatusParser._size_to_bytes(result_got.group("speed"))
-                    eta = None
-                    if result_got.group("eta"):
-                        eta = LftpJobStatusParser._eta_to_seconds(result_got.group("eta"))
-                    transfer_state = LftpJobStatus.TransferState(size_local, size_remote, percent_local, speed, eta)
-                else:
-                    # No data line at all
-                    transfer_state = LftpJobStatus.TransferState(None, None, None, None, None)
-
-                status.total_transfer_state = transfer_state
-                jobs.append(status)
-                prev_job = status
-                continue
-
-            # Search for mirror header
-            result = mirror_header_m.search(line)
-            if result:
-                id_ = int(result.group("id"))
-                name = os.path.basename(os.path.normpath(result.group("remote")))
-                flags = result.group("flags")
-                type_ = LftpJobStatus.Type.MIRROR
-                status = LftpJobStatus(
-                    job_id=id_, job_type=type_, state=LftpJobStatus.State.RUNNING, name=name, flags=flags
-                )
-                size_local = LftpJobStatusParser._size_to_bytes(result.group("szlocal"))
-                size_remote = LftpJobStatusParser._size_to_bytes(result.group("szremote"))
-                percent_local = int(result.group("pctlocal"))
-                speed = None
-                if result.group("speed"):
-                    speed = LftpJobStatusParser._size_to_bytes(result.group("speed"))
-                transfer_state = LftpJobStatus.TransferState(
-                    size_local,
-                    size_remote,
-                    percent_local,
-                    speed,
-                    None,  # eta
-                )
-                status.total_transfer_state = transfer_state
-                jobs.append(status)
-                prev_job = status
-                # Continue the outer loop
-                continue
-
-            # Search for mirror connecting header
-            # Note: this must be after the more restrictive mirror header above
-            result = mirror_fl_header_m.search(line)
-            if result:
-                # There may be a 'Connecting' or 'cd' line ahead, but not always
-                if lines and (lines[0].startswith("Getting file list") or lines[0].startswith("cd ")):
-                    lines.pop(0)  # pop the connecting line
-                id_ = int(result.group("id"))
-                name = os.path.basename(os.path.normpath(result.group("remote")))
-                flags = result.group("flags")
-                type_ = LftpJobStatus.Type.MIRROR
-                status = LftpJobStatus(
-                    job_id=id_, job_type=type_, state=LftpJobStatus.State.RUNNING, name=name, flags=flags
-                )
-                jobs.append(status)
-                prev_job = status
-                # Continue the outer loop
-                continue
-
-            # Search for filename
-            result = filename_m.search(line)
-            if result:
-                name = result.group("name")
-                if not lines:
-                    raise ValueError(f"Missing chunk data for filename '{name}'")
-                line = lines.pop(0)
-                result_at = chunk_at_m.search(line)
-                result_at2 = chunk_at2_m.search(line)
-                result_got = chunk_got_m.search(line)
-                if result_at:
-                    # filename is full path, but chunk name is only normpath
-                    if result_at.group("name") != os.path.basename(os.path.normpath(name)):
-                        raise ValueError(
-                            "Mismatch: filename '{}' but chunk data for '{}'".format(name, result_at.group("name"))
-                        )
-                    size_local = None
-                    percent_local = None
-                    speed = None
-                    if result_at.group("speed"):
-                        speed = LftpJobStatusParser._size_to_bytes(result_at.group("speed"))
-                    eta = None
-                    if result_at.group("eta"):
-                        eta = LftpJobStatusParser._eta_to_seconds(result_at.group("eta"))
-                    file_status = LftpJobStatus.TransferState(size_local, None, percent_local, speed, eta)
-                    assert prev_job is not None
-                    prev_job.add_active_file_transfer_state(name, file_status)
-                elif result_at2:
+            if first == "\\":
+                # Ignore "\chunk" line
+                if cls.__CHUNK_HEADER_M.match(line):
+                    # Also need to ignore the next line (chunk data)
+                    if pos < count and lines[pos].startswith("`"):
+                        pos += 1
+                    continue
+
+                result = cls.__TRANSFER_M.match(line)
+                if result:
+                    name = result.group("name")
+                    if pos == count:
+                        raise ValueError(f"Missing chunk data for filename '{name}'")
+                    data = cls.__parse_data_line(lines[pos])
+                    if data is None:
+                        raise ValueError(f"Missing chunk data for filename '{name}'")
+                    pos += 1
+                    result, file_status = data
                     # filename is full path, but chunk name is only normpath
-                    if result_at2.group("name") != os.path.basename(os.path.normpath(name)):
-                        raise ValueError(
-                            "Mismatch: filename '{}' but chunk data for '{}'".format(name, result_at2.group("name"))
-                        )
-                    file_status = LftpJobStatus.TransferState(None, None, None, None, None)
-                    assert prev_job is not None
-                    prev_job.add_active_file_transfer_state(name, file_status)
-                elif result_got:
-                    if result_got.group("name") != os.path.basename(os.path.normpath(name)):
+                    if result.group("name") != os.path.basename(os.path.normpath(name)):
                         raise ValueError(
-                            "Mismatch: filename '{}' but chunk data for '{}'".format(name, result_got.group("name"))
+                            "Mismatch: filename '{}' but chunk data for '{}'".format(name, result.group("name"))
                         )
-                    size_local = int(result_got.group("szlocal"))
-                    size_remote = int(result_got.group("szremote"))
-                    percent_local = int(result_got.group("pctlocal"))
-                    speed = None
-                    if result_got.group("speed"):
-                        speed = LftpJobStatusParser._size_to_bytes(result_got.group("speed"))
-                    eta = None
-                    if result_got.group("eta"):
-                        eta = LftpJobStatusParser._eta_to_seconds(result_got.group("eta"))
-                    file_status = LftpJobStatus.TransferState(size_local, size_remote, percent_local, speed, eta)
-                    assert prev_job is not None
                     prev_job.add_active_file_transfer_state(name, file_status)
-                else:
-                    raise ValueError(f"Missing chunk data for filename '{name}'")
-                # Continue the outer loop
-                continue
-
-            # Search for but ignore "\mirror" line
-            result = mirror_m.search(line)
-            if result:
-                # Continue the outer loop
-                continue
-            result = mirror_empty_m.search(line)
-            if result:
-                name = result.group("name")
-                # One of these lines may follow, ignore it as well
-                #    "Getting files list"
-                #    "cd"
-                #    "<name>: "
-                #    "mkdir"
-                if lines:
-                    if (
-                        "Getting file list" in lines[0]
-                        or lines[0].startswith("cd ")
-                        or lines[0] == f"{name}:"
-                        or lines[0].startswith("mkdir ")
-                    ):
-                        lines.pop(0)
-                # Continue the outer loop
-                continue
-
-            # Search for but ignore "\chunk" line
-            result = chunk_header_m.search(line)
-            if result:
-                # Also need to ignore the next line (chunk data)
-                if lines and lines[0].startswith("`"):
-                    lines.pop(0)
-                # Continue the outer loop
-                continue
-
-            # Search for but ignore "chmod" line
-            result = chmod_header_m.search(line)
-            if result:
-                name = result.group("name")
-                # Also ignore the next one or two lines
-                if not lines or not lines[0].startswith("file:"):
-                    raise ValueError(f"Missing 'file:' line for chmod '{name}'")
-                lines.pop(0)
-                if lines:
-                    result_chmod = chmod_pattern_m.search(lines[0])
-                    if result_chmod:
-                        name_chmod = result_chmod.group("name")
-                        if name != name_chmod:
-                            raise ValueError(f"Mismatch in names chmod '{name}'")
-                        lines.pop(0)
-                # Continue the outer loop
-                continue
-
-            # Search for the Done line, but it better be the last line
-            result = queue_done_m.match(line)
-            if result:
-                if lines:
-                    raise ValueError("There are more lines after the 'Done' line")
-                # Continue the outer loop
-                continue
-
-            # If we're inside a job context, skip any unrecognized line.
+                    continue
+
+                # Ignore "\mirror" line
+                if cls.__MIRROR_M.match(line):
+                    continue
+                result = cls.__MIRROR_EMPTY_M.match(line)
+                if result:
+                    name = result.group("name")
+                    # One of these lines may follow, ignore it as well
+                    #    "Getting files list"
+                    #    "cd"
+                    #    "<name>: "
+                    #    "mkdir"
+                    if pos < count:
+                        next_line = lines[pos]
+                        if (
+                            "Getting file list" in next_line
+                            or next_line.startswith("cd ")
+                            or next_line == f"{name}:"
+                            or next_line.startswith("mkdir ")
+                        ):
+                            pos += 1
+                    continue
+
+            elif first == "c":
+                # Ignore "chmod" line
+                result = cls.__CHMOD_HEADER_M.match(line)
+                if result:
+                    name = result.group("name")
+                    # Also ignore the next one or two lines
+                    if pos == count or not lines[pos].startswith("file:"):
+                        raise ValueError(f"Missing 'file:' line for chmod '{name}'")
+                    pos += 1
+                    if pos < count:
+                        result_chmod = cls.__CHMOD_M.search(lines[pos])
+                        if result_chmod:
+                            if name != result_chmod.group("name"):
+                                raise ValueError(f"Mismatch in names chmod '{name}'")
+                            pos += 1
+                    continue
+
+            elif first == "[":
+                # The Done line, but it better be the last line
+                if cls.__QUEUE_DONE_M.match(line):
+                    if pos < count:
+                        raise ValueError("There are more lines after the 'Done' line")
+                    continue
+
+            # Inside a job context, skip any unrecognized line.
             # PTY line-wrapping can produce arbitrary fragments (filename tails,
             # partial speed/eta strings like "eta:4m [Receiving data]" or
             # "ta:4m [Receiving data]") that no fixed regex can anticipate.
-            if prev_job is not None:
-                self.logger.warning("Skipping unrecognized line inside job context: '%s'", line)
-                continue
-
-            # Outside a job context, check for known orphan progress lines
-            if orphan_progress_m.match(line) or partial_progress_m.match(line) or chunk_wrap_m.match(line):
-                self.logger.warning("Skipping orphan lftp progress line: '%s'", line)
-                continue
-
-            # Truly unrecognized line outside any job — raise so the caller
-            # can track consecutive errors and decide whether to propagate
-            raise ValueError(f"Unable to parse line '{line}'")
+            self.logger.warning("Skipping unrecognized line inside job context: '%s'", line)
         return jobs
 
     @staticmethod
-    def __parse_queue(lines: list[str]) -> list[LftpJobStatus]:  # noqa: C901 — complexity 19, lftp output parser
-        queue: list[LftpJobStatus] = []
+    def __new_job(header: re.Match[str], job_type: LftpJobStatus.Type) -> LftpJobStatus:
+        return LftpJobStatus(
+            job_id=int(header.group("id")),
+            job_type=job_type,
+            state=LftpJobStatus.State.RUNNING,
+            name=os.path.basename(os.path.normpath(header.group("remote"))),
+            flags=header.group("flags"),
+            remote_path=header.group("remote"),
+            # The header's greedy local path may take in the job's progress
+            local_path=LftpJobStatusParser.__HEADER_PROGRESS_M.sub("", header.group("local")),
+        )
 
-        queue_done_m = re.compile(LftpJobStatusParser.__QUEUE_DONE_REGEX)
-        if len(lines) == 1:
-            if not queue_done_m.match(lines[0]):
-                # Single unrecognized line - might be empty output, skip gracefully
-                return queue
-            lines.pop(0)
-
-        if lines:
-            # Look for the header lines
-            if len(lines) < 2:
-                # Not enough lines for a valid queue header - return empty queue
-                return queue
-            header1_pattern = rf"^\[\d+\] queue \(sftp://.*@.*\)(?:\s+--\s+(?:\d+\.\d+|\d+)\s({LftpJobStatusParser.__SIZE_UNITS_REGEX})\/s)?$"
-            header2_pattern = "^sftp://.*@.*$"
-            line = lines.pop(0)
-            if not re.match(header1_pattern, line):
-                # First line doesn't match queue header - no active queue, return empty
-                # Put the line back for __parse_jobs to handle
-                lines.insert(0, line)
-                return queue
-            line = lines.pop(0)
-            if not re.match(header2_pattern, line):
-                # Second line doesn't match - malformed but not fatal, return empty queue
-                lines.insert(0, line)
-                return queue
-            if not lines:
-                raise ValueError("Missing queue status")
-
-            # Look for 'Now executing' lines
-            line = lines.pop(0)
-            if re.match("Queue is stopped.", line):
-                # Nothing to do
-                pass
-            elif re.match("Now executing:", line):
-                # Remove any more lines associated with 'now executing'
-                while lines and re.match(r"^-\[\d+\]", lines[0]):
-                    lines.pop(0)
-
-            # Look for the actual queue
-            if lines and re.match("Commands queued:", lines[0]):
-                lines.pop(0)
-                if not lines:
-                    raise ValueError("Missing queued commands")
-
-                # Parse the queued commands
-                queue_pget_pattern = (
-                    r"^(?P<id>\d+)\.\s+"
-                    r"pget\s+"
-                    r"(?P<flags>.*?)\s+"
-                    r"(?P<lq>[\'\"]|)(?P<remote>.+)(?P=lq)\s+"  # greedy on purpose
-                    r"(?:-o\s+)"
-                    r"(?P<rq>[\'\"]|)(?P<local>.+)(?P=rq)$"
-                )  # greedy on purpose
-                queue_pget_m = re.compile(queue_pget_pattern)
-                queue_mirror_pattern = (
-                    r"^(?P<id>\d+)\.\s+"
-                    r"mirror\s+"
-                    r"(?P<flags>.*?)\s+"
-                    r"(?P<lq>[\'\"]|)(?P<remote>.+)(?P=lq)\s+"  # greedy on purpose
-                    r"(?P<rq>[\'\"]|)(?P<local>.+)(?P=rq)$"
-                )  # greedy on purpose
-                queue_mirror_m = re.compile(queue_mirror_pattern)
-                while lines:
-                    line = lines[0]
-                    if re.match(r"^\d+\.", line):
-                        # header line
-                        lines.pop(0)
-
-                        result_pget = queue_pget_m.match(line)
-                        result_mirror = queue_mirror_m.match(line)
-                        if result_pget:
-                            type_ = LftpJobStatus.Type.PGET
-                            result = result_pget
-                        elif result_mirror:
-                            type_ = LftpJobStatus.Type.MIRROR
-                            result = result_mirror
-                        else:
-                            raise ValueError(f"Failed to parse queue line: {line}")
-                        id_ = int(result.group("id"))
-                        name = os.path.basename(os.path.normpath(result.group("remote")))
-                        flags = result.group("flags")
-                        status = LftpJobStatus(
-                            job_id=id_, job_type=type_, state=LftpJobStatus.State.QUEUED, name=name, flags=flags
-                        )
-                        queue.append(status)
-                    elif re.match(r"^cd\s.*$", line):
-                        # 'cd' line after pget, ignore
-                        lines.pop(0)
-                    else:
-                        # no match, exit loop
-                        break
+    @staticmethod
+    def __parse_pget(lines: list[str], pos: int, line: str, header: re.Match[str]) -> tuple[LftpJobStatus, int]:
+        """
+        Parse a pget job from its header and the lines that follow it
+        :return: the job, and the index of the first line after it
+        """
+        cls = LftpJobStatusParser
+        # Next line must be the sftp line
+        if pos == len(lines) or "sftp" not in lines[pos]:
+            raise ValueError(f"Missing the 'sftp' line for pget header '{line}'")
+        pos += 1
+
+        status = cls.__new_job(header, LftpJobStatus.Type.PGET)
+        transfer_state = LftpJobStatus.TransferState(None, None, None, None, None)
+        # Data line may not exist
+        if pos < len(lines):
+            data = cls.__parse_data_line(lines[pos])
+            pos += 1
+            if data is not None:
+                result, transfer_state = data
+                if result.re is cls.__CHUNK_GOT_M:
+                    got_name = os.path.basename(os.path.normpath(result.group("name")))
+                    if got_name != status.name:
+                        raise ValueError(f"Mismatch: filename '{status.name}' but chunk data for '{got_name}'")
+                elif header.group("remote") != result.group("name"):
+                    raise ValueError(
+                        "Mismatch between pget names '{}' vs '{}'".format(header.group("remote"), result.group("name"))
+                    )
+        status.total_transfer_state = transfer_state
+        return status, pos
 
-            # Look for the done line
-            if lines and queue_done_m.match(lines[0]):
-                lines.pop(0)
+    @staticmethod
+    def __parse_data_line(line: str) -> tuple[re.Match[str], LftpJobStatus.TransferState] | None:
+        """
+        Parse the progress line of a transfer
+        :param line:
+        :return: the match and the transfer state, or None if line is not a progress line
+        """
+        cls = LftpJobStatusParser
+        if not line.startswith("`"):
+            return None
+        result = cls.__CHUNK_AT_M.match(line)
+        if result:
+            speed = result.group("speed")
+            eta = result.group("eta")
+            return result, LftpJobStatus.TransferState(
+                None,  # size local
+                None,  # size remote
+                None,  # percent local
+                cls._size_to_bytes(speed) if speed else None,
+                cls._eta_to_seconds(eta) if eta else None,
+            )
+        result = cls.__CHUNK_AT2_M.match(line)
+        if result:
+            return result, LftpJobStatus.TransferState(None, None, None, None, None)
+        result = cls.__CHUNK_GOT_M.match(line)
+        if result:
+            speed = result.group("speed")
+            eta = result.group("eta")
+            return result, LftpJobStatus.TransferState(
+                int(result.group("szlocal")),
+                int(result.group("szremote")),
+                int(result.group("pctlocal")),
+                cls._size_to_bytes(speed) if speed else None,
+                cls._eta_to_seconds(eta) if eta else None,
+            )
+        return None
 
-        return queue
+    @staticmethod
+    def __is_orphan_progress(line: str) -> bool:
+        cls = LftpJobStatusParser
+        return bool(
+            cls.__ORPHAN_PROGRESS_M.match(line)
+            or cls.__PARTIAL_PROGRESS_M.match(line)
+            or cls.__CHUNK_WRAP_M.match(line)
+        )
@@ -3,10 +3,12 @@
 import logging
 import os
 import re
+import time
 import warnings
+from collections import deque
 from collections.abc import Callable
 from functools import wraps
-from typing import Any
+from typing import Any, NamedTuple
 
 # 3rd party libs
 import pexpect
@@ -34,6 +36,33 @@ class LftpError(AppError):
     pass
 
 
+class LftpCommandLatency(NamedTuple):
+    """
+    Round trip time of lftp commands, from sending a command to lftp's next prompt
+      num_commands: commands timed since lftp started
+      last_ms: time of the last command
+      average_ms: average time over the recent commands
+      max_ms: longest time over the recent commands
+    """
+
+    num_commands: int
+    last_ms: float
+    average_ms: float
+    max_ms: float
+
+
+class LftpQueueItem(NamedTuple):
+    """
+    A download for Lftp.queue_many(), with the arguments of Lftp.queue()
+    """
+
+    name: str
+    is_dir: bool
+    exclude_patterns: list[str] | None = None
+    remote_dir_path: str | None = None
+    local_dir_path: str | None = None
+
+
 class Lftp:
     """
     Lftp command utility
@@ -44,6 +73,7 @@ class Lftp:
     __SET_NUM_CONNECTIONS_MIRROR = "mirror:use-pget-n"
     __SET_NUM_MAX_TOTAL_CONNECTIONS = "net:connection-limit"
     __SET_RATE_LIMIT = "net:limit-rate"
+    __SET_TOTAL_RATE_LIMIT = "net:limit-total-rate"
     __SET_MIN_CHUNK_SIZE = "pget:min-chunk-size"
     __SET_NUM_PARALLEL_JOBS = "cmd:queue-parallel"
     __SET_MOVE_BACKGROUND_ON_EXIT = "cmd:move-background"
@@ -62,6 +92,23 @@ class Lftp:
     __SET_XFER_VERIFY = "xfer:verify"
     __SET_XFER_VERIFY_COMMAND = "xfer:verify-command"
 
+    # While no jobs are queued or running, status() skips the "jobs -v" round
+    # trip and only re-syncs with lftp at this interval
+    _IDLE_STATUS_INTERVAL_IN_SECS = 30.0
+
+    # Bytes read from lftp per read; "jobs -v" output can run to megabytes
+    _READ_SIZE = 64 * 1024
+    # Trailing bytes searched for the prompt on each read, instead of everything
+    # read since the last prompt; the prompt line is always far shorter
+    _PROMPT_SEARCH_WINDOW = 4096
+    # Number of recent commands the latency average and max cover
+    _LATENCY_WINDOW = 100
+    # Longest line queue_many() submits at once, well within the 10000 column
+    # terminal so that lftp echoes each submission on a single line
+    _MAX_QUEUE_LINE_LENGTH = 4000
+    # Echoed after each queue command of a submission, to split its output per command
+    _QUEUE_ITEM_MARKER = "__seedsync_queued__"
+
     def __init__(self, address: str, port: int, user: str, password: str | None):
         self.__user = user
         self.__password = password
@@ -70,12 +117,17 @@ class Lftp:
         self.__base_remote_dir_path = ""
         self.__base_local_dir_path = ""
         self.logger = logging.getLogger("Lftp")
-        self.__expect_pattern = f"lftp {self.__user}@{self.__address}:.*>"
+        self.__expect_pattern = f"lftp {re.escape(self.__user)}@{re.escape(self.__address)}:.*>"
         self.__job_status_parser = LftpJobStatusParser()
         self.__timeout = 10  # in seconds
         self.__consecutive_status_errors = 0
         self.__consecutive_timeouts = 0
         self.__settings_cache: dict[str, str] = {}
+        # Whether lftp may have queued or running jobs; unknown until the first status
+        self.__has_jobs = True
+        self.__last_status_time: float | None = None
+        self.__num_timed_commands = 0
+        self.__latencies: deque[float] = deque(maxlen=Lftp._LATENCY_WINDOW)
 
         self.__log_command_output = False
         self.__pending_error: str | None = None
@@ -107,9 +159,14 @@ class Lftp:
         # Suppress DeprecationWarning from pexpect.spawn's internal forkpty call.
         with warnings.catch_warnings():
             warnings.filterwarnings("ignore", message=".*fork.*", category=DeprecationWarning)
-            self.__process = pexpect.spawn("/usr/bin/lftp", args, env=spawn_env)  # type: ignore[arg-type]
+            self.__process = pexpect.spawn(
+                "/usr/bin/lftp",
+                args,
+                env=spawn_env,  # type: ignore[arg-type]
+                maxread=Lftp._READ_SIZE,
+            )
         self.__process.setwinsize(24, 10000)
-        self.__process.expect(self.__expect_pattern)
+        self.__expect_prompt()
         self.__setup()
 
     def __restart_process(self):
@@ -182,14 +239,15 @@ class Lftp:
             raise LftpError(error)
 
     @with_check_process
-    def __run_command(self, command: str):  # type: ignore[arg-type]
+    def __run_command(self, command: str, detect_errors: bool = True):  # type: ignore[arg-type]
         assert self.__process is not None
         if self.__log_command_output:
             self.logger.debug("command: {}".format(command.encode("utf8", "surrogateescape")))
+        start_time = time.monotonic()
         self.__process.sendline(command)
         timed_out = False
         try:
-            self.__process.expect(self.__expect_pattern, timeout=self.__timeout)
+            self.__expect_prompt(timeout=self.__timeout)
         except pexpect.exceptions.TIMEOUT:
             timed_out = True
 
@@ -204,13 +262,16 @@ class Lftp:
 
         # Success — reset consecutive timeout counter
         self.__consecutive_timeouts = 0
+        latency = time.monotonic() - start_time
+        self.__num_timed_commands += 1
+        self.__latencies.append(latency)
         before = self.__process.before
         assert isinstance(before, bytes)
         out = before.decode("utf8", "replace")
         out = out.strip()  # remove any CRs
 
         if self.__log_command_output:
-            self.logger.debug(f"out ({len(out)} bytes):\n {out}")
+            self.logger.debug(f"out ({len(out)} bytes, {1000 * latency:.1f} ms):\n {out}")
             after_val = self.__process.after
             if isinstance(after_val, bytes):
                 after = after_val.decode("utf8", "replace").strip()
@@ -219,33 +280,64 @@ class Lftp:
             self.logger.debug(f"after: {after}")
 
         # let's try and detect some errors
-        if self.__detect_errors_from_output(out):
-            # we need to consume the actual output so that
-            # it doesn't get passed onto next command
+        if detect_errors and self.__detect_errors_from_output(out):
             error_out = out
-            try:
-                self.__process.expect(self.__expect_pattern, timeout=self.__timeout)
-            except pexpect.exceptions.TIMEOUT:
-                self.logger.warning("Lftp timeout while consuming error output")
-                self.__pending_error = error_out
-                return ""
-            before = self.__process.before
-            assert isinstance(before, bytes)
-            out = before.decode("utf8", "replace")
-            out = out.strip()  # remove any CRs
-            if self.__log_command_output:
-                self.logger.debug(f"retry out ({len(out)} bytes):\n {out}")
-                after_val = self.__process.after
-                if isinstance(after_val, bytes):
-                    after = after_val.decode("utf8", "replace").strip()
-                else:
-                    after = ""
-                self.logger.debug(f"retry after: {after}")
-            self.logger.error(f"Lftp detected error: {error_out}")
             # save pending error
             self.__pending_error = error_out
+            retry_out = self.__read_error_prompt()
+            if retry_out is None:
+                return ""
+            self.logger.error(f"Lftp detected error: {error_out}")
+            out = retry_out
         return out
 
+    def __read_error_prompt(self) -> str | None:
+        """
+        Read the prompt that lftp prints again after an error, so that the
+        actual output doesn't get passed onto the next command
+        :return: output before that prompt, None if lftp timed out
+        """
+        assert self.__process is not None
+        try:
+            self.__expect_prompt(timeout=self.__timeout)
+        except pexpect.exceptions.TIMEOUT:
+            self.logger.warning("Lftp timeout while consuming error output")
+            return None
+        before = self.__process.before
+        assert isinstance(before, bytes)
+        out = before.decode("utf8", "replace")
+        out = out.strip()  # remove any CRs
+        if self.__log_command_output:
+            self.logger.debug(f"retry out ({len(out)} bytes):\n {out}")
+            after_val = self.__process.after
+            if isinstance(after_val, bytes):
+                after = after_val.decode("utf8", "replace").strip()
+            else:
+                after = ""
+            self.logger.debug(f"retry after: {after}")
+        return out
+
+    @property
+    def command_latency(self) -> LftpCommandLatency | None:
+        """Round trip time of the commands run so far, None before the first"""
+        if not self.__latencies:
+            return None
+        return LftpCommandLatency(
+            num_commands=self.__num_timed_commands,
+            last_ms=1000 * self.__latencies[-1],
+            average_ms=1000 * sum(self.__latencies) / len(self.__latencies),
+            max_ms=1000 * max(self.__latencies),
+        )
+
+    def __expect_prompt(self, timeout: int | None = -1):
+        """
+        Wait for lftp's prompt
+        Only the tail of the output is searched on each read, so waiting on a
+        command with a lot of output doesn't rescan all of it on every read.
+        """
+        assert self.__process is not None
+        self.__process.expect(self.__expect_pattern, timeout=timeout, searchwindowsize=Lftp._PROMPT_SEARCH_WINDOW)
+
     @staticmethod
     def __detect_errors_from_output(out: str) -> bool:
         errors = [
@@ -335,6 +427,14 @@ class Lftp:
     def rate_limit(self, rate_limit: int | str):
         self.__set(Lftp.__SET_RATE_LIMIT, str(rate_limit))
 
+    @property
+    def total_rate_limit(self) -> str:
+        return self.__get(Lftp.__SET_TOTAL_RATE_LIMIT)
+
+    @total_rate_limit.setter
+    def total_rate_limit(self, total_rate_limit: int | str):
+        self.__set(Lftp.__SET_TOTAL_RATE_LIMIT, str(total_rate_limit))
+
     @property
     def min_chunk_size(self) -> str:
         return self.__get(Lftp.__SET_MIN_CHUNK_SIZE)
@@ -471,21 +571,44 @@ class Lftp:
         Returns None when the status output could not be parsed, so callers
         can distinguish "no jobs" from "parse failed" and avoid false
         completion signals.
+        When nothing has been queued since lftp last reported no jobs, lftp is
+        only asked every _IDLE_STATUS_INTERVAL_IN_SECS; otherwise an empty list
+        is returned right away.
         :return:
         """
+        now = time.monotonic()
+        if (
+            not self.__has_jobs
+            and self.__last_status_time is not None
+            and now - self.__last_status_time < Lftp._IDLE_STATUS_INTERVAL_IN_SECS
+        ):
+            return []
         out = self.__run_command("jobs -v")  # type: ignore[arg-type]
         try:
             statuses = self.__job_status_parser.parse(out)
             self.__consecutive_status_errors = 0
         except LftpJobStatusParserError:
             self.__consecutive_status_errors += 1
+            self.__has_jobs = True
             if self.__consecutive_status_errors < MAX_CONSECUTIVE_STATUS_ERRORS:
                 self.logger.warning(f"Ignoring status error (count={self.__consecutive_status_errors})")
                 return None
             raise
+        # A timed out command has no output at all, not even the command echo,
+        # so it says nothing about the jobs
+        if out:
+            self.__has_jobs = len(statuses) > 0
+            self.__last_status_time = now
         return statuses
 
-    def queue(self, name: str, is_dir: bool, exclude_patterns: list[str] | None = None):
+    def queue(
+        self,
+        name: str,
+        is_dir: bool,
+        exclude_patterns: list[str] | None = None,
+        remote_dir_path: str | None = None,
+        local_dir_path: str | None = None,
+    ):
         """
         Queues a job for download
         This method may cause an exception to be generated in a later method call:
@@ -494,8 +617,90 @@ class Lftp:
         :param name: name of file or folder to download
         :param is_dir: true if folder, false if file
         :param exclude_patterns: list of glob patterns to exclude (only applies to mirror/directory downloads)
+        :param remote_dir_path: remote directory to download from, instead of the base remote dir
+        :param local_dir_path: local directory to download to, instead of the base local dir
         :return:
         """
+        command = self.__queue_command(LftpQueueItem(name, is_dir, exclude_patterns, remote_dir_path, local_dir_path))
+        self.__has_jobs = True
+        self.__run_command(command)  # type: ignore[arg-type]
+
+    def queue_many(self, items: list[LftpQueueItem]) -> list[LftpError | None]:
+        """
+        Queues several jobs for download
+        The queue commands are sent together, so that lftp is waited on once per
+        submission instead of once per job. Errors that lftp reports about an item
+        while queueing it are returned for that item, and so is the failure of a
+        submission that lftp didn't confirm. As with queue(), other errors, including
+        those of the download itself, may come up in a later method call.
+        :param items:
+        :return: error of each item, None for the items that were queued
+        """
+        errors: list[LftpError | None] = []
+        submission: list[tuple[LftpQueueItem, str]] = []
+        for item in items:
+            command = self.__queue_command(item)
+            commands = [c for _, c in submission] + [command]
+            if submission and len(Lftp.__queue_line(commands)) > Lftp._MAX_QUEUE_LINE_LENGTH:
+                errors += self.__submit_queue_commands(submission)
+                submission = []
+            submission.append((item, command))
+        if submission:
+            errors += self.__submit_queue_commands(submission)
+        return errors
+
+    @staticmethod
+    def __queue_line(commands: list[str]) -> str:
+        return "; ".join(f"{command}; echo {Lftp._QUEUE_ITEM_MARKER}" for command in commands)
+
+    def __submit_queue_commands(self, submission: list[tuple[LftpQueueItem, str]]) -> list[LftpError | None]:
+        self.__has_jobs = True
+        line = Lftp.__queue_line([command for _, command in submission])
+        out = self.__run_command(line, detect_errors=False)  # type: ignore[arg-type]
+        # The first line echoes the submission and the output of each command
+        # ends at its marker. Output is never empty unless lftp timed out.
+        sections: list[list[str]] = [[]]
+        for out_line in out.splitlines()[1:]:
+            if out_line.strip() == Lftp._QUEUE_ITEM_MARKER:
+                sections.append([])
+            else:
+                sections[-1].append(out_line)
+        num_confirmed = len(sections) - 1
+        errors: list[LftpError | None] = []
+        # Each error is followed by another prompt, until lftp times out on one
+        in_step = True
+        for index, (item, _) in enumerate(submission):
+            if index >= num_confirmed:
+                self.logger.warning(f"Lftp did not confirm queueing '{item.name}'")
+                errors.append(LftpError(f"lftp did not confirm queueing '{item.name}'"))
+                continue
+            item_out = "\n".join(sections[index]).strip()
+            errors.append(None)
+            if not self.__detect_errors_from_output(item_out):
+                continue
+            self.logger.error(f"Lftp detected error: {item_out}")
+            if self.__remote_path(item) in item_out:
+                errors[-1] = LftpError(item_out)
+            else:
+                # Errors of earlier jobs are printed whenever they happen
+                self.__pending_error = item_out
+            if in_step:
+                in_step = self.__read_error_prompt() is not None
+        return errors
+
+    def __remote_path(self, item: LftpQueueItem) -> str:
+        remote_dir_path = item.remote_dir_path
+        if remote_dir_path is None:
+            remote_dir_path = self.__base_remote_dir_path
+        return f"{remote_dir_path}/{item.name}"
+
+    def __queue_command(self, item: LftpQueueItem) -> str:
+        remote_dir_path = item.remote_dir_path
+        if remote_dir_path is None:
+            remote_dir_path = self.__base_remote_dir_path
+        local_dir_path = item.local_dir_path
+        if local_dir_path is None:
+            local_dir_path = self.__base_local_dir_path
 
         # Escape single and double quotes in any string used in queue command
         def escape(s: str) -> str:
@@ -504,28 +709,28 @@ class Lftp:
         # Build --exclude-glob flags for mirror commands
         # Note: LFTP's --exclude uses regex; --exclude-glob uses glob patterns
         exclude_flags = ""
-        if is_dir and exclude_patterns:
-            exclude_flags = " ".join(f'--exclude-glob "{escape(p)}"' for p in exclude_patterns)
+        if item.is_dir and item.exclude_patterns:
+            exclude_flags = " ".join(f'--exclude-glob "{escape(p)}"' for p in item.exclude_patterns)
 
         parts = [
             "queue",
             "'",
-            "pget" if not is_dir else "mirror",
+            "pget" if not item.is_dir else "mirror",
             "-c",
         ]
         if exclude_flags:
             parts.append(exclude_flags)
         parts.extend(
             [
-                f'"{escape(self.__base_remote_dir_path)}/{escape(name)}"',
-                "-o" if not is_dir else "",
-                f'"{escape(self.__base_local_dir_path)}/"',
+                f'"{escape(remote_dir_path)}/{escape(item.name)}"',
+                "-o" if not item.is_dir else "",
+                f'"{escape(local_dir_path)}/"',
                 "'",
             ]
         )
         command = " ".join(parts)
         self.logger.info("queue command: %s", command)
-        self.__run_command(command)  # type: ignore[arg-type]
+        return command
 
     def kill(self, name: str) -> bool:
         """
@@ -546,18 +751,36 @@ class Lftp:
         if job_to_kill is None:
             self.logger.debug(f"Kill failed to find job '{name}'")
             return False
+        self.kill_job(job_to_kill)
+        return True
+
+    def kill_job(self, job: LftpJobStatus):
+        """
+        Kill a queued or running job from a previous status
+        :param job:
+        :return:
+        """
         # Note: there's a chance that job ids change between when we called status
         #       and when we execute the kill command
         #       in this case the wrong job may be killed, there's nothing we can do about it
-        if job_to_kill.state == LftpJobStatus.State.RUNNING:
-            self.logger.debug(f"Killing running job '{name}'...")
-            self.__run_command(f"kill {job_to_kill.id}")  # type: ignore[arg-type]
-        elif job_to_kill.state == LftpJobStatus.State.QUEUED:
-            self.logger.debug(f"Killing queued job '{name}'...")
-            self.__run_command(f"queue --delete {job_to_kill.id}")  # type: ignore[arg-type]
+        if job.state == LftpJobStatus.State.RUNNING:
+            self.logger.debug(f"Killing running job '{job.name}'...")
+            self.__run_command(f"kill {job.id}")  # type: ignore[arg-type]
+        elif job.state == LftpJobStatus.State.QUEUED:
+            self.logger.debug(f"Killing queued job '{job.name}'...")
+            self.__run_command(f"queue --delete {job.id}")  # type: ignore[arg-type]
         else:
-            raise NotImplementedError(f"Unsupported state {job_to_kill.state!s}")
-        return True
+            raise NotImplementedError(f"Unsupported state {job.state!s}")
+
+    def move_queued(self, position: int, to_position: int):
+        """
+        Move a queued job within the queue
+        :param position: 1-based position of the job in the queue
+        :param to_position: position to move the job to, before the job now there
+        :return:
+        """
+        self.logger.debug(f"Moving queued job {position} to {to_position}")
+        self.__run_command(f"queue --move {position} {to_position}")  # type: ignore[arg-type]
 
     def kill_all(self):
         """
@@ -567,6 +790,8 @@ class Lftp:
         # empty the queue and kill running jobs
         self.__run_command("queue -d *")  # type: ignore[arg-type]
         self.__run_command("kill all")  # type: ignore[arg-type]
+        self.__has_jobs = False
+        self.__last_status_time = time.monotonic()
 
     def exit(self):
         """
@@ -0,0 +1,399 @@
+# Copyright 2017, Inderpreet Singh, All rights reserved.
+
+import logging
+import os
+import time
+from typing import NamedTuple
+
+from ssh import Sshcp
+
+from .bundle import TarBundle
+from .job_status import LftpJobStatus
+from .lftp import Lftp, LftpError, LftpQueueItem
+
+
+class SharedLftpQueueItem(NamedTuple):
+    """
+    A download for SharedLftpClient.queue_many(), with the arguments of SharedLftpClient.queue()
+    """
+
+    name: str
+    is_dir: bool
+    exclude_patterns: list[str] | None = None
+    bundle: bool = False
+    size: int | None = None
+
+
+class SharedLftp:
+    """
+    One lftp process shared by all path pairs on the same remote host
+
+    Each pair works through its own SharedLftpClient, which downloads into the
+    pair's directories and only sees the pair's jobs. All jobs run in the same
+    lftp process, so its connection and parallel job limits apply to the host
+    as a whole instead of to each pair separately.
+
+    Directories can also be downloaded as a tar stream over ssh (a bundle)
+    instead of an lftp mirror job. Bundles run outside of lftp, next to its
+    jobs, and are reported among them as mirror jobs. Up to max_bundles run
+    at a time; the others wait in order. A bundle that fails is queued in lftp
+    instead, which resumes from what was unpacked.
+    """
+
+    # Clients polling within this time share a single "jobs -v"
+    _STATUS_MAX_AGE_IN_SECS = 0.25
+
+    def __init__(self, lftp: Lftp, ssh: Sshcp | None = None, password: str | None = None):
+        """
+        :param lftp:
+        :param ssh: ssh access to the same host, None to never bundle
+        :param password: ssh password, None for key authentication
+        """
+        self.lftp = lftp
+        self.__ssh = ssh
+        self.__password = password
+        # Bundles bypass lftp's rate limit, so they're only used while it's unlimited
+        self.rate_limited = False
+        self.max_bundles = 1
+        self.__clients: list[SharedLftpClient] = []
+        self.__statuses: list[LftpJobStatus] | None = None
+        self.__status_time: float | None = None
+        # Client that last queued each (remote path, local dir), for jobs whose paths
+        # don't match any client
+        self.__queued_by: dict[tuple[str, str], SharedLftpClient] = {}
+        self.__pending_errors: list[LftpError] = []
+        # Running bundles, with the client each belongs to and its exclude patterns
+        self.__bundles: dict[TarBundle, tuple[SharedLftpClient, list[str] | None]] = {}
+        # Bundles count their job ids down from -1, apart from lftp's
+        self.__next_bundle_id = -1
+        self.logger = logging.getLogger("SharedLftp")
+
+    def client(self, remote_dir_path: str, local_dir_path: str) -> "SharedLftpClient":
+        """
+        Create a client that downloads from remote_dir_path to local_dir_path
+        :param remote_dir_path:
+        :param local_dir_path:
+        :return:
+        """
+        client = SharedLftpClient(self, remote_dir_path, local_dir_path)
+        self.__clients.append(client)
+        return client
+
+    @property
+    def num_clients(self) -> int:
+        return len(self.__clients)
+
+    def status(self, client: "SharedLftpClient") -> list[LftpJobStatus] | None:
+        """
+        Status of the jobs that belong to client
+        :param client:
+        :return: None if lftp's status could not be read
+        """
+        statuses = self.__status()
+        if statuses is None:
+            return None
+        return [job for job in statuses if self.__owner(job) is client] + [
+            bundle.status for bundle, (owner, _) in self.__bundles.items() if owner is client
+        ]
+
+    def queued_jobs(self) -> list[tuple["SharedLftpClient | None", LftpJobStatus]]:
+        """
+        Queued jobs of all clients, in queue order, with the client each belongs to
+        Uses the jobs of the last status read, which the clients' status() calls
+        keep current, instead of reading lftp's status again. Empty if the queue
+        changed since that read.
+        :return:
+        """
+        statuses = self.__statuses if self.__status_time is not None else None
+        if statuses is None:
+            return []
+        return [(self.__owner(job), job) for job in statuses if job.state == LftpJobStatus.State.QUEUED]
+
+    def reorder_queue(self, jobs: list[LftpJobStatus]):
+        """
+        Move queued jobs so that the queue is in the given order
+        :param jobs: all jobs from queued_jobs(), in the new order
+        :return:
+        """
+        # Note: a job may start between reading the queue and moving, which shifts
+        #       the positions; the next reorder fixes the order up
+        positions = [job.id for _, job in self.queued_jobs()]
+        moved = False
+        for index, job in enumerate(jobs):
+            if index >= len(positions) or positions[index] == job.id or job.id not in positions:
+                continue
+            current = positions.index(job.id)
+            self.lftp.move_queued(current + 1, index + 1)
+            positions.insert(index, positions.pop(current))
+            moved = True
+        if moved:
+            self.__invalidate_status()
+
+    def queue(
+        self,
+        client: "SharedLftpClient",
+        name: str,
+        is_dir: bool,
+        exclude_patterns: list[str] | None = None,
+        bundle: bool = False,
+        size: int | None = None,
+    ):
+        """
+        Queue a download for client
+        :param client:
+        :param name:
+        :param is_dir:
+        :param exclude_patterns:
+        :param bundle: download the directory as a tar stream over ssh, where possible
+        :param size: remote size of the file, for the progress of a bundle
+        :return:
+        """
+        if self.__can_bundle(bundle, is_dir):
+            self.__start_bundle(client, name, exclude_patterns, size)
+            return
+        self.__queued_by[client.queued_key(name)] = client
+        self.__invalidate_status()
+        self.lftp.queue(
+            name,
+            is_dir,
+            exclude_patterns=exclude_patterns,
+            remote_dir_path=client.remote_dir_path,
+            local_dir_path=client.local_dir_path,
+        )
+
+    def queue_many(self, client: "SharedLftpClient", items: list[SharedLftpQueueItem]) -> list[LftpError | None]:
+        """
+        Queue several downloads for client, sending those that go to lftp together
+        :param client:
+        :param items:
+        :return: error of each item, None for the items that were queued
+        """
+        errors: list[LftpError | None] = [None] * len(items)
+        in_lftp: list[int] = []
+        for index, item in enumerate(items):
+            if self.__can_bundle(item.bundle, item.is_dir):
+                self.__start_bundle(client, item.name, item.exclude_patterns, item.size)
+            else:
+                self.__queued_by[client.queued_key(item.name)] = client
+                in_lftp.append(index)
+        if not in_lftp:
+            return errors
+        self.__invalidate_status()
+        lftp_errors = self.lftp.queue_many(
+            [
+                LftpQueueItem(
+                    items[index].name,
+                    items[index].is_dir,
+                    exclude_patterns=items[index].exclude_patterns,
+                    remote_dir_path=client.remote_dir_path,
+                    local_dir_path=client.local_dir_path,
+                )
+                for index in in_lftp
+            ]
+        )
+        for index, error in zip(in_lftp, lftp_errors, strict=True):
+            errors[index] = error
+        return errors
+
+    def kill(self, client: "SharedLftpClient", name: str) -> bool:
+        """
+        Kill client's queued or running job of the given name
+        :param client:
+        :param name:
+        :return: True if job of given name was found, False otherwise
+        """
+        for bundle, (owner, _) in self.__bundles.items():
+            if owner is client and bundle.name == name:
+                bundle.kill()
+                del self.__bundles[bundle]
+                return True
+        self.__invalidate_status()
+        statuses = self.status(client)
+        if statuses is None:
+            return False
+        job = next((job for job in statuses if job.name == name), None)
+        if job is None:
+            return False
+        self.__invalidate_status()
+        self.lftp.kill_job(job)
+        return True
+
+    def raise_pending_error(self, client: "SharedLftpClient"):
+        """
+        Raise the pending error that belongs to client, if any
+        An error belongs to the client whose remote directory it mentions. Errors
+        that don't mention any client's directory go to the first client to ask.
+        :param client:
+        :return:
+        """
+        try:
+            self.lftp.raise_pending_error()
+        except LftpError as e:
+            self.__pending_errors.append(e)
+        for error in self.__pending_errors:
+            owner = self.__error_owner(str(error))
+            if owner is None or owner is client:
+                self.__pending_errors.remove(error)
+                raise error
+
+    def release(self, client: "SharedLftpClient"):
+        """
+        Remove client, killing its jobs; the last client to leave exits lftp
+        :param client:
+        :return:
+        """
+        for bundle in [bundle for bundle, (owner, _) in self.__bundles.items() if owner is client]:
+            bundle.kill()
+            del self.__bundles[bundle]
+        if self.__clients == [client]:
+            self.__clients.clear()
+            self.__queued_by.clear()
+            self.lftp.exit()
+            return
+        self.__invalidate_status()
+        for job in self.status(client) or []:
+            self.lftp.kill_job(job)
+        self.__clients.remove(client)
+        self.__queued_by = {key: c for key, c in self.__queued_by.items() if c is not client}
+        self.__invalidate_status()
+
+    def __can_bundle(self, bundle: bool, is_dir: bool) -> bool:
+        return bundle and is_dir and self.__ssh is not None and not self.rate_limited
+
+    def __start_bundle(
+        self, client: "SharedLftpClient", name: str, exclude_patterns: list[str] | None, size: int | None
+    ):
+        assert self.__ssh is not None
+        source_command = self.__ssh.shell_command_line(
+            TarBundle.remote_command(client.remote_dir_path, name, exclude_patterns)
+        )
+        bundle = TarBundle(
+            job_id=self.__next_bundle_id,
+            name=name,
+            remote_dir_path=client.remote_dir_path,
+            local_dir_path=client.local_dir_path,
+            source_command=source_command,
+            size_remote=size,
+            password=self.__password,
+        )
+        self.__next_bundle_id -= 1
+        self.__bundles[bundle] = (client, exclude_patterns)
+        self.__start_bundles()
+
+    def __poll_bundles(self):
+        for bundle, (client, exclude_patterns) in list(self.__bundles.items()):
+            if bundle.poll():
+                continue
+            del self.__bundles[bundle]
+            if bundle.error is None:
+                continue
+            self.logger.warning(f"{bundle.error}; downloading it with lftp instead")
+            # Queue it in lftp right away, so it never looks finished in between
+            try:
+                self.queue(client, bundle.name, True, exclude_patterns=exclude_patterns)
+            except LftpError as e:
+                self.__pending_errors.append(e)
+
+    def __start_bundles(self):
+        num_running = sum(1 for bundle in self.__bundles if bundle.started)
+        for bundle in self.__bundles:
+            if num_running >= self.max_bundles:
+                break
+            if not bundle.started:
+                bundle.start()
+                num_running += 1
+
+    def __status(self) -> list[LftpJobStatus] | None:
+        self.__poll_bundles()
+        self.__start_bundles()
+        now = time.monotonic()
+        if self.__status_time is None or now - self.__status_time >= SharedLftp._STATUS_MAX_AGE_IN_SECS:
+            self.__statuses = self.lftp.status()
+            self.__status_time = now
+        return self.__statuses
+
+    def __invalidate_status(self):
+        self.__status_time = None
+
+    def __owner(self, job: LftpJobStatus) -> "SharedLftpClient | None":
+        for client in self.__clients:
+            if client.has_paths_of(job):
+                return client
+        # lftp doesn't quote the paths it lists, so paths with spaces may not split right
+        if job.remote_path is not None and job.local_path is not None:
+            # Try each space as the one between the two paths
+            paths = f"{job.remote_path} {job.local_path}"
+            for index, char in enumerate(paths):
+                if char != " ":
+                    continue
+                key = (os.path.normpath(paths[:index]), os.path.normpath(paths[index + 1 :]))
+                owner = self.__queued_by.get(key)
+                if owner is not None:
+                    return owner
+        if len(self.__clients) == 1:
+            return self.__clients[0]
+        return None
+
+    def __error_owner(self, message: str) -> "SharedLftpClient | None":
+        owner = None
+        for client in self.__clients:
+            if client.mentioned_in(message):
+                # Prefer the deepest directory, for pairs nested inside each other
+                if owner is None or len(client.remote_dir_path) > len(owner.remote_dir_path):
+                    owner = client
+        return owner
+
+
+class SharedLftpClient:
+    """
+    A path pair's view of a SharedLftp
+
+    Has the methods of Lftp that the controller uses for downloading.
+    """
+
+    def __init__(self, shared: SharedLftp, remote_dir_path: str, local_dir_path: str):
+        self.shared = shared
+        self.remote_dir_path = remote_dir_path
+        self.local_dir_path = local_dir_path
+        self.__remote_dir = os.path.normpath(remote_dir_path)
+        self.__local_dir = os.path.normpath(local_dir_path)
+
+    def has_paths_of(self, job: LftpJobStatus) -> bool:
+        """True if job downloads from this client's remote dir to its local dir"""
+        if job.remote_path is None or job.local_path is None:
+            return False
+        remote_dir = os.path.dirname(os.path.normpath(job.remote_path))
+        return remote_dir == self.__remote_dir and os.path.normpath(job.local_path) == self.__local_dir
+
+    def queued_key(self, name: str) -> tuple[str, str]:
+        """Remote path and local dir of a job that downloads name"""
+        return os.path.normpath(os.path.join(self.__remote_dir, name)), self.__local_dir
+
+    def mentioned_in(self, message: str) -> bool:
+        """True if message mentions a path inside this client's remote dir"""
+        return f"{self.__remote_dir.rstrip('/')}/" in message
+
+    def status(self) -> list[LftpJobStatus] | None:
+        return self.shared.status(self)
+
+    def queue(
+        self,
+        name: str,
+        is_dir: bool,
+        exclude_patterns: list[str] | None = None,
+        bundle: bool = False,
+        size: int | None = None,
+    ):
+        self.shared.queue(self, name, is_dir, exclude_patterns=exclude_patterns, bundle=bundle, size=size)
+
+    def queue_many(self, items: list[SharedLftpQueueItem]) -> list[LftpError | None]:
+        return self.shared.queue_many(self, items)
+
+    def kill(self, name: str) -> bool:
+        return self.shared.kill(self, name)
+
+    def raise_pending_error(self):
+        self.shared.raise_pending_error(self)
+
+    def exit(self):
+        self.shared.release(self)
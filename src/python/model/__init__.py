@@ -1,5 +1,6 @@
 # Copyright 2017, Inderpreet Singh, All rights reserved.
 
 from .model import Model as Model, IModelListener as IModelListener, ModelError as ModelError
+from .model import ANY_PAIR as ANY_PAIR, AnyPair as AnyPair
 from .file import ModelFile as ModelFile
 from .diff import ModelDiff as ModelDiff, ModelDiffUtil as ModelDiffUtil
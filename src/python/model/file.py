@@ -30,6 +30,17 @@ class ModelFile:
         VALIDATED = 9
         CORRUPT = 10
 
+    __EQ_IGNORED_KEYS = frozenset(
+        {
+            "_ModelFile__update_timestamp",
+            "_ModelFile__parent",
+            "_ModelFile__children",
+            "_ModelFile__children_by_name",
+            "_ModelFile__full_path",
+            "_ModelFile__frozen",
+        }
+    )
+
     def __init__(self, name: str, is_dir: bool, pair_id: str | None = None):
         self.__name = name  # file or folder name
         self.__is_dir = is_dir  # True if this is a dir, False if file
@@ -40,7 +51,11 @@ class ModelFile:
         self.__transferred_size: int | None = None  # transferred size in bytes, None if file does not exist
         self.__downloading_speed: int | None = None  # in bytes / sec, None if not downloading
         self.__eta: int | None = None  # est. time remaining in seconds, None if not available
+        self.__eta_low: int | None = None  # optimistic end of the eta band, None if not available
+        self.__eta_high: int | None = None  # pessimistic end of the eta band, None if not available
+        self.__throughput: int | None = None  # windowed bytes / sec, None if not enough history
         self.__is_extractable = False  # whether file is an archive or dir contains archives
+        self.__priority = 0  # download priority, higher is downloaded first
         self.__local_created_timestamp: datetime | None = None
         self.__local_modified_timestamp: datetime | None = None
         self.__remote_created_timestamp: datetime | None = None
@@ -49,7 +64,13 @@ class ModelFile:
         # Note: timestamp is not part of equality operator
         self.__update_timestamp = datetime.now()
         self.__children: list[ModelFile] = []  # children files
+        self.__children_by_name: dict[str, ModelFile] = {}  # name->child index of __children
         self.__parent: ModelFile | None = None  # direct predecessor
+        # path including all predecessors, recomputed when attached to a parent
+        self.__full_path = name
+        # Set once the file is published in a model snapshot; see freeze()
+        # Note: frozen flag is not part of equality operator
+        self.__frozen = False
 
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, ModelFile):
@@ -58,12 +79,10 @@ class ModelFile:
         #   timestamp: we don't care about it
         #   parent: semantics are to check self and children only
         #   children: check these manually for easier debugging
-        ka = set(self.__dict__).difference(
-            {"_ModelFile__update_timestamp", "_ModelFile__parent", "_ModelFile__children"}
-        )
-        kb = set(other.__dict__).difference(
-            {"_ModelFile__update_timestamp", "_ModelFile__parent", "_ModelFile__children"}
-        )
+        #   children index, full path: derived from children and parent
+        #   frozen: immutability does not change what the file describes
+        ka = set(self.__dict__).difference(ModelFile.__EQ_IGNORED_KEYS)
+        kb = set(other.__dict__).difference(ModelFile.__EQ_IGNORED_KEYS)
         # Check self properties
         if ka != kb:
             return False
@@ -73,8 +92,8 @@ class ModelFile:
         # Check children's properties
         if len(self.__children) != len(other.__children):
             return False
-        my_children_dict = {f.name: f for f in self.__children}
-        other_children_dict = {f.name: f for f in other.__children}
+        my_children_dict = self.__children_by_name
+        other_children_dict = other.__children_by_name
         if my_children_dict.keys() != other_children_dict.keys():
             return False
         return all(my_children_dict[name] == other_children_dict[name] for name in my_children_dict)
@@ -92,6 +111,7 @@ class ModelFile:
 
     @pair_id.setter
     def pair_id(self, pair_id: str | None):
+        self.__check_mutable()
         self.__pair_id = pair_id
 
     @property
@@ -104,6 +124,7 @@ class ModelFile:
 
     @state.setter
     def state(self, state: State):
+        self.__check_mutable()
         if type(state) != ModelFile.State:
             raise TypeError
         self.__state = state
@@ -114,6 +135,7 @@ class ModelFile:
 
     @remote_size.setter
     def remote_size(self, remote_size: int | None):
+        self.__check_mutable()
         if type(remote_size) == int:
             if remote_size < 0:
                 raise ValueError
@@ -129,6 +151,7 @@ class ModelFile:
 
     @local_size.setter
     def local_size(self, local_size: int | None):
+        self.__check_mutable()
         if type(local_size) == int:
             if local_size < 0:
                 raise ValueError
@@ -144,6 +167,7 @@ class ModelFile:
 
     @transferred_size.setter
     def transferred_size(self, transferred_size: int | None):
+        self.__check_mutable()
         if type(transferred_size) == int:
             if transferred_size < 0:
                 raise ValueError
@@ -159,6 +183,7 @@ class ModelFile:
 
     @downloading_speed.setter
     def downloading_speed(self, downloading_speed: int | None):
+        self.__check_mutable()
         if type(downloading_speed) == int:
             if downloading_speed < 0:
                 raise ValueError
@@ -174,6 +199,7 @@ class ModelFile:
 
     @update_timestamp.setter
     def update_timestamp(self, update_timestamp: datetime):
+        self.__check_mutable()
         if type(update_timestamp) != datetime:
             raise TypeError
         self.__update_timestamp = update_timestamp
@@ -184,6 +210,7 @@ class ModelFile:
 
     @eta.setter
     def eta(self, eta: int | None):
+        self.__check_mutable()
         if type(eta) == int:
             if eta < 0:
                 raise ValueError
@@ -193,12 +220,72 @@ class ModelFile:
         else:
             raise TypeError
 
+    @property
+    def eta_low(self) -> int | None:
+        return self.__eta_low
+
+    @eta_low.setter
+    def eta_low(self, eta_low: int | None):
+        self.__check_mutable()
+        if type(eta_low) == int:
+            if eta_low < 0:
+                raise ValueError
+            self.__eta_low = eta_low
+        elif eta_low is None:
+            self.__eta_low = eta_low
+        else:
+            raise TypeError
+
+    @property
+    def eta_high(self) -> int | None:
+        return self.__eta_high
+
+    @eta_high.setter
+    def eta_high(self, eta_high: int | None):
+        self.__check_mutable()
+        if type(eta_high) == int:
+            if eta_high < 0:
+                raise ValueError
+            self.__eta_high = eta_high
+        elif eta_high is None:
+            self.__eta_high = eta_high
+        else:
+            raise TypeError
+
+    @property
+    def throughput(self) -> int | None:
+        return self.__throughput
+
+    @throughput.setter
+    def throughput(self, throughput: int | None):
+        self.__check_mutable()
+        if type(throughput) == int:
+            if throughput < 0:
+                raise ValueError
+            self.__throughput = throughput
+        elif throughput is None:
+            self.__throughput = throughput
+        else:
+            raise TypeError
+
+    @property
+    def priority(self) -> int:
+        return self.__priority
+
+    @priority.setter
+    def priority(self, priority: int):
+        self.__check_mutable()
+        if type(priority) != int:
+            raise TypeError
+        self.__priority = priority
+
     @property
     def is_extractable(self) -> bool:
         return self.__is_extractable
 
     @is_extractable.setter
     def is_extractable(self, is_extractable: bool):
+        self.__check_mutable()
         self.__is_extractable = is_extractable
 
     @property
@@ -207,6 +294,7 @@ class ModelFile:
 
     @local_created_timestamp.setter
     def local_created_timestamp(self, local_created_timestamp: datetime):
+        self.__check_mutable()
         if type(local_created_timestamp) != datetime:
             raise TypeError
         self.__local_created_timestamp = local_created_timestamp
@@ -217,6 +305,7 @@ class ModelFile:
 
     @local_modified_timestamp.setter
     def local_modified_timestamp(self, local_modified_timestamp: datetime):
+        self.__check_mutable()
         if type(local_modified_timestamp) != datetime:
             raise TypeError
         self.__local_modified_timestamp = local_modified_timestamp
@@ -227,6 +316,7 @@ class ModelFile:
 
     @remote_created_timestamp.setter
     def remote_created_timestamp(self, remote_created_timestamp: datetime):
+        self.__check_mutable()
         if type(remote_created_timestamp) != datetime:
             raise TypeError
         self.__remote_created_timestamp = remote_created_timestamp
@@ -237,6 +327,7 @@ class ModelFile:
 
     @remote_modified_timestamp.setter
     def remote_modified_timestamp(self, remote_modified_timestamp: datetime):
+        self.__check_mutable()
         if type(remote_modified_timestamp) != datetime:
             raise TypeError
         self.__remote_modified_timestamp = remote_modified_timestamp
@@ -244,19 +335,26 @@ class ModelFile:
     @property
     def full_path(self) -> str:
         """Full path including all predecessors"""
-        if self.__parent:
-            return os.path.join(self.__parent.full_path, self.name)
-        return self.name
+        return self.__full_path
 
     def add_child(self, child_file: "ModelFile"):
+        self.__check_mutable()
+        # Attaching sets the child's parent and full path
+        child_file.__check_mutable()
         if not self.is_dir:
             raise TypeError("Cannot add child to a non-directory")
         if child_file is self:
             raise ValueError("Cannot add parent as a child")
-        if child_file.name in (f.name for f in self.__children):
+        if child_file.name in self.__children_by_name:
             raise ValueError("Cannot add child more than once")
         self.__children.append(child_file)
+        self.__children_by_name[child_file.name] = child_file
         child_file.__parent = self
+        child_file.__update_full_path()
+
+    def get_child(self, name: str) -> Optional["ModelFile"]:
+        """Return the direct child with the given name, or None"""
+        return self.__children_by_name.get(name)
 
     def get_children(self) -> list["ModelFile"]:
         return copy.copy(self.__children)
@@ -264,3 +362,30 @@ class ModelFile:
     @property
     def parent(self) -> Optional["ModelFile"]:
         return self.__parent
+
+    @property
+    def is_frozen(self) -> bool:
+        return self.__frozen
+
+    def freeze(self):
+        """
+        Make this file and all its descendants immutable
+        Frozen files can be shared between model snapshots and handed to
+        other threads without copying. Any later attempt to modify them
+        raises an AttributeError.
+        """
+        self.__frozen = True
+        for child in self.__children:
+            child.freeze()
+
+    def __update_full_path(self):
+        # Children are normally attached before they have children of their own,
+        # so this usually touches a single node
+        assert self.__parent is not None
+        self.__full_path = os.path.join(self.__parent.__full_path, self.__name)
+        for child in self.__children:
+            child.__update_full_path()
+
+    def __check_mutable(self):
+        if self.__frozen:
+            raise AttributeError(f"Cannot modify frozen file '{self.__name}'")
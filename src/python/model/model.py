@@ -1,7 +1,10 @@
 # Copyright 2017, Inderpreet Singh, All rights reserved.
 
+import bisect
 import logging
 from abc import ABC, abstractmethod
+from collections.abc import Iterable
+from enum import Enum
 
 # my libs
 from common import AppError
@@ -17,6 +20,16 @@ class ModelError(AppError):
     pass
 
 
+class AnyPair(Enum):
+    """Type of ANY_PAIR"""
+
+    ANY_PAIR = 0
+
+
+# pair_id for Model.query that accepts files of every pair; None selects the default pair
+ANY_PAIR = AnyPair.ANY_PAIR
+
+
 class IModelListener(ABC):
     """
     Interface to listen to model events
@@ -54,6 +67,12 @@ class IModelListener(ABC):
 class Model:
     """
     Represents the entire state of lftp
+
+    Besides the primary key->file map, the model keeps secondary indexes by
+    state, by pair_id and by is_extractable, plus a lazily sorted name list
+    for prefix lookups. The indexes are updated in add_file, remove_file and
+    update_file, so files must not be modified while they are in the model;
+    replace them with update_file instead.
     """
 
     @staticmethod
@@ -81,6 +100,12 @@ class Model:
         self.logger = logging.getLogger("Model")
         self.__files: dict[str, ModelFile] = {}  # key->ModelFile (key is pair_id:name or just name)
         self.__listeners: list[IModelListener] = []
+        # Secondary indexes, each maps key->ModelFile
+        self.__files_by_state: dict[ModelFile.State, dict[str, ModelFile]] = {}
+        self.__files_by_pair: dict[str | None, dict[str, ModelFile]] = {}
+        self.__extractable_files: dict[str, ModelFile] = {}
+        # Sorted (name, key) pairs for prefix lookups, None when stale
+        self.__sorted_names: list[tuple[str, str]] | None = None
 
     def set_base_logger(self, base_logger: logging.Logger):
         self.logger = base_logger.getChild("Model")
@@ -118,6 +143,8 @@ class Model:
         if key in self.__files:
             raise ModelError("File already exists in the model")
         self.__files[key] = file
+        self.__index(key, file)
+        self.__sorted_names = None
         for listener in self.__listeners:
             listener.file_added(self.__files[key])
 
@@ -134,6 +161,8 @@ class Model:
             raise ModelError("File does not exist in the model")
         file = self.__files[key]
         del self.__files[key]
+        self.__unindex(key, file)
+        self.__sorted_names = None
         for listener in self.__listeners:
             listener.file_removed(file)
 
@@ -150,6 +179,8 @@ class Model:
         old_file = self.__files[key]
         new_file = file
         self.__files[key] = new_file
+        self.__unindex(key, old_file)
+        self.__index(key, new_file)
         for listener in self.__listeners:
             listener.file_updated(old_file, new_file)
 
@@ -176,3 +207,84 @@ class Model:
     def get_all_files(self) -> list[ModelFile]:
         """Return all files in the model."""
         return list(self.__files.values())
+
+    def query(
+        self,
+        states: Iterable[ModelFile.State] | None = None,
+        pair_id: str | AnyPair | None = ANY_PAIR,
+        is_extractable: bool | None = None,
+        name_prefix: str | None = None,
+    ) -> list[ModelFile]:
+        """
+        Return the files matching all of the given criteria
+        Criteria left as None, and pair_id left as ANY_PAIR, are not
+        applied. The smallest matching index drives the lookup, so the cost
+        is proportional to the number of candidates in that index rather
+        than the size of the model.
+        :param states: accept files in any of these states
+        :param pair_id: accept files of this pair only, None for the default pair
+        :param is_extractable: accept files with this is_extractable value
+        :param name_prefix: accept files whose name starts with this prefix
+        :return:
+        """
+        state_set = frozenset(states) if states is not None else None
+        candidates = self.__smallest_candidates(state_set, pair_id, is_extractable, name_prefix)
+        return [
+            f
+            for f in candidates
+            if (state_set is None or f.state in state_set)
+            and (pair_id is ANY_PAIR or f.pair_id == pair_id)
+            and (is_extractable is None or f.is_extractable == is_extractable)
+            and (name_prefix is None or f.name.startswith(name_prefix))
+        ]
+
+    def __smallest_candidates(
+        self,
+        state_set: frozenset[ModelFile.State] | None,
+        pair_id: str | AnyPair | None,
+        is_extractable: bool | None,
+        name_prefix: str | None,
+    ) -> Iterable[ModelFile]:
+        # (size, candidates) for every index that applies; only the smallest is walked
+        options: list[tuple[int, Iterable[ModelFile]]] = [(len(self.__files), self.__files.values())]
+        if state_set is not None:
+            buckets = [self.__files_by_state[state] for state in state_set if state in self.__files_by_state]
+            options.append((sum(len(b) for b in buckets), (f for b in buckets for f in b.values())))
+        if pair_id is not ANY_PAIR:
+            bucket = self.__files_by_pair.get(pair_id, {})
+            options.append((len(bucket), bucket.values()))
+        if is_extractable:
+            options.append((len(self.__extractable_files), self.__extractable_files.values()))
+        if name_prefix is not None:
+            keys = self.__keys_with_prefix(name_prefix)
+            options.append((len(keys), (self.__files[key] for key in keys)))
+        return min(options, key=lambda option: option[0])[1]
+
+    def __keys_with_prefix(self, prefix: str) -> list[str]:
+        if self.__sorted_names is None:
+            self.__sorted_names = sorted((f.name, key) for key, f in self.__files.items())
+        names = self.__sorted_names
+        keys = []
+        for i in range(bisect.bisect_left(names, (prefix,)), len(names)):
+            name, key = names[i]
+            if not name.startswith(prefix):
+                break
+            keys.append(key)
+        return keys
+
+    def __index(self, key: str, file: ModelFile):
+        self.__files_by_state.setdefault(file.state, {})[key] = file
+        self.__files_by_pair.setdefault(file.pair_id, {})[key] = file
+        if file.is_extractable:
+            self.__extractable_files[key] = file
+
+    def __unindex(self, key: str, file: ModelFile):
+        state_bucket = self.__files_by_state.get(file.state, {})
+        state_bucket.pop(key, None)
+        if not state_bucket:
+            self.__files_by_state.pop(file.state, None)
+        pair_bucket = self.__files_by_pair.get(file.pair_id, {})
+        pair_bucket.pop(key, None)
+        if not pair_bucket:
+            self.__files_by_pair.pop(file.pair_id, None)
+        self.__extractable_files.pop(key, None)
@@ -382,8 +382,12 @@ class Seedsync:
         config.controller.use_local_path_as_extract_path = True
         config.controller.use_staging = False
         config.controller.staging_path = "/staging"
+        config.controller.model_build_workers = 4
+        config.controller.model_build_mode = "thread"
+        config.controller.download_order = "fifo"
 
         config.web.port = 8800
+        config.web.server_mode = "threaded"
 
         config.autoqueue.enabled = False
         config.autoqueue.patterns_only = False
@@ -409,6 +413,13 @@ class Seedsync:
         config.lftp.net_max_retries = 2
         config.lftp.net_reconnect_interval_base = 3
         config.lftp.net_reconnect_interval_multiplier = 1
+        config.lftp.bandwidth_schedule = ""
+        config.lftp.auto_tune_connections = False
+        config.lftp.auto_tune_min_connections = 1
+        config.lftp.auto_tune_max_connections = 32
+        config.lftp.bundle_small_files = False
+        config.lftp.bundle_min_files = 500
+        config.lftp.bundle_max_avg_file_size = 1048576
 
         return config
 
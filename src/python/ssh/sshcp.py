@@ -243,7 +243,7 @@ class Sshcp:
             sp.close()
             raise SshcpError("SFTP timed out") from None
 
-    def __run_command(self, command: str, flags: str, args: str) -> bytes:
+    def __command_line(self, command: str, flags: str, args: str) -> str:
         command_args = [command, flags]
 
         # Common flags
@@ -268,7 +268,10 @@ class Sshcp:
             command_args += ["-o", "PubkeyAuthentication=no"]
 
         command_args.append(args)
-        command = " ".join(command_args)
+        return " ".join(command_args)
+
+    def __run_command(self, command: str, flags: str, args: str) -> bytes:
+        command = self.__command_line(command, flags, args)
         self.logger.debug(f"Command: {command}")
 
         start_time = time.time()
@@ -385,6 +388,32 @@ class Sshcp:
         if not command:
             raise ValueError("Command cannot be empty")
 
+        flags = [
+            "-p",
+            str(self.__port),  # port
+        ]
+        args = [self._remote_address(), Sshcp.__quote_command(command)]
+        return self.__run_command(command="ssh", flags=" ".join(flags), args=" ".join(args))
+
+    def shell_command_line(self, command: str) -> str:
+        """
+        The ssh command line that runs a shell command on the remote server
+        For callers that run ssh themselves, e.g. to stream its output
+        :param command:
+        :return:
+        """
+        if not command:
+            raise ValueError("Command cannot be empty")
+
+        flags = [
+            "-p",
+            str(self.__port),  # port
+        ]
+        args = [self._remote_address(), Sshcp.__quote_command(command)]
+        return self.__command_line(command="ssh", flags=" ".join(flags), args=" ".join(args))
+
+    @staticmethod
+    def __quote_command(command: str) -> str:
         # escape the command for SSH transport
         if "'" in command:
             # Single quotes in command: wrap in single quotes and escape each
@@ -399,13 +428,7 @@ class Sshcp:
         else:
             # no quotes in command, cover with double quotes
             command = f'"{command}"'
-
-        flags = [
-            "-p",
-            str(self.__port),  # port
-        ]
-        args = [self._remote_address(), command]
-        return self.__run_command(command="ssh", flags=" ".join(flags), args=" ".join(args))
+        return command
 
     def copy(self, local_path: str, remote_path: str):
         """
@@ -44,6 +44,47 @@ class TestControllerHandler(BaseTestWebApp):
         self.assertEqual(Controller.Command.Action.QUEUE, command.action)
         self.assertEqual('value"with"doublequote', command.filename)
 
+    def test_queue_with_priority(self):
+        self.controller.queue_command = MagicMock(side_effect=lambda cmd: cmd.callbacks[0].on_success())
+
+        self.test_app.get("/server/command/queue/test1")
+        self.assertIsNone(self.controller.queue_command.call_args[0][0].priority)
+        self.test_app.get("/server/command/queue/test1?priority=5")
+        self.assertEqual(5, self.controller.queue_command.call_args[0][0].priority)
+
+        self.controller.queue_command.reset_mock()
+        self.test_app.get("/server/command/queue/test1?priority=high", status=400)
+        self.test_app.get("/server/command/queue/test1?priority=101", status=400)
+        self.controller.queue_command.assert_not_called()
+
+    def test_queue_with_bundle(self):
+        self.controller.queue_command = MagicMock(side_effect=lambda cmd: cmd.callbacks[0].on_success())
+
+        self.test_app.get("/server/command/queue/test1")
+        self.assertIsNone(self.controller.queue_command.call_args[0][0].bundle)
+        self.test_app.get("/server/command/queue/test1?bundle=true")
+        self.assertTrue(self.controller.queue_command.call_args[0][0].bundle)
+        self.test_app.get("/server/command/queue/test1?bundle=0")
+        self.assertFalse(self.controller.queue_command.call_args[0][0].bundle)
+
+        self.controller.queue_command.reset_mock()
+        self.test_app.get("/server/command/queue/test1?bundle=maybe", status=400)
+        self.controller.queue_command.assert_not_called()
+
+    def test_prioritize(self):
+        self.controller.queue_command = MagicMock(side_effect=lambda cmd: cmd.callbacks[0].on_success())
+
+        resp = self.test_app.get("/server/command/prioritize/test1?priority=-3")
+        self.assertEqual("Set priority of file 'test1'", resp.text)
+        command = self.controller.queue_command.call_args[0][0]
+        self.assertEqual(Controller.Command.Action.PRIORITIZE, command.action)
+        self.assertEqual("test1", command.filename)
+        self.assertEqual(-3, command.priority)
+
+        self.controller.queue_command.reset_mock()
+        self.test_app.get("/server/command/prioritize/test1", status=400)
+        self.controller.queue_command.assert_not_called()
+
     def test_stop(self):
         def side_effect(cmd: Controller.Command):
             cmd.callbacks[0].on_success()
@@ -239,3 +280,177 @@ class TestControllerHandlerValidation(BaseTestWebApp):
         resp = self.test_app.get("/server/command/queue/" + uri, expect_errors=True)
         self.assertEqual(400, resp.status_int)
         self.controller.queue_command.assert_not_called()
+
+
+class TestControllerHandlerBatch(BaseTestWebApp):
+    def setUp(self):
+        super().setUp()
+        # Loopback requests are exempt from the CSRF origin check
+        self.test_app.extra_environ = {"REMOTE_ADDR": "127.0.0.1"}
+
+    def _post_batch(self, commands, status=200):
+        return self.test_app.post_json("/server/command/batch", {"commands": commands}, status=status)
+
+    def test_batch(self):
+        def side_effect(commands: list[Controller.Command]):
+            for cmd in commands:
+                if cmd.filename == "bad":
+                    cmd.callbacks[0].on_failure("File 'bad' not found")
+                else:
+                    cmd.callbacks[0].on_success()
+
+        self.controller.queue_commands = MagicMock(side_effect=side_effect)
+
+        resp = self._post_batch(
+            [
+                {"action": "queue", "file": "a b", "pair_id": "p1"},
+                {"action": "QUEUE", "file": "bad"},
+                {"action": "launch", "file": "c"},
+                {"action": "stop", "file": "../etc/passwd"},
+                {"action": "delete_local", "file": "d", "pair_id": " "},
+                "queue e",
+                {"action": "delete_remote", "file": "f/g"},
+            ]
+        )
+        self.controller.queue_commands.assert_called_once()
+        commands = self.controller.queue_commands.call_args[0][0]
+        self.assertEqual(
+            [
+                (Controller.Command.Action.QUEUE, "a b", "p1"),
+                (Controller.Command.Action.QUEUE, "bad", None),
+                (Controller.Command.Action.DELETE_REMOTE, "f/g", None),
+            ],
+            [(c.action, c.filename, c.pair_id) for c in commands],
+        )
+        results = resp.json["results"]
+        self.assertEqual(
+            [
+                (True, None),
+                (False, "File 'bad' not found"),
+                (False, "Invalid action"),
+                (False, "Invalid file name"),
+                (False, "pair_id must be a non-blank string"),
+                (False, "Expected JSON object"),
+                (True, None),
+            ],
+            [(r["success"], r["error"]) for r in results],
+        )
+        self.assertEqual(
+            {"action": "queue", "file": "a b", "pair_id": "p1", "success": True, "error": None}, results[0]
+        )
+
+    def test_batch_priority(self):
+        self.controller.queue_commands = MagicMock(
+            side_effect=lambda commands: [cmd.callbacks[0].on_success() for cmd in commands]
+        )
+        resp = self._post_batch(
+            [
+                {"action": "queue", "file": "a", "priority": 2},
+                {"action": "prioritize", "file": "b", "priority": -1},
+                {"action": "prioritize", "file": "c"},
+                {"action": "queue", "file": "d", "priority": "2"},
+                {"action": "queue", "file": "e", "priority": 1000},
+            ]
+        )
+        commands = self.controller.queue_commands.call_args[0][0]
+        self.assertEqual(
+            [(Controller.Command.Action.QUEUE, "a", 2), (Controller.Command.Action.PRIORITIZE, "b", -1)],
+            [(c.action, c.filename, c.priority) for c in commands],
+        )
+        self.assertEqual(
+            [None, None, "Missing priority", "Invalid priority", "Invalid priority"],
+            [r["error"] for r in resp.json["results"]],
+        )
+
+    def test_batch_bundle(self):
+        self.controller.queue_commands = MagicMock(
+            side_effect=lambda commands: [cmd.callbacks[0].on_success() for cmd in commands]
+        )
+        resp = self._post_batch(
+            [
+                {"action": "queue", "file": "a", "bundle": True},
+                {"action": "queue", "file": "b"},
+                {"action": "queue", "file": "c", "bundle": "yes"},
+            ]
+        )
+        commands = self.controller.queue_commands.call_args[0][0]
+        self.assertEqual([("a", True), ("b", None)], [(c.filename, c.bundle) for c in commands])
+        self.assertEqual([None, None, "Invalid bundle"], [r["error"] for r in resp.json["results"]])
+
+    def test_batch_all_invalid_does_not_reach_controller(self):
+        self.controller.queue_commands = MagicMock()
+        resp = self._post_batch([{"action": "queue", "file": ""}])
+        self.controller.queue_commands.assert_not_called()
+        self.assertEqual("Invalid file name", resp.json["results"][0]["error"])
+
+    def test_batch_bad_request(self):
+        self.controller.queue_commands = MagicMock()
+        self.test_app.post("/server/command/batch", "not json", status=400)
+        self.test_app.post_json("/server/command/batch", [{"action": "queue", "file": "a"}], status=400)
+        too_many = [{"action": "queue", "file": f"f{i}"} for i in range(1001)]
+        self._post_batch(too_many, status=400)
+        self.controller.queue_commands.assert_not_called()
+
+
+class TestControllerHandlerAsync(BaseTestWebApp):
+    def setUp(self):
+        super().setUp()
+        self.commands: list[Controller.Command] = []
+        self.controller.queue_command = MagicMock(side_effect=self.commands.append)
+        self.controller.queue_commands = MagicMock(side_effect=self.commands.extend)
+
+    def test_async_command(self):
+        resp = self.test_app.get("/server/command/queue/test1?async=true&pair_id=p1", status=202)
+        command_id = resp.json["command_id"]
+        self.assertEqual(f"/server/command/result/{command_id}", resp.headers["Location"].split("localhost", 1)[-1])
+        self.assertEqual(1, len(self.commands))
+        self.assertEqual(("test1", "p1"), (self.commands[0].filename, self.commands[0].pair_id))
+
+        result = self.test_app.get(f"/server/command/result/{command_id}").json
+        self.assertEqual(
+            {
+                "command_id": command_id,
+                "action": "queue",
+                "file": "test1",
+                "pair_id": "p1",
+                "state": "pending",
+                "error": None,
+            },
+            result,
+        )
+
+        # The controller runs the command later
+        self.commands[0].callbacks[0].on_failure("File 'test1' does not exist remotely")
+        result = self.test_app.get(f"/server/command/result/{command_id}").json
+        self.assertEqual("failed", result["state"])
+        self.assertEqual("File 'test1' does not exist remotely", result["error"])
+
+    def test_prefer_respond_async(self):
+        resp = self.test_app.get("/server/command/stop/test1", headers={"Prefer": "respond-async, wait=10"}, status=202)
+        self.commands[0].callbacks[0].on_success()
+        result = self.test_app.get(f"/server/command/result/{resp.json['command_id']}").json
+        self.assertEqual(("stop", "succeeded"), (result["action"], result["state"]))
+
+    def test_async_validation_errors_are_immediate(self):
+        self.test_app.get("/server/command/queue/test1?async=true&pair_id=%20", status=400)
+        self.assertEqual([], self.commands)
+
+    def test_unknown_result(self):
+        self.test_app.get("/server/command/result/nope", status=404)
+
+    def test_async_batch(self):
+        self.test_app.extra_environ = {"REMOTE_ADDR": "127.0.0.1"}
+        resp = self.test_app.post_json(
+            "/server/command/batch?async=true",
+            {"commands": [{"action": "queue", "file": "a"}, {"action": "nope", "file": "b"}]},
+            status=202,
+        )
+        self.controller.queue_commands.assert_called_once()
+        accepted, rejected = resp.json["results"]
+        self.assertIsNone(accepted["success"])
+        self.assertEqual("Invalid action", rejected["error"])
+        self.assertNotIn("command_id", rejected)
+
+        self.commands[0].callbacks[0].on_success()
+        result = self.test_app.get(f"/server/command/result/{accepted['command_id']}").json
+        self.assertEqual("succeeded", result["state"])
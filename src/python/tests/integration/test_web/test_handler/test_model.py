@@ -0,0 +1,135 @@
+# Copyright 2017, Inderpreet Singh, All rights reserved.
+
+import json
+from datetime import datetime
+
+from controller.model_registry import ModelRegistry
+from model import Model, ModelFile
+from tests.integration.test_web.test_web_app import BaseTestWebApp
+
+
+class TestModelHandler(BaseTestWebApp):
+    def setUp(self):
+        super().setUp()
+        files = []
+        for i, (name, state, size) in enumerate(
+            [
+                ("Delta", ModelFile.State.DOWNLOADING, 400),
+                ("alpha", ModelFile.State.DEFAULT, 100),
+                ("charlie", ModelFile.State.QUEUED, None),
+                ("Bravo", ModelFile.State.DOWNLOADED, 200),
+                ("echo.mkv", ModelFile.State.DEFAULT, 300),
+            ]
+        ):
+            f = ModelFile(name, name != "echo.mkv", pair_id="p1" if i % 2 == 0 else "p2")
+            f.state = state
+            f.remote_size = size
+            f.remote_modified_timestamp = datetime.fromtimestamp(1000 + i)
+            files.append(f)
+        season = ModelFile("Season 1", True, pair_id="p1")
+        season.add_child(ModelFile("e01.mkv", False, pair_id="p1"))
+        season.add_child(ModelFile("e02.mkv", False, pair_id="p1"))
+        files[0].add_child(season)
+        files[0].add_child(ModelFile("delta.nfo", False, pair_id="p1"))
+        self.files = files
+        self.registry = ModelRegistry(Model())
+        self.__set_files(files)
+        self.controller.query_model.side_effect = self.registry.query
+
+    def __set_files(self, files: list[ModelFile]):
+        model = Model()
+        for f in files:
+            model.add_file(f)
+        self.registry.apply_diff(model)
+
+    def __get(self, path: str, status: int = 200):
+        resp = self.test_app.get(path, status=status)
+        return json.loads(resp.body) if status == 200 else resp.text
+
+    def __names(self, data) -> list[str]:
+        return [f["name"] for f in data["files"]]
+
+    def test_default_page(self):
+        data = self.__get("/server/model")
+        self.assertEqual(self.registry.version, data["version"])
+        self.assertEqual(5, data["total"])
+        self.assertIsNone(data["next_cursor"])
+        self.assertEqual(["alpha", "Bravo", "charlie", "Delta", "echo.mkv"], self.__names(data))
+        # Roots only by default
+        delta = data["files"][3]
+        self.assertEqual([], delta["children"])
+
+    def test_children_flag_includes_subtrees(self):
+        data = self.__get("/server/model?name_contains=delta&children=true")
+        self.assertEqual(["Season 1", "delta.nfo"], [c["name"] for c in data["files"][0]["children"]])
+
+    def test_filters(self):
+        data = self.__get("/server/model?state=downloading,queued")
+        self.assertEqual(["charlie", "Delta"], self.__names(data))
+        data = self.__get("/server/model?pair_id=p2")
+        self.assertEqual(["alpha", "Bravo"], self.__names(data))
+        data = self.__get("/server/model?name_contains=LT")
+        self.assertEqual(["Delta"], self.__names(data))
+        self.__get("/server/model?state=sleeping", status=400)
+
+    def test_default_pair_filter(self):
+        self.__set_files([*self.files, ModelFile("foxtrot", False)])
+        data = self.__get("/server/model?pair_id=")
+        self.assertEqual(["foxtrot"], self.__names(data))
+        data = self.__get("/server/model")
+        self.assertEqual(6, data["total"])
+        data = self.__get("/server/model/children?name=foxtrot")
+        self.assertEqual(0, data["total"])
+
+    def test_sort(self):
+        data = self.__get("/server/model?sort=-size")
+        self.assertEqual(["Delta", "echo.mkv", "Bravo", "alpha", "charlie"], self.__names(data))
+        data = self.__get("/server/model?sort=size")
+        self.assertEqual(["charlie", "alpha", "Bravo", "echo.mkv", "Delta"], self.__names(data))
+        data = self.__get("/server/model?sort=-modified")
+        self.assertEqual(["echo.mkv", "Bravo", "charlie", "alpha", "Delta"], self.__names(data))
+        self.__get("/server/model?sort=color", status=400)
+
+    def test_cursor_pagination(self):
+        for sort in ("name", "-name", "size", "-size", "state", "modified"):
+            expected = self.__names(self.__get(f"/server/model?sort={sort}"))
+            names = []
+            path = f"/server/model?sort={sort}&limit=2"
+            while True:
+                data = self.__get(path)
+                self.assertEqual(5, data["total"])
+                names += self.__names(data)
+                if data["next_cursor"] is None:
+                    break
+                path = f"/server/model?sort={sort}&limit=2&cursor={data['next_cursor']}"
+            self.assertEqual(expected, names, sort)
+
+    def test_invalid_cursor(self):
+        self.__get("/server/model?cursor=notbase64!", status=400)
+        data = self.__get("/server/model?sort=name&limit=1")
+        # Cursor of one sort order used with another
+        self.__get(f"/server/model?sort=size&cursor={data['next_cursor']}", status=400)
+
+    def test_limit(self):
+        data = self.__get("/server/model?limit=0")
+        self.assertEqual(1, len(data["files"]))
+        self.__get("/server/model?limit=lots", status=400)
+
+    def test_children(self):
+        data = self.__get("/server/model/children?name=Delta&pair_id=p1")
+        self.assertEqual(2, data["total"])
+        self.assertEqual(["delta.nfo", "Season 1"], self.__names(data))
+        self.assertEqual([], data["files"][1]["children"])
+
+        data = self.__get("/server/model/children?name=Delta&pair_id=p1&path=Season%201&sort=-name&limit=1")
+        self.assertEqual(["e02.mkv"], self.__names(data))
+        data = self.__get(
+            f"/server/model/children?name=Delta&pair_id=p1&path=Season%201&sort=-name&cursor={data['next_cursor']}"
+        )
+        self.assertEqual(["e01.mkv"], self.__names(data))
+
+    def test_children_not_found(self):
+        self.__get("/server/model/children", status=400)
+        self.__get("/server/model/children?name=Delta", status=404)
+        self.__get("/server/model/children?name=Delta&pair_id=p1&path=Season%202", status=404)
+        self.__get("/server/model/children?name=Delta&pair_id=p1&path=delta.nfo/x", status=404)
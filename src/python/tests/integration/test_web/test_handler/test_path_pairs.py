@@ -271,6 +271,26 @@ class TestPathPairsHandler(BaseTestWebApp):
         # Other fields unchanged
         self.assertEqual("TV", body["name"])
 
+    def test_create_with_priority(self):
+        data = {"name": "TV", "remote_path": "/r/tv", "local_path": "/l/tv", "priority": 3}
+        resp = self._post_json("/server/pathpairs", data)
+        self.assertEqual(201, resp.status_int)
+        self.assertEqual(3, json.loads(resp.text)["priority"])
+
+    def test_create_rejects_non_integer_priority(self):
+        for priority in ("3", 1.5, True):
+            data = {"name": "TV", "remote_path": "/r/tv", "local_path": "/l/tv", "priority": priority}
+            resp = self._post_json("/server/pathpairs", data, expect_errors=True)
+            self.assertEqual(400, resp.status_int)
+            self.assertIn("priority", resp.text)
+
+    def test_update_keeps_priority(self):
+        pair = self._add_pair(name="TV")
+        resp = self._put_json(f"/server/pathpairs/{pair.id}", {"priority": -2})
+        self.assertEqual(-2, json.loads(resp.text)["priority"])
+        resp = self._put_json(f"/server/pathpairs/{pair.id}", {"enabled": False})
+        self.assertEqual(-2, json.loads(resp.text)["priority"])
+
     def test_create_rejects_unknown_arr_target_ids(self):
         """arr_target_ids referencing non-existent integrations should be rejected."""
         data = {
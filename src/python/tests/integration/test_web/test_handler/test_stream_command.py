@@ -0,0 +1,29 @@
+# Copyright 2017, Inderpreet Singh, All rights reserved.
+
+from threading import Timer
+from unittest.mock import patch
+
+from tests.integration.test_web.test_web_app import BaseTestWebApp
+
+
+class TestCommandResultStreamHandler(BaseTestWebApp):
+    @patch("web.handler.stream_command.SerializeCommandResult")
+    def test_stream_command_serializes_results(self, mock_serialize_cls):
+        # Schedule server stop
+        Timer(1.0, self.web_app.stop).start()
+
+        command_results = self.web_app_builder.command_results
+        before = command_results.create("queue", "a", None)
+        command_results.complete(before.command_id)
+        after = command_results.create("queue", "b", None)
+        Timer(0.3, lambda: command_results.complete(after.command_id, error="boom")).start()
+
+        mock_serialize = mock_serialize_cls.return_value
+        mock_serialize.result.return_value = "\n"
+
+        self.test_app.get("/server/stream?events=command")
+        # Only results completed while the stream is open
+        self.assertEqual(1, mock_serialize.result.call_count)
+        result = mock_serialize.result.call_args[0][0]
+        self.assertEqual(after.command_id, result.command_id)
+        self.assertEqual("boom", result.error)
@@ -43,6 +43,27 @@ class TestLogStreamHandler(BaseTestWebApp):
         self.assertEqual("Error msg", record4.msg)
         self.assertEqual(logging.ERROR, record4.levelno)
 
+    @patch("web.handler.stream_log.SerializeLogRecord")
+    def test_stream_log_level_floor(self, mock_serialize_log_record_cls):
+        # Schedule server stop
+        Timer(2.0, self.web_app.stop).start()
+
+        def issue_logs():
+            self.context.logger.info("Info msg")
+            self.context.logger.warning("Warning msg")
+            self.context.logger.error("Error msg")
+
+        Timer(0.3, issue_logs).start()
+
+        mock_serialize = mock_serialize_log_record_cls.return_value
+        mock_serialize.record.return_value = "\n"
+
+        self.test_app.get("/server/stream?events=log&log_level=warning")
+        self.assertEqual(["Warning msg", "Error msg"], [c[0][0].msg for c in mock_serialize.record.call_args_list])
+
+    def test_stream_log_invalid_level(self):
+        self.test_app.get("/server/stream?log_level=loud", status=400)
+
 
 class TestLogStreamHandlerCleanup(BaseTestWebApp):
     """Tests for handler attachment and cleanup."""
@@ -1,11 +1,12 @@
 # Copyright 2017, Inderpreet Singh, All rights reserved.
 
 import unittest
-from threading import Timer
-from unittest.mock import patch
+from threading import Event, Timer
+from unittest.mock import MagicMock, patch
 
 from model import ModelFile
 from tests.integration.test_web.test_web_app import BaseTestWebApp
+from web.handler.stream_model import ModelStreamFilter, ModelStreamHandler, ModelStreamHub
 from web.serialize import SerializeModel
 
 
@@ -17,12 +18,25 @@ class TestModelStreamHandler(BaseTestWebApp):
         self.test_app.get("/server/stream")
         self.controller.get_model_files_and_add_listener.assert_called_once_with(unittest.mock.ANY)
 
-    def test_stream_model_removes_listener(self):
+    def test_stream_model_keeps_listener_for_resume(self):
         # Schedule server stop
         Timer(2.0, self.web_app.stop).start()
 
         self.test_app.get("/server/stream")
-        self.controller.remove_model_listener.assert_called_once_with(self.model_listener)
+        # The listener outlives the stream so that the client can resume
+        self.controller.remove_model_listener.assert_not_called()
+
+    @patch("web.handler.stream_model.SerializeModel")
+    def test_stream_model_ids_events(self, mock_serialize_model_cls):
+        # Schedule server stop
+        Timer(2.0, self.web_app.stop).start()
+
+        mock_serialize = mock_serialize_model_cls.return_value
+        mock_serialize.model.return_value = "\n"
+
+        self.test_app.get("/server/stream")
+        event_id = mock_serialize.model.call_args.kwargs["event_id"]
+        self.assertRegex(event_id, r"^[0-9a-f]+\.0$")
 
     @patch("web.handler.stream_model.SerializeModel")
     def test_stream_model_serializes_initial_model(self, mock_serialize_model_cls):
@@ -37,7 +51,9 @@ class TestModelStreamHandler(BaseTestWebApp):
         self.model_files = [ModelFile("a", True), ModelFile("b", False)]
 
         self.test_app.get("/server/stream")
-        mock_serialize.model.assert_called_once_with([ModelFile("a", True), ModelFile("b", False)])
+        mock_serialize.model.assert_called_once_with(
+            [ModelFile("a", True), ModelFile("b", False)], event_id=unittest.mock.ANY, with_children=True
+        )
 
     @patch("web.handler.stream_model.SerializeModel")
     def test_stream_model_serializes_updates(self, mock_serialize_model_cls):
@@ -79,3 +95,283 @@ class TestModelStreamHandler(BaseTestWebApp):
         self.assertEqual(SerializeModel.UpdateEvent.Change.UPDATED, call3[0][0].change)
         self.assertEqual(old_file, call3[0][0].old_file)
         self.assertEqual(new_file, call3[0][0].new_file)
+
+    @patch("web.handler.stream_model.SerializeModel")
+    def test_stream_model_filters_initial_model(self, mock_serialize_model_cls):
+        # Schedule server stop
+        Timer(1.0, self.web_app.stop).start()
+
+        mock_serialize = mock_serialize_model_cls.return_value
+        mock_serialize.model.return_value = "\n"
+
+        downloading = ModelFile("a", False, pair_id="p1")
+        downloading.state = ModelFile.State.DOWNLOADING
+        other_pair = ModelFile("b", False, pair_id="p2")
+        other_pair.state = ModelFile.State.DOWNLOADING
+        self.model_files = [downloading, other_pair, ModelFile("c", False, pair_id="p1")]
+
+        self.test_app.get("/server/stream?events=model&pair_id=p1,p3&state=downloading,queued")
+        mock_serialize.model.assert_called_once_with([downloading], event_id=unittest.mock.ANY, with_children=True)
+
+    def test_stream_model_invalid_state(self):
+        resp = self.test_app.get("/server/stream?state=downloading,bogus", status=400)
+        self.assertIn("bogus", resp.text)
+
+
+class TestModelStreamHub(unittest.TestCase):
+    def setUp(self):
+        self.controller = MagicMock()
+        self.model_files = [ModelFile("a", False)]
+        self.controller.get_model_files_and_add_listener.side_effect = lambda _: list(self.model_files)
+        self.hub = ModelStreamHub(self.controller)
+
+    def test_listens_to_model_once(self):
+        seq1, files1 = self.hub.subscribe()
+        seq2, files2 = self.hub.subscribe()
+        self.controller.get_model_files_and_add_listener.assert_called_once_with(self.hub)
+        self.assertEqual(seq1, seq2)
+        self.assertEqual(files1, files2)
+
+        self.hub.unsubscribe()
+        self.hub.unsubscribe()
+        self.controller.remove_model_listener.assert_not_called()
+
+    @patch("web.handler.stream_model.time.monotonic")
+    def test_reattaches_after_resume_window(self, mock_monotonic):
+        mock_monotonic.return_value = 100.0
+        self.hub.subscribe()
+        old_id = self.hub.event_id(0)
+        self.hub.unsubscribe()
+
+        # Within the window the hub stays attached
+        mock_monotonic.return_value = 100.0 + ModelStreamHub._RESUME_WINDOW_IN_SECS
+        self.hub.subscribe()
+        self.hub.unsubscribe()
+        self.controller.remove_model_listener.assert_not_called()
+
+        # After the window it stops tracking and re-attaches with a new epoch
+        mock_monotonic.return_value = 200.0 + 2 * ModelStreamHub._RESUME_WINDOW_IN_SECS
+        self.model_files = [ModelFile("a", False), ModelFile("b", False)]
+        seq, files = self.hub.subscribe(last_event_id=old_id)
+        self.controller.remove_model_listener.assert_called_once_with(self.hub)
+        self.assertEqual(2, self.controller.get_model_files_and_add_listener.call_count)
+        self.assertEqual([ModelFile("a", False), ModelFile("b", False)], files)
+        self.assertNotEqual(old_id, self.hub.event_id(seq))
+
+    @patch("web.handler.stream_model.time.monotonic")
+    @patch("web.handler.stream_model.SerializeModel")
+    def test_stops_tracking_after_resume_window(self, mock_serialize_model_cls, mock_monotonic):
+        mock_serialize_model_cls.UpdateEvent = SerializeModel.UpdateEvent
+        mock_monotonic.return_value = 100.0
+        seq, _ = self.hub.subscribe()
+        self.hub.unsubscribe()
+        mock_monotonic.return_value = 101.0 + ModelStreamHub._RESUME_WINDOW_IN_SECS
+        self.hub.file_added(ModelFile("b", False))
+        self.assertEqual((None, seq), self.hub.get_payload(seq))
+
+    @patch("web.handler.stream_model.SerializeModel")
+    def test_serializes_each_event_once(self, mock_serialize_model_cls):
+        mock_serialize = mock_serialize_model_cls.return_value
+        mock_serialize.model.return_value = "init"
+        mock_serialize.update_event.side_effect = lambda e, event_id: "update " + e.new_file.name
+        mock_serialize_model_cls.UpdateEvent = SerializeModel.UpdateEvent
+
+        seq1, files1 = self.hub.subscribe()
+        seq2, files2 = self.hub.subscribe()
+        self.assertEqual("init", self.hub.serialize_model(seq1, files1))
+        self.assertEqual("init", self.hub.serialize_model(seq2, files2))
+        mock_serialize.model.assert_called_once_with(
+            [ModelFile("a", False)], event_id=self.hub.event_id(seq1), with_children=True
+        )
+
+        self.hub.file_added(ModelFile("b", False))
+        self.assertEqual(("update b", seq1 + 1), self.hub.get_payload(seq1))
+        self.assertEqual(("update b", seq2 + 1), self.hub.get_payload(seq2))
+        self.assertEqual((None, seq1 + 1), self.hub.get_payload(seq1 + 1))
+        mock_serialize.update_event.assert_called_once()
+
+    @patch("web.handler.stream_model.SerializeModel")
+    def test_tracks_model_for_new_streams(self, mock_serialize_model_cls):
+        mock_serialize_model_cls.UpdateEvent = SerializeModel.UpdateEvent
+        self.hub.subscribe()
+        old_a = ModelFile("a", False)
+        new_a = ModelFile("a", False)
+        new_a.local_size = 100
+        self.hub.file_added(ModelFile("b", False))
+        self.hub.file_updated(old_a, new_a)
+        self.hub.file_removed(ModelFile("b", False))
+        seq, files = self.hub.subscribe()
+        self.assertEqual(3, seq)
+        self.assertEqual([new_a], files)
+
+    @patch("web.handler.stream_model.SerializeModel")
+    def test_slow_stream_is_resynced(self, mock_serialize_model_cls):
+        mock_serialize = mock_serialize_model_cls.return_value
+        mock_serialize.model.side_effect = lambda files, event_id, with_children: f"init {len(files)}"
+        mock_serialize_model_cls.UpdateEvent = SerializeModel.UpdateEvent
+
+        seq, _ = self.hub.subscribe()
+        for i in range(ModelStreamHub._MAX_BACKLOG + 1):
+            self.hub.file_added(ModelFile(f"f{i}", False))
+        payload, next_seq = self.hub.get_payload(seq)
+        self.assertEqual(f"init {ModelStreamHub._MAX_BACKLOG + 2}", payload)
+        self.assertEqual(ModelStreamHub._MAX_BACKLOG + 1, next_seq)
+        self.assertEqual((None, next_seq), self.hub.get_payload(next_seq))
+
+    @patch("web.handler.stream_model.SerializeModel")
+    def test_new_event_sets_wakeups(self, mock_serialize_model_cls):
+        mock_serialize_model_cls.UpdateEvent = SerializeModel.UpdateEvent
+        wakeup1, wakeup2 = Event(), Event()
+        self.hub.subscribe(wakeup1)
+        self.hub.subscribe(wakeup2)
+        self.hub.file_added(ModelFile("b", False))
+        self.assertTrue(wakeup1.is_set())
+        self.assertTrue(wakeup2.is_set())
+
+        wakeup1.clear()
+        wakeup2.clear()
+        self.hub.unsubscribe(wakeup2)
+        self.hub.file_added(ModelFile("c", False))
+        self.assertTrue(wakeup1.is_set())
+        self.assertFalse(wakeup2.is_set())
+
+    @patch("web.handler.stream_model.SerializeModel")
+    def test_payloads_carry_event_ids(self, mock_serialize_model_cls):
+        mock_serialize = mock_serialize_model_cls.return_value
+        mock_serialize.model.side_effect = lambda files, event_id, with_children: f"init {event_id}"
+        mock_serialize.update_event.side_effect = lambda e, event_id: f"update {event_id}"
+        mock_serialize_model_cls.UpdateEvent = SerializeModel.UpdateEvent
+
+        seq, files = self.hub.subscribe()
+        self.assertEqual(f"init {self.hub.event_id(seq)}", self.hub.serialize_model(seq, files))
+        self.hub.file_added(ModelFile("b", False))
+        payload, next_seq = self.hub.get_payload(seq)
+        self.assertEqual(f"update {self.hub.event_id(next_seq)}", payload)
+
+    @patch("web.handler.stream_model.SerializeModel")
+    def test_resumes_from_last_event_id(self, mock_serialize_model_cls):
+        mock_serialize = mock_serialize_model_cls.return_value
+        mock_serialize.update_event.side_effect = lambda e, event_id: f"update {e.new_file.name}"
+        mock_serialize_model_cls.UpdateEvent = SerializeModel.UpdateEvent
+
+        seq, _ = self.hub.subscribe()
+        self.hub.file_added(ModelFile("b", False))
+        _, seq = self.hub.get_payload(seq)
+        last_event_id = self.hub.event_id(seq)
+        self.hub.unsubscribe()
+
+        # Events that happen while the client is away
+        self.hub.file_added(ModelFile("c", False))
+        self.hub.file_added(ModelFile("d", False))
+
+        resume_seq, files = self.hub.subscribe(last_event_id=last_event_id)
+        self.assertIsNone(files)
+        self.assertEqual(seq, resume_seq)
+        self.assertEqual(("update c", seq + 1), self.hub.get_payload(resume_seq))
+        self.assertEqual(("update d", seq + 2), self.hub.get_payload(seq + 1))
+        self.assertEqual((None, seq + 2), self.hub.get_payload(seq + 2))
+
+    @patch("web.handler.stream_model.SerializeModel")
+    def test_resume_falls_back_to_model_init(self, mock_serialize_model_cls):
+        mock_serialize_model_cls.UpdateEvent = SerializeModel.UpdateEvent
+        seq, _ = self.hub.subscribe()
+        epoch = self.hub.event_id(seq).split(".")[0]
+        for i in range(ModelStreamHub._MAX_BACKLOG + 1):
+            self.hub.file_added(ModelFile(f"f{i}", False))
+
+        # Too old, unknown epoch, in the future, or malformed
+        for last_event_id in (f"{epoch}.0", f"x{epoch}.1", f"{epoch}.100000", f"{epoch}.", "garbage"):
+            seq, files = self.hub.subscribe(last_event_id=last_event_id)
+            self.assertEqual(ModelStreamHub._MAX_BACKLOG + 1, seq)
+            self.assertEqual(ModelStreamHub._MAX_BACKLOG + 2, len(files))
+
+    def test_handler_reads_last_event_id(self):
+        hub = MagicMock()
+        hub.subscribe.return_value = (5, None)
+        with (
+            patch.object(ModelStreamHandler, "_hub", hub),
+            patch("web.handler.stream_model.bottle") as mock_bottle,
+        ):
+            mock_bottle.request.get_header.return_value = "abc.5"
+            handler = ModelStreamHandler(self.controller)
+            handler.setup()
+            hub.subscribe.assert_called_once_with(None, "abc.5")
+            # Resumed streams skip the model-init event
+            hub.get_payload.return_value = (None, 5)
+            self.assertIsNone(handler.get_value())
+            hub.serialize_model.assert_not_called()
+
+    @patch("web.handler.stream_model.SerializeModel")
+    def test_roots_only_payloads(self, mock_serialize_model_cls):
+        mock_serialize = mock_serialize_model_cls.return_value
+        mock_serialize.model.side_effect = lambda files, event_id, with_children: f"init {with_children}"
+        mock_serialize.update_event.side_effect = lambda e, event_id, with_children=True: f"update {with_children}"
+        mock_serialize_model_cls.UpdateEvent = SerializeModel.UpdateEvent
+
+        seq, files = self.hub.subscribe()
+        self.assertEqual("init True", self.hub.serialize_model(seq, files))
+        self.assertEqual("init False", self.hub.serialize_model(seq, files, with_children=False))
+        self.hub.file_added(ModelFile("b", False))
+        self.assertEqual(("update True", seq + 1), self.hub.get_payload(seq))
+        self.assertEqual(("update False", seq + 1), self.hub.get_payload(seq, with_children=False))
+        # Both variants are cached
+        self.assertEqual(("update False", seq + 1), self.hub.get_payload(seq, with_children=False))
+        self.assertEqual(2, mock_serialize.model.call_count)
+        self.assertEqual(2, mock_serialize.update_event.call_count)
+
+    @patch("web.handler.stream_model.SerializeModel")
+    def test_filtered_streams(self, mock_serialize_model_cls):
+        mock_serialize = mock_serialize_model_cls.return_value
+        mock_serialize.model.side_effect = lambda files, event_id, with_children: [f.name for f in files]
+        mock_serialize.update_event.side_effect = lambda e, event_id: f"{e.change.name} {event_id}"
+        mock_serialize_model_cls.UpdateEvent = SerializeModel.UpdateEvent
+        downloading = ModelStreamFilter(states=frozenset({ModelFile.State.DOWNLOADING}))
+
+        def make_file(name: str, state: ModelFile.State) -> ModelFile:
+            file = ModelFile(name, False)
+            file.state = state
+            return file
+
+        self.model_files = [make_file("a", ModelFile.State.DOWNLOADING), make_file("b", ModelFile.State.DEFAULT)]
+        seq, files = self.hub.subscribe()
+        self.assertEqual(["a"], self.hub.serialize_model(seq, files, file_filter=downloading))
+        self.assertEqual(["a", "b"], self.hub.serialize_model(seq, files))
+
+        # Not subscribed to: skipped without serializing
+        self.hub.file_added(make_file("c", ModelFile.State.QUEUED))
+        self.assertEqual((None, seq + 1), self.hub.get_payload(seq, file_filter=downloading))
+        mock_serialize.update_event.assert_not_called()
+
+        # Starts matching: added; keeps matching: updated; stops matching: removed
+        self.hub.file_updated(make_file("c", ModelFile.State.QUEUED), make_file("c", ModelFile.State.DOWNLOADING))
+        self.hub.file_updated(make_file("c", ModelFile.State.DOWNLOADING), make_file("c", ModelFile.State.DOWNLOADING))
+        self.hub.file_updated(make_file("c", ModelFile.State.DOWNLOADING), make_file("c", ModelFile.State.DOWNLOADED))
+        expected = [
+            (f"ADDED {self.hub.event_id(seq + 2)}", seq + 2),
+            (f"UPDATED {self.hub.event_id(seq + 3)}", seq + 3),
+            (f"REMOVED {self.hub.event_id(seq + 4)}", seq + 4),
+            (None, seq + 4),
+        ]
+        next_seq = seq + 1
+        for payload, expected_seq in expected:
+            self.assertEqual((payload, expected_seq), self.hub.get_payload(next_seq, file_filter=downloading))
+            next_seq = expected_seq
+
+        # Unfiltered streams still see the original events, filtered payloads are shared
+        self.assertEqual((f"UPDATED {self.hub.event_id(seq + 2)}", seq + 2), self.hub.get_payload(seq + 1))
+        self.hub.get_payload(seq + 1, file_filter=ModelStreamFilter(states=downloading.states))
+        self.assertEqual(4, mock_serialize.update_event.call_count)
+
+    def test_filter_from_query(self):
+        self.assertIsNone(ModelStreamFilter.from_query("", ""))
+        self.assertIsNone(ModelStreamFilter.from_query(" , ", ""))
+        self.assertEqual(
+            ModelStreamFilter(pair_ids=frozenset({"p1", "p2"}), states=None),
+            ModelStreamFilter.from_query("p1, p2", ""),
+        )
+        self.assertEqual(
+            ModelStreamFilter(pair_ids=None, states=frozenset({ModelFile.State.QUEUED})),
+            ModelStreamFilter.from_query("", "Queued"),
+        )
+        with self.assertRaises(ValueError):
+            ModelStreamFilter.from_query("", "queued,nope")
@@ -38,16 +38,77 @@ class TestStatusStreamHandler(BaseTestWebApp):
         # Setup mock serialize instance
         mock_serialize = mock_serialize_status_cls.return_value
         mock_serialize.status.return_value = "\n"
+        mock_serialize.status_delta.return_value = "\n"
 
         self.test_app.get("/server/stream")
-        self.assertEqual(3, len(mock_serialize.status.call_args_list))
-        call1, call2, call3 = mock_serialize.status.call_args_list
-        status1 = call1[0][0]
+        self.assertEqual(1, len(mock_serialize.status.call_args_list))
+        status1 = mock_serialize.status.call_args_list[0][0][0]
         self.assertEqual(True, status1.server.up)
         self.assertEqual(None, status1.server.error_msg)
-        status2 = call2[0][0]
-        self.assertEqual(False, status2.server.up)
-        self.assertEqual(None, status2.server.error_msg)
-        status3 = call3[0][0]
-        self.assertEqual(False, status3.server.up)
-        self.assertEqual("Something bad happened", status3.server.error_msg)
+        # Both changes are coalesced into one delta
+        mock_serialize.status_delta.assert_called_once_with(
+            {"server": {"up": False, "error_msg": "Something bad happened"}}
+        )
+
+    @patch("web.handler.stream_status.SerializeStatus")
+    def test_stream_status_coalesces_bursts(self, mock_serialize_status_cls):
+        # Schedule server stop
+        Timer(1.5, self.web_app.stop).start()
+
+        # Many updates of one component within one interval
+        def update_status():
+            for speed in range(1, 101):
+                self.context.status.transfer.download_speed = speed
+
+        Timer(0.3, update_status).start()
+
+        mock_serialize = mock_serialize_status_cls.return_value
+        mock_serialize.status.return_value = "\n"
+        mock_serialize.status_delta.return_value = "\n"
+
+        self.test_app.get("/server/stream?events=status")
+        self.assertEqual(1, mock_serialize.status.call_count)
+        # Only the changed component is sent, with its latest value
+        mock_serialize.status_delta.assert_called_once_with(
+            {
+                "transfer": {
+                    "download_speed": 100,
+                    "pair_download_speeds": {},
+                    "auto_tune": {},
+                    "rate_limit": None,
+                    "max_total_connections": 0,
+                    "schedule_window": None,
+                    "lftp_latency": {},
+                }
+            }
+        )
+
+    @patch("web.handler.stream_status.SerializeStatus")
+    def test_stream_status_skips_unchanged_values(self, mock_serialize_status_cls):
+        # Schedule server stop
+        Timer(1.0, self.web_app.stop).start()
+
+        # Re-assigning the same value notifies, but changes nothing
+        def update_status():
+            self.context.status.server.up = True
+
+        Timer(0.3, update_status).start()
+
+        mock_serialize = mock_serialize_status_cls.return_value
+        mock_serialize.status.return_value = "\n"
+
+        self.test_app.get("/server/stream?events=status")
+        self.assertEqual(1, mock_serialize.status.call_count)
+        mock_serialize.status_delta.assert_not_called()
+
+    @patch("web.handler.stream_status.SerializeStatus")
+    def test_stream_status_not_subscribed(self, mock_serialize_status_cls):
+        # Schedule server stop
+        Timer(1.0, self.web_app.stop).start()
+
+        self.test_app.get("/server/stream?events=model,log")
+        mock_serialize_status_cls.return_value.status.assert_not_called()
+
+    def test_stream_unknown_event_family(self):
+        resp = self.test_app.get("/server/stream?events=status,weather", status=400)
+        self.assertIn("weather", resp.text)
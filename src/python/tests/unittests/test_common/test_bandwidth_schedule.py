@@ -0,0 +1,86 @@
+# Copyright 2017, Inderpreet Singh, All rights reserved.
+
+import unittest
+from datetime import datetime
+
+from common import BandwidthSchedule
+
+# 2024-01-01 is a Monday
+MONDAY = 1
+FRIDAY = 5
+SATURDAY = 6
+
+
+def _at(day: int, hour: int, minute: int = 0) -> datetime:
+    return datetime(2024, 1, day, hour, minute)
+
+
+class TestBandwidthSchedule(unittest.TestCase):
+    def test_parse(self):
+        schedule = BandwidthSchedule.parse("Mon-Fri 08:00-18:00 rate=500k connections=4; 23:00-07:00 rate=0")
+        self.assertEqual(2, len(schedule.windows))
+        day, night = schedule.windows
+        self.assertEqual(frozenset(range(5)), day.days)
+        self.assertEqual((8 * 60, 18 * 60), (day.start, day.end))
+        self.assertEqual("500K", day.rate_limit)
+        self.assertEqual(4, day.max_total_connections)
+        self.assertEqual("Mon-Fri 08:00-18:00 rate=500k connections=4", day.text)
+        self.assertEqual(frozenset(range(7)), night.days)
+        self.assertEqual("0", night.rate_limit)
+        self.assertIsNone(night.max_total_connections)
+
+    def test_parse_empty(self):
+        self.assertEqual([], BandwidthSchedule.parse("").windows)
+        self.assertEqual([], BandwidthSchedule.parse(None).windows)
+        self.assertEqual([], BandwidthSchedule.parse(" ; ").windows)
+
+    def test_parse_days(self):
+        schedule = BandwidthSchedule.parse("Sat,Sun 00:00-24:00 rate=0; fri-mon 10:00-11:00 connections=2")
+        self.assertEqual(frozenset({5, 6}), schedule.windows[0].days)
+        self.assertEqual(frozenset({4, 5, 6, 0}), schedule.windows[1].days)
+
+    def test_parse_errors(self):
+        for text in (
+            "rate=1M",
+            "08:00 rate=1M",
+            "08:00-18:00",
+            "08:00-25:00 rate=1M",
+            "08:00-18:60 rate=1M",
+            "Mon-Xyz 08:00-18:00 rate=1M",
+            "08:00-18:00 rate=fast",
+            "08:00-18:00 rate=1M:2M",
+            "08:00-18:00 connections=-1",
+            "08:00-18:00 speed=1M",
+            "08:00-18:00 rate=1M rate=2M",
+        ):
+            with self.assertRaises(ValueError, msg=text):
+                BandwidthSchedule.parse(text)
+
+    def test_active_window(self):
+        schedule = BandwidthSchedule.parse("Mon-Fri 08:00-18:00 rate=1M; 18:00-20:00 rate=2M")
+        self.assertEqual("1M", schedule.active_window(_at(MONDAY, 8)).rate_limit)
+        self.assertEqual("1M", schedule.active_window(_at(FRIDAY, 17, 59)).rate_limit)
+        self.assertEqual("2M", schedule.active_window(_at(FRIDAY, 18)).rate_limit)
+        self.assertEqual("2M", schedule.active_window(_at(SATURDAY, 19)).rate_limit)
+        self.assertIsNone(schedule.active_window(_at(SATURDAY, 10)))
+        self.assertIsNone(schedule.active_window(_at(MONDAY, 7, 59)))
+
+    def test_first_window_wins(self):
+        schedule = BandwidthSchedule.parse("12:00-13:00 rate=1M; 00:00-24:00 rate=2M")
+        self.assertEqual("1M", schedule.active_window(_at(MONDAY, 12, 30)).rate_limit)
+        self.assertEqual("2M", schedule.active_window(_at(MONDAY, 14)).rate_limit)
+
+    def test_window_past_midnight(self):
+        schedule = BandwidthSchedule.parse("Fri 22:00-02:00 rate=0")
+        self.assertIsNotNone(schedule.active_window(_at(FRIDAY, 23)))
+        self.assertIsNotNone(schedule.active_window(_at(SATURDAY, 1, 59)))
+        self.assertIsNone(schedule.active_window(_at(SATURDAY, 2)))
+        self.assertIsNone(schedule.active_window(_at(SATURDAY, 23)))
+
+    def test_sunday_window_past_midnight_into_monday(self):
+        schedule = BandwidthSchedule.parse("Sun 23:00-01:00 rate=0")
+        self.assertIsNotNone(schedule.active_window(datetime(2024, 1, 7, 23, 30)))
+        # The schedule repeats weekly, so any Monday follows a Sunday
+        self.assertIsNotNone(schedule.active_window(_at(MONDAY, 0, 30)))
+        self.assertIsNone(schedule.active_window(_at(MONDAY, 1)))
+        self.assertIsNone(schedule.active_window(_at(SATURDAY, 23, 30)))
@@ -247,6 +247,13 @@ class TestConfig(unittest.TestCase):
             "net_max_retries": "2",
             "net_reconnect_interval_base": "3",
             "net_reconnect_interval_multiplier": "1",
+            "bandwidth_schedule": "Mon-Fri 08:00-18:00 rate=1M",
+            "auto_tune_connections": "True",
+            "auto_tune_min_connections": "2",
+            "auto_tune_max_connections": "24",
+            "bundle_small_files": "True",
+            "bundle_min_files": "200",
+            "bundle_max_avg_file_size": "65536",
         }
         lftp = Config.Lftp.from_dict(good_dict)
         self.assertEqual("remote.server.com", lftp.remote_address)
@@ -271,6 +278,13 @@ class TestConfig(unittest.TestCase):
         self.assertEqual(2, lftp.net_max_retries)
         self.assertEqual(3, lftp.net_reconnect_interval_base)
         self.assertEqual(1, lftp.net_reconnect_interval_multiplier)
+        self.assertEqual("Mon-Fri 08:00-18:00 rate=1M", lftp.bandwidth_schedule)
+        self.assertEqual(True, lftp.auto_tune_connections)
+        self.assertEqual(2, lftp.auto_tune_min_connections)
+        self.assertEqual(24, lftp.auto_tune_max_connections)
+        self.assertEqual(True, lftp.bundle_small_files)
+        self.assertEqual(200, lftp.bundle_min_files)
+        self.assertEqual(65536, lftp.bundle_max_avg_file_size)
 
         self.check_common(
             Config.Lftp,
@@ -345,6 +359,24 @@ class TestConfig(unittest.TestCase):
         self.check_bad_value_error(Config.Lftp, good_dict, "net_max_retries", "-1")
         self.check_bad_value_error(Config.Lftp, good_dict, "net_reconnect_interval_base", "-1")
         self.check_bad_value_error(Config.Lftp, good_dict, "net_reconnect_interval_multiplier", "-1")
+        self.check_bad_value_error(Config.Lftp, good_dict, "bandwidth_schedule", "08:00-18:00")
+        self.check_bad_value_error(Config.Lftp, good_dict, "bandwidth_schedule", "Someday 08:00-18:00 rate=1M")
+        self.check_bad_value_error(Config.Lftp, good_dict, "auto_tune_connections", "SomeString")
+        self.check_bad_value_error(Config.Lftp, good_dict, "auto_tune_min_connections", "0")
+        self.check_bad_value_error(Config.Lftp, good_dict, "auto_tune_max_connections", "0")
+        self.check_bad_value_error(Config.Lftp, good_dict, "bundle_small_files", "SomeString")
+        self.check_bad_value_error(Config.Lftp, good_dict, "bundle_min_files", "0")
+        self.check_bad_value_error(Config.Lftp, good_dict, "bundle_max_avg_file_size", "-1")
+
+    def test_lftp_optional_defaults(self):
+        lftp = Config.Lftp.from_dict({})
+        self.assertEqual("", lftp.bandwidth_schedule)
+        self.assertEqual(False, lftp.auto_tune_connections)
+        self.assertEqual(1, lftp.auto_tune_min_connections)
+        self.assertEqual(32, lftp.auto_tune_max_connections)
+        self.assertEqual(False, lftp.bundle_small_files)
+        self.assertEqual(500, lftp.bundle_min_files)
+        self.assertEqual(1048576, lftp.bundle_max_avg_file_size)
 
     def test_controller(self):
         good_dict = {
@@ -355,6 +387,9 @@ class TestConfig(unittest.TestCase):
             "use_local_path_as_extract_path": "True",
             "use_staging": "False",
             "staging_path": "/staging/path",
+            "model_build_workers": "8",
+            "model_build_mode": "Process",
+            "download_order": "Smallest_First",
         }
         controller = Config.Controller.from_dict(good_dict)
         self.assertEqual(30000, controller.interval_ms_remote_scan)
@@ -364,6 +399,9 @@ class TestConfig(unittest.TestCase):
         self.assertEqual(True, controller.use_local_path_as_extract_path)
         self.assertEqual(False, controller.use_staging)
         self.assertEqual("/staging/path", controller.staging_path)
+        self.assertEqual(8, controller.model_build_workers)
+        self.assertEqual("process", controller.model_build_mode)
+        self.assertEqual("smallest_first", controller.download_order)
 
         self.check_common(
             Config.Controller,
@@ -390,19 +428,35 @@ class TestConfig(unittest.TestCase):
         self.check_bad_value_error(Config.Controller, good_dict, "use_local_path_as_extract_path", "-1")
         self.check_bad_value_error(Config.Controller, good_dict, "use_staging", "SomeString")
         self.check_bad_value_error(Config.Controller, good_dict, "use_staging", "-1")
+        self.check_bad_value_error(Config.Controller, good_dict, "model_build_workers", "0")
+        self.check_bad_value_error(Config.Controller, good_dict, "model_build_mode", "fiber")
+        self.check_bad_value_error(Config.Controller, good_dict, "download_order", "random")
+
+    def test_controller_model_build_defaults(self):
+        controller = Config.Controller.from_dict({})
+        self.assertEqual(4, controller.model_build_workers)
+        self.assertEqual("thread", controller.model_build_mode)
+        self.assertEqual("fifo", controller.download_order)
 
     def test_web(self):
         good_dict = {
             "port": "1234",
+            "server_mode": "AsyncIO",
         }
         web = Config.Web.from_dict(good_dict)
         self.assertEqual(1234, web.port)
+        self.assertEqual("asyncio", web.server_mode)
 
         self.check_common(Config.Web, good_dict, {"port"})
 
         # bad values
         self.check_bad_value_error(Config.Web, good_dict, "port", "-1")
         self.check_bad_value_error(Config.Web, good_dict, "port", "0")
+        self.check_bad_value_error(Config.Web, good_dict, "server_mode", "twisted")
+
+    def test_web_server_mode_default(self):
+        web = Config.Web.from_dict({"port": "1234"})
+        self.assertEqual("threaded", web.server_mode)
 
     def test_autoqueue(self):
         good_dict = {"enabled": "True", "patterns_only": "False", "auto_extract": "True", "auto_delete_remote": "False"}
@@ -640,6 +694,13 @@ class TestConfig(unittest.TestCase):
         net_max_retries = 2
         net_reconnect_interval_base = 3
         net_reconnect_interval_multiplier = 1
+        bandwidth_schedule =
+        auto_tune_connections = False
+        auto_tune_min_connections = 1
+        auto_tune_max_connections = 32
+        bundle_small_files = False
+        bundle_min_files = 500
+        bundle_max_avg_file_size = 1048576
 
         [Controller]
         interval_ms_remote_scan = 1234
@@ -649,10 +710,14 @@ class TestConfig(unittest.TestCase):
         use_local_path_as_extract_path = True
         use_staging = False
         staging_path = /staging
+        model_build_workers = 4
+        model_build_mode = thread
+        download_order = fifo
 
         [Web]
         port = 13
         api_key =
+        server_mode = threaded
 
         [AutoQueue]
         enabled = True
@@ -30,6 +30,18 @@ class TestPathPair(unittest.TestCase):
         rebuilt = PathPair.from_dict(pair.to_dict())
         self.assertEqual(["a", "b"], rebuilt.arr_target_ids)
 
+    def test_priority(self):
+        self.assertEqual(0, PathPair(name="TV", remote_path="/r", local_path="/l").priority)
+        pair = PathPair(name="TV", remote_path="/r", local_path="/l", priority=5)
+        self.assertEqual(5, PathPair.from_dict(pair.to_dict()).priority)
+        # Pairs saved before priorities existed
+        d = pair.to_dict()
+        del d["priority"]
+        self.assertEqual(0, PathPair.from_dict(d).priority)
+        d["priority"] = "high"
+        with self.assertRaises(TypeError):
+            PathPair.from_dict(d)
+
 
 class TestPathPairsConfig(unittest.TestCase):
     def test_round_trip_persistence(self):
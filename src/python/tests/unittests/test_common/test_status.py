@@ -133,6 +133,8 @@ class TestStatus(unittest.TestCase):
         self.assertEqual(None, status.server.error_msg)
         self.assertEqual(None, status.controller.latest_local_scan_time)
         self.assertEqual(None, status.controller.latest_remote_scan_time)
+        self.assertEqual(0, status.transfer.download_speed)
+        self.assertEqual({}, status.transfer.pair_download_speeds)
 
     def test_components_registered(self):
         # Test that all components were registered
@@ -153,6 +155,12 @@ class TestStatus(unittest.TestCase):
         self.assertEqual(time1, copy.controller.latest_local_scan_time)
         self.assertEqual(time2, copy.controller.latest_remote_scan_time)
 
+        status.transfer.download_speed = 300
+        status.transfer.pair_download_speeds = {"p1": 300}
+        copy = status.copy()
+        self.assertEqual(300, copy.transfer.download_speed)
+        self.assertEqual({"p1": 300}, copy.transfer.pair_download_speeds)
+
     def test_copy_values(self):
         status = Status()
         status.server.up = False
@@ -191,3 +199,16 @@ class TestStatus(unittest.TestCase):
 
         copy.server.error_msg = "b"
         listener.notify.assert_not_called()
+
+    def test_snapshot_is_shared_until_changed(self):
+        status = Status()
+        status.server.error_msg = "a"
+        snapshot = status.snapshot()
+        self.assertIs(snapshot, status.snapshot())
+        self.assertEqual("a", snapshot.server.error_msg)
+
+        status.server.error_msg = "b"
+        new_snapshot = status.snapshot()
+        self.assertIsNot(snapshot, new_snapshot)
+        self.assertEqual("a", snapshot.server.error_msg)
+        self.assertEqual("b", new_snapshot.server.error_msg)
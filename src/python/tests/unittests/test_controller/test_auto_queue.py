@@ -7,8 +7,15 @@ import unittest
 from unittest.mock import MagicMock
 
 from common import Config, PersistError, overrides
-from controller import AutoQueue, AutoQueuePattern, AutoQueuePersist, Controller, IAutoQueuePersistListener
-from model import IModelListener, ModelFile
+from controller import (
+    AutoQueue,
+    AutoQueuePattern,
+    AutoQueuePersist,
+    Controller,
+    IAutoQueuePersistListener,
+    ModelSnapshot,
+)
+from model import ANY_PAIR, IModelListener, ModelFile
 
 
 class TestAutoQueuePattern(unittest.TestCase):
@@ -282,8 +289,20 @@ class TestAutoQueue(unittest.TestCase):
             self.model_listener = listener
             return get_model()
 
+        def query_model(states=None, pair_id=ANY_PAIR, is_extractable=None, name_prefix=None):
+            files = [
+                f
+                for f in self.initial_model
+                if (states is None or f.state in states)
+                and (pair_id is ANY_PAIR or f.pair_id == pair_id)
+                and (is_extractable is None or f.is_extractable == is_extractable)
+                and (name_prefix is None or f.name.startswith(name_prefix))
+            ]
+            return ModelSnapshot(0, tuple(files))
+
         self.controller.get_model_files.side_effect = get_model
         self.controller.get_model_files_and_add_listener.side_effect = get_model_and_capture_listener
+        self.controller.query_model.side_effect = query_model
 
     def test_matching_new_files_are_queued(self):
         persist = AutoQueuePersist()
@@ -4,8 +4,10 @@ import os
 import unittest
 from unittest.mock import MagicMock
 
+from controller import Controller, ModelSnapshot
 from controller.command_pipeline import CommandPipeline
-from model import ModelFile
+from lftp import LftpError, SharedLftpQueueItem
+from model import ModelError, ModelFile
 
 
 class TestCommandPipelineHelpers(unittest.TestCase):
@@ -132,3 +134,204 @@ class TestCommandPipelineHelpers(unittest.TestCase):
 
         self.assertFalse(pipeline.command_queue.empty())
         self.assertIs(command, pipeline.command_queue.get())
+
+
+class TestCommandPipelineStep(unittest.TestCase):
+    def setUp(self):
+        self.pc1 = MagicMock()
+        self.pc1.pair_id = "p1"
+        self.pc2 = MagicMock()
+        self.pc2.pair_id = "p2"
+        self.pipeline = CommandPipeline(
+            pair_contexts=[self.pc1, self.pc2],
+            registry=MagicMock(),
+            persist=MagicMock(),
+            context=MagicMock(),
+            password=None,
+            mp_logger=MagicMock(),
+            extract_process=MagicMock(),
+            validate_process=MagicMock(),
+            logger=MagicMock(),
+            sync_persist_callback=MagicMock(),
+        )
+        self.pipeline._context.config.general.exclude_patterns = ""
+        self.files: dict[tuple[str, str], ModelFile] = {}
+
+        def get_file(name, pair_id=None):
+            if (name, pair_id) not in self.files:
+                raise ModelError("not found")
+            return self.files[(name, pair_id)]
+
+        self.pipeline._registry.get_file.side_effect = get_file
+        for pc in (self.pc1, self.pc2):
+            pc.lftp.queue_many.side_effect = lambda items: [None] * len(items)
+
+    def _queued_names(self, pc) -> list[str]:
+        return [item.name for c in pc.lftp.queue_many.call_args_list for item in c.args[0]]
+
+    def _add_file(self, name: str, pair_id: str, remote_size: int | None = 100) -> ModelFile:
+        file = ModelFile(name, False, pair_id=pair_id)
+        file.remote_size = remote_size
+        self.files[(name, pair_id)] = file
+        return file
+
+    @staticmethod
+    def _command(action, name: str, pair_id: str):
+        command = Controller.Command(action, name, pair_id=pair_id)
+        callback = MagicMock()
+        command.add_callback(callback)
+        return command, callback
+
+    def test_batch_queues_per_pair(self):
+        self._add_file("a", "p1")
+        self._add_file("b", "p2")
+        self._add_file("c", "p1")
+        self._add_file("no_remote", "p1", remote_size=None)
+
+        def lftp_queue_many(items):
+            return [LftpError("boom") if item.name == "c" else None for item in items]
+
+        self.pc1.lftp.queue_many.side_effect = lftp_queue_many
+        Action = Controller.Command.Action
+        commands = [
+            self._command(Action.QUEUE, "a", "p1"),
+            self._command(Action.QUEUE, "b", "p2"),
+            self._command(Action.QUEUE, "c", "p1"),
+            self._command(Action.QUEUE, "no_remote", "p1"),
+            self._command(Action.QUEUE, "missing", "p1"),
+            self._command(Action.QUEUE, "a", "unknown"),
+        ]
+        self.pipeline.queue_many([c for c, _ in commands])
+        self.pipeline.step()
+
+        # One submission per pair
+        self.pc1.lftp.queue_many.assert_called_once()
+        self.assertEqual(["a", "c"], self._queued_names(self.pc1))
+        self.assertEqual(["b"], self._queued_names(self.pc2))
+        successes = [cb.on_success.called for _, cb in commands]
+        self.assertEqual([True, True, False, False, False, False], successes)
+        (_, c_callback), (_, no_remote_callback) = commands[2], commands[3]
+        c_callback.on_failure.assert_called_once_with("Lftp error: boom")
+        no_remote_callback.on_failure.assert_called_once_with("File 'no_remote' does not exist remotely")
+        self.assertTrue(self.pipeline.command_queue.empty())
+
+    def test_batch_fails_when_submission_fails(self):
+        self._add_file("a", "p1")
+        self._add_file("b", "p1")
+        self.pc1.lftp.queue_many.side_effect = LftpError("lftp process is not running and restart failed")
+        Action = Controller.Command.Action
+        commands = [self._command(Action.QUEUE, "a", "p1"), self._command(Action.QUEUE, "b", "p1")]
+        self.pipeline.queue_many([c for c, _ in commands])
+        self.pipeline.step()
+        for _, callback in commands:
+            callback.on_success.assert_not_called()
+            callback.on_failure.assert_called_once_with("Lftp error: lftp process is not running and restart failed")
+
+    def test_batch_keeps_order_with_other_commands(self):
+        file = self._add_file("a", "p1")
+        file.state = ModelFile.State.QUEUED
+        self._add_file("b", "p1")
+        order: list[str] = []
+
+        def lftp_queue_many(items):
+            order.extend(f"queue {item.name}" for item in items)
+            return [None] * len(items)
+
+        self.pc1.lftp.queue_many.side_effect = lftp_queue_many
+        self.pc1.lftp.kill.side_effect = lambda name: order.append(f"kill {name}")
+        Action = Controller.Command.Action
+        commands = [
+            self._command(Action.QUEUE, "b", "p1"),
+            self._command(Action.STOP, "a", "p1"),
+            self._command(Action.QUEUE, "a", "p1"),
+        ]
+        self.pipeline.queue_many([c for c, _ in commands])
+        self.pipeline.step()
+        self.assertEqual(["queue b", "kill a", "queue a"], order)
+
+    def test_prioritize(self):
+        self._add_file("a", "p1")
+        command = Controller.Command(Controller.Command.Action.PRIORITIZE, "a", pair_id="p1", priority=7)
+        callback = MagicMock()
+        command.add_callback(callback)
+        self.pipeline.queue(command)
+        self.pipeline.step()
+        callback.on_success.assert_called_once_with()
+        self.assertEqual(7, self.pipeline.priorities.get("p1", "a"))
+        self.pc1.model_builder.set_priorities.assert_called_with({"a": 7})
+        self.pc1.lftp.queue_many.assert_not_called()
+
+    def test_prioritize_without_priority(self):
+        self._add_file("a", "p1")
+        command, callback = self._command(Controller.Command.Action.PRIORITIZE, "a", "p1")
+        self.pipeline.queue(command)
+        self.pipeline.step()
+        callback.on_failure.assert_called_once_with("No priority given for file 'a'")
+
+    def test_queue_with_priority(self):
+        self._add_file("a", "p1")
+        command = Controller.Command(Controller.Command.Action.QUEUE, "a", pair_id="p1", priority=-2)
+        self.pipeline.queue(command)
+        self.pipeline.step()
+        self.assertEqual(-2, self.pipeline.priorities.get("p1", "a"))
+        self.pc1.lftp.queue_many.assert_called_once_with(
+            [SharedLftpQueueItem("a", False, exclude_patterns=[], bundle=False, size=100)]
+        )
+
+    def _add_dir(self, name: str, pair_id: str, file_sizes: list[int]) -> ModelFile:
+        directory = ModelFile(name, True, pair_id=pair_id)
+        sub = ModelFile("sub", True, pair_id=pair_id)
+        directory.add_child(sub)
+        for index, size in enumerate(file_sizes):
+            child = ModelFile(f"f{index}", False, pair_id=pair_id)
+            child.remote_size = size
+            sub.add_child(child)
+        directory.remote_size = sum(file_sizes)
+        self.files[(name, pair_id)] = directory
+        return directory
+
+    def _queued_item(self, command: Controller.Command) -> SharedLftpQueueItem:
+        self.pc1.lftp.queue_many.reset_mock()
+        self.pipeline.queue(command)
+        self.pipeline.step()
+        (item,) = self.pc1.lftp.queue_many.call_args.args[0]
+        return item
+
+    def _queued_bundle(self, command: Controller.Command) -> bool:
+        return self._queued_item(command).bundle
+
+    def test_queue_bundle_option(self):
+        self._add_dir("d", "p1", [100, 200])
+        self._add_file("f", "p1")
+        self.pipeline._context.config.lftp.bundle_small_files = False
+        Action = Controller.Command.Action
+        self.assertTrue(self._queued_bundle(Controller.Command(Action.QUEUE, "d", pair_id="p1", bundle=True)))
+        self.assertFalse(self._queued_bundle(Controller.Command(Action.QUEUE, "d", pair_id="p1")))
+        # Single files are never bundled
+        item = self._queued_item(Controller.Command(Action.QUEUE, "f", pair_id="p1", bundle=True))
+        self.assertFalse(item.bundle)
+        self.assertEqual(100, item.size)
+
+    def test_queue_bundles_many_small_files(self):
+        config = self.pipeline._context.config.lftp
+        config.bundle_small_files = True
+        config.bundle_min_files = 3
+        config.bundle_max_avg_file_size = 1000
+        self._add_dir("small", "p1", [10, 20, 2000])
+        self._add_dir("few", "p1", [10, 20])
+        self._add_dir("large", "p1", [10, 20, 4000])
+        Action = Controller.Command.Action
+        self.assertTrue(self._queued_bundle(Controller.Command(Action.QUEUE, "small", pair_id="p1")))
+        self.assertFalse(self._queued_bundle(Controller.Command(Action.QUEUE, "few", pair_id="p1")))
+        self.assertFalse(self._queued_bundle(Controller.Command(Action.QUEUE, "large", pair_id="p1")))
+        self.assertFalse(self._queued_bundle(Controller.Command(Action.QUEUE, "small", pair_id="p1", bundle=False)))
+
+    def test_prune_priorities(self):
+        self.pipeline.priorities.set_priority("p1", "a", 1)
+        self.pipeline.priorities.set_priority("p2", "b", 2)
+        self.pipeline._registry.query.return_value = ModelSnapshot(1, (ModelFile("b", False, pair_id="p2"),))
+        self.pipeline.prune_priorities()
+        self.assertEqual(0, self.pipeline.priorities.get("p1", "a"))
+        self.assertEqual(2, self.pipeline.priorities.get("p2", "b"))
+        self.pc1.model_builder.set_priorities.assert_called_with({})
+        self.pc2.model_builder.set_priorities.assert_called_with({"b": 2})
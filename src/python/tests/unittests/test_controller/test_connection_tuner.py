@@ -0,0 +1,105 @@
+# Copyright 2017, Inderpreet Singh, All rights reserved.
+
+import unittest
+from unittest.mock import patch
+
+from controller.connection_tuner import ConnectionTuner, TuningSetting, connection_steps, parse_rate
+
+MB = 1024**2
+
+
+class TestConnectionSteps(unittest.TestCase):
+    def test_connection_steps(self):
+        self.assertEqual([1, 2, 3, 4, 6, 8, 12, 16], connection_steps(1, 16))
+        self.assertEqual([5, 6, 8, 10], connection_steps(5, 10))
+        self.assertEqual([4], connection_steps(4, 4))
+        self.assertEqual([4], connection_steps(4, 2))
+
+
+class TestConnectionTuner(unittest.TestCase):
+    def setUp(self):
+        patcher = patch("controller.connection_tuner.time.monotonic")
+        self.mock_time = patcher.start()
+        self.mock_time.return_value = 100.0
+        self.addCleanup(patcher.stop)
+
+    def _measure(self, tuner: ConnectionTuner, speed_of) -> str | None:
+        """Feed samples until the tuner decides, with speed_of(setting) as the per file throughput"""
+        for _ in range(100):
+            decision = tuner.sample(2 * speed_of(tuner.setting), 2)
+            self.mock_time.return_value += 1.0
+            if decision is not None:
+                return decision
+        return None
+
+    def test_starts_at_configured_setting(self):
+        tuner = ConnectionTuner(min_connections=1, max_connections=16, connections=5, min_chunk_size=100 * MB)
+        self.assertEqual(TuningSetting(connections=4, min_chunk_size=100 * MB), tuner.setting)
+        tuner = ConnectionTuner(min_connections=1, max_connections=16, connections=20, min_chunk_size=None)
+        self.assertEqual(TuningSetting(connections=16, min_chunk_size=MB), tuner.setting)
+
+    def test_waits_to_settle_and_measure(self):
+        tuner = ConnectionTuner(min_connections=1, max_connections=16, connections=4, min_chunk_size=MB)
+        elapsed = 0
+        while tuner.sample(1000.0, 1) is None:
+            self.mock_time.return_value += 1.0
+            elapsed += 1
+        self.assertGreaterEqual(elapsed, ConnectionTuner._SETTLE_IN_SECS + ConnectionTuner._MEASURE_IN_SECS)
+
+    def test_idle_time_does_not_count(self):
+        tuner = ConnectionTuner(min_connections=1, max_connections=16, connections=4, min_chunk_size=MB)
+        for _ in range(100):
+            self.assertIsNone(tuner.sample(0.0, 0))
+            self.mock_time.return_value += 1.0
+        self.assertIsNone(tuner.sample(1000.0, 1))
+
+    def test_converges_on_best_connections(self):
+        # More connections help up to 12, the chunk size doesn't matter
+        def speed_of(setting: TuningSetting) -> float:
+            return 1000.0 * min(setting.connections, 12)
+
+        tuner = ConnectionTuner(min_connections=1, max_connections=32, connections=4, min_chunk_size=MB)
+        decisions = []
+        while not tuner.converged:
+            decisions.append(self._measure(tuner, speed_of))
+        self.assertEqual(TuningSetting(connections=12, min_chunk_size=MB), tuner.setting)
+        self.assertIn("settled on 12 connections with 1 MiB chunks", decisions[-1])
+        self.assertEqual(decisions[-1], tuner.last_decision)
+
+    def test_rejects_small_gain(self):
+        def speed_of(setting: TuningSetting) -> float:
+            return 1000.0 + setting.connections + setting.min_chunk_size / MB
+
+        tuner = ConnectionTuner(min_connections=1, max_connections=32, connections=4, min_chunk_size=MB)
+        while not tuner.converged:
+            self._measure(tuner, speed_of)
+        self.assertEqual(TuningSetting(connections=4, min_chunk_size=MB), tuner.setting)
+
+    def test_measures_again_after_holding(self):
+        tuner = ConnectionTuner(min_connections=4, max_connections=4, connections=4, min_chunk_size=MB)
+        while not tuner.converged:
+            self._measure(tuner, lambda setting: 1000.0 / setting.min_chunk_size)
+        best = tuner.setting
+        self.assertEqual(MB // 8, best.min_chunk_size)
+        self.mock_time.return_value += ConnectionTuner._HOLD_IN_SECS
+        tuner.sample(1000.0, 1)
+        self.assertFalse(tuner.converged)
+        self.assertEqual(best, tuner.setting)
+        self.assertIn("measured", self._measure(tuner, lambda setting: 1000.0))
+
+
+class TestParseRate(unittest.TestCase):
+    def test_parse_rate(self):
+        self.assertEqual(500, parse_rate("500"))
+        self.assertEqual(500 * 1024, parse_rate("500K"))
+        self.assertEqual(1536 * 1024, parse_rate("1.5m"))
+        self.assertEqual(2 * 1024**3, parse_rate("2G"))
+
+    def test_parse_rate_without_limit(self):
+        self.assertIsNone(parse_rate(None))
+        self.assertIsNone(parse_rate(""))
+        self.assertIsNone(parse_rate("0"))
+
+    def test_parse_rate_not_a_single_number(self):
+        self.assertIsNone(parse_rate("1M:500K"))
+        self.assertIsNone(parse_rate("fast"))
@@ -0,0 +1,44 @@
+"""Unit tests for the bandwidth limits the Controller applies to its LFTP instances."""
+
+import unittest
+from unittest.mock import MagicMock, patch
+
+from controller import Controller, ControllerPersist
+from controller.model_updater import ModelUpdater
+
+from .test_validate_config import _make_args, _make_config, _make_context
+
+
+@patch.object(Controller, "_build_pair_contexts", return_value=[])
+@patch.object(ModelUpdater, "sync_persist_to_all_builders")
+class TestControllerLimits(unittest.TestCase):
+    def _make_controller(self, net_limit_rate: str) -> Controller:
+        self.config = _make_config()
+        self.config.lftp.net_limit_rate = net_limit_rate
+        return Controller(_make_context(self.config, _make_args()), MagicMock(spec=ControllerPersist))
+
+    def test_rate_limit_is_total_across_connections(self, _mock_sync, _mock_build):
+        controller = self._make_controller("2M")
+        shared = MagicMock()
+        controller._configure_shared_lftp(shared)
+        self.assertEqual("2M", shared.lftp.total_rate_limit)
+        self.assertEqual(0, shared.lftp.rate_limit)
+        self.assertEqual(10, shared.lftp.num_max_total_connections)
+        self.assertTrue(shared.rate_limited)
+
+    def test_no_rate_limit(self, _mock_sync, _mock_build):
+        controller = self._make_controller("")
+        shared = MagicMock()
+        controller._configure_shared_lftp(shared)
+        self.assertEqual(0, shared.lftp.total_rate_limit)
+        self.assertEqual(0, shared.lftp.rate_limit)
+        self.assertFalse(shared.rate_limited)
+
+    def test_zero_rate_limit_is_unlimited(self, _mock_sync, _mock_build):
+        controller = self._make_controller("")
+        for rate in ("0", "0K", "0.0M", ""):
+            self.config.lftp.net_limit_rate = rate
+            self.assertEqual(((None, 10), None), controller._scheduled_limits(), rate)
+        for rate in ("500K", "0.5M"):
+            self.config.lftp.net_limit_rate = rate
+            self.assertEqual(((rate, 10), None), controller._scheduled_limits(), rate)
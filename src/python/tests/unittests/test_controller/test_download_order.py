@@ -0,0 +1,82 @@
+# Copyright 2017, Inderpreet Singh, All rights reserved.
+
+import math
+import unittest
+from datetime import datetime
+
+from controller.download_order import DownloadPriorities, queue_order_key
+from controller.persist_keys import persist_key
+from model import ModelFile
+
+
+class TestDownloadPriorities(unittest.TestCase):
+    def test_set_and_get(self):
+        priorities = DownloadPriorities()
+        priorities.set_priority("p1", "a", 5)
+        priorities.set_priority(None, "a", -1)
+        self.assertEqual(5, priorities.get("p1", "a"))
+        self.assertEqual(-1, priorities.get(None, "a"))
+        self.assertEqual(0, priorities.get("p2", "a"))
+        self.assertEqual(2, len(priorities))
+
+    def test_zero_removes(self):
+        priorities = DownloadPriorities()
+        priorities.set_priority("p1", "a", 5)
+        priorities.set_priority("p1", "a", 0)
+        self.assertEqual(0, len(priorities))
+        self.assertEqual({}, priorities.of_pair("p1"))
+
+    def test_of_pair_is_a_copy(self):
+        priorities = DownloadPriorities()
+        priorities.set_priority("p1", "a", 5)
+        of_pair = priorities.of_pair("p1")
+        of_pair["b"] = 1
+        self.assertEqual({"a": 5}, priorities.of_pair("p1"))
+
+    def test_retain(self):
+        priorities = DownloadPriorities()
+        priorities.set_priority("p1", "a", 1)
+        priorities.set_priority("p1", "b", 2)
+        priorities.set_priority(None, "c", 3)
+        priorities.retain({persist_key("p1", "b"), persist_key(None, "c")})
+        self.assertEqual({"b": 2}, priorities.of_pair("p1"))
+        self.assertEqual({"c": 3}, priorities.of_pair(None))
+
+
+class TestQueueOrderKey(unittest.TestCase):
+    @staticmethod
+    def _file(name: str, size: int | None, modified: datetime | None, priority: int = 0) -> ModelFile:
+        file = ModelFile(name, False)
+        file.remote_size = size
+        if modified is not None:
+            file.remote_modified_timestamp = modified
+        file.priority = priority
+        return file
+
+    def test_priority_first(self):
+        low = self._file("low", 10, None, priority=-1)
+        high = self._file("high", 1000, None, priority=2)
+        keys = {f.name: queue_order_key(f, 0, "smallest_first") for f in (low, high)}
+        self.assertLess(keys["high"], keys["low"])
+
+    def test_pair_priority_adds_to_file_priority(self):
+        file = self._file("a", 10, None, priority=2)
+        self.assertEqual((-5, 0.0), queue_order_key(file, 3, "fifo"))
+        self.assertEqual((-3, 0.0), queue_order_key(None, 3, "fifo"))
+
+    def test_smallest_first(self):
+        small = self._file("small", 10, None)
+        big = self._file("big", 1000, None)
+        unknown = self._file("unknown", None, None)
+        self.assertLess(queue_order_key(small, 0, "smallest_first"), queue_order_key(big, 0, "smallest_first"))
+        self.assertEqual((0, math.inf), queue_order_key(unknown, 0, "smallest_first"))
+
+    def test_oldest_first(self):
+        old = self._file("old", 10, datetime(2020, 1, 1))
+        new = self._file("new", 10, datetime(2024, 1, 1))
+        self.assertLess(queue_order_key(old, 0, "oldest_first"), queue_order_key(new, 0, "oldest_first"))
+
+    def test_fifo_ties(self):
+        a = self._file("a", 10, datetime(2024, 1, 1))
+        b = self._file("b", 1000, datetime(2020, 1, 1))
+        self.assertEqual(queue_order_key(a, 0, "fifo"), queue_order_key(b, 0, "fifo"))
@@ -714,57 +714,86 @@ class TestModelBuilder(unittest.TestCase):
         # Uses filesystem: (2000-1000)/100 = 10
         self.assertEqual(10, model.get_file("a").eta)
 
-    def test_build_eta_smoothing(self):
-        """EMA dampens speed fluctuations across multiple builds"""
-        # First build: raw ETA = (2000-1000)/100 = 10.0, smoothed = 10.0
+    def __build_downloading_a(self, local_size: int, speed: int, remote_size: int = 2000) -> ModelFile:
         s = LftpJobStatus(0, LftpJobStatus.Type.PGET, LftpJobStatus.State.RUNNING, "a", "")
-        s.total_transfer_state = LftpJobStatus.TransferState(None, None, None, 100, None)
-        self.model_builder.set_lftp_statuses([s])
-        self.model_builder.set_remote_files([SystemFile("a", 2000, False)])
-        self.model_builder.set_local_files([SystemFile("a", 1000, False)])
-        model = self.model_builder.build_model()
-        self.assertEqual(10, model.get_file("a").eta)
-
-        # Second build (no clear): speed drops, local size advances slightly
-        # raw ETA = (2000-1001)/50 = 19.98, smoothed = 10.0 + 0.3*(19.98 - 10.0) = 12.994
-        s = LftpJobStatus(0, LftpJobStatus.Type.PGET, LftpJobStatus.State.RUNNING, "a", "")
-        s.total_transfer_state = LftpJobStatus.TransferState(None, None, None, 50, None)
-        self.model_builder.set_lftp_statuses([s])
-        self.model_builder.set_local_files([SystemFile("a", 1001, False)])
-        model = self.model_builder.build_model()
-        self.assertEqual(13, model.get_file("a").eta)  # ceil(12.994) = 13
-
-        # Third build: speed stays low, local advances again
-        # raw ETA = (2000-1002)/50 = 19.96, smoothed = 12.994 + 0.3*(19.96 - 12.994) = 15.084
-        s = LftpJobStatus(0, LftpJobStatus.Type.PGET, LftpJobStatus.State.RUNNING, "a", "")
-        s.total_transfer_state = LftpJobStatus.TransferState(None, None, None, 50, None)
+        s.total_transfer_state = LftpJobStatus.TransferState(None, None, None, speed, None)
         self.model_builder.set_lftp_statuses([s])
-        self.model_builder.set_local_files([SystemFile("a", 1002, False)])
-        model = self.model_builder.build_model()
-        self.assertEqual(16, model.get_file("a").eta)  # ceil(15.084) = 16
-
-    def test_build_eta_smoothing_reset_on_clear(self):
-        """clear() resets smoothed ETA state"""
-        # First build: raw = 10.0, smoothed = 10.0
-        s = LftpJobStatus(0, LftpJobStatus.Type.PGET, LftpJobStatus.State.RUNNING, "a", "")
-        s.total_transfer_state = LftpJobStatus.TransferState(None, None, None, 100, None)
-        self.model_builder.set_lftp_statuses([s])
-        self.model_builder.set_remote_files([SystemFile("a", 2000, False)])
-        self.model_builder.set_local_files([SystemFile("a", 1000, False)])
-        model = self.model_builder.build_model()
-        self.assertEqual(10, model.get_file("a").eta)
-
-        # Clear resets smoothed state
-        self.model_builder.clear()
-
-        # After clear: raw = 20.0, smoothed = 20.0 (first value, unsmoothed)
-        s = LftpJobStatus(0, LftpJobStatus.Type.PGET, LftpJobStatus.State.RUNNING, "a", "")
-        s.total_transfer_state = LftpJobStatus.TransferState(None, None, None, 50, None)
-        self.model_builder.set_lftp_statuses([s])
-        self.model_builder.set_remote_files([SystemFile("a", 2000, False)])
-        self.model_builder.set_local_files([SystemFile("a", 1000, False)])
-        model = self.model_builder.build_model()
-        self.assertEqual(20, model.get_file("a").eta)
+        self.model_builder.set_remote_files([SystemFile("a", remote_size, False)])
+        self.model_builder.set_local_files([SystemFile("a", local_size, False)])
+        return self.model_builder.build_model().get_file("a")
+
+    @patch("controller.throughput.time.monotonic")
+    def test_build_eta_windowed_throughput(self, mock_monotonic):
+        """ETA comes from bytes transferred over the window once enough history exists"""
+        # Not enough history yet: ETA estimated from lftp's speed, (2000-1000)/100 = 10
+        mock_monotonic.return_value = 100.0
+        a = self.__build_downloading_a(1000, 100)
+        self.assertEqual(10, a.eta)
+        self.assertIsNone(a.throughput)
+        self.assertIsNone(a.eta_low)
+        self.assertIsNone(a.eta_high)
+
+        # 400 bytes in 4 secs: throughput = 100, ETA = (2000-1400)/100 = 6
+        mock_monotonic.return_value = 102.0
+        self.__build_downloading_a(1200, 100)
+        mock_monotonic.return_value = 104.0
+        a = self.__build_downloading_a(1400, 100)
+        self.assertEqual(100, a.throughput)
+        self.assertEqual(6, a.eta)
+        self.assertEqual(6, a.eta_low)
+        self.assertEqual(6, a.eta_high)
+
+        # A spike in lftp's speed doesn't move the windowed ETA, (2000-1600)/100 = 4
+        mock_monotonic.return_value = 106.0
+        a = self.__build_downloading_a(1600, 5000)
+        self.assertEqual(5000, a.downloading_speed)
+        self.assertEqual(100, a.throughput)
+        self.assertEqual(4, a.eta)
+
+    @patch("controller.throughput.time.monotonic")
+    def test_build_eta_band(self, mock_monotonic):
+        """ETA band reflects the spread of the per-interval rates"""
+        # Interval rates 50, 150, 100 -> quartiles 75 and 125, windowed rate 100
+        for timestamp, local_size in [(0.0, 0), (2.0, 100), (4.0, 400), (6.0, 600)]:
+            mock_monotonic.return_value = timestamp
+            a = self.__build_downloading_a(local_size, 100, remote_size=1600)
+        self.assertEqual(100, a.throughput)
+        self.assertEqual(10, a.eta)  # 1000/100
+        self.assertEqual(8, a.eta_low)  # ceil(1000/125)
+        self.assertEqual(14, a.eta_high)  # ceil(1000/75)
+
+    @patch("controller.throughput.time.monotonic")
+    def test_build_eta_history_reset(self, mock_monotonic):
+        """History is dropped on clear(), when a transfer restarts and when a file stops downloading"""
+        mock_monotonic.return_value = 0.0
+        self.__build_downloading_a(1000, 100)
+        mock_monotonic.return_value = 4.0
+        a = self.__build_downloading_a(1400, 100)
+        self.assertEqual(100, a.throughput)
+
+        # Clear resets the history, ETA falls back to lftp's speed: (2000-1000)/50 = 20
+        self.model_builder.clear()
+        mock_monotonic.return_value = 8.0
+        a = self.__build_downloading_a(1000, 50)
+        self.assertIsNone(a.throughput)
+        self.assertEqual(20, a.eta)
+
+        # Transfer restarts from a smaller size
+        mock_monotonic.return_value = 12.0
+        self.__build_downloading_a(1400, 50)
+        mock_monotonic.return_value = 13.0
+        a = self.__build_downloading_a(200, 50)
+        self.assertIsNone(a.throughput)
+        self.assertEqual(36, a.eta)
+
+        # File is no longer downloading
+        self.model_builder.set_lftp_statuses([])
+        mock_monotonic.return_value = 14.0
+        a = self.model_builder.build_model().get_file("a")
+        self.assertIsNone(a.throughput)
+        mock_monotonic.return_value = 20.0
+        a = self.__build_downloading_a(800, 50)
+        self.assertIsNone(a.throughput)
 
     def test_build_children_names(self):
         model = self.__build_test_model_children_tree_1()
@@ -1848,6 +1877,20 @@ class TestModelBuilder(unittest.TestCase):
         self.model_builder.set_corrupt_files({"a", "c"})
         self.assertTrue(self.model_builder.has_changes())
 
+    def test_build_priorities(self):
+        self.model_builder.set_remote_files([SystemFile("a", 100, False), SystemFile("b", 100, False)])
+        self.model_builder.set_priorities({"a": 3})
+        model = self.model_builder.build_model()
+        self.assertEqual(3, model.get_file("a").priority)
+        self.assertEqual(0, model.get_file("b").priority)
+
+        self.assertFalse(self.model_builder.has_changes())
+        self.model_builder.set_priorities({"a": 3})
+        self.assertFalse(self.model_builder.has_changes())
+        self.model_builder.set_priorities({})
+        self.assertTrue(self.model_builder.has_changes())
+        self.assertEqual(0, self.model_builder.build_model().get_file("a").priority)
+
 
 class TestSharedLocalDeduplication(unittest.TestCase):
     """
@@ -33,7 +33,7 @@ class TestModelRegistry(unittest.TestCase):
         self.model.set_base_logger(logger)
         self.registry = ModelRegistry(self.model)
 
-    def test_get_files_returns_deep_copies(self):
+    def test_get_files_returns_frozen_files(self):
         f = ModelFile("test.txt", False)
         f.state = ModelFile.State.DEFAULT
         self.model.add_file(f)
@@ -42,8 +42,9 @@ class TestModelRegistry(unittest.TestCase):
         self.assertEqual(1, len(files))
         self.assertEqual("test.txt", files[0].name)
 
-        # Modify the returned copy
-        files[0].state = ModelFile.State.DOWNLOADED
+        # Returned files cannot be modified
+        with self.assertRaises(AttributeError):
+            files[0].state = ModelFile.State.DOWNLOADED
 
         # Original should be unchanged
         original = self.model.get_file("test.txt")
@@ -159,3 +160,52 @@ class TestModelRegistry(unittest.TestCase):
         # Verify model is updated
         result = self.registry.get_file("update_me.txt")
         self.assertEqual(ModelFile.State.DOWNLOADED, result.state)
+
+    def test_snapshot_version_increments_on_change(self):
+        v0 = self.registry.get_snapshot().version
+        self.model.add_file(ModelFile("a.txt", False))
+        s1 = self.registry.get_snapshot()
+        self.assertEqual(v0 + 1, s1.version)
+        self.assertEqual(v0 + 1, self.registry.version)
+        # No change, same snapshot object
+        self.assertIs(s1, self.registry.get_snapshot())
+
+    def test_snapshot_shares_unchanged_files(self):
+        self.model.add_file(ModelFile("a.txt", False))
+        self.model.add_file(ModelFile("b.txt", False))
+        s1 = self.registry.get_snapshot()
+
+        new_model = Model()
+        logger = logging.getLogger("TestModelRegistry.new")
+        logger.addHandler(logging.NullHandler())
+        new_model.set_base_logger(logger)
+        new_model.add_file(ModelFile("a.txt", False))
+        b_updated = ModelFile("b.txt", False)
+        b_updated.state = ModelFile.State.DOWNLOADED
+        new_model.add_file(b_updated)
+        self.registry.apply_diff(new_model)
+
+        s2 = self.registry.get_snapshot()
+        self.assertGreater(s2.version, s1.version)
+        s1_files = {f.name: f for f in s1.files}
+        s2_files = {f.name: f for f in s2.files}
+        self.assertIs(s1_files["a.txt"], s2_files["a.txt"])
+        self.assertIsNot(s1_files["b.txt"], s2_files["b.txt"])
+        # Old snapshot is untouched
+        self.assertEqual(ModelFile.State.DEFAULT, s1_files["b.txt"].state)
+        self.assertEqual(ModelFile.State.DOWNLOADED, s2_files["b.txt"].state)
+
+    def test_get_snapshot_and_add_listener(self):
+        self.model.add_file(ModelFile("existing.txt", False))
+        listener = _TestListener()
+        snapshot = self.registry.get_snapshot_and_add_listener(listener)
+        self.assertEqual(["existing.txt"], [f.name for f in snapshot.files])
+        self.model.add_file(ModelFile("new.txt", False))
+        self.assertEqual(["new.txt"], [f.name for f in listener.added])
+        self.assertEqual(snapshot.version + 1, self.registry.version)
+
+    def test_listeners_receive_frozen_files(self):
+        listener = _TestListener()
+        self.registry.add_listener(listener)
+        self.model.add_file(ModelFile("a.txt", False))
+        self.assertTrue(listener.added[0].is_frozen)
@@ -3,8 +3,13 @@
 import unittest
 from unittest.mock import MagicMock
 
+from common import Config, Status
+from controller.model_builder import ModelBuilder
+from controller.model_registry import ModelRegistry
 from controller.model_updater import ModelUpdater
 from controller.persist_keys import KEY_SEP
+from model import Model, ModelFile
+from system import SystemFile
 
 
 class TestSyncPersistToAllBuilders(unittest.TestCase):
@@ -133,3 +138,190 @@ class TestSyncPersistToAllBuilders(unittest.TestCase):
         pc_abc.model_builder.set_extract_failed_files.assert_called_once_with({"bad.zip"})
         pc_abc.model_builder.set_validated_files.assert_called_once_with({"good.mkv"})
         pc_abc.model_builder.set_corrupt_files.assert_called_once_with({"corrupt.mkv"})
+
+
+class TestPruneExtractedFiles(unittest.TestCase):
+    def _make_updater(self, pair_ids, extracted, files):
+        model = Model()
+        for f in files:
+            model.add_file(f)
+        pair_contexts = []
+        for pair_id in pair_ids:
+            pc = MagicMock()
+            pc.pair_id = pair_id
+            pair_contexts.append(pc)
+        persist = MagicMock()
+        persist.downloaded_file_names = set()
+        persist.extracted_file_names = set(extracted)
+        persist.extract_failed_file_names = set()
+        persist.validated_file_names = set()
+        persist.corrupt_file_names = set()
+        updater = ModelUpdater(
+            pair_contexts=pair_contexts,
+            persist=persist,
+            pipeline=MagicMock(),
+            registry=ModelRegistry(model),
+            extract_process=MagicMock(),
+            validate_process=MagicMock(),
+            context=MagicMock(),
+            password=None,
+            logger=MagicMock(),
+        )
+        return updater, persist
+
+    @staticmethod
+    def _file(name, state, pair_id=None):
+        f = ModelFile(name, False, pair_id=pair_id)
+        f.state = state
+        return f
+
+    def test_removes_deleted_files_only(self):
+        updater, persist = self._make_updater(
+            ["abc"],
+            {f"abc{KEY_SEP}gone.rar", f"abc{KEY_SEP}here.rar"},
+            [
+                self._file("gone.rar", ModelFile.State.DELETED, "abc"),
+                self._file("here.rar", ModelFile.State.EXTRACTED, "abc"),
+            ],
+        )
+        updater._prune_extracted_files()
+        self.assertEqual({f"abc{KEY_SEP}here.rar"}, persist.extracted_file_names)
+
+    def test_handles_legacy_colon_keys(self):
+        updater, persist = self._make_updater(
+            ["abc"],
+            {"abc:gone.rar"},
+            [self._file("gone.rar", ModelFile.State.DELETED, "abc")],
+        )
+        updater._prune_extracted_files()
+        self.assertEqual(set(), persist.extracted_file_names)
+
+    def test_none_pair_id_uses_bare_keys(self):
+        updater, persist = self._make_updater(
+            [None],
+            {"gone.rar", f"abc{KEY_SEP}gone.rar"},
+            [self._file("gone.rar", ModelFile.State.DELETED)],
+        )
+        updater._prune_extracted_files()
+        self.assertEqual({f"abc{KEY_SEP}gone.rar"}, persist.extracted_file_names)
+
+    def test_ignores_files_of_unknown_pairs(self):
+        updater, persist = self._make_updater(
+            ["abc"],
+            {f"xyz{KEY_SEP}gone.rar"},
+            [self._file("gone.rar", ModelFile.State.DELETED, "xyz")],
+        )
+        updater._prune_extracted_files()
+        self.assertEqual({f"xyz{KEY_SEP}gone.rar"}, persist.extracted_file_names)
+
+
+class TestBuildPairModels(unittest.TestCase):
+    def _make_updater(self, workers, mode):
+        config = Config()
+        config.controller.model_build_workers = workers
+        config.controller.model_build_mode = mode
+        context = MagicMock()
+        context.config = config
+        pair_contexts = []
+        for idx in range(3):
+            pc = MagicMock()
+            pc.pair_id = f"pair{idx}"
+            pc.local_path = "/downloads"
+            pc.model_builder = ModelBuilder(pair_id=pc.pair_id)
+            pc.model_builder.set_remote_files(
+                [SystemFile(f"remote{idx}.mkv", 100, False), SystemFile("shared", 10, True)]
+            )
+            pc.model_builder.set_local_files([SystemFile("local_only.txt", 5, False)])
+            pair_contexts.append(pc)
+        updater = ModelUpdater(
+            pair_contexts=pair_contexts,
+            persist=MagicMock(),
+            pipeline=MagicMock(),
+            registry=MagicMock(),
+            extract_process=MagicMock(),
+            validate_process=MagicMock(),
+            context=context,
+            password=None,
+            logger=MagicMock(),
+        )
+        self.addCleanup(updater.shutdown)
+        return updater
+
+    @staticmethod
+    def _keys(model):
+        return sorted(Model.file_key(f) for f in model.get_all_files())
+
+    def test_thread_pool_matches_serial(self):
+        serial = self._make_updater(1, "thread")._build_aggregate_model()
+        parallel = self._make_updater(4, "thread")._build_aggregate_model()
+        self.assertEqual(self._keys(serial), self._keys(parallel))
+        # Local-only file is claimed by the first pair only
+        self.assertIn("pair0:local_only.txt", self._keys(parallel))
+        self.assertNotIn("pair1:local_only.txt", self._keys(parallel))
+
+    def test_thread_pool_caches_pair_models(self):
+        updater = self._make_updater(4, "thread")
+        updater._build_aggregate_model()
+        self.assertIsNone(updater._build_aggregate_model())
+
+    def test_process_pool_matches_serial(self):
+        serial = self._make_updater(1, "thread")._build_aggregate_model()
+        updater = self._make_updater(2, "process")
+        parallel = updater._build_aggregate_model()
+        self.assertEqual(self._keys(serial), self._keys(parallel))
+        # Built models are handed back to the builders in this process
+        self.assertFalse(any(pc.model_builder.has_changes() for pc in updater._pair_contexts))
+
+
+class TestUpdateTransferStatus(unittest.TestCase):
+    def _make_updater(self, files):
+        model = Model()
+        for f in files:
+            model.add_file(f)
+        context = MagicMock()
+        context.status = Status()
+        updater = ModelUpdater(
+            pair_contexts=[],
+            persist=MagicMock(),
+            pipeline=MagicMock(),
+            registry=ModelRegistry(model),
+            extract_process=MagicMock(),
+            validate_process=MagicMock(),
+            context=context,
+            password=None,
+            logger=MagicMock(),
+        )
+        return updater, context.status
+
+    @staticmethod
+    def _file(name, pair_id, state, speed=None, throughput=None):
+        f = ModelFile(name, False, pair_id=pair_id)
+        f.state = state
+        f.downloading_speed = speed
+        f.throughput = throughput
+        return f
+
+    def test_sums_speeds_per_pair(self):
+        updater, status = self._make_updater(
+            [
+                self._file("a", "p1", ModelFile.State.DOWNLOADING, speed=500, throughput=100),
+                # No windowed throughput yet, lftp's speed is used
+                self._file("b", "p1", ModelFile.State.DOWNLOADING, speed=50),
+                self._file("c", "p2", ModelFile.State.DOWNLOADING, speed=10, throughput=20),
+                self._file("d", "p2", ModelFile.State.DOWNLOADED, speed=1000, throughput=1000),
+            ]
+        )
+        updater._update_transfer_status()
+        self.assertEqual(170, status.transfer.download_speed)
+        self.assertEqual({"p1": 150, "p2": 20}, status.transfer.pair_download_speeds)
+
+    def test_only_notifies_on_change(self):
+        updater, status = self._make_updater(
+            [self._file("a", "p1", ModelFile.State.DOWNLOADING, speed=100, throughput=100)]
+        )
+        listener = MagicMock()
+        status.add_listener(listener)
+        updater._update_transfer_status()
+        self.assertEqual(2, listener.notify.call_count)
+        updater._update_transfer_status()
+        self.assertEqual(2, listener.notify.call_count)
@@ -204,7 +204,7 @@ class TestConfigureLftp(unittest.TestCase):
 
         configure_lftp(lftp, config)
 
-        self.assertEqual(lftp.rate_limit, "1M")
+        self.assertEqual(lftp.total_rate_limit, "1M")
         self.assertEqual(lftp.net_socket_buffer, "65536")
         self.assertEqual(lftp.min_chunk_size, "100k")
 
@@ -235,7 +235,7 @@ class TestConfigureLftp(unittest.TestCase):
 
         configure_lftp(lftp, config)
 
-        self.assertNotIn("rate_limit", lftp._set_attrs)
+        self.assertNotIn("total_rate_limit", lftp._set_attrs)
         self.assertNotIn("net_socket_buffer", lftp._set_attrs)
         self.assertNotIn("min_chunk_size", lftp._set_attrs)
 
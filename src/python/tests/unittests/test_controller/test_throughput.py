@@ -0,0 +1,105 @@
+# Copyright 2017, Inderpreet Singh, All rights reserved.
+
+import unittest
+
+from controller.throughput import ThroughputTracker
+
+
+class TestThroughputTracker(unittest.TestCase):
+    def setUp(self):
+        self.tracker = ThroughputTracker()
+
+    def test_no_estimate_without_history(self):
+        self.assertIsNone(self.tracker.estimate("a"))
+        self.tracker.add_sample("a", 100, timestamp=0.0)
+        self.assertIsNone(self.tracker.estimate("a"))
+        # Span shorter than the minimum
+        self.tracker.add_sample("a", 200, timestamp=1.0)
+        self.assertIsNone(self.tracker.estimate("a"))
+        self.assertIsNone(self.tracker.estimate_eta("a", 1000))
+
+    def test_windowed_rate(self):
+        self.tracker.add_sample("a", 0, timestamp=0.0)
+        self.tracker.add_sample("a", 400, timestamp=2.0)
+        self.tracker.add_sample("a", 500, timestamp=4.0)
+        estimate = self.tracker.estimate("a")
+        self.assertIsNotNone(estimate)
+        self.assertEqual(125, estimate.rate)
+        self.assertLessEqual(estimate.rate_low, estimate.rate)
+        self.assertGreaterEqual(estimate.rate_high, estimate.rate)
+
+    def test_single_interval_band_is_the_rate(self):
+        self.tracker.add_sample("a", 0, timestamp=0.0)
+        self.tracker.add_sample("a", 500, timestamp=5.0)
+        estimate = self.tracker.estimate("a")
+        self.assertEqual((100, 100, 100), tuple(estimate))
+
+    def test_eta(self):
+        for timestamp, transferred in [(0.0, 0), (2.0, 100), (4.0, 400), (6.0, 600)]:
+            self.tracker.add_sample("a", transferred, timestamp=timestamp)
+        eta = self.tracker.estimate_eta("a", 1000)
+        self.assertEqual(10, eta.eta)
+        self.assertEqual(8, eta.eta_low)
+        self.assertEqual(14, eta.eta_high)
+
+        # Nothing left
+        self.assertEqual((0, 0, 0), tuple(self.tracker.estimate_eta("a", -5)))
+
+    def test_eta_stalled(self):
+        self.tracker.add_sample("a", 100, timestamp=0.0)
+        self.tracker.add_sample("a", 100, timestamp=5.0)
+        self.assertEqual(0, self.tracker.estimate("a").rate)
+        self.assertIsNone(self.tracker.estimate_eta("a", 1000))
+
+    def test_eta_high_unbounded_when_a_slow_interval_stalled(self):
+        self.tracker.add_sample("a", 0, timestamp=0.0)
+        self.tracker.add_sample("a", 0, timestamp=2.0)
+        self.tracker.add_sample("a", 0, timestamp=4.0)
+        self.tracker.add_sample("a", 600, timestamp=6.0)
+        eta = self.tracker.estimate_eta("a", 1000)
+        self.assertEqual(10, eta.eta)
+        self.assertIsNone(eta.eta_high)
+
+    def test_reset_when_bytes_go_backwards(self):
+        self.tracker.add_sample("a", 1000, timestamp=0.0)
+        self.tracker.add_sample("a", 2000, timestamp=5.0)
+        self.assertIsNotNone(self.tracker.estimate("a"))
+        self.tracker.add_sample("a", 10, timestamp=6.0)
+        self.assertIsNone(self.tracker.estimate("a"))
+        self.tracker.add_sample("a", 410, timestamp=10.0)
+        self.assertEqual(100, self.tracker.estimate("a").rate)
+
+    def test_same_timestamp_replaces_sample(self):
+        self.tracker.add_sample("a", 0, timestamp=0.0)
+        self.tracker.add_sample("a", 100, timestamp=4.0)
+        self.tracker.add_sample("a", 400, timestamp=4.0)
+        self.assertEqual(100, self.tracker.estimate("a").rate)
+
+    def test_old_samples_leave_the_window(self):
+        self.tracker.add_sample("a", 0, timestamp=0.0)
+        self.tracker.add_sample("a", 10, timestamp=10.0)
+        self.tracker.add_sample("a", 1010, timestamp=35.0)
+        self.tracker.add_sample("a", 1510, timestamp=40.0)
+        # Sample at t=0 fell out of the 30 sec window
+        self.assertEqual(50, self.tracker.estimate("a").rate)
+
+    def test_long_gap_keeps_last_two_samples(self):
+        self.tracker.add_sample("a", 0, timestamp=0.0)
+        self.tracker.add_sample("a", 6000, timestamp=60.0)
+        self.assertEqual(100, self.tracker.estimate("a").rate)
+
+    def test_sample_count_is_bounded(self):
+        for i in range(ThroughputTracker.MAX_SAMPLES * 2):
+            self.tracker.add_sample("a", i * 10, timestamp=i * 0.1)
+        # Only the last MAX_SAMPLES samples (6.3 secs) remain
+        self.assertAlmostEqual(100, self.tracker.estimate("a").rate)
+
+    def test_keys_discard_clear(self):
+        self.tracker.add_sample("a", 0, timestamp=0.0)
+        self.tracker.add_sample("b", 0, timestamp=0.0)
+        self.assertEqual({"a", "b"}, self.tracker.keys())
+        self.tracker.discard("a")
+        self.tracker.discard("missing")
+        self.assertEqual({"b"}, self.tracker.keys())
+        self.tracker.clear()
+        self.assertEqual(set(), self.tracker.keys())
@@ -0,0 +1,283 @@
+# Copyright 2017, Inderpreet Singh, All rights reserved.
+
+"""Benchmark corpus for LftpJobStatusParser.
+
+Builds a large "jobs -v" output from the line formats of real captures
+(see test_job_status_parser.py): a busy queue with tens of mirror and pget
+jobs, each transferring several files in many chunks, plus the chmod,
+sub-mirror and line-wrap noise lftp emits under load.
+
+The real captures themselves are kept in CAPTURES, and make_capture_output
+scales one up by repeating its jobs, so the parser is also timed on output
+lftp actually printed.
+
+Run it as a module to print the parse time of the corpus:
+    python -m tests.unittests.test_lftp.job_status_corpus
+"""
+
+import logging
+import re
+import time
+
+from lftp import LftpJobStatusParser
+
+NUM_MIRROR_JOBS = 30
+NUM_PGET_JOBS = 10
+NUM_QUEUED = 40
+FILES_PER_MIRROR = 4
+CHUNKS_PER_FILE = 16
+
+_FILE_SIZE = 2_147_483_648
+_CHUNK_SIZE = _FILE_SIZE // CHUNKS_PER_FILE
+
+
+def _mirror_header(job_id: int) -> str:
+    return (
+        f"[{job_id}] mirror -c /remote/path/Show.Name.S01E{job_id:02d}.1080p.WEB.H264-GROUP /local/path/"
+        f"  -- 1.2G/8.0G (15%) 12.26 MiB/s"
+    )
+
+
+def _transfer(name: str, file_index: int) -> list[str]:
+    got = _FILE_SIZE // 4 + file_index
+    lines = [
+        f"\\transfer `{name}' ",
+        f"`{name}', got {got} of {_FILE_SIZE} (25%) 3.18M/s eta:8m ",
+    ]
+    for chunk in range(CHUNKS_PER_FILE):
+        start = chunk * _CHUNK_SIZE
+        end = start + _CHUNK_SIZE - 1
+        lines.append(f"\\chunk {start}-{end} ")
+        if chunk % 7 == 6:
+            lines.append(f"`{name}' at {start + 1024} (0%) [Making data connection]")
+        else:
+            lines.append(f"`{name}' at {start + 4096 * chunk} (25%) 203.6K/s eta:7m [Receiving data]")
+    return lines
+
+
+def make_jobs_output(num_mirror_jobs: int = NUM_MIRROR_JOBS) -> str:
+    """Return the "jobs -v" output of the corpus, with the given number of running mirror jobs"""
+    lines = [
+        "jobs -v",
+        "[0] queue (sftp://someone:@localhost:22)  -- 48.26 MiB/s",
+        "sftp://someone:@localhost:22/remote/path",
+        f"Now executing: {_mirror_header(1)}",
+    ]
+    lines += [f"    -{_mirror_header(job_id)}" for job_id in range(2, num_mirror_jobs + 1)]
+    lines.append("Commands queued:")
+    for i in range(1, NUM_QUEUED + 1):
+        if i % 2:
+            lines.append(f" {i}. mirror -c /remote/path/Queued.Movie.{i}.2160p /local/path/")
+        else:
+            lines.append(f" {i}. pget -c /remote/path/queued.file.{i}.mkv -o /local/path/")
+            lines.append("    cd /remote/path")
+
+    for job_id in range(1, num_mirror_jobs + 1):
+        lines.append(_mirror_header(job_id))
+        if job_id % 5 == 0:
+            for part in range(3):
+                lines += [
+                    f"chmod show.name.s01e{job_id:02d}.r{part:02d} ",
+                    "file:/local/path/Show.Name",
+                    f"`show.name.s01e{job_id:02d}.r{part:02d}' []",
+                ]
+        for file_index in range(FILES_PER_MIRROR):
+            lines += _transfer(f"show.name.s01e{job_id:02d}.part{file_index}.mkv", file_index)
+        lines += [
+            "\\mirror `Subs'  -- 0/512k (0%)",
+            f"\\transfer `Subs/show.name.s01e{job_id:02d}.srt'",
+            f"`show.name.s01e{job_id:02d}.srt' at 0 (0%) [Connecting...]",
+            "eta:4m [Receiving data]",
+        ]
+
+    for i in range(NUM_PGET_JOBS):
+        job_id = num_mirror_jobs + 1 + i
+        name = f"/remote/path/single.file.{i}.mkv"
+        lines += [
+            f"[{job_id}] pget -c {name} -o /local/path/",
+            "sftp://someone:@localhost:22/remote/path",
+            f"`single.file.{i}.mkv', got 1048576 of 4194304 (25%) 1.1M/s eta:3s",
+        ]
+    return "\n".join(lines) + "\n"
+
+
+# Real "jobs -v" captures, as recorded for the unit tests in test_job_status_parser.py
+CAPTURES = {
+    "queue_stopped": r"""
+[0] queue (sftp://someone:@localhost)
+sftp://someone:@localhost/home/someone
+Queue is stopped.
+Commands queued:
+ 1. mirror -c /tmp/test_lftp/remote/a /tmp/test_lftp/local/
+ 2. pget -c /tmp/test_lftp/remote/c -o /tmp/test_lftp/local/
+ 3. mirror -c /tmp/test_lftp/remote/b /tmp/test_lftp/local/
+ 4. mirror -c /tmp/test_lftp/remote/b /tmp/test_lftp/local/
+ 5. mirror -c /tmp/test_lftp/remote/b /tmp/test_lftp/local/
+""",
+    "pget_chunks": r"""
+[0] queue (sftp://someone:@localhost) 
+sftp://someone:@localhost/home/someone
+Now executing: [1] pget -c /tmp/test_lftp/remote/A.b.C.rar -o /tmp/lftp/
+[1] pget -c /tmp/test_lftp/remote/A.b.C.rar -o /tmp/lftp/ 
+sftp://someone:@localhost/home/someone
+`/tmp/test_lftp/remote/A.b.C.rar', got 2622559389 of 3274103236 (80%) 
+\chunk 0-2752841944
+`/tmp/test_lftp/remote/A.b.C.rar' at 2622559389 (0%) [Receiving data]
+\chunk 3143787913-3274103235 
+`/tmp/test_lftp/remote/A.b.C.rar' at 3143787913 (0%) [Connecting...]
+\chunk 3013472590-3143787912 
+`/tmp/test_lftp/remote/A.b.C.rar' at 3013472590 (0%) [Connecting...]
+\chunk 2883157267-3013472589 
+`/tmp/test_lftp/remote/A.b.C.rar' at 2883157267 (0%) [Connecting...]
+\chunk 2752841944-2883157266 
+`/tmp/test_lftp/remote/A.b.C.rar' at 2752841944 (0%) [Connecting...]
+""",
+    "mirror_nested": r"""
+[1] queue (sftp://someone:@localhost)  -- 15.8 KiB/s
+sftp://someone:@localhost/home/someone
+Now executing: [2] mirror -c /tmp/test_lftp/remote/a /tmp/test_lftp/local/ -- 17k/26M (0%) 5.0 KiB/s
+        -[3] mirror -c /tmp/test_lftp/remote/b /tmp/test_lftp/local/ -- 35k/394k (8%) 10.8 KiB/s
+Commands queued:
+ 1. pget -c /tmp/test_lftp/remote/c -o /tmp/test_lftp/local/
+ 2. mirror -c /tmp/test_lftp/remote/b /tmp/test_lftp/local/
+ 3. mirror -c /tmp/test_lftp/remote/b /tmp/test_lftp/local/
+[2] mirror -c /tmp/test_lftp/remote/a /tmp/test_lftp/local/  -- 17k/26M (0%) 5.0 KiB/s
+\transfer `aa'
+`aa' at 2976 (12%) 997b/s eta:22s [Receiving data]
+\transfer `ab'
+`ab', got 13733 of 25165824 (0%) 4.0K/s eta:1h45m
+\chunk 0-6291456
+`ab' at 4362 (0%) 1.1K/s eta:92m [Receiving data]
+\chunk 18874368-25165823
+`ab' at 18877569 (0%) 1001b/s eta:1h45m [Receiving data]
+\chunk 12582912-18874367
+`ab' at 12585895 (0%) 997b/s eta:1h45m [Receiving data]
+\chunk 6291456-12582911
+`ab' at 6294643 (0%) 999b/s eta:1h45m [Receiving data]
+[3] mirror -c /tmp/test_lftp/remote/b /tmp/test_lftp/local/  -- 35k/394k (8%) 10.8 KiB/s
+\transfer `bb'
+`bb', got 12333 of 131072 (9%) 3.9K/s eta:30s
+\chunk 0-32768
+`bb' at 2970 (2%) 996b/s eta:30s [Receiving data]
+\chunk 98304-131071
+`bb' at 101288 (9%) 998b/s eta:30s [Receiving data]
+\chunk 65536-98303
+`bb' at 68727 (9%) 1001b/s eta:30s [Receiving data]
+\chunk 32768-65535
+`bb' at 35956 (9%) 998b/s eta:30s [Receiving data]
+\mirror `ba'  -- 23k/263k (8%) 6.9 KiB/s
+\transfer `ba/baa'
+`baa', got 9342 of 131072 (7%) 2.9K/s
+\chunk 0-32768
+`baa' at 3192 (2%) 998b/s eta:30s [Receiving data]
+\chunk 98304-131071
+`baa' at 98304 (0%) [ssh_exchange_identification: Connection closed by remote host]
+\chunk 65536-98303
+`baa' at 68721 (9%) 998b/s eta:30s [Receiving data]
+\chunk 32768-65535
+`baa' at 35733 (9%) 993b/s eta:30s [Receiving data]
+\transfer `ba/bab'
+`bab', got 13128 of 131072 (10%) 4.0K/s eta:30s
+\chunk 0-32768
+`bab' at 4170 (3%) 1.1K/s eta:26s [Receiving data]
+\chunk 98304-131071
+`bab' at 101297 (9%) 1001b/s eta:30s [Receiving data]
+\chunk 65536-98303
+`bab' at 68525 (9%) 999b/s eta:30s [Receiving data]
+\chunk 32768-65535
+`bab' at 35744 (9%) 997b/s eta:30s [Receiving data]
+""",
+    "mirror_chmod": r"""
+[0] queue (sftp://someone:@localhost:22)  -- 12.26 MiB/s
+sftp://someone:@localhost:22/remote/path
+Now executing: [3] mirror -c /remote/path/Space.Trek.S23E03.720p /local/path/ -- 985M/985M (100%)
+    -[4] mirror -c /remote/path/Star.Battle.Movie /local/path/ -- 116M/1.2G (9%) 12.26 MiB/s
+[3] mirror -c /remote/path/Space.Trek.S23E03.720p /local/path/  -- 985M/985M (100%)
+chmod Space.Trek.S23E03.720p.r06 
+file:/local/path/Space.Trek.S23E03.720p
+`Space.Trek.S23E03.720p.r06' []
+chmod Space.Trek.S23E03.720p.r07 
+file:/local/path/Space.Trek.S23E03.720p
+`Space.Trek.S23E03.720p.r07' []
+chmod Space.Trek.S23E03.720p.r08 
+file:/local/path/Space.Trek.S23E03.720p
+`Space.Trek.S23E03.720p.r08' []
+chmod Space.Trek.S23E03.720p.r09 
+file:/local/path/Space.Trek.S23E03.720p
+`Space.Trek.S23E03.720p.r09' []
+[4] mirror -c /remote/path/Star.Battle.Movie /local/path/  -- 116M/1.2G (9%) 12.26 MiB/s
+\transfer `star.battle.movie.720p.r07' 
+`star.battle.movie.720p.r07', got 44628032 of 50000000 (89%) 1.10M/s eta:5s 
+\chunk 9011200-25000000
+`star.battle.movie.720p.r07' at 19628032 (25%) 1.10M/s eta:5s [Receiving data]
+\transfer `star.battle.movie.720p.r08' 
+`star.battle.movie.720p.r08', got 15237120 of 50000000 (30%) 2.04M/s 
+\chunk 0-25000000
+`star.battle.movie.720p.r08' at 13664256 (27%) 1.36M/s eta:8s [Receiving data]
+\chunk 37500000-49999999 
+`star.battle.movie.720p.r08' at 38581344 (8%) 696.2K/s eta:16s [Receiving data]
+\chunk 25000000-37499999 
+`star.battle.movie.720p.r08' at 25491520 (3%) [Receiving data]
+\transfer `star.battle.movie.720p.r09' 
+`star.battle.movie.720p.r09', got 21692416 of 50000000 (43%) 4.05M/s eta:16s 
+\chunk 0-12500000
+`star.battle.movie.720p.r09' at 12419072 (24%) 1.28M/s eta:0s [Receiving data]
+\chunk 37500000-49999999 
+`star.battle.movie.720p.r09' at 38843488 (10%) 662.8K/s eta:16s [Receiving data]
+\chunk 25000000-37499999 
+`star.battle.movie.720p.r09' at 28047424 (24%) 963.8K/s eta:10s [Receiving data]
+\chunk 12500000-24999999 
+`star.battle.movie.720p.r09' at 17382432 (39%) 1.19M/s eta:6s [Receiving data]
+\transfer `star.battle.movie.720p.r10' 
+`star.battle.movie.720p.r10', got 33930272 of 50000000 (67%) 5.06M/s eta:6s 
+\chunk 37500000-49999999 
+`star.battle.movie.720p.r10' at 43037792 (44%) 1.16M/s eta:6s [Receiving data]
+\chunk 25000000-37499999 
+`star.battle.movie.720p.r10' at 32503872 (60%) 1.19M/s eta:4s [Receiving data]
+\chunk 12500000-24999999 
+`star.battle.movie.720p.r10' at 20888608 (67%) 1.33M/s eta:3s [Receiving data]
+""",
+}
+
+_JOB_HEADER = re.compile(r"^\[(\d+)\] (mirror|pget) ", re.MULTILINE)
+_JOB_ID_STEP = 1000
+
+
+def make_capture_output(name: str, repeat: int = 1) -> str:
+    """Return the real capture of the given name, with its jobs repeated repeat times
+
+    The queue header is kept once. Each repeat of the jobs adds _JOB_ID_STEP
+    to their job ids, so every job in the output is still unique.
+    """
+    capture = CAPTURES[name]
+    match = _JOB_HEADER.search(capture)
+    if match is None:
+        return capture
+    header, jobs = capture[: match.start()], capture[match.start() :]
+    return header + "".join(_renumber_jobs(jobs, i * _JOB_ID_STEP) for i in range(repeat))
+
+
+def _renumber_jobs(jobs: str, step: int) -> str:
+    return _JOB_HEADER.sub(lambda m: f"[{int(m.group(1)) + step}] {m.group(2)} ", jobs)
+
+
+def parse_time(output: str, repeat: int = 5) -> float:
+    """Return the best time, in seconds, of parsing output repeat times"""
+    parser = LftpJobStatusParser()
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parser.parse(output)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+if __name__ == "__main__":
+    # The corpus has lines the parser skips with a warning
+    logging.disable(logging.WARNING)
+    for num_mirror_jobs in (NUM_MIRROR_JOBS, NUM_MIRROR_JOBS * 4):
+        corpus = make_jobs_output(num_mirror_jobs=num_mirror_jobs)
+        print(f"{num_mirror_jobs} mirror jobs, {corpus.count(chr(10))} lines: {parse_time(corpus) * 1000:.1f} ms")
+    for name in CAPTURES:
+        corpus = make_capture_output(name, repeat=100)
+        print(f"{name} x100, {corpus.count(chr(10))} lines: {parse_time(corpus) * 1000:.1f} ms")
@@ -0,0 +1,106 @@
+# Copyright 2017, Inderpreet Singh, All rights reserved.
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from lftp import LftpJobStatus, TarBundle
+
+
+class TestTarBundle(unittest.TestCase):
+    """Unit tests for TarBundle, with a local tar standing in for the remote one."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp(prefix="test_bundle")
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        self.remote_dir = os.path.join(self.temp_dir, "remote")
+        self.local_dir = os.path.join(self.temp_dir, "local")
+        os.makedirs(os.path.join(self.remote_dir, "Some Dir's", "sub"))
+        for index in range(20):
+            with open(os.path.join(self.remote_dir, "Some Dir's", "sub", f"f{index}.jpg"), "wb") as f:
+                f.write(b"x" * 100)
+        with open(os.path.join(self.remote_dir, "Some Dir's", "info.nfo"), "wb") as f:
+            f.write(b"x" * 10)
+
+    def _bundle(self, name: str, exclude_patterns: list[str] | None = None) -> TarBundle:
+        bundle = TarBundle(
+            job_id=-1,
+            name=name,
+            remote_dir_path=self.remote_dir,
+            local_dir_path=self.local_dir,
+            source_command=TarBundle.remote_command(self.remote_dir, name, exclude_patterns),
+            size_remote=2000,
+        )
+        bundle.start()
+        return bundle
+
+    @staticmethod
+    def _wait(bundle: TarBundle):
+        deadline = time.monotonic() + 10
+        while bundle.poll():
+            if time.monotonic() > deadline:
+                bundle.kill()
+                raise AssertionError("Bundle did not finish")
+            time.sleep(0.05)
+
+    def test_remote_command(self):
+        self.assertEqual(
+            "tar -C '/remote/dir' -cf - --exclude='*.nfo' -- 'Don'\\''t'",
+            TarBundle.remote_command("/remote/dir", "Don't", ["*.nfo"]),
+        )
+        self.assertEqual("tar -C \"$HOME/dir\" -cf - -- 'a b'", TarBundle.remote_command("~/dir", "a b"))
+
+    def test_downloads_directory(self):
+        bundle = self._bundle("Some Dir's", exclude_patterns=["*.nfo"])
+        status = bundle.status
+        self.assertEqual(-1, status.id)
+        self.assertEqual(LftpJobStatus.Type.MIRROR, status.type)
+        self.assertEqual(LftpJobStatus.State.RUNNING, status.state)
+        self.assertEqual("Some Dir's", status.name)
+        self._wait(bundle)
+        self.assertIsNone(bundle.error)
+        self.assertEqual(20, bundle.num_files)
+        self.assertEqual(20, len(os.listdir(os.path.join(self.local_dir, "Some Dir's", "sub"))))
+        self.assertFalse(os.path.exists(os.path.join(self.local_dir, "Some Dir's", "info.nfo")))
+        transfer_state = bundle.status.total_transfer_state
+        self.assertEqual(2000, transfer_state.size_local)
+        self.assertEqual(2000, transfer_state.size_remote)
+        self.assertEqual(100.0, transfer_state.percent_local)
+
+    def test_missing_directory_fails(self):
+        bundle = self._bundle("missing")
+        self._wait(bundle)
+        self.assertIsNotNone(bundle.error)
+        self.assertIn("missing", bundle.error)
+
+    def test_failed_source_fails(self):
+        # The whole stream arrives, but the source still fails, like ssh losing the connection at the end
+        remote_command = TarBundle.remote_command(self.remote_dir, "Some Dir's")
+        bundle = TarBundle(
+            job_id=-1,
+            name="Some Dir's",
+            remote_dir_path=self.remote_dir,
+            local_dir_path=self.local_dir,
+            source_command=f"( {remote_command}; exit 255 )",
+        )
+        bundle.start()
+        self._wait(bundle)
+        self.assertIsNotNone(bundle.error)
+
+    def test_kill(self):
+        bundle = TarBundle(
+            job_id=-1,
+            name="slow",
+            remote_dir_path=self.remote_dir,
+            local_dir_path=self.local_dir,
+            source_command="sleep 10",
+        )
+        self.assertEqual(LftpJobStatus.State.QUEUED, bundle.status.state)
+        self.assertTrue(bundle.poll())
+        bundle.start()
+        self.assertEqual(LftpJobStatus.State.RUNNING, bundle.status.state)
+        self.assertTrue(bundle.poll())
+        bundle.kill()
+        self.assertFalse(bundle.poll())
@@ -42,6 +42,24 @@ class TestLftpJobStatus(unittest.TestCase):
         )
         self.assertEqual("bye", status.name)
 
+    def test_paths(self):
+        status = LftpJobStatus(
+            job_id=-1, job_type=LftpJobStatus.Type.PGET, state=LftpJobStatus.State.QUEUED, name="a", flags=""
+        )
+        self.assertIsNone(status.remote_path)
+        self.assertIsNone(status.local_path)
+        status = LftpJobStatus(
+            job_id=-1,
+            job_type=LftpJobStatus.Type.PGET,
+            state=LftpJobStatus.State.QUEUED,
+            name="a",
+            flags="",
+            remote_path="/remote/a",
+            local_path="/local/",
+        )
+        self.assertEqual("/remote/a", status.remote_path)
+        self.assertEqual("/local/", status.local_path)
+
     def test_total_transfer_state(self):
         status = LftpJobStatus(
             job_id=-1, job_type=LftpJobStatus.Type.MIRROR, state=LftpJobStatus.State.RUNNING, name="", flags=""
@@ -9,7 +9,7 @@ import unittest
 
 import timeout_decorator
 
-from lftp import Lftp, LftpError, LftpJobStatus
+from lftp import Lftp, LftpError, LftpJobStatus, LftpQueueItem
 from tests.utils import TestUtils
 
 
@@ -154,6 +154,12 @@ class TestLftp(unittest.TestCase):
         self.lftp.rate_limit = "1M"
         self.assertEqual("1M", self.lftp.rate_limit)
 
+    def test_total_rate_limit(self):
+        self.lftp.total_rate_limit = 500
+        self.assertEqual("500", self.lftp.total_rate_limit)
+        self.lftp.total_rate_limit = "1M"
+        self.assertEqual("1M", self.lftp.total_rate_limit)
+
     def test_min_chunk_size(self):
         self.lftp.min_chunk_size = 500
         self.assertEqual("500", self.lftp.min_chunk_size)
@@ -342,6 +348,60 @@ class TestLftp(unittest.TestCase):
         self.assertEqual(LftpJobStatus.Type.PGET, statuses[2].type)
         self.assertEqual(LftpJobStatus.State.RUNNING, statuses[2].state)
 
+    @timeout_decorator.timeout(5)
+    def test_queue_many(self):
+        self.lftp.num_parallel_jobs = 2
+        self.lftp.rate_limit = 10  # so jobs don't finish right away
+        errors = self.lftp.queue_many([LftpQueueItem("a", True), LftpQueueItem("c", False), LftpQueueItem("b", True)])
+        self.assertEqual([None, None, None], errors)
+        while True:
+            statuses = self.lftp.status()
+            self.lftp.raise_pending_error()
+            if len(statuses) > 2:
+                break
+        self.assertEqual(3, len(statuses))
+        # queued jobs
+        self.assertEqual("b", statuses[0].name)
+        self.assertEqual(LftpJobStatus.State.QUEUED, statuses[0].state)
+        # running jobs
+        self.assertEqual("a", statuses[1].name)
+        self.assertEqual(LftpJobStatus.Type.MIRROR, statuses[1].type)
+        self.assertEqual(LftpJobStatus.State.RUNNING, statuses[1].state)
+        self.assertEqual("c", statuses[2].name)
+        self.assertEqual(LftpJobStatus.Type.PGET, statuses[2].type)
+        self.assertEqual(LftpJobStatus.State.RUNNING, statuses[2].state)
+
+    @timeout_decorator.timeout(5)
+    def test_queue_many_with_spaces_and_excludes(self):
+        self.lftp.rate_limit = 10  # so jobs don't finish right away
+        errors = self.lftp.queue_many([LftpQueueItem("d d", False), LftpQueueItem("e e", True, ["*.nfo"])])
+        self.assertEqual([None, None], errors)
+        while True:
+            statuses = self.lftp.status()
+            self.lftp.raise_pending_error()
+            if len(statuses) > 1:
+                break
+        self.assertEqual({"d d", "e e"}, {status.name for status in statuses})
+
+    @timeout_decorator.timeout(5)
+    def test_queue_many_missing_file(self):
+        """check that a failing item of a batch leaves lftp in step with its commands"""
+        self.lftp.rate_limit = 10  # so jobs don't finish right away
+        self.lftp.queue_many([LftpQueueItem("non-existing-file", False), LftpQueueItem("c", False)])
+        # wait for the missing file to fail
+        error = None
+        while error is None:
+            self.lftp.status()
+            try:
+                self.lftp.raise_pending_error()
+            except LftpError as e:
+                error = e
+        self.assertTrue("No such file" in str(error))
+        # the next status still reads the status of the other item
+        statuses = self.lftp.status()
+        self.assertEqual(["c"], [status.name for status in statuses])
+        self.assertEqual(LftpJobStatus.State.RUNNING, statuses[0].state)
+
     @timeout_decorator.timeout(5)
     def test_kill_all(self):
         self.lftp.num_parallel_jobs = 2
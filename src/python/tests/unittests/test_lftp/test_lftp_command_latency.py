@@ -0,0 +1,82 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+import pexpect
+
+from lftp import Lftp, LftpError
+
+_PROMPT = b"lftp someone@localhost:~> "
+
+
+class TestLftpCommandLatency(unittest.TestCase):
+    """Unit tests for waiting on lftp's prompt and timing each command.
+
+    These tests replace the lftp process with a mock, so that no LFTP process
+    or SSH connection is needed.
+    """
+
+    def setUp(self):
+        with patch.object(Lftp, "_Lftp__spawn_process"):
+            self.lftp = Lftp(address="localhost", port=22, user="someone", password=None)
+        self.process = MagicMock()
+        self.process.isalive.return_value = True
+        self.process.before = b"jobs -v\r\n"
+        self.process.after = _PROMPT
+        self.lftp._Lftp__process = self.process
+
+        monotonic_patcher = patch("lftp.lftp.time.monotonic")
+        self.mock_monotonic = monotonic_patcher.start()
+        self.addCleanup(monotonic_patcher.stop)
+
+    def __run(self, start: float, end: float):
+        self.mock_monotonic.side_effect = [start, end]
+        self.lftp._Lftp__run_command("jobs -v")
+
+    def test_waits_for_prompt_in_bounded_window(self):
+        self.__run(1.0, 1.0)
+        self.process.expect.assert_called_once_with(
+            "lftp someone@localhost:.*>", timeout=10, searchwindowsize=Lftp._PROMPT_SEARCH_WINDOW
+        )
+
+    def test_no_latency_before_first_command(self):
+        self.assertIsNone(self.lftp.command_latency)
+
+    def test_latency(self):
+        self.__run(1.0, 1.010)
+        self.__run(2.0, 2.030)
+        self.__run(3.0, 3.020)
+        latency = self.lftp.command_latency
+        assert latency is not None
+        self.assertEqual(3, latency.num_commands)
+        self.assertAlmostEqual(20.0, latency.last_ms)
+        self.assertAlmostEqual(20.0, latency.average_ms)
+        self.assertAlmostEqual(30.0, latency.max_ms)
+
+    def test_latency_covers_recent_commands(self):
+        self.__run(0.0, 1.0)
+        for _ in range(Lftp._LATENCY_WINDOW):
+            self.__run(0.0, 0.010)
+        latency = self.lftp.command_latency
+        assert latency is not None
+        self.assertEqual(Lftp._LATENCY_WINDOW + 1, latency.num_commands)
+        self.assertAlmostEqual(10.0, latency.average_ms)
+        self.assertAlmostEqual(10.0, latency.max_ms)
+
+    def test_error_reads_next_prompt(self):
+        outputs = iter([b"pget: Access failed: No such file (/remote/a)\r\n", b"\r\n"])
+
+        def expect(*args, **kwargs):
+            self.process.before = next(outputs)
+
+        self.process.expect.side_effect = expect
+        self.mock_monotonic.return_value = 1.0
+        self.lftp._Lftp__run_command('queue \'pget -c "/remote/a" -o "/local/"\'')
+        self.assertEqual(2, self.process.expect.call_count)
+        with self.assertRaises(LftpError):
+            self.lftp.raise_pending_error()
+
+    def test_timeout_not_timed(self):
+        self.mock_monotonic.return_value = 1.0
+        self.process.expect.side_effect = pexpect.exceptions.TIMEOUT("timeout")
+        self.assertEqual("", self.lftp._Lftp__run_command("jobs -v"))
+        self.assertIsNone(self.lftp.command_latency)
@@ -0,0 +1,92 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from lftp import Lftp
+
+_IDLE_OUTPUT = "jobs -v"
+_BUSY_OUTPUT = """jobs -v
+[1] pget -c /remote/path/c -o /local/path/
+sftp://someone:@localhost/remote/path
+`/remote/path/c' at 0 (0%) [Connecting...]
+"""
+
+
+class TestLftpIdleStatus(unittest.TestCase):
+    """Unit tests for skipping the 'jobs -v' round trip while lftp has no jobs.
+
+    These tests mock __run_command so that no LFTP process or SSH connection
+    is needed.
+    """
+
+    def setUp(self):
+        with patch.object(Lftp, "_Lftp__spawn_process"):
+            self.lftp = Lftp(address="localhost", port=22, user="someone", password=None)
+        self.run_command = MagicMock(return_value=_IDLE_OUTPUT)
+        self.lftp._Lftp__run_command = self.run_command
+
+        monotonic_patcher = patch("lftp.lftp.time.monotonic")
+        self.mock_monotonic = monotonic_patcher.start()
+        self.addCleanup(monotonic_patcher.stop)
+        self.mock_monotonic.return_value = 100.0
+
+    def __jobs_v_calls(self) -> int:
+        return sum(1 for c in self.run_command.call_args_list if c.args[0] == "jobs -v")
+
+    def test_idle_status_skips_round_trip(self):
+        # First status always asks lftp
+        self.assertEqual([], self.lftp.status())
+        self.assertEqual(1, self.__jobs_v_calls())
+        for _ in range(10):
+            self.assertEqual([], self.lftp.status())
+        self.assertEqual(1, self.__jobs_v_calls())
+
+    def test_idle_status_resyncs_periodically(self):
+        self.lftp.status()
+        self.mock_monotonic.return_value = 100.0 + Lftp._IDLE_STATUS_INTERVAL_IN_SECS - 1
+        self.lftp.status()
+        self.assertEqual(1, self.__jobs_v_calls())
+
+        # lftp has jobs we didn't queue
+        self.run_command.return_value = _BUSY_OUTPUT
+        self.mock_monotonic.return_value = 100.0 + Lftp._IDLE_STATUS_INTERVAL_IN_SECS
+        statuses = self.lftp.status()
+        self.assertEqual(["c"], [s.name for s in statuses])
+        self.lftp.status()
+        self.assertEqual(3, self.__jobs_v_calls())
+
+    def test_queue_resumes_polling(self):
+        self.lftp.status()
+        self.lftp.queue("c", False)
+        self.run_command.return_value = _BUSY_OUTPUT
+        self.assertEqual(1, len(self.lftp.status()))
+        self.assertEqual(1, len(self.lftp.status()))
+        self.assertEqual(3, self.__jobs_v_calls())
+
+        # Job finishes, back to idle
+        self.run_command.return_value = _IDLE_OUTPUT
+        self.assertEqual([], self.lftp.status())
+        self.lftp.status()
+        self.assertEqual(4, self.__jobs_v_calls())
+
+    def test_kill_all_goes_idle(self):
+        self.lftp.queue("c", False)
+        self.lftp.kill_all()
+        self.assertEqual([], self.lftp.status())
+        self.assertEqual(0, self.__jobs_v_calls())
+
+    def test_timeout_is_not_idle(self):
+        self.lftp.queue("c", False)
+        # A timed out command returns no output
+        self.run_command.return_value = ""
+        self.assertEqual([], self.lftp.status())
+        self.lftp.status()
+        self.assertEqual(2, self.__jobs_v_calls())
+
+    def test_parse_error_is_not_idle(self):
+        self.lftp.status()
+        self.lftp.queue("c", False)
+        self.run_command.return_value = "jobs -v\nsomething unexpected"
+        self.assertIsNone(self.lftp.status())
+        self.run_command.return_value = _IDLE_OUTPUT
+        self.assertEqual([], self.lftp.status())
+        self.assertEqual(3, self.__jobs_v_calls())
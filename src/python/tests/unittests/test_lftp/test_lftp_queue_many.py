@@ -0,0 +1,111 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from lftp import Lftp, LftpError, LftpQueueItem
+
+_MARKER = Lftp._QUEUE_ITEM_MARKER
+
+
+class TestLftpQueueMany(unittest.TestCase):
+    """Unit tests for sending several queue commands to lftp at once.
+
+    These tests mock __run_command so that no LFTP process or SSH connection
+    is needed.
+    """
+
+    def setUp(self):
+        with patch.object(Lftp, "_Lftp__spawn_process"):
+            self.lftp = Lftp(address="localhost", port=22, user="someone", password=None)
+        self.lftp.set_base_remote_dir_path("/remote/path")
+        self.lftp.set_base_local_dir_path("/local/path")
+        self.run_command = MagicMock(side_effect=self.__echo)
+        self.lftp._Lftp__run_command = self.run_command
+        self.read_error_prompt = MagicMock(return_value="")
+        self.lftp._Lftp__read_error_prompt = self.read_error_prompt
+
+    @staticmethod
+    def __echo(line: str, **kwargs) -> str:
+        # lftp echoes the line, then each command's marker
+        return "\n".join([line] + [_MARKER] * line.count(f"echo {_MARKER}"))
+
+    def test_single_submission(self):
+        errors = self.lftp.queue_many(
+            [
+                LftpQueueItem("a", False),
+                LftpQueueItem("b", True, exclude_patterns=["*.nfo"], remote_dir_path="/other", local_dir_path="/l"),
+            ]
+        )
+        self.assertEqual([None, None], errors)
+        self.run_command.assert_called_once()
+        line = self.run_command.call_args.args[0]
+        self.assertFalse(self.run_command.call_args.kwargs["detect_errors"])
+        commands = line.split(f"; echo {_MARKER}")
+        self.assertEqual(3, len(commands))
+        self.assertIn("pget", commands[0])
+        self.assertIn('"/remote/path/a" -o "/local/path/"', commands[0])
+        self.assertIn('mirror -c --exclude-glob "*.nfo" "/other/b"', commands[1])
+        self.assertEqual("", commands[2])
+
+    def test_matches_queue(self):
+        self.lftp.queue("a", True, exclude_patterns=["*.nfo"])
+        command = self.run_command.call_args.args[0]
+        self.lftp.queue_many([LftpQueueItem("a", True, exclude_patterns=["*.nfo"])])
+        self.assertEqual(f"{command}; echo {_MARKER}", self.run_command.call_args.args[0])
+
+    def test_errors_per_item(self):
+        self.run_command.side_effect = lambda line, **kwargs: "\n".join(
+            [line, _MARKER, "mirror: Access failed: No such file (/remote/path/b)", _MARKER, _MARKER]
+        )
+        errors = self.lftp.queue_many([LftpQueueItem("a", False), LftpQueueItem("b", True), LftpQueueItem("c", False)])
+        self.assertIsNone(errors[0])
+        self.assertEqual("mirror: Access failed: No such file (/remote/path/b)", str(errors[1]))
+        self.assertIsNone(errors[2])
+        # The prompt lftp prints again after the error is read
+        self.read_error_prompt.assert_called_once_with()
+        self.lftp.raise_pending_error()
+
+    def test_errors_of_other_jobs_are_pending(self):
+        # An earlier job's error, printed while the batch was being queued
+        self.run_command.side_effect = lambda line, **kwargs: "\n".join(
+            [line, "pget: Access failed: No such file (/remote/path/old)", _MARKER, _MARKER]
+        )
+        errors = self.lftp.queue_many([LftpQueueItem("a", False), LftpQueueItem("b", False)])
+        self.assertEqual([None, None], errors)
+        self.read_error_prompt.assert_called_once_with()
+        with self.assertRaises(LftpError) as ctx:
+            self.lftp.raise_pending_error()
+        self.assertIn("/remote/path/old", str(ctx.exception))
+
+    def test_error_prompt_timeout(self):
+        self.read_error_prompt.return_value = None
+        self.run_command.side_effect = lambda line, **kwargs: "\n".join(
+            [line, "pget: Access failed (/remote/path/a)", _MARKER, "mirror: Access failed (/remote/path/b)", _MARKER]
+        )
+        errors = self.lftp.queue_many([LftpQueueItem("a", False), LftpQueueItem("b", True)])
+        self.assertEqual(
+            ["pget: Access failed (/remote/path/a)", "mirror: Access failed (/remote/path/b)"], [str(e) for e in errors]
+        )
+        # No more waiting on prompts once lftp timed out on one
+        self.read_error_prompt.assert_called_once_with()
+
+    def test_timeout_fails_unconfirmed_items(self):
+        self.run_command.side_effect = lambda line, **kwargs: ""
+        errors = self.lftp.queue_many([LftpQueueItem("a", False), LftpQueueItem("b", False)])
+        self.assertEqual(
+            ["lftp did not confirm queueing 'a'", "lftp did not confirm queueing 'b'"], [str(e) for e in errors]
+        )
+
+    def test_items_past_last_marker_fail(self):
+        self.run_command.side_effect = lambda line, **kwargs: "\n".join([line, _MARKER])
+        errors = self.lftp.queue_many([LftpQueueItem("a", False), LftpQueueItem("b", False)])
+        self.assertIsNone(errors[0])
+        self.assertEqual("lftp did not confirm queueing 'b'", str(errors[1]))
+
+    def test_long_batches_split(self):
+        items = [LftpQueueItem("x" * 100 + str(index), False) for index in range(100)]
+        errors = self.lftp.queue_many(items)
+        self.assertEqual([None] * 100, errors)
+        self.assertGreater(self.run_command.call_count, 1)
+        lines = [c.args[0] for c in self.run_command.call_args_list]
+        self.assertTrue(all(len(line) <= Lftp._MAX_QUEUE_LINE_LENGTH for line in lines))
+        self.assertEqual(100, sum(line.count(f"echo {_MARKER}") for line in lines))
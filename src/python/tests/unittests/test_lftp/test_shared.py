@@ -0,0 +1,315 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+from lftp import Lftp, LftpError, LftpJobStatus, LftpQueueItem, SharedLftp, SharedLftpQueueItem
+from ssh import Sshcp
+
+
+def _job(job_id: int, name: str, remote_path: str | None, local_path: str | None) -> LftpJobStatus:
+    return LftpJobStatus(
+        job_id=job_id,
+        job_type=LftpJobStatus.Type.PGET,
+        state=LftpJobStatus.State.QUEUED,
+        name=name,
+        flags="-c",
+        remote_path=remote_path,
+        local_path=local_path,
+    )
+
+
+class TestSharedLftp(unittest.TestCase):
+    """Unit tests for sharing one lftp instance between path pairs.
+
+    The Lftp is a mock, so no LFTP process or SSH connection is needed.
+    """
+
+    def setUp(self):
+        self.lftp = MagicMock(spec=Lftp)
+        self.lftp.status.return_value = []
+        self.shared = SharedLftp(self.lftp)
+        self.tv = self.shared.client("/remote/tv", "/local/tv")
+        self.movies = self.shared.client("/remote/movies/", "/local/movies")
+
+        patcher = patch("lftp.shared.time.monotonic")
+        self.mock_time = patcher.start()
+        self.mock_time.return_value = 100.0
+        self.addCleanup(patcher.stop)
+
+    def test_queue_uses_client_dirs(self):
+        self.tv.queue("a", False)
+        self.movies.queue("b", True, exclude_patterns=["*.nfo"])
+        self.lftp.queue.assert_any_call(
+            "a", False, exclude_patterns=None, remote_dir_path="/remote/tv", local_dir_path="/local/tv"
+        )
+        self.lftp.queue.assert_any_call(
+            "b", True, exclude_patterns=["*.nfo"], remote_dir_path="/remote/movies/", local_dir_path="/local/movies"
+        )
+
+    def test_queue_many_uses_client_dirs(self):
+        self.lftp.queue_many.return_value = [None, LftpError("mirror: Access failed")]
+        errors = self.tv.queue_many([SharedLftpQueueItem("a", False), SharedLftpQueueItem("b", True, ["*.nfo"])])
+        self.lftp.queue_many.assert_called_once_with(
+            [
+                LftpQueueItem("a", False, None, remote_dir_path="/remote/tv", local_dir_path="/local/tv"),
+                LftpQueueItem("b", True, ["*.nfo"], remote_dir_path="/remote/tv", local_dir_path="/local/tv"),
+            ]
+        )
+        self.assertIsNone(errors[0])
+        self.assertEqual("mirror: Access failed", str(errors[1]))
+
+    def test_status_routed_by_paths(self):
+        a = _job(1, "a", "/remote/tv/a", "/local/tv/")
+        b = _job(2, "b", "/remote/movies/b", "/local/movies//")
+        self.lftp.status.return_value = [a, b]
+        self.assertEqual([a], self.tv.status())
+        self.assertEqual([b], self.movies.status())
+
+    def test_status_routed_by_local_path_when_remote_dir_is_shared(self):
+        other = self.shared.client("/remote/tv", "/staging/tv")
+        a = _job(1, "a", "/remote/tv/a", "/local/tv/")
+        b = _job(2, "b", "/remote/tv/b", "/staging/tv/")
+        self.lftp.status.return_value = [a, b]
+        self.assertEqual([a], self.tv.status())
+        self.assertEqual([b], other.status())
+
+    def test_status_of_unmatched_job_goes_to_client_that_queued_it(self):
+        self.movies.queue("a b", False)
+        # Unquoted path with spaces, split in the wrong place
+        a = _job(1, "a b", "/remote/movies/a", "b /local/movies/")
+        self.lftp.status.return_value = [a]
+        self.assertEqual([], self.tv.status())
+        self.assertEqual([a], self.movies.status())
+
+    def test_status_of_same_name_from_two_clients(self):
+        self.tv.queue("a b", False)
+        self.movies.queue("a b", False)
+        tv_job = _job(1, "a b", "/remote/tv/a", "b /local/tv/")
+        movies_job = _job(2, "a b", "/remote/movies/a", "b /local/movies/")
+        self.lftp.status.return_value = [tv_job, movies_job]
+        self.assertEqual([tv_job], self.tv.status())
+        self.assertEqual([movies_job], self.movies.status())
+
+    def test_status_of_unknown_job_is_dropped(self):
+        self.lftp.status.return_value = [_job(1, "x", "/remote/other/x", "/local/other/")]
+        self.assertEqual([], self.tv.status())
+        self.assertEqual([], self.movies.status())
+
+    def test_status_of_single_client_gets_all_jobs(self):
+        shared = SharedLftp(self.lftp)
+        client = shared.client("/remote/tv", "/local/tv")
+        x = _job(1, "x", "/remote/other/x", "/local/other/")
+        self.lftp.status.return_value = [x]
+        self.assertEqual([x], client.status())
+
+    def test_status_unavailable(self):
+        self.lftp.status.return_value = None
+        self.assertIsNone(self.tv.status())
+        self.assertIsNone(self.movies.status())
+
+    def test_status_shared_between_clients(self):
+        self.tv.status()
+        self.movies.status()
+        self.assertEqual(1, self.lftp.status.call_count)
+        self.mock_time.return_value += SharedLftp._STATUS_MAX_AGE_IN_SECS
+        self.tv.status()
+        self.assertEqual(2, self.lftp.status.call_count)
+
+    def test_queue_refreshes_status(self):
+        self.tv.status()
+        self.movies.queue("b", False)
+        self.tv.status()
+        self.assertEqual(2, self.lftp.status.call_count)
+
+    def test_kill_only_own_job(self):
+        a = _job(1, "a", "/remote/tv/a", "/local/tv/")
+        self.lftp.status.return_value = [a]
+        self.assertFalse(self.movies.kill("a"))
+        self.lftp.kill_job.assert_not_called()
+        self.assertTrue(self.tv.kill("a"))
+        self.lftp.kill_job.assert_called_once_with(a)
+
+    def test_pending_error_routed_to_client_of_its_dir(self):
+        self.lftp.raise_pending_error.side_effect = [LftpError("mirror: Access failed: /remote/movies/b"), None]
+        self.tv.raise_pending_error()
+        with self.assertRaises(LftpError) as context:
+            self.movies.raise_pending_error()
+        self.assertIn("/remote/movies/b", str(context.exception))
+        # Raised only once
+        self.lftp.raise_pending_error.side_effect = None
+        self.movies.raise_pending_error()
+
+    def test_pending_error_not_routed_by_dir_prefix(self):
+        self.lftp.raise_pending_error.side_effect = LftpError("mirror: Access failed: /remote/tv2/b")
+        # Mentions neither client's directory, so it goes to the first to ask
+        with self.assertRaises(LftpError):
+            self.movies.raise_pending_error()
+        tv2 = self.shared.client("/remote/tv2", "/local/tv2")
+        self.tv.raise_pending_error()
+        with self.assertRaises(LftpError):
+            tv2.raise_pending_error()
+
+    def test_pending_error_without_dir_goes_to_first_client_to_ask(self):
+        self.lftp.raise_pending_error.side_effect = LftpError("Login failed")
+        with self.assertRaises(LftpError):
+            self.tv.raise_pending_error()
+        self.lftp.raise_pending_error.side_effect = None
+        self.movies.raise_pending_error()
+
+    def test_exit_kills_own_jobs_until_last_client(self):
+        a = _job(1, "a", "/remote/tv/a", "/local/tv/")
+        b = _job(2, "b", "/remote/movies/b", "/local/movies/")
+        self.lftp.status.return_value = [a, b]
+        self.tv.exit()
+        self.lftp.kill_job.assert_called_once_with(a)
+        self.lftp.exit.assert_not_called()
+        self.assertEqual(1, self.shared.num_clients)
+        self.movies.exit()
+        self.lftp.exit.assert_called_once_with()
+        self.assertEqual(0, self.shared.num_clients)
+
+    def test_queued_jobs_with_owners(self):
+        a = _job(1, "a", "/remote/tv/a", "/local/tv/")
+        b = _job(2, "b", "/remote/movies/b", "/local/movies/")
+        running = LftpJobStatus(
+            job_id=3, job_type=LftpJobStatus.Type.PGET, state=LftpJobStatus.State.RUNNING, name="c", flags="-c"
+        )
+        self.lftp.status.return_value = [running, a, b]
+        self.tv.status()
+        self.assertEqual([(self.tv, a), (self.movies, b)], self.shared.queued_jobs())
+
+    def test_queued_jobs_reuse_last_status(self):
+        a = _job(1, "a", "/remote/tv/a", "/local/tv/")
+        self.assertEqual([], self.shared.queued_jobs())
+        self.lftp.status.return_value = [a]
+        self.tv.status()
+        self.mock_time.return_value += 10
+        self.assertEqual([(self.tv, a)], self.shared.queued_jobs())
+        self.assertEqual(1, self.lftp.status.call_count)
+        # Queueing changes the queue, the jobs are unknown until the next status read
+        self.tv.queue("b", False)
+        self.assertEqual([], self.shared.queued_jobs())
+
+    def test_reorder_queue(self):
+        a = _job(1, "a", "/remote/tv/a", "/local/tv/")
+        b = _job(2, "b", "/remote/movies/b", "/local/movies/")
+        c = _job(3, "c", "/remote/tv/c", "/local/tv/")
+        self.lftp.status.return_value = [a, b, c]
+        self.tv.status()
+        self.shared.reorder_queue([c, a, b])
+        self.lftp.move_queued.assert_called_once_with(3, 1)
+        self.assertEqual(1, self.lftp.status.call_count)
+        # Status is read again after moving
+        self.assertEqual([], self.shared.queued_jobs())
+        self.tv.status()
+        self.assertEqual(2, self.lftp.status.call_count)
+
+    def test_reorder_queue_already_in_order(self):
+        a = _job(1, "a", "/remote/tv/a", "/local/tv/")
+        b = _job(2, "b", "/remote/movies/b", "/local/movies/")
+        self.lftp.status.return_value = [a, b]
+        self.tv.status()
+        self.shared.reorder_queue([a, b])
+        self.lftp.move_queued.assert_not_called()
+
+
+class TestSharedLftpBundles(unittest.TestCase):
+    """Unit tests for downloading directories as bundles next to the lftp jobs.
+
+    The ssh command is left out, so the bundles run tar on local directories.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp(prefix="test_shared_bundles")
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        self.remote_dir = os.path.join(self.temp_dir, "remote")
+        os.makedirs(os.path.join(self.remote_dir, "album"))
+        with open(os.path.join(self.remote_dir, "album", "cover.jpg"), "wb") as f:
+            f.write(b"x" * 100)
+
+        self.lftp = MagicMock(spec=Lftp)
+        self.lftp.status.return_value = []
+        self.ssh = MagicMock(spec=Sshcp)
+        self.ssh.shell_command_line.side_effect = lambda command: command
+        self.shared = SharedLftp(self.lftp, ssh=self.ssh)
+        self.client = self.shared.client(self.remote_dir, os.path.join(self.temp_dir, "local"))
+
+    def _wait_for_bundles(self) -> list[LftpJobStatus]:
+        deadline = time.monotonic() + 10
+        while any(job.id < 0 for job in self.client.status() or []):
+            if time.monotonic() > deadline:
+                raise AssertionError("Bundles did not finish")
+            time.sleep(0.05)
+        return self.client.status() or []
+
+    def test_bundle_runs_next_to_lftp(self):
+        # The source waits on a fifo, so the bundle is still running until the test releases it
+        gate = os.path.join(self.temp_dir, "gate")
+        os.mkfifo(gate)
+        self.ssh.shell_command_line.side_effect = lambda command: f"cat {gate} > /dev/null; {command}"
+        self.addCleanup(self.client.kill, "album")
+        self.client.queue("album", True, bundle=True, size=100)
+        self.lftp.queue.assert_not_called()
+        statuses = self.client.status()
+        self.assertEqual(["album"], [job.name for job in statuses])
+        self.assertEqual(LftpJobStatus.State.RUNNING, statuses[0].state)
+        with open(gate, "w"):
+            pass
+        self.assertEqual([], self._wait_for_bundles())
+        self.assertTrue(os.path.isfile(os.path.join(self.temp_dir, "local", "album", "cover.jpg")))
+        self.lftp.queue.assert_not_called()
+
+    def test_failed_bundle_falls_back_to_lftp(self):
+        self.client.queue("missing", True, exclude_patterns=["*.nfo"], bundle=True)
+        self._wait_for_bundles()
+        self.lftp.queue.assert_called_once_with(
+            "missing",
+            True,
+            exclude_patterns=["*.nfo"],
+            remote_dir_path=self.remote_dir,
+            local_dir_path=os.path.join(self.temp_dir, "local"),
+        )
+
+    def test_queue_many_bundles_apart_from_lftp(self):
+        self.lftp.queue_many.return_value = [None]
+        errors = self.client.queue_many(
+            [SharedLftpQueueItem("album", True, bundle=True, size=100), SharedLftpQueueItem("file", False, bundle=True)]
+        )
+        self.assertEqual([None, None], errors)
+        (item,) = self.lftp.queue_many.call_args.args[0]
+        self.assertEqual("file", item.name)
+        self.assertEqual([], self._wait_for_bundles())
+        self.assertTrue(os.path.isfile(os.path.join(self.temp_dir, "local", "album", "cover.jpg")))
+
+    def test_no_bundle_while_rate_limited_or_without_ssh(self):
+        self.shared.rate_limited = True
+        self.client.queue("album", True, bundle=True)
+        self.assertEqual(1, self.lftp.queue.call_count)
+        shared = SharedLftp(self.lftp)
+        shared.client(self.remote_dir, self.temp_dir).queue("album", True, bundle=True)
+        self.assertEqual(2, self.lftp.queue.call_count)
+        self.client.queue("file", False, bundle=True)
+        self.assertEqual(3, self.lftp.queue.call_count)
+
+    def test_bundles_wait_for_a_slot(self):
+        self.ssh.shell_command_line.side_effect = lambda command: "sleep 10"
+        self.shared.max_bundles = 1
+        self.client.queue("a", True, bundle=True)
+        self.client.queue("b", True, bundle=True)
+        states = {job.name: job.state for job in self.client.status()}
+        self.assertEqual({"a": LftpJobStatus.State.RUNNING, "b": LftpJobStatus.State.QUEUED}, states)
+        self.assertEqual([], self.shared.queued_jobs())
+        self.assertTrue(self.client.kill("a"))
+        states = {job.name: job.state for job in self.client.status()}
+        self.assertEqual({"b": LftpJobStatus.State.RUNNING}, states)
+        self.client.exit()
+
+    def test_kill_bundle(self):
+        self.ssh.shell_command_line.side_effect = lambda command: "sleep 10"
+        self.client.queue("album", True, bundle=True)
+        self.assertTrue(self.client.kill("album"))
+        self.assertEqual([], self.client.status())
+        self.lftp.kill_job.assert_not_called()
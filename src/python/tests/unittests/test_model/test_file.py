@@ -101,6 +101,53 @@ class TestModelFile(unittest.TestCase):
         with self.assertRaises(ValueError):
             file.eta = -100
 
+    def test_eta_band(self):
+        file = ModelFile("test", False)
+
+        file.eta_low = 80
+        file.eta_high = 120
+        self.assertEqual(80, file.eta_low)
+        self.assertEqual(120, file.eta_high)
+        file.eta_low = None
+        file.eta_high = None
+        self.assertEqual(None, file.eta_low)
+        self.assertEqual(None, file.eta_high)
+
+        with self.assertRaises(TypeError):
+            file.eta_low = "BadValue"
+        with self.assertRaises(ValueError):
+            file.eta_low = -100
+        with self.assertRaises(TypeError):
+            file.eta_high = 1.5
+        with self.assertRaises(ValueError):
+            file.eta_high = -100
+
+    def test_throughput(self):
+        file = ModelFile("test", False)
+
+        file.throughput = 100
+        self.assertEqual(100, file.throughput)
+        file.throughput = None
+        self.assertEqual(None, file.throughput)
+
+        with self.assertRaises(TypeError):
+            file.throughput = "BadValue"
+        with self.assertRaises(ValueError):
+            file.throughput = -100
+
+    def test_priority(self):
+        file = ModelFile("test", False)
+        self.assertEqual(0, file.priority)
+        file.priority = 5
+        self.assertEqual(5, file.priority)
+        file.priority = -3
+        self.assertEqual(-3, file.priority)
+
+        with self.assertRaises(TypeError):
+            file.priority = None
+        with self.assertRaises(TypeError):
+            file.priority = 1.5
+
     def test_is_extractable(self):
         file = ModelFile("test", True)
         file.is_extractable = True
@@ -253,3 +300,58 @@ class TestModelFile(unittest.TestCase):
         self.assertIsNone(a.parent)
         self.assertEqual(a, aa.parent)
         self.assertEqual(aa, aaa.parent)
+
+    def test_freeze(self):
+        a = ModelFile("a", True)
+        aa = ModelFile("aa", False)
+        a.add_child(aa)
+        self.assertFalse(a.is_frozen)
+        a.freeze()
+        self.assertTrue(a.is_frozen)
+        self.assertTrue(aa.is_frozen)
+        with self.assertRaises(AttributeError):
+            a.state = ModelFile.State.DOWNLOADED
+        with self.assertRaises(AttributeError):
+            aa.local_size = 100
+        with self.assertRaises(AttributeError):
+            a.add_child(ModelFile("ab", False))
+        self.assertEqual(ModelFile.State.DEFAULT, a.state)
+        self.assertIsNone(aa.local_size)
+
+    def test_frozen_child_cannot_be_added(self):
+        aa = ModelFile("aa", False)
+        aa.freeze()
+        a = ModelFile("a", True)
+        with self.assertRaises(AttributeError):
+            a.add_child(aa)
+        self.assertIsNone(aa.parent)
+        self.assertEqual("aa", aa.full_path)
+        self.assertEqual([], a.get_children())
+
+    def test_freeze_ignored_in_equality(self):
+        a1 = ModelFile("a", False)
+        a2 = ModelFile("a", False)
+        a1.freeze()
+        self.assertEqual(a1, a2)
+
+    def test_full_path_of_subtree_attached_later(self):
+        aa = ModelFile("aa", True)
+        aaa = ModelFile("aaa", False)
+        aa.add_child(aaa)
+        self.assertEqual("aa/aaa", aaa.full_path)
+        a = ModelFile("a", True)
+        a.add_child(aa)
+        self.assertEqual("a/aa", aa.full_path)
+        self.assertEqual("a/aa/aaa", aaa.full_path)
+
+    def test_get_child(self):
+        a = ModelFile("a", True)
+        aa = ModelFile("aa", False)
+        a.add_child(aa)
+        self.assertIs(aa, a.get_child("aa"))
+        self.assertIsNone(a.get_child("ab"))
+
+    def test_full_path_ignored_in_equality(self):
+        a = ModelFile("a", True)
+        a.add_child(ModelFile("aa", False))
+        self.assertEqual(ModelFile("aa", False), a.get_child("aa"))
@@ -6,7 +6,7 @@ import unittest
 from unittest.mock import MagicMock
 
 from common import overrides
-from model import IModelListener, Model, ModelError, ModelFile
+from model import ANY_PAIR, IModelListener, Model, ModelError, ModelFile
 
 
 class DummyModelListener(IModelListener):
@@ -138,3 +138,68 @@ class TestLftpModel(unittest.TestCase):
         self.model.update_file(new_file)
         # noinspection PyUnresolvedReferences
         listener.file_updated.assert_called_once_with(old_file, new_file)
+
+    def _add(self, name, state=ModelFile.State.DEFAULT, pair_id=None, is_extractable=False):
+        file = ModelFile(name, False, pair_id=pair_id)
+        file.state = state
+        file.is_extractable = is_extractable
+        self.model.add_file(file)
+        return file
+
+    def test_query_by_state(self):
+        self._add("a", ModelFile.State.DELETED)
+        self._add("b", ModelFile.State.QUEUED)
+        self._add("c", ModelFile.State.DELETED)
+        names = {f.name for f in self.model.query(states=[ModelFile.State.DELETED])}
+        self.assertEqual({"a", "c"}, names)
+        names = {f.name for f in self.model.query(states=[ModelFile.State.DELETED, ModelFile.State.QUEUED])}
+        self.assertEqual({"a", "b", "c"}, names)
+        self.assertEqual([], self.model.query(states=[ModelFile.State.EXTRACTING]))
+
+    def test_query_combined_criteria(self):
+        self._add("a", ModelFile.State.DOWNLOADED, pair_id="p1", is_extractable=True)
+        self._add("b", ModelFile.State.DOWNLOADED, pair_id="p2", is_extractable=True)
+        self._add("c", ModelFile.State.DOWNLOADED, pair_id="p1", is_extractable=False)
+        self._add("d", ModelFile.State.QUEUED, pair_id="p1", is_extractable=True)
+        result = self.model.query(states=[ModelFile.State.DOWNLOADED], pair_id="p1", is_extractable=True)
+        self.assertEqual(["a"], [f.name for f in result])
+        result = self.model.query(pair_id="p1", is_extractable=False)
+        self.assertEqual(["c"], [f.name for f in result])
+
+    def test_query_no_criteria_returns_all(self):
+        self._add("a")
+        self._add("b", pair_id="p1")
+        self.assertEqual({"a", "b"}, {f.name for f in self.model.query()})
+
+    def test_query_default_pair(self):
+        self._add("a")
+        self._add("b", pair_id="p1")
+        self.assertEqual(["a"], [f.name for f in self.model.query(pair_id=None)])
+        self.assertEqual({"a", "b"}, {f.name for f in self.model.query(pair_id=ANY_PAIR)})
+
+    def test_query_by_name_prefix(self):
+        self._add("Show.S01E01")
+        self._add("Show.S01E02", pair_id="p1")
+        self._add("Shows")
+        self._add("Movie")
+        names = {f.name for f in self.model.query(name_prefix="Show.")}
+        self.assertEqual({"Show.S01E01", "Show.S01E02"}, names)
+        self._add("Show.S01E03")
+        names = {f.name for f in self.model.query(name_prefix="Show.", pair_id="p1")}
+        self.assertEqual({"Show.S01E02"}, names)
+        self.assertEqual(3, len(self.model.query(name_prefix="Show.")))
+
+    def test_query_indexes_follow_update_and_remove(self):
+        self._add("a", ModelFile.State.QUEUED, pair_id="p1")
+        updated = ModelFile("a", False, pair_id="p1")
+        updated.state = ModelFile.State.DOWNLOADED
+        updated.is_extractable = True
+        self.model.update_file(updated)
+        self.assertEqual([], self.model.query(states=[ModelFile.State.QUEUED]))
+        self.assertEqual([updated], self.model.query(states=[ModelFile.State.DOWNLOADED]))
+        self.assertEqual([updated], self.model.query(is_extractable=True))
+        self.model.remove_file("a", pair_id="p1")
+        self.assertEqual([], self.model.query(states=[ModelFile.State.DOWNLOADED]))
+        self.assertEqual([], self.model.query(pair_id="p1"))
+        self.assertEqual([], self.model.query(is_extractable=True))
+        self.assertEqual([], self.model.query(name_prefix="a"))
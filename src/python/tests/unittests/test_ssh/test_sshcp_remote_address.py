@@ -17,3 +17,10 @@ class TestSshcpRemoteAddress(unittest.TestCase):
     def test_remote_address_default_user(self):
         sshcp = Sshcp(host="example.com", port=22)
         self.assertEqual("example.com", sshcp._remote_address())
+
+    def test_shell_command_line(self):
+        sshcp = Sshcp(host="example.com", port=2222, user="alice", password="pass")
+        command_line = sshcp.shell_command_line("tar -cf - 'a b'")
+        self.assertTrue(command_line.startswith("ssh -p 2222 "))
+        self.assertIn("-o PubkeyAuthentication=no", command_line)
+        self.assertTrue(command_line.endswith("alice@example.com 'tar -cf - '\"'\"'a b'\"'\"''"))
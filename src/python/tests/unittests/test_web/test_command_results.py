@@ -0,0 +1,84 @@
+# Copyright 2017, Inderpreet Singh, All rights reserved.
+
+import unittest
+from unittest.mock import MagicMock, patch
+
+from web.command_results import CommandResult, CommandResultStore
+
+
+class TestCommandResultStore(unittest.TestCase):
+    def test_create_and_complete(self):
+        store = CommandResultStore()
+        listener = MagicMock()
+        store.add_listener(listener)
+
+        ok = store.create("queue", "a", "p1")
+        failed = store.create("stop", "b", None)
+        self.assertNotEqual(ok.command_id, failed.command_id)
+        self.assertEqual(CommandResult.State.PENDING, store.get(ok.command_id).state)
+
+        store.complete(ok.command_id)
+        store.complete(failed.command_id, error="File 'b' is not Queued or Downloading")
+        self.assertEqual(
+            CommandResult(ok.command_id, "queue", "a", "p1", CommandResult.State.SUCCEEDED, None),
+            store.get(ok.command_id),
+        )
+        failed_result = store.get(failed.command_id)
+        self.assertEqual(CommandResult.State.FAILED, failed_result.state)
+        self.assertEqual("File 'b' is not Queued or Downloading", failed_result.error)
+        self.assertEqual(
+            [store.get(ok.command_id), failed_result], [c.args[0] for c in listener.result_updated.call_args_list]
+        )
+
+        store.remove_listener(listener)
+        store.complete(store.create("queue", "c", None).command_id)
+        self.assertEqual(2, listener.result_updated.call_count)
+
+    def test_unknown_ids(self):
+        store = CommandResultStore()
+        listener = MagicMock()
+        store.add_listener(listener)
+        self.assertIsNone(store.get("nope"))
+        store.complete("nope")
+        listener.result_updated.assert_not_called()
+
+    @patch("web.command_results.time.monotonic")
+    def test_completed_results_expire(self, mock_monotonic):
+        mock_monotonic.return_value = 100.0
+        store = CommandResultStore()
+        pending = store.create("queue", "a", None)
+        done = store.create("queue", "b", None)
+        store.complete(done.command_id)
+
+        mock_monotonic.return_value = 100.0 + CommandResultStore._RETENTION_IN_SECS + 1
+        self.assertIsNone(store.get(done.command_id))
+        # Pending commands are kept until they complete
+        self.assertIsNotNone(store.get(pending.command_id))
+
+    @patch.object(CommandResultStore, "_MAX_RESULTS", 3)
+    def test_store_is_bounded(self):
+        store = CommandResultStore()
+        results = [store.create("queue", f"f{i}", None) for i in range(5)]
+        for result in results:
+            store.complete(result.command_id)
+        self.assertEqual(
+            [None, None, *[r._replace(state=CommandResult.State.SUCCEEDED) for r in results[2:]]],
+            [store.get(r.command_id) for r in results],
+        )
+
+    @patch.object(CommandResultStore, "_MAX_RESULTS", 3)
+    def test_pending_results_are_not_pruned_by_completed_ones(self):
+        store = CommandResultStore()
+        pending = [store.create("queue", f"p{i}", None) for i in range(5)]
+        for i in range(5):
+            store.complete(store.create("queue", f"f{i}", None).command_id)
+        self.assertEqual(pending, [store.get(r.command_id) for r in pending])
+
+    @patch.object(CommandResultStore, "_MAX_PENDING_RESULTS", 3)
+    def test_pending_results_are_capped_separately(self):
+        store = CommandResultStore()
+        done = store.create("queue", "done", None)
+        store.complete(done.command_id)
+        pending = [store.create("queue", f"p{i}", None) for i in range(5)]
+        self.assertEqual([None, None, *pending[2:]], [store.get(r.command_id) for r in pending])
+        self.assertIsNotNone(store.get(done.command_id))
@@ -0,0 +1,119 @@
+# Copyright 2017, Inderpreet Singh, All rights reserved.
+
+import unittest
+import zlib
+
+from web.compression import CompressionMiddleware, StreamCompressor, choose_encoding, compress, is_compressible
+
+
+def _gunzip(data: bytes) -> bytes:
+    return zlib.decompress(data, 16 + zlib.MAX_WBITS)
+
+
+class TestChooseEncoding(unittest.TestCase):
+    def test_choose_encoding(self):
+        self.assertIsNone(choose_encoding(None))
+        self.assertIsNone(choose_encoding(""))
+        self.assertIsNone(choose_encoding("br, identity"))
+        self.assertEqual("gzip", choose_encoding("gzip"))
+        self.assertEqual("gzip", choose_encoding("gzip, deflate, br"))
+        self.assertEqual("gzip", choose_encoding("deflate, GZIP"))
+        self.assertEqual("deflate", choose_encoding("deflate"))
+        self.assertEqual("deflate", choose_encoding("gzip;q=0.5, deflate"))
+        self.assertEqual("deflate", choose_encoding("gzip; q=0, deflate;q=0.1"))
+        self.assertIsNone(choose_encoding("gzip;q=0"))
+        self.assertEqual("gzip", choose_encoding("*"))
+        self.assertIsNone(choose_encoding("gzip;q=bad"))
+
+    def test_is_compressible(self):
+        self.assertTrue(is_compressible("application/json"))
+        self.assertTrue(is_compressible("text/html; charset=UTF-8"))
+        self.assertTrue(is_compressible("text/event-stream"))
+        self.assertFalse(is_compressible("image/png"))
+        self.assertFalse(is_compressible(None))
+
+    def test_compress(self):
+        self.assertEqual(b"hello" * 100, _gunzip(compress(b"hello" * 100, "gzip")))
+        self.assertEqual(b"hello" * 100, zlib.decompress(compress(b"hello" * 100, "deflate")))
+
+    def test_stream_compressor_flushes_every_chunk(self):
+        compressor = StreamCompressor("gzip")
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        for chunk in (b"event: a\n\n", b"event: b\n\n"):
+            self.assertEqual(chunk, decompressor.decompress(compressor.compress(chunk)))
+        self.assertEqual(b"", decompressor.decompress(compressor.finish()))
+        self.assertTrue(decompressor.eof)
+
+
+class TestCompressionMiddleware(unittest.TestCase):
+    def _call(self, body_chunks, content_type="application/json", accept_encoding="gzip", extra_headers=(), **environ):
+        def app(environ, start_response):
+            start_response("200 OK", [("Content-Type", content_type), ("Content-Length", "1"), *extra_headers])
+            return iter(body_chunks)
+
+        middleware = CompressionMiddleware(app, skip_environ_key="skip")
+        responses = []
+
+        def start_response(status, headers, exc_info=None):
+            responses.append((status, dict(headers)))
+
+        env = {"REQUEST_METHOD": "GET", "HTTP_ACCEPT_ENCODING": accept_encoding, **environ}
+        result = middleware(env, start_response)
+        return responses, result
+
+    def test_compresses_large_json(self):
+        body = b'{"a": "' + b"x" * 2000 + b'"}'
+        responses, result = self._call([body[:10], body[10:]])
+        chunks = list(result)
+        _, headers = responses[0]
+        self.assertEqual("gzip", headers["Content-Encoding"])
+        self.assertEqual("Accept-Encoding", headers["Vary"])
+        self.assertEqual(str(len(b"".join(chunks))), headers["Content-Length"])
+        self.assertEqual(body, _gunzip(b"".join(chunks)))
+
+    def test_small_body_is_not_compressed(self):
+        responses, result = self._call([b"{}"])
+        self.assertEqual([b"{}"], list(result))
+        _, headers = responses[0]
+        self.assertNotIn("Content-Encoding", headers)
+        self.assertEqual("2", headers["Content-Length"])
+
+    def test_passthrough(self):
+        body = [b"x" * 2000]
+        # Client doesn't accept compression
+        _, result = self._call(body, accept_encoding="")
+        self.assertEqual(body, list(result))
+        # Binary content
+        _, result = self._call(body, content_type="image/png")
+        self.assertEqual(body, list(result))
+        # Already encoded
+        _, result = self._call(body, extra_headers=[("Content-Encoding", "gzip")])
+        self.assertEqual(body, list(result))
+        # Stream driven by the server
+        _, result = self._call(body, skip=object())
+        self.assertEqual(body, list(result))
+        # HEAD request
+        _, result = self._call(body, REQUEST_METHOD="HEAD")
+        self.assertEqual(body, list(result))
+
+    def test_event_stream_is_compressed_per_chunk(self):
+        events = [b"event: a\ndata: 1\n\n", b"event: b\ndata: 2\n\n"]
+        responses, result = self._call(events, content_type="text/event-stream")
+        _, headers = responses[0]
+        self.assertEqual("gzip", headers["Content-Encoding"])
+        self.assertNotIn("Content-Length", headers)
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        chunks = iter(result)
+        for event in events:
+            self.assertEqual(event, decompressor.decompress(next(chunks)))
+
+    def test_write_callable_is_refused(self):
+        def app(environ, start_response):
+            write = start_response("200 OK", [("Content-Type", "application/json")])
+            write(b"{}")
+            return []
+
+        middleware = CompressionMiddleware(app, skip_environ_key="skip")
+        env = {"REQUEST_METHOD": "GET", "HTTP_ACCEPT_ENCODING": "gzip"}
+        with self.assertRaisesRegex(RuntimeError, "write\\(\\) is not supported"):
+            middleware(env, lambda status, headers, exc_info=None: None)
@@ -0,0 +1,33 @@
+# Copyright 2017, Inderpreet Singh, All rights reserved.
+
+import json
+import unittest
+
+from web.command_results import CommandResult
+from web.serialize import SerializeCommandResult
+
+from .test_serialize import parse_stream
+
+
+class TestSerializeCommandResult(unittest.TestCase):
+    def test_result(self):
+        result = CommandResult("abc", "queue", "a file", "p1", CommandResult.State.FAILED, "Lftp error")
+        out = parse_stream(SerializeCommandResult().result(result))
+        self.assertEqual("command-result", out["event"])
+        self.assertEqual(
+            {
+                "command_id": "abc",
+                "action": "queue",
+                "file": "a file",
+                "pair_id": "p1",
+                "state": "failed",
+                "error": "Lftp error",
+            },
+            json.loads(out["data"]),
+        )
+
+    def test_result_json(self):
+        data = json.loads(SerializeCommandResult.result_json(CommandResult("abc", "stop", "b", None)))
+        self.assertEqual("pending", data["state"])
+        self.assertIsNone(data["pair_id"])
+        self.assertIsNone(data["error"])
@@ -28,6 +28,53 @@ class TestSerializeModel(unittest.TestCase):
         )
         self.assertEqual("model-removed", out["event"])
 
+    def test_event_id(self):
+        serialize = SerializeModel()
+        out = parse_stream(serialize.model([]))
+        self.assertNotIn("id", out)
+        out = parse_stream(serialize.model([], event_id="abc.3"))
+        self.assertEqual("abc.3", out["id"])
+        out = parse_stream(
+            serialize.update_event(
+                SerializeModel.UpdateEvent(SerializeModel.UpdateEvent.Change.ADDED, None, None), event_id="abc.4"
+            )
+        )
+        self.assertEqual("abc.4", out["id"])
+        self.assertEqual("model-added", out["event"])
+
+    def test_without_children(self):
+        serialize = SerializeModel()
+        a = ModelFile("a", True)
+        a.add_child(ModelFile("aa", False))
+        out = parse_stream(serialize.model([a], with_children=False))
+        data = json.loads(out["data"])
+        self.assertEqual("a", data[0]["name"])
+        self.assertEqual([], data[0]["children"])
+        out = parse_stream(
+            serialize.update_event(
+                SerializeModel.UpdateEvent(SerializeModel.UpdateEvent.Change.ADDED, None, a), with_children=False
+            )
+        )
+        self.assertEqual([], json.loads(out["data"])["new_file"]["children"])
+        out = parse_stream(serialize.model([a]))
+        self.assertEqual("aa", json.loads(out["data"])[0]["children"][0]["name"])
+
+    def test_files_page(self):
+        serialize = SerializeModel()
+        a = ModelFile("a", True)
+        a.add_child(ModelFile("aa", False))
+        data = json.loads(serialize.files_page(version=7, total=3, model_files=[a], next_cursor="abc"))
+        self.assertEqual(7, data["version"])
+        self.assertEqual(3, data["total"])
+        self.assertEqual("abc", data["next_cursor"])
+        self.assertEqual("a", data["files"][0]["name"])
+        self.assertEqual([], data["files"][0]["children"])
+        data = json.loads(
+            serialize.files_page(version=7, total=1, model_files=[a], next_cursor=None, with_children=True)
+        )
+        self.assertIsNone(data["next_cursor"])
+        self.assertEqual("aa", data["files"][0]["children"][0]["name"])
+
     def test_model_is_a_list(self):
         serialize = SerializeModel()
         files = []
@@ -202,6 +249,32 @@ class TestSerializeModel(unittest.TestCase):
         self.assertEqual(0, data[1]["eta"])
         self.assertEqual(100, data[2]["eta"])
 
+    def test_eta_band_and_throughput(self):
+        serialize = SerializeModel()
+        a = ModelFile("a", False)
+        b = ModelFile("b", False)
+        b.eta_low = 80
+        b.eta_high = 120
+        b.throughput = 2048
+        out = parse_stream(serialize.model([a, b]))
+        data = json.loads(out["data"])
+        self.assertEqual(None, data[0]["eta_low"])
+        self.assertEqual(None, data[0]["eta_high"])
+        self.assertEqual(None, data[0]["throughput"])
+        self.assertEqual(80, data[1]["eta_low"])
+        self.assertEqual(120, data[1]["eta_high"])
+        self.assertEqual(2048, data[1]["throughput"])
+
+    def test_file_priority(self):
+        serialize = SerializeModel()
+        a = ModelFile("a", False)
+        b = ModelFile("b", False)
+        b.priority = 3
+        out = parse_stream(serialize.model([a, b]))
+        data = json.loads(out["data"])
+        self.assertEqual(0, data[0]["priority"])
+        self.assertEqual(3, data[1]["priority"])
+
     def test_file_is_extractable(self):
         serialize = SerializeModel()
         a = ModelFile("a", True)
@@ -5,7 +5,7 @@ import unittest
 from datetime import UTC, datetime
 
 from common import Status
-from web.serialize import SerializeStatus
+from web.serialize import SerializeStatus, SerializeStatusJson
 
 from .test_serialize import parse_stream
 
@@ -97,3 +97,78 @@ class TestSerializeStatus(unittest.TestCase):
         out = parse_stream(serialize.status(status))
         data = json.loads(out["data"])
         self.assertEqual("remote server went boom", data["controller"]["latest_remote_scan_error"])
+
+    def test_transfer_status_download_speeds(self):
+        serialize = SerializeStatus()
+        status = Status()
+        out = parse_stream(serialize.status(status))
+        data = json.loads(out["data"])
+        self.assertEqual(0, data["transfer"]["download_speed"])
+        self.assertEqual({}, data["transfer"]["pair_download_speeds"])
+
+        status.transfer.download_speed = 300
+        status.transfer.pair_download_speeds = {"p1": 100, "p2": 200}
+        out = parse_stream(serialize.status(status))
+        data = json.loads(out["data"])
+        self.assertEqual(300, data["transfer"]["download_speed"])
+        self.assertEqual({"p1": 100, "p2": 200}, data["transfer"]["pair_download_speeds"])
+
+    def test_transfer_auto_tune(self):
+        serialize = SerializeStatus()
+        status = Status()
+        data = json.loads(parse_stream(serialize.status(status))["data"])
+        self.assertEqual({}, data["transfer"]["auto_tune"])
+
+        state = {"connections": 8, "min_chunk_size": 1048576, "converged": False, "last_decision": None}
+        status.transfer.auto_tune = {"seedbox:22": state}
+        data = json.loads(parse_stream(serialize.status(status))["data"])
+        self.assertEqual({"seedbox:22": state}, data["transfer"]["auto_tune"])
+
+    def test_transfer_lftp_latency(self):
+        serialize = SerializeStatus()
+        status = Status()
+        data = json.loads(parse_stream(serialize.status(status))["data"])
+        self.assertEqual({}, data["transfer"]["lftp_latency"])
+
+        latency = {"commands": 42, "last_ms": 12.5, "average_ms": 10.1, "max_ms": 80.0}
+        status.transfer.lftp_latency = {"seedbox:22": latency}
+        data = json.loads(parse_stream(serialize.status(status))["data"])
+        self.assertEqual({"seedbox:22": latency}, data["transfer"]["lftp_latency"])
+
+    def test_transfer_limits(self):
+        serialize = SerializeStatus()
+        status = Status()
+        data = json.loads(parse_stream(serialize.status(status))["data"])
+        self.assertIsNone(data["transfer"]["rate_limit"])
+        self.assertEqual(0, data["transfer"]["max_total_connections"])
+        self.assertIsNone(data["transfer"]["schedule_window"])
+
+        status.transfer.rate_limit = "500K"
+        status.transfer.max_total_connections = 4
+        status.transfer.schedule_window = "Mon-Fri 08:00-18:00 rate=500K connections=4"
+        data = json.loads(parse_stream(serialize.status(status))["data"])
+        self.assertEqual("500K", data["transfer"]["rate_limit"])
+        self.assertEqual(4, data["transfer"]["max_total_connections"])
+        self.assertEqual("Mon-Fri 08:00-18:00 rate=500K connections=4", data["transfer"]["schedule_window"])
+
+    def test_status_delta(self):
+        serialize = SerializeStatus()
+        status = Status()
+        status.transfer.download_speed = 300
+        transfer = SerializeStatusJson.status_dict(status)["transfer"]
+        out = parse_stream(serialize.status_delta({"transfer": transfer}))
+        self.assertEqual("status-delta", out["event"])
+        self.assertEqual(
+            {
+                "transfer": {
+                    "download_speed": 300,
+                    "pair_download_speeds": {},
+                    "auto_tune": {},
+                    "rate_limit": None,
+                    "max_total_connections": 0,
+                    "schedule_window": None,
+                    "lftp_latency": {},
+                }
+            },
+            json.loads(out["data"]),
+        )
@@ -0,0 +1,118 @@
+# Copyright 2017, Inderpreet Singh, All rights reserved.
+
+import logging
+import os
+import shutil
+import tempfile
+import unittest
+import zlib
+from unittest.mock import MagicMock, patch
+
+from webtest import TestApp
+
+from web.static_cache import StaticAssetCache
+from web.web_app import WebApp
+
+
+class _StaticFilesTestCase(unittest.TestCase):
+    def setUp(self):
+        self.html_path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.html_path, ignore_errors=True)
+        self.index = b"<html>" + b"<p>seedsync</p>" * 100 + b"</html>"
+        self.main_js = b"console.log('main');" * 100
+        self._write("index.html", self.index)
+        self._write("main-QTQ3FMLD.js", self.main_js)
+        self._write("assets/logo.png", b"\x89PNG" + bytes(range(256)))
+        self._write("assets/theme-responsive.css", b"body {}")
+
+    def _write(self, rel_path: str, data: bytes):
+        path = os.path.join(self.html_path, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(data)
+
+
+class TestStaticAssetCache(_StaticFilesTestCase):
+    def test_load(self):
+        cache = StaticAssetCache()
+        cache.load(self.html_path, logging.getLogger("test_static_cache"))
+        self.assertEqual(4, len(cache))
+
+        index = cache.get("index.html")
+        assert index is not None
+        self.assertEqual(self.index, index.body)
+        assert index.gzip_body is not None
+        self.assertEqual(self.index, zlib.decompress(index.gzip_body, 16 + zlib.MAX_WBITS))
+        self.assertEqual("text/html; charset=UTF-8", index.content_type)
+        self.assertFalse(index.immutable)
+        self.assertTrue(index.etag.startswith('"') and index.etag.endswith('"'))
+
+        main_js = cache.get("main-QTQ3FMLD.js")
+        assert main_js is not None
+        self.assertTrue(main_js.immutable)
+        self.assertNotEqual(index.etag, main_js.etag)
+
+        logo = cache.get("/assets/logo.png")
+        assert logo is not None
+        self.assertEqual("image/png", logo.content_type)
+        self.assertIsNone(logo.gzip_body)
+
+        # Too short to pay off, and not a content hash
+        theme = cache.get("assets/theme-responsive.css")
+        assert theme is not None
+        self.assertIsNone(theme.gzip_body)
+        self.assertFalse(theme.immutable)
+
+        self.assertIsNone(cache.get("missing.js"))
+        self.assertIsNone(cache.get("../index.html"))
+
+    def test_size_limits(self):
+        cache = StaticAssetCache()
+        with patch.object(StaticAssetCache, "_MAX_FILE_SIZE", 1000):
+            cache.load(self.html_path, logging.getLogger("test_static_cache"))
+        self.assertIsNone(cache.get("index.html"))
+        self.assertIsNotNone(cache.get("assets/logo.png"))
+
+
+class TestWebAppStaticFiles(_StaticFilesTestCase):
+    def setUp(self):
+        super().setUp()
+        context = MagicMock()
+        context.logger = logging.getLogger("test_static_files")
+        context.args.html_path = self.html_path
+        web_app = WebApp(context, MagicMock())
+        web_app.add_default_routes()
+        self.test_app = TestApp(web_app)
+
+    def test_serves_gzipped_asset(self):
+        resp = self.test_app.get("/main-QTQ3FMLD.js", headers={"Accept-Encoding": "gzip"})
+        # webtest decodes the body and drops Content-Encoding, the ETag tells the variants apart
+        self.assertTrue(resp.headers["ETag"].endswith('-gzip"'))
+        self.assertEqual(self.main_js, resp.body)
+        self.assertEqual("public, max-age=31536000, immutable", resp.headers["Cache-Control"])
+        self.assertEqual("Accept-Encoding", resp.headers["Vary"])
+
+    def test_serves_identity_asset(self):
+        resp = self.test_app.get("/dashboard")
+        self.assertNotIn("Content-Encoding", resp.headers)
+        self.assertEqual(self.index, resp.body)
+        self.assertEqual("no-cache", resp.headers["Cache-Control"])
+        self.assertTrue(resp.headers["Content-Type"].startswith("text/html"))
+
+    def test_etag_revalidation(self):
+        resp = self.test_app.get("/index.html", headers={"Accept-Encoding": "gzip"})
+        gzip_etag = resp.headers["ETag"]
+        resp = self.test_app.get("/index.html")
+        identity_etag = resp.headers["ETag"]
+        self.assertNotEqual(gzip_etag, identity_etag)
+
+        for etag in (gzip_etag, identity_etag, f'"other", W/{identity_etag}'):
+            resp = self.test_app.get("/index.html", headers={"If-None-Match": etag}, status=304)
+            self.assertEqual(b"", resp.body)
+        self.test_app.get("/index.html", headers={"If-None-Match": '"other"'}, status=200)
+
+    def test_uncached_file_is_served_from_disk(self):
+        self._write("late.txt", b"added after startup")
+        resp = self.test_app.get("/late.txt")
+        self.assertEqual(b"added after startup", resp.body)
+        self.test_app.get("/missing.txt", status=404)
@@ -1,10 +1,21 @@
 # Copyright 2017, Inderpreet Singh, All rights reserved.
 
+import http.client
 import logging
+import shutil
+import socket
+import tempfile
+import threading
+import time
 import unittest
+import zlib
 from unittest.mock import MagicMock, patch
 
-from web.web_app_job import MyWSGIRefServer, WebAppJob, _RequestLoggingMiddleware
+import bottle
+
+from web.utils import StreamQueue
+from web.web_app import IStreamHandler, WebApp
+from web.web_app_job import AsyncWebServer, MyWSGIRefServer, WebAppJob, _RequestLoggingMiddleware
 
 
 class _WebAppJobBase(unittest.TestCase):
@@ -20,6 +31,7 @@ class _WebAppJobBase(unittest.TestCase):
         context.logger = logger
         context.web_access_logger = logger
         context.config.web.port = 8080
+        context.config.web.server_mode = "threaded"
         context.args.debug = False
         return context
 
@@ -41,6 +53,22 @@ class TestWebAppJobSetup(_WebAppJobBase):
         mock_thread_cls.assert_called_once()
         mock_thread_cls.return_value.start.assert_called_once()
 
+    @patch("web.web_app_job.Thread")
+    @patch("web.web_app_job.AsyncWebServer")
+    @patch("web.web_app_job.MyWSGIRefServer")
+    def test_setup_creates_async_server_in_asyncio_mode(self, mock_server_cls, mock_async_server_cls, mock_thread_cls):
+        """setup() creates the asyncio server when server_mode is asyncio."""
+        context = self._make_context()
+        context.config.web.server_mode = "asyncio"
+        web_app = MagicMock()
+
+        job = WebAppJob(context, web_app)
+        job.setup()
+
+        mock_async_server_cls.assert_called_once_with(context.web_access_logger, host="0.0.0.0", port=8080)
+        mock_server_cls.assert_not_called()
+        mock_thread_cls.return_value.start.assert_called_once()
+
 
 class TestWebAppJobExecute(_WebAppJobBase):
     """Tests for WebAppJob.execute() — invokes the web app's process loop."""
@@ -96,6 +124,242 @@ class TestMyWSGIRefServer(unittest.TestCase):
         self.assertTrue(server.quiet)
 
 
+class _QueueStreamHandler(IStreamHandler):
+    """Stream handler that emits whatever the test puts into its queue"""
+
+    queue: StreamQueue[str] | None = None
+
+    def set_wakeup(self, wakeup):
+        assert _QueueStreamHandler.queue is not None
+        _QueueStreamHandler.queue.set_wakeup(wakeup)
+
+    def setup(self):
+        pass
+
+    def get_value(self):
+        assert _QueueStreamHandler.queue is not None
+        return _QueueStreamHandler.queue.get_next_event()
+
+    def cleanup(self):
+        assert _QueueStreamHandler.queue is not None
+        _QueueStreamHandler.queue.set_wakeup(None)
+
+
+class TestAsyncWebServer(unittest.TestCase):
+    """Tests for AsyncWebServer, served over a real socket."""
+
+    def setUp(self):
+        context = MagicMock()
+        context.logger = logging.getLogger("test_async_web_server")
+        html_path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, html_path, ignore_errors=True)
+        context.args.html_path = html_path
+        self.web_app = WebApp(context, MagicMock())
+        self.web_app.add_handler("/hello", lambda: "hello world")
+        self.web_app.add_post_handler("/echo", self.__echo)
+        _QueueStreamHandler.queue = StreamQueue()
+        self.web_app.add_streaming_handler(_QueueStreamHandler)
+        self.web_app.add_default_routes()
+
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            self.port = s.getsockname()[1]
+        self.server = AsyncWebServer(context.logger, host="127.0.0.1", port=self.port)
+        self.server_thread = threading.Thread(target=self.server.run, args=(self.web_app,), daemon=True)
+        self.server_thread.start()
+        self.__wait_for_server()
+
+    def tearDown(self):
+        self.web_app.stop()
+        self.server.stop()
+        self.server_thread.join(timeout=5)
+        self.assertFalse(self.server_thread.is_alive())
+        _QueueStreamHandler.queue = None
+
+    @staticmethod
+    def __echo():
+        return bottle.request.body.read()
+
+    def __wait_for_server(self):
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            try:
+                socket.create_connection(("127.0.0.1", self.port), timeout=1).close()
+                return
+            except OSError:
+                time.sleep(0.01)
+        self.fail("Server did not start")
+
+    def test_get_request(self):
+        conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=5)
+        conn.request("GET", "/hello")
+        response = conn.getresponse()
+        self.assertEqual(200, response.status)
+        self.assertEqual(b"hello world", response.read())
+        conn.close()
+
+    def test_keep_alive_serves_multiple_requests(self):
+        conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=5)
+        for body in (b"one", b"two"):
+            conn.request("POST", "/echo", body=body)
+            response = conn.getresponse()
+            self.assertEqual(200, response.status)
+            self.assertEqual(body, response.read())
+        conn.close()
+
+    def test_unknown_path_returns_404(self):
+        conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=5)
+        conn.request("GET", "/server/nope")
+        response = conn.getresponse()
+        self.assertEqual(404, response.status)
+        response.read()
+        conn.close()
+
+    def test_malformed_request_returns_400(self):
+        with socket.create_connection(("127.0.0.1", self.port), timeout=5) as sock:
+            sock.sendall(b"GARBAGE\r\n\r\n")
+            self.assertTrue(sock.recv(1024).startswith(b"HTTP/1.1 400"))
+
+    def test_stream_delivers_events(self):
+        conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=5)
+        conn.request("GET", "/server/stream")
+        response = conn.getresponse()
+        self.assertEqual(200, response.status)
+        self.assertEqual("text/event-stream", response.getheader("Content-Type"))
+
+        assert _QueueStreamHandler.queue is not None
+        _QueueStreamHandler.queue.put("data: first\n\n")
+        self.assertEqual(b"data: first\n", response.fp.readline())
+        self.assertEqual(b"\n", response.fp.readline())
+        _QueueStreamHandler.queue.put("data: second\n\n")
+        self.assertEqual(b"data: second\n", response.fp.readline())
+        conn.close()
+
+    def test_stream_is_compressed_per_event(self):
+        conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=5)
+        conn.request("GET", "/server/stream", headers={"Accept-Encoding": "gzip"})
+        response = conn.getresponse()
+        self.assertEqual("gzip", response.getheader("Content-Encoding"))
+
+        assert _QueueStreamHandler.queue is not None
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        for event in ("data: first\n\n", "data: second\n\n"):
+            _QueueStreamHandler.queue.put(event)
+            # Each event arrives complete, without waiting for more data
+            received = b""
+            while received != event.encode():
+                received += decompressor.decompress(response.fp.read1(1024))
+        conn.close()
+
+    def test_large_response_is_compressed(self):
+        self.web_app.add_handler("/big", lambda: bottle.HTTPResponse(body="x" * 4096, content_type="application/json"))
+        conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=5)
+        conn.request("GET", "/big", headers={"Accept-Encoding": "gzip"})
+        response = conn.getresponse()
+        self.assertEqual("gzip", response.getheader("Content-Encoding"))
+        self.assertEqual(b"x" * 4096, zlib.decompress(response.read(), 16 + zlib.MAX_WBITS))
+        conn.close()
+
+    def test_stream_does_not_block_other_requests(self):
+        streams = []
+        for _ in range(AsyncWebServer._MAX_WORKERS * 2):
+            conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=5)
+            conn.request("GET", "/server/stream")
+            self.assertEqual(200, conn.getresponse().status)
+            streams.append(conn)
+
+        # More open streams than workers, regular requests are still served
+        conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=5)
+        conn.request("GET", "/hello")
+        self.assertEqual(b"hello world", conn.getresponse().read())
+        conn.close()
+        for stream in streams:
+            stream.close()
+
+    def test_streams_are_served_while_requests_block(self):
+        release = threading.Event()
+        self.addCleanup(release.set)
+        self.web_app.add_handler("/block", lambda: "done" if release.wait(timeout=10) else "timeout")
+        blocked = []
+        for _ in range(AsyncWebServer._MAX_WORKERS):
+            sock = socket.create_connection(("127.0.0.1", self.port), timeout=5)
+            sock.sendall(b"GET /block HTTP/1.1\r\nHost: localhost\r\n\r\n")
+            blocked.append(sock)
+
+        # Every request worker is busy, the stream still opens and delivers events
+        conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=5)
+        conn.request("GET", "/server/stream", headers={"Accept": "text/event-stream"})
+        response = conn.getresponse()
+        self.assertEqual(200, response.status)
+        assert _QueueStreamHandler.queue is not None
+        _QueueStreamHandler.queue.put("data: first\n\n")
+        self.assertEqual(b"data: first\n", response.fp.readline())
+        conn.close()
+
+        release.set()
+        for sock in blocked:
+            self.assertTrue(sock.recv(1024).startswith(b"HTTP/1.1 200"))
+            sock.close()
+
+    def test_chunked_request_returns_411(self):
+        with socket.create_connection(("127.0.0.1", self.port), timeout=5) as sock:
+            sock.sendall(
+                b"POST /echo HTTP/1.1\r\nHost: localhost\r\nTransfer-Encoding: chunked\r\n\r\n3\r\none\r\n0\r\n\r\n"
+            )
+            self.assertTrue(sock.recv(1024).startswith(b"HTTP/1.1 411"))
+
+    def test_oversized_body_returns_413(self):
+        with socket.create_connection(("127.0.0.1", self.port), timeout=5) as sock:
+            length = AsyncWebServer._MAX_BODY_SIZE + 1
+            sock.sendall(f"POST /echo HTTP/1.1\r\nHost: localhost\r\nContent-Length: {length}\r\n\r\n".encode())
+            self.assertTrue(sock.recv(1024).startswith(b"HTTP/1.1 413"))
+        # A body of the maximum size is still accepted
+        conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=5)
+        body = b"x" * AsyncWebServer._MAX_BODY_SIZE
+        conn.request("POST", "/echo", body=body)
+        self.assertEqual(body, conn.getresponse().read())
+        conn.close()
+
+    def test_negative_content_length_returns_400(self):
+        with socket.create_connection(("127.0.0.1", self.port), timeout=5) as sock:
+            sock.sendall(b"POST /echo HTTP/1.1\r\nHost: localhost\r\nContent-Length: -1\r\n\r\n")
+            self.assertTrue(sock.recv(1024).startswith(b"HTTP/1.1 400"))
+
+    @patch.object(AsyncWebServer, "_IDLE_TIMEOUT_IN_SECS", 0.2)
+    def test_idle_connection_is_closed(self):
+        with socket.create_connection(("127.0.0.1", self.port), timeout=5) as sock:
+            self.assertEqual(b"", sock.recv(1024))
+
+    @patch.object(AsyncWebServer, "_REQUEST_TIMEOUT_IN_SECS", 0.2)
+    def test_incomplete_request_is_closed(self):
+        with socket.create_connection(("127.0.0.1", self.port), timeout=5) as sock:
+            sock.sendall(b"GET /hello HTTP/1.1\r\nHost: localhost\r\n")
+            self.assertEqual(b"", sock.recv(1024))
+        with socket.create_connection(("127.0.0.1", self.port), timeout=5) as sock:
+            sock.sendall(b"POST /echo HTTP/1.1\r\nHost: localhost\r\nContent-Length: 10\r\n\r\none")
+            self.assertEqual(b"", sock.recv(1024))
+
+    def test_stop_closes_open_streams(self):
+        conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=5)
+        conn.request("GET", "/server/stream")
+        response = conn.getresponse()
+        self.web_app.stop()
+        self.server.stop()
+        self.server_thread.join(timeout=5)
+        self.assertFalse(self.server_thread.is_alive())
+        self.assertEqual(b"", response.read())
+        conn.close()
+
+    def test_stop_on_never_initialized_server_logs_warning(self):
+        logger = logging.getLogger("test_async_server_never_started")
+        server = AsyncWebServer(logger, host="0.0.0.0", port=8080)
+
+        with self.assertLogs("test_async_server_never_started", level="WARNING") as log_ctx:
+            server.stop()
+
+        self.assertTrue(any("never initialized" in msg for msg in log_ctx.output))
+
+
 class TestRequestLoggingMiddleware(unittest.TestCase):
     """Tests for _RequestLoggingMiddleware."""
 
@@ -1,6 +1,8 @@
 # Copyright 2017, Inderpreet Singh, All rights reserved.
 
+import time
 import unittest
+from threading import Timer
 from unittest.mock import MagicMock, patch
 
 from web.web_app import WebApp
@@ -20,6 +22,7 @@ class TestWebStreamHeartbeat(unittest.TestCase):
         """Create a mock stream handler that returns values from a list, then None."""
         handler_cls = MagicMock()
         handler_instance = MagicMock()
+        handler_instance.time_to_next_value.return_value = None
         handler_instance.get_value.side_effect = [*list(values), None]
         handler_cls.return_value = handler_instance
         return handler_cls, handler_instance
@@ -31,10 +34,8 @@ class TestWebStreamHeartbeat(unittest.TestCase):
 
         # Simulate the stream generator with a very short heartbeat interval
         original_interval = WebApp._HEARTBEAT_INTERVAL_IN_SECS
-        original_poll = WebApp._STREAM_POLL_INTERVAL_IN_MS
         try:
             WebApp._HEARTBEAT_INTERVAL_IN_SECS = 0  # immediate heartbeat
-            WebApp._STREAM_POLL_INTERVAL_IN_MS = 0
 
             # Call the stream method directly
             # We need to mock bottle.response to avoid errors
@@ -62,7 +63,6 @@ class TestWebStreamHeartbeat(unittest.TestCase):
             self.assertGreaterEqual(len(heartbeats), 1)
         finally:
             WebApp._HEARTBEAT_INTERVAL_IN_SECS = original_interval
-            WebApp._STREAM_POLL_INTERVAL_IN_MS = original_poll
 
     def test_no_heartbeat_when_data_flowing(self):
         """No heartbeat should be emitted when data is actively flowing."""
@@ -70,10 +70,8 @@ class TestWebStreamHeartbeat(unittest.TestCase):
         self.app.add_streaming_handler(handler_cls)
 
         original_interval = WebApp._HEARTBEAT_INTERVAL_IN_SECS
-        original_poll = WebApp._STREAM_POLL_INTERVAL_IN_MS
         try:
             WebApp._HEARTBEAT_INTERVAL_IN_SECS = 0  # would fire immediately if idle
-            WebApp._STREAM_POLL_INTERVAL_IN_MS = 0
 
             with patch("web.web_app.bottle") as mock_bottle:
                 mock_bottle.response = MagicMock()
@@ -99,7 +97,6 @@ class TestWebStreamHeartbeat(unittest.TestCase):
             self.assertGreaterEqual(len(data_events), 1)
         finally:
             WebApp._HEARTBEAT_INTERVAL_IN_SECS = original_interval
-            WebApp._STREAM_POLL_INTERVAL_IN_MS = original_poll
 
     def test_x_accel_buffering_header(self):
         """X-Accel-Buffering header should be set to 'no' to disable proxy buffering."""
@@ -117,3 +114,44 @@ class TestWebStreamHeartbeat(unittest.TestCase):
             list(gen)
 
             mock_response.set_header.assert_called_with("X-Accel-Buffering", "no")
+
+    def test_stream_wakes_up_on_new_value(self):
+        """A value signalled through the wakeup is delivered without waiting for a poll or heartbeat."""
+        handler_cls, handler_instance = self._make_handler([])
+        self.app.add_streaming_handler(handler_cls)
+        pending = []
+        handler_instance.get_value.side_effect = lambda: pending.pop() if pending else None
+
+        def send_value():
+            wakeup = handler_instance.set_wakeup.call_args[0][0]
+            pending.append("event: test\ndata: {}\n\n")
+            wakeup.set()
+
+        with patch("web.web_app.bottle") as mock_bottle:
+            mock_bottle.response = MagicMock()
+            gen = self.app._WebApp__web_stream()
+            start = time.monotonic()
+            Timer(0.2, send_value).start()
+            value = next(gen)
+            elapsed = time.monotonic() - start
+            self.app.stop()
+            list(gen)
+
+        self.assertEqual("event: test\ndata: {}\n\n", value)
+        self.assertLess(elapsed, WebApp._HEARTBEAT_INTERVAL_IN_SECS)
+        handler_instance.set_wakeup.assert_called_once()
+        handler_instance.cleanup.assert_called_once_with()
+
+    def test_stop_releases_idle_stream(self):
+        """stop() wakes up streams that are blocked waiting for data."""
+        handler_cls, _handler_instance = self._make_handler([])
+        self.app.add_streaming_handler(handler_cls)
+
+        with patch("web.web_app.bottle") as mock_bottle:
+            mock_bottle.response = MagicMock()
+            Timer(0.2, self.app.stop).start()
+            start = time.monotonic()
+            results = list(self.app._WebApp__web_stream())
+
+        self.assertEqual([], results)
+        self.assertLess(time.monotonic() - start, WebApp._HEARTBEAT_INTERVAL_IN_SECS)
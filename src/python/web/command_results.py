@@ -0,0 +1,123 @@
+# Copyright 2017, Inderpreet Singh, All rights reserved.
+
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from enum import Enum
+from threading import Lock
+from typing import NamedTuple
+
+
+class CommandResult(NamedTuple):
+    """Outcome of a command submitted asynchronously"""
+
+    class State(Enum):
+        PENDING = 0
+        SUCCEEDED = 1
+        FAILED = 2
+
+    command_id: str
+    action: str
+    file_name: str
+    pair_id: str | None
+    state: State = State.PENDING
+    error: str | None = None
+
+
+class ICommandResultListener(ABC):
+    """
+    Interface to listen to command results
+    """
+
+    @abstractmethod
+    def result_updated(self, result: CommandResult):
+        """
+        Called when a command completes
+        Note: called in the controller thread
+        :param result:
+        :return:
+        """
+        pass
+
+
+class CommandResultStore:
+    """
+    Results of asynchronously submitted commands, by command id
+
+    Completed results are kept for at most _RETENTION_IN_SECS, and only the
+    latest _MAX_RESULTS of them, so that clients can poll for them after the
+    fact. Pending results are kept until their command completes; they are
+    capped separately at _MAX_PENDING_RESULTS, past which the oldest are
+    assumed lost and dropped. Thread-safe.
+    """
+
+    _MAX_RESULTS = 1000
+    _MAX_PENDING_RESULTS = 10000
+    _RETENTION_IN_SECS = 600.0
+
+    def __init__(self):
+        self.__lock = Lock()
+        # command id -> result, in order of creation
+        self.__pending: OrderedDict[str, CommandResult] = OrderedDict()
+        # command id -> (result, time of completion), in order of completion
+        self.__completed: OrderedDict[str, tuple[CommandResult, float]] = OrderedDict()
+        self.__listeners: list[ICommandResultListener] = []
+
+    def create(self, action: str, file_name: str, pair_id: str | None) -> CommandResult:
+        """Register a new pending command and return it with its id"""
+        result = CommandResult(command_id=uuid.uuid4().hex, action=action, file_name=file_name, pair_id=pair_id)
+        with self.__lock:
+            self.__pending[result.command_id] = result
+            while len(self.__pending) > CommandResultStore._MAX_PENDING_RESULTS:
+                self.__pending.popitem(last=False)
+        return result
+
+    def complete(self, command_id: str, error: str | None = None):
+        """
+        Record the outcome of a command and notify the listeners
+        :param command_id:
+        :param error: None if the command succeeded
+        :return:
+        """
+        with self.__lock:
+            pending = self.__pending.pop(command_id, None)
+            if pending is None:
+                return
+            state = CommandResult.State.SUCCEEDED if error is None else CommandResult.State.FAILED
+            result = pending._replace(state=state, error=error)
+            self.__completed[command_id] = (result, time.monotonic())
+            self.__prune()
+            listeners = list(self.__listeners)
+        for listener in listeners:
+            listener.result_updated(result)
+
+    def get(self, command_id: str) -> CommandResult | None:
+        with self.__lock:
+            self.__prune()
+            pending = self.__pending.get(command_id)
+            if pending is not None:
+                return pending
+            entry = self.__completed.get(command_id)
+        return entry[0] if entry is not None else None
+
+    def add_listener(self, listener: ICommandResultListener):
+        with self.__lock:
+            self.__listeners.append(listener)
+
+    def remove_listener(self, listener: ICommandResultListener):
+        with self.__lock:
+            if listener in self.__listeners:
+                self.__listeners.remove(listener)
+
+    def __prune(self):
+        """
+        Drop expired completed results, and the oldest ones beyond _MAX_RESULTS
+        Caller must hold __lock
+        """
+        expiry = time.monotonic() - CommandResultStore._RETENTION_IN_SECS
+        while self.__completed and (
+            len(self.__completed) > CommandResultStore._MAX_RESULTS
+            or next(iter(self.__completed.values()))[1] <= expiry
+        ):
+            self.__completed.popitem(last=False)
@@ -0,0 +1,183 @@
+# Copyright 2017, Inderpreet Singh, All rights reserved.
+
+"""HTTP response compression.
+
+Negotiates gzip/deflate from Accept-Encoding and compresses text responses.
+Event streams are compressed incrementally and flushed after every chunk,
+so each SSE event reaches the browser as soon as it is produced.
+"""
+
+import zlib
+from collections.abc import Iterable, Iterator
+from typing import Any
+from wsgiref.types import StartResponse, WSGIApplication, WSGIEnvironment
+
+# Preferred first when the client accepts several with the same weight
+_SUPPORTED_ENCODINGS = ("gzip", "deflate")
+_WBITS = {"gzip": 16 + zlib.MAX_WBITS, "deflate": zlib.MAX_WBITS}
+
+_COMPRESSIBLE_TYPES = {"application/json", "application/javascript", "image/svg+xml"}
+_EVENT_STREAM_TYPE = "text/event-stream"
+
+
+def choose_encoding(accept_encoding: str | None) -> str | None:
+    """
+    Return the content coding to use for a request, or None to send identity
+    :param accept_encoding: value of the Accept-Encoding request header
+    :return: "gzip", "deflate" or None
+    """
+    if not accept_encoding:
+        return None
+    weights: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        weight = 1.0
+        params = params.strip().replace(" ", "")
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[coding] = weight
+    best: str | None = None
+    best_weight = 0.0
+    for coding in _SUPPORTED_ENCODINGS:
+        weight = weights.get(coding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = coding, weight
+    return best
+
+
+def is_compressible(content_type: str | None) -> bool:
+    """Whether a response of this content type is worth compressing"""
+    if not content_type:
+        return False
+    mime = content_type.split(";", 1)[0].strip().lower()
+    return mime.startswith("text/") or mime in _COMPRESSIBLE_TYPES
+
+
+def compress(data: bytes, encoding: str, level: int = 6) -> bytes:
+    """Compress a complete body with the given content coding"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, _WBITS[encoding])
+    return compressor.compress(data) + compressor.flush()
+
+
+class StreamCompressor:
+    """Incremental compressor whose output is decodable after every chunk"""
+
+    def __init__(self, encoding: str, level: int = 6):
+        self.encoding = encoding
+        self.__compressor = zlib.compressobj(level, zlib.DEFLATED, _WBITS[encoding])
+
+    def compress(self, data: bytes) -> bytes:
+        """Compress data and flush it, so the client can decode it right away"""
+        return self.__compressor.compress(data) + self.__compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self.__compressor.flush()
+
+
+def _no_write(data: bytes) -> None:
+    raise RuntimeError("write() is not supported with compression")
+
+
+class CompressionMiddleware:
+    """
+    WSGI middleware that compresses text responses for clients that accept it
+
+    Regular responses are compressed as a whole when they are at least
+    _MIN_SIZE bytes. Event streams are compressed chunk by chunk. Responses
+    that already have a Content-Encoding, have no body, or belong to a stream
+    that the server drives itself (see StreamSession) pass through unchanged.
+    """
+
+    _MIN_SIZE = 512
+
+    def __init__(self, app: WSGIApplication, skip_environ_key: str | None = None):
+        """
+        :param app:
+        :param skip_environ_key: responses to requests whose environ has this key
+                                 are passed through
+        """
+        self.app = app
+        self.skip_environ_key = skip_environ_key
+
+    def __call__(self, environ: WSGIEnvironment, start_response: StartResponse) -> Iterable[bytes]:
+        encoding = choose_encoding(environ.get("HTTP_ACCEPT_ENCODING"))
+        if encoding is None or environ.get("REQUEST_METHOD") == "HEAD":
+            return self.app(environ, start_response)
+
+        # (status, headers) held back until we know whether to compress
+        captured: list[Any] = []
+        forwarded = False
+
+        def _start_response(status: str, headers: list[tuple[str, str]], exc_info: Any = None) -> Any:
+            nonlocal forwarded
+            if forwarded or exc_info is not None:
+                # App started the response late, or is reporting an error: don't interfere
+                forwarded = True
+                return start_response(status, headers, exc_info)
+            captured[:] = [status, headers]
+            return _no_write
+
+        result = self.app(environ, _start_response)
+        if forwarded or not captured:
+            # start_response is deferred to body iteration (not done by bottle), pass through
+            forwarded = True
+            return result
+        status, headers = captured
+        if not self.__should_compress(environ, status, headers):
+            start_response(status, headers)
+            return result
+
+        content_type = CompressionMiddleware.__header(headers, "Content-Type")
+        headers = [(k, v) for (k, v) in headers if k.lower() != "content-length"]
+        headers.append(("Content-Encoding", encoding))
+        headers.append(("Vary", "Accept-Encoding"))
+        if content_type is not None and content_type.split(";", 1)[0].strip().lower() == _EVENT_STREAM_TYPE:
+            start_response(status, headers)
+            return CompressionMiddleware.__compress_stream(result, StreamCompressor(encoding))
+
+        try:
+            body = b"".join(result)
+        finally:
+            close = getattr(result, "close", None)
+            if close is not None:
+                close()
+        if len(body) < CompressionMiddleware._MIN_SIZE:
+            # Not worth it, but the response still varies with Accept-Encoding
+            headers = [(k, v) for (k, v) in headers if k.lower() != "content-encoding"]
+            headers.append(("Content-Length", str(len(body))))
+            start_response(status, headers)
+            return [body]
+        compressed = compress(body, encoding)
+        headers.append(("Content-Length", str(len(compressed))))
+        start_response(status, headers)
+        return [compressed]
+
+    def __should_compress(self, environ: WSGIEnvironment, status: str, headers: list[tuple[str, str]]) -> bool:
+        if self.skip_environ_key is not None and environ.get(self.skip_environ_key) is not None:
+            return False
+        if status[:3] in ("204", "304") or status[:1] == "1":
+            return False
+        if CompressionMiddleware.__header(headers, "Content-Encoding") is not None:
+            return False
+        return is_compressible(CompressionMiddleware.__header(headers, "Content-Type"))
+
+    @staticmethod
+    def __header(headers: list[tuple[str, str]], name: str) -> str | None:
+        name = name.lower()
+        return next((v for (k, v) in headers if k.lower() == name), None)
+
+    @staticmethod
+    def __compress_stream(result: Iterable[bytes], compressor: StreamCompressor) -> Iterator[bytes]:
+        try:
+            for chunk in result:
+                if chunk:
+                    yield compressor.compress(chunk)
+            yield compressor.finish()
+        finally:
+            close = getattr(result, "close", None)
+            if close is not None:
+                close()
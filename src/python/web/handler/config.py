@@ -30,6 +30,10 @@ _LFTP_TUNING_KEYS: frozenset[tuple[str, str]] = frozenset(
         ("lftp", "net_max_retries"),
         ("lftp", "net_reconnect_interval_base"),
         ("lftp", "net_reconnect_interval_multiplier"),
+        ("lftp", "bandwidth_schedule"),
+        ("lftp", "auto_tune_connections"),
+        ("lftp", "auto_tune_min_connections"),
+        ("lftp", "auto_tune_max_connections"),
         ("general", "verbose"),
         ("validate", "xfer_verify"),
         ("validate", "algorithm"),
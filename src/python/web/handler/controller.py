@@ -1,14 +1,18 @@
 # Copyright 2017, Inderpreet Singh, All rights reserved.
 
+import json
 import os
 from threading import Event
+from typing import Any, cast
 from urllib.parse import unquote
 
 from bottle import HTTPResponse, request
 
 from common import overrides
-from controller import Controller
+from controller import Controller, DownloadPriorities
 
+from ..command_results import CommandResultStore
+from ..serialize import SerializeCommandResult
 from ..web_app import IHandler, WebApp
 
 
@@ -40,6 +44,50 @@ def _validate_pair_id(pair_id: str | None) -> str | None:
     return pair_id
 
 
+_MIN_PRIORITY = DownloadPriorities.MIN_PRIORITY
+_MAX_PRIORITY = DownloadPriorities.MAX_PRIORITY
+
+
+def _validate_priority(priority: Any) -> bool:
+    """Whether priority is a download priority: an integer within the allowed range"""
+    return isinstance(priority, int) and not isinstance(priority, bool) and _MIN_PRIORITY <= priority <= _MAX_PRIORITY
+
+
+def _priority_param(required: bool) -> int | HTTPResponse | None:
+    """
+    Parse the ?priority= query parameter
+    Returns the priority, None if it is optional and absent, or an HTTPResponse(400) on failure.
+    """
+    value = request.params.get("priority")  # type: ignore[attr-defined]
+    if value is None and not required:
+        return None
+    try:
+        priority = int(value)
+    except (TypeError, ValueError):
+        priority = None
+    if not _validate_priority(priority):
+        return HTTPResponse(
+            body=f"priority must be an integer from {_MIN_PRIORITY} to {_MAX_PRIORITY}",
+            status=400,
+        )
+    return priority
+
+
+def _bundle_param() -> bool | HTTPResponse | None:
+    """
+    Parse the optional ?bundle= query parameter
+    Returns True or False, None if absent, or an HTTPResponse(400) on failure.
+    """
+    value = request.params.get("bundle")  # type: ignore[attr-defined]
+    if value is None:
+        return None
+    if value.lower() in ("1", "true"):
+        return True
+    if value.lower() in ("0", "false"):
+        return False
+    return HTTPResponse(body="bundle must be true or false", status=400)
+
+
 def _decode_and_validate(file_name: str) -> str | HTTPResponse:
     """
     Decode a double-encoded filename and validate it.
@@ -79,9 +127,49 @@ class WebResponseActionCallback(Controller.Command.ICallback):
         self.__event.wait()
 
 
+class AsyncActionCallback(Controller.Command.ICallback):
+    """
+    Controller action callback for commands submitted asynchronously
+    Records the outcome in the command result store instead of blocking a request
+    """
+
+    def __init__(self, command_results: CommandResultStore, command_id: str):
+        self.__command_results = command_results
+        self.__command_id = command_id
+
+    @overrides(Controller.Command.ICallback)
+    def on_failure(self, error: str):
+        self.__command_results.complete(self.__command_id, error=error or "Unknown error")
+
+    @overrides(Controller.Command.ICallback)
+    def on_success(self):
+        self.__command_results.complete(self.__command_id)
+
+
+def _wants_async() -> bool:
+    """Whether the client asked for asynchronous submission, with ?async=true or Prefer: respond-async"""
+    if request.query.get("async", "").lower() in ("1", "true"):  # type: ignore[attr-defined]
+        return True
+    prefer = request.get_header("Prefer") or ""
+    return "respond-async" in (p.strip().lower() for p in prefer.split(","))
+
+
 class ControllerHandler(IHandler):
-    def __init__(self, controller: Controller):
+    """
+    Runs file commands on the controller
+
+    By default a request blocks until the controller has run the command.
+    With ?async=true (or a "Prefer: respond-async" header) the command is
+    accepted with 202 and a command id instead; its result is streamed as a
+    command-result event and can be polled from /server/command/result/<id>.
+    """
+
+    # Maximum number of commands in one batch request
+    _MAX_BATCH_SIZE = 1000
+
+    def __init__(self, controller: Controller, command_results: CommandResultStore):
         self.__controller = controller
+        self.__command_results = command_results
 
     @overrides(IHandler)
     def add_routes(self, web_app: WebApp):
@@ -91,8 +179,18 @@ class ControllerHandler(IHandler):
         web_app.add_handler("/server/command/delete_local/<file_name>", self.__handle_action_delete_local)
         web_app.add_handler("/server/command/delete_remote/<file_name>", self.__handle_action_delete_remote)
         web_app.add_handler("/server/command/validate/<file_name>", self.__handle_action_validate)
+        web_app.add_handler("/server/command/prioritize/<file_name>", self.__handle_action_prioritize)
+        web_app.add_post_handler("/server/command/batch", self.__handle_batch)
+        web_app.add_handler("/server/command/result/<command_id>", self.__handle_result)
 
-    def __dispatch_command(self, file_name: str, action: Controller.Command.Action, success_msg: str):
+    def __dispatch_command(
+        self,
+        file_name: str,
+        action: Controller.Command.Action,
+        success_msg: str,
+        priority: int | None = None,
+        bundle: bool | None = None,
+    ):
         """Common handler: decode filename, validate pair_id, dispatch command."""
         decoded = _decode_and_validate(file_name)
         if isinstance(decoded, HTTPResponse):
@@ -101,7 +199,14 @@ class ControllerHandler(IHandler):
         pair_id = _validate_pair_id(request.params.get("pair_id"))  # type: ignore[attr-defined]
         if pair_id == "":
             return HTTPResponse(body="pair_id must not be blank", status=400)
-        command = Controller.Command(action, decoded, pair_id=pair_id)
+        command = Controller.Command(action, decoded, pair_id=pair_id, priority=priority, bundle=bundle)
+        if _wants_async():
+            command_id = self.__accept_async(command)
+            return HTTPResponse(
+                body=json.dumps({"command_id": command_id}),
+                status=202,
+                headers={"Content-Type": "application/json", "Location": f"/server/command/result/{command_id}"},
+            )
         callback = WebResponseActionCallback()
         command.add_callback(callback)
         self.__controller.queue_command(command)
@@ -111,7 +216,15 @@ class ControllerHandler(IHandler):
         return HTTPResponse(body=callback.error or "Unknown error", status=400)
 
     def __handle_action_queue(self, file_name: str):
-        return self.__dispatch_command(file_name, Controller.Command.Action.QUEUE, "Queued file '{}'")
+        priority = _priority_param(required=False)
+        if isinstance(priority, HTTPResponse):
+            return priority
+        bundle = _bundle_param()
+        if isinstance(bundle, HTTPResponse):
+            return bundle
+        return self.__dispatch_command(
+            file_name, Controller.Command.Action.QUEUE, "Queued file '{}'", priority=priority, bundle=bundle
+        )
 
     def __handle_action_stop(self, file_name: str):
         return self.__dispatch_command(file_name, Controller.Command.Action.STOP, "Stopped file '{}'")
@@ -135,3 +248,113 @@ class ControllerHandler(IHandler):
         return self.__dispatch_command(
             file_name, Controller.Command.Action.VALIDATE, "Requested validation for file '{}'"
         )
+
+    def __handle_action_prioritize(self, file_name: str):
+        priority = _priority_param(required=True)
+        if isinstance(priority, HTTPResponse):
+            return priority
+        return self.__dispatch_command(
+            file_name, Controller.Command.Action.PRIORITIZE, "Set priority of file '{}'", priority=priority
+        )
+
+    def __handle_batch(self):
+        """
+        Run many commands with one request
+        Body: {"commands": [{"action": "queue", "file": "name", "pair_id": "id"}, ...]}
+        File names are plain JSON strings, not URL-encoded. A "priority" is
+        required for "prioritize" and optional for "queue", as is a boolean
+        "bundle" to download a directory as one tar stream. The commands are
+        handed to the controller together, so they are processed in a single
+        cycle. Responds with one result per command, in order:
+        {"results": [{"action", "file", "pair_id", "success", "error"}, ...]}
+        In async mode it responds with 202 right away; each accepted command
+        has a "command_id" and null "success" instead.
+        """
+        try:
+            raw_data: Any = json.loads(request.body.read().decode("utf-8"))  # type: ignore[attr-defined]
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            return HTTPResponse(body="Invalid JSON", status=400)
+        if not isinstance(raw_data, dict) or not isinstance(raw_data.get("commands"), list):
+            return HTTPResponse(body="Expected JSON object with a 'commands' list", status=400)
+        items = cast(list[Any], raw_data["commands"])
+        if len(items) > ControllerHandler._MAX_BATCH_SIZE:
+            return HTTPResponse(
+                body=f"Too many commands, at most {ControllerHandler._MAX_BATCH_SIZE} per batch", status=400
+            )
+
+        is_async = _wants_async()
+        results: list[dict[str, Any]] = []
+        commands: list[Controller.Command] = []
+        callbacks: list[tuple[int, WebResponseActionCallback]] = []
+        for item in items:
+            result = ControllerHandler.__parse_batch_item(item)
+            results.append(result)
+            if result["error"] is not None:
+                continue
+            command = Controller.Command(
+                Controller.Command.Action[result["action"].upper()],
+                result["file"],
+                pair_id=result["pair_id"],
+                priority=cast(dict[str, Any], item).get("priority"),
+                bundle=cast(dict[str, Any], item).get("bundle"),
+            )
+            if is_async:
+                result["command_id"] = self.__accept_async(command, queue=False)
+                result["success"] = None
+            else:
+                callback = WebResponseActionCallback()
+                command.add_callback(callback)
+                callbacks.append((len(results) - 1, callback))
+            commands.append(command)
+
+        if commands:
+            self.__controller.queue_commands(commands)
+        if is_async:
+            return HTTPResponse(
+                body=json.dumps({"results": results}), status=202, headers={"Content-Type": "application/json"}
+            )
+        for index, callback in callbacks:
+            callback.wait()
+            results[index]["success"] = bool(callback.success)
+            results[index]["error"] = None if callback.success else (callback.error or "Unknown error")
+        return HTTPResponse(body=json.dumps({"results": results}), headers={"Content-Type": "application/json"})
+
+    @staticmethod
+    def __parse_batch_item(item: Any) -> dict[str, Any]:
+        """Validate one batch item; the result has an error if it is invalid"""
+        if not isinstance(item, dict):
+            return {"action": None, "file": None, "pair_id": None, "success": False, "error": "Expected JSON object"}
+        data = cast(dict[str, Any], item)
+        action, file_name, pair_id = data.get("action"), data.get("file"), data.get("pair_id")
+        result: dict[str, Any] = {"action": action, "file": file_name, "pair_id": pair_id, "success": False}
+        if not isinstance(action, str) or action.upper() not in Controller.Command.Action.__members__:
+            result["error"] = "Invalid action"
+        elif not isinstance(file_name, str) or not _validate_filename(file_name):
+            result["error"] = "Invalid file name"
+        elif pair_id is not None and (not isinstance(pair_id, str) or _validate_pair_id(pair_id) == ""):
+            result["error"] = "pair_id must be a non-blank string"
+        elif data.get("priority") is not None and not _validate_priority(data["priority"]):
+            result["error"] = "Invalid priority"
+        elif action.upper() == Controller.Command.Action.PRIORITIZE.name and data.get("priority") is None:
+            result["error"] = "Missing priority"
+        elif data.get("bundle") is not None and not isinstance(data["bundle"], bool):
+            result["error"] = "Invalid bundle"
+        else:
+            result["error"] = None
+        return result
+
+    def __handle_result(self, command_id: str):
+        result = self.__command_results.get(command_id)
+        if result is None:
+            return HTTPResponse(body="Unknown command id", status=404)
+        return HTTPResponse(
+            body=SerializeCommandResult.result_json(result), headers={"Content-Type": "application/json"}
+        )
+
+    def __accept_async(self, command: Controller.Command, queue: bool = True) -> str:
+        """Track the command in the result store, queue it unless told not to, and return its id"""
+        result = self.__command_results.create(command.action.name.lower(), command.filename, command.pair_id)
+        command.add_callback(AsyncActionCallback(self.__command_results, result.command_id))
+        if queue:
+            self.__controller.queue_command(command)
+        return result.command_id
@@ -0,0 +1,187 @@
+# Copyright 2017, Inderpreet Singh, All rights reserved.
+
+import base64
+import binascii
+import json
+from collections.abc import Callable
+from typing import Any
+
+from bottle import HTTPResponse, request
+
+from common import overrides
+from controller import Controller
+from model import ANY_PAIR, AnyPair, Model, ModelFile
+
+from ..serialize import SerializeModel
+from ..web_app import IHandler, WebApp
+
+
+def _size_of(file: ModelFile) -> int | None:
+    return file.remote_size if file.remote_size is not None else file.local_size
+
+
+def _modified_of(file: ModelFile) -> float | None:
+    timestamp = file.remote_modified_timestamp or file.local_modified_timestamp
+    return timestamp.timestamp() if timestamp is not None else None
+
+
+def _nullable(value: Any) -> tuple[int, Any]:
+    """Sort key part that orders missing values first without comparing them to real values"""
+    return (0, 0) if value is None else (1, value)
+
+
+class ModelHandler(IHandler):
+    """
+    REST access to the model, for clients that don't want the whole tree at once
+
+    GET /server/model returns a page of root files. Query parameters:
+      state:         comma-separated states to accept (e.g. "downloading,queued")
+      pair_id:       accept files of this path pair only; empty for the default pair
+      name_contains: accept files whose name contains this text (case-insensitive)
+      sort:          name, size, state or modified; prefix with "-" for descending
+      limit:         page size
+      cursor:        next_cursor of the previous page
+      children:      "true" to include each file's subtree
+
+    GET /server/model/children returns a page of the children of one file,
+    addressed by the "name" and "pair_id" of its root and a "/"-separated
+    "path" below that root. It accepts the same state, name_contains, sort,
+    limit, cursor and children parameters, so a client can walk a large tree
+    one level at a time.
+
+    Pagination is keyset based: the cursor encodes the sort key of the last
+    file returned. Pages stay consistent while the model changes underneath;
+    files that are added or removed between requests are simply included in
+    or dropped from the pages not yet fetched.
+
+    Root files are looked up through the model's indexes by state and pair,
+    so filtering a large model doesn't walk every file.
+    """
+
+    _DEFAULT_LIMIT = 200
+    _MAX_LIMIT = 1000
+
+    __SORT_KEYS: dict[str, Callable[[ModelFile], tuple[Any, ...]]] = {
+        "name": lambda f: (f.name.lower(),),
+        "size": lambda f: _nullable(_size_of(f)),
+        "state": lambda f: (f.state.name.lower(),),
+        "modified": lambda f: _nullable(_modified_of(f)),
+    }
+
+    def __init__(self, controller: Controller):
+        self.__controller = controller
+        self.__serialize = SerializeModel()
+
+    @overrides(IHandler)
+    def add_routes(self, web_app: WebApp):
+        web_app.add_handler("/server/model", self.__handle_get_model)
+        web_app.add_handler("/server/model/children", self.__handle_get_children)
+
+    def __handle_get_model(self):
+        try:
+            states = ModelHandler.__requested_states()
+        except KeyError:
+            return HTTPResponse(body="Invalid state", status=400)
+        pair_id: str | AnyPair | None = ANY_PAIR
+        if "pair_id" in request.query:  # type: ignore[attr-defined]
+            pair_id = request.query.get("pair_id") or None  # type: ignore[attr-defined]
+        snapshot = self.__controller.query_model(states=states, pair_id=pair_id)
+        return self.__page(snapshot.version, list(snapshot.files))
+
+    def __handle_get_children(self):
+        name = request.query.getunicode("name", "")  # type: ignore[attr-defined]
+        if not name:
+            return HTTPResponse(body="name is required", status=400)
+        pair_id = request.query.get("pair_id") or None  # type: ignore[attr-defined]
+        snapshot = self.__controller.query_model(pair_id=pair_id, name_prefix=name)
+        file = next((f for f in snapshot.files if f.name == name), None)
+        path = request.query.getunicode("path", "")  # type: ignore[attr-defined]
+        for part in (p for p in path.split("/") if p):
+            if file is None:
+                break
+            file = file.get_child(part)
+        if file is None:
+            return HTTPResponse(body=f"File '{name}/{path}' not found".rstrip("/"), status=404)
+        return self.__page(snapshot.version, file.get_children())
+
+    def __page(self, version: int, files: list[ModelFile]) -> HTTPResponse:
+        """Filter, sort and paginate files according to the request's query parameters"""
+        query = request.query  # type: ignore[attr-defined]
+
+        try:
+            states = ModelHandler.__requested_states()
+        except KeyError:
+            return HTTPResponse(body="Invalid state", status=400)
+
+        sort = query.get("sort", "name")
+        descending = sort.startswith("-")
+        sort_key = ModelHandler.__SORT_KEYS.get(sort.lstrip("-"))
+        if sort_key is None:
+            return HTTPResponse(
+                body="sort must be one of: {}".format(", ".join(sorted(ModelHandler.__SORT_KEYS))), status=400
+            )
+
+        try:
+            limit = int(query.get("limit", ModelHandler._DEFAULT_LIMIT))
+        except ValueError:
+            return HTTPResponse(body="limit must be an integer", status=400)
+        limit = max(1, min(limit, ModelHandler._MAX_LIMIT))
+
+        cursor: tuple[Any, ...] | None = None
+        if query.get("cursor"):
+            cursor = ModelHandler.__decode_cursor(query.get("cursor"))
+            if cursor is None:
+                return HTTPResponse(body="Invalid cursor", status=400)
+
+        needle = query.getunicode("name_contains", "").lower()
+        matched = [
+            f for f in files if (states is None or f.state in states) and (not needle or needle in f.name.lower())
+        ]
+
+        # The file key breaks ties, so the order is total and cursors are unambiguous
+        keyed = sorted(
+            (((*sort_key(f), Model.file_key(f)), f) for f in matched), key=lambda kf: kf[0], reverse=descending
+        )
+        start = 0
+        if cursor is not None:
+            try:
+                start = next(
+                    (i for i, (k, _) in enumerate(keyed) if (k < cursor if descending else k > cursor)), len(keyed)
+                )
+            except TypeError:
+                # Cursor from a different sort order
+                return HTTPResponse(body="Invalid cursor", status=400)
+        page = keyed[start : start + limit]
+        next_cursor = ModelHandler.__encode_cursor(page[-1][0]) if start + limit < len(keyed) else None
+
+        with_children = query.get("children", "").lower() in ("1", "true")
+        out_json = self.__serialize.files_page(
+            version=version,
+            total=len(matched),
+            model_files=[f for _, f in page],
+            next_cursor=next_cursor,
+            with_children=with_children,
+        )
+        return HTTPResponse(body=out_json, content_type="application/json")
+
+    @staticmethod
+    def __requested_states() -> set[ModelFile.State] | None:
+        """The states of the request's state parameter, None if absent. Raises KeyError on an unknown state."""
+        state = request.query.get("state")  # type: ignore[attr-defined]
+        if not state:
+            return None
+        return {ModelFile.State[s.strip().upper()] for s in state.split(",") if s.strip()}
+
+    @staticmethod
+    def __encode_cursor(key: tuple[Any, ...]) -> str:
+        return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+    @staticmethod
+    def __decode_cursor(cursor: str) -> tuple[Any, ...] | None:
+        try:
+            key = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        except (binascii.Error, ValueError):
+            return None
+        if not isinstance(key, list):
+            return None
+        return tuple(key)
@@ -33,10 +33,10 @@ class PathPairsHandler(IHandler):
     def __validate_pair_params(
         data: dict[str, Any],
         defaults: PathPair | None = None,
-    ) -> "HTTPResponse | tuple[str, str, str, bool, bool, list[str]]":
+    ) -> "HTTPResponse | tuple[str, str, str, bool, bool, list[str], int]":
         """Validate and extract path pair parameters from request data.
 
-        Returns (name, remote_path, local_path, enabled, auto_queue, arr_target_ids)
+        Returns (name, remote_path, local_path, enabled, auto_queue, arr_target_ids, priority)
         or an HTTPResponse on error. When defaults is provided (a PathPair), missing
         keys fall back to its values.
         """
@@ -47,6 +47,7 @@ class PathPairsHandler(IHandler):
         enabled = data.get("enabled", d.enabled if d else True)
         auto_queue = data.get("auto_queue", d.auto_queue if d else True)
         arr_target_ids_raw = data.get("arr_target_ids", list(d.arr_target_ids) if d else [])
+        priority = data.get("priority", d.priority if d else 0)
         if not isinstance(name, str) or not isinstance(remote_path, str) or not isinstance(local_path, str):
             return HTTPResponse(body="name, remote_path, and local_path must be strings", status=400)
         if not isinstance(enabled, bool) or not isinstance(auto_queue, bool):
@@ -58,6 +59,8 @@ class PathPairsHandler(IHandler):
             if not isinstance(t, str):
                 return HTTPResponse(body="arr_target_ids must be a list of strings", status=400)
             arr_target_ids.append(t)
+        if not isinstance(priority, int) or isinstance(priority, bool):
+            return HTTPResponse(body="priority must be an integer", status=400)
         name = name.strip()
         remote_path = remote_path.strip()
         local_path = local_path.strip()
@@ -67,7 +70,7 @@ class PathPairsHandler(IHandler):
             return HTTPResponse(body="remote_path must not be empty", status=400)
         if not local_path:
             return HTTPResponse(body="local_path must not be empty", status=400)
-        return name, remote_path, local_path, enabled, auto_queue, arr_target_ids
+        return name, remote_path, local_path, enabled, auto_queue, arr_target_ids, priority
 
     def __validate_arr_target_ids(self, arr_target_ids: list[str]) -> HTTPResponse | None:
         """Return an error response if any arr_target_ids don't exist, else None."""
@@ -94,7 +97,7 @@ class PathPairsHandler(IHandler):
         result = self.__validate_pair_params(data)
         if isinstance(result, HTTPResponse):
             return result
-        name, remote_path, local_path, enabled, auto_queue, arr_target_ids = result
+        name, remote_path, local_path, enabled, auto_queue, arr_target_ids, priority = result
 
         err = self.__validate_arr_target_ids(arr_target_ids)
         if err is not None:
@@ -107,6 +110,7 @@ class PathPairsHandler(IHandler):
             enabled=enabled,
             auto_queue=auto_queue,
             arr_target_ids=arr_target_ids,
+            priority=priority,
         )
         try:
             self.__config.add_pair(pair)
@@ -133,7 +137,7 @@ class PathPairsHandler(IHandler):
         result = self.__validate_pair_params(data, defaults=existing)
         if isinstance(result, HTTPResponse):
             return result
-        name, remote_path, local_path, enabled, auto_queue, arr_target_ids = result
+        name, remote_path, local_path, enabled, auto_queue, arr_target_ids, priority = result
 
         err = self.__validate_arr_target_ids(arr_target_ids)
         if err is not None:
@@ -147,6 +151,7 @@ class PathPairsHandler(IHandler):
             enabled=enabled,
             auto_queue=auto_queue,
             arr_target_ids=arr_target_ids,
+            priority=priority,
         )
         try:
             self.__config.update_pair(updated)
@@ -0,0 +1,52 @@
+# Copyright 2017, Inderpreet Singh, All rights reserved.
+
+from threading import Event
+
+from common import overrides
+
+from ..command_results import CommandResult, CommandResultStore, ICommandResultListener
+from ..serialize import SerializeCommandResult
+from ..utils import StreamQueue
+from ..web_app import IStreamHandler
+
+
+class CommandResultListener(ICommandResultListener, StreamQueue[CommandResult]):
+    """
+    Command result listener used by streams to listen to completed commands
+    """
+
+    @overrides(ICommandResultListener)
+    def result_updated(self, result: CommandResult):
+        self.put(result)
+
+
+class CommandResultStreamHandler(IStreamHandler):
+    """
+    Streams the results of asynchronously submitted commands as they complete
+    """
+
+    event_family = "command"
+
+    def __init__(self, command_results: CommandResultStore):
+        self.command_results = command_results
+        self.serialize = SerializeCommandResult()
+        self.listener = CommandResultListener()
+
+    @overrides(IStreamHandler)
+    def set_wakeup(self, wakeup: Event):
+        self.listener.set_wakeup(wakeup)
+
+    @overrides(IStreamHandler)
+    def setup(self):
+        self.command_results.add_listener(self.listener)
+
+    @overrides(IStreamHandler)
+    def get_value(self) -> str | None:
+        result = self.listener.get_next_event()
+        if result is not None:
+            return self.serialize.result(result)
+        return None
+
+    @overrides(IStreamHandler)
+    def cleanup(self):
+        self.command_results.remove_listener(self.listener)
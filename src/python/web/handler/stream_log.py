@@ -5,9 +5,11 @@ from __future__ import annotations
 import copy
 import logging
 import time
-from threading import Lock
+from threading import Event, Lock
 from typing import TYPE_CHECKING, Any
 
+import bottle
+
 from common import overrides
 
 from ..serialize import SerializeLogRecord
@@ -83,8 +85,11 @@ class LogStreamHandler(IStreamHandler):
     Streams logs captured after the stream starts.
     Also cache a small history of logs and sends them when the stream
     starts.
+    The log_level stream parameter (e.g. "WARNING") drops less severe records.
     """
 
+    event_family = "log"
+
     _CACHE_HISTORY_SIZE_IN_MS = 3000
 
     # Cache of logs
@@ -94,6 +99,12 @@ class LogStreamHandler(IStreamHandler):
         self.logger = logger
         self.handler = QueueLogHandler()
         self.serialize = SerializeLogRecord()
+        log_level = bottle.request.query.get("log_level")
+        if log_level:
+            level = logging.getLevelName(log_level.strip().upper())
+            if not isinstance(level, int):
+                raise ValueError(f"Invalid log level: {log_level}")
+            self.handler.setLevel(level)
 
     # noinspection PyUnresolvedReferences
     @classmethod
@@ -105,12 +116,17 @@ class LogStreamHandler(IStreamHandler):
 
         super().register(web_app=web_app, **kwargs)
 
+    @overrides(IStreamHandler)
+    def set_wakeup(self, wakeup: Event):
+        self.handler.set_wakeup(wakeup)
+
     @overrides(IStreamHandler)
     def setup(self):
         # Send out all the cached records first
         assert LogStreamHandler._cache is not None
         for record in LogStreamHandler._cache.get_cached_records():
-            self.handler.emit(record)
+            if record.levelno >= self.handler.level:
+                self.handler.emit(record)
         # Then subscribe the live stream
         self.logger.addHandler(self.handler)
 
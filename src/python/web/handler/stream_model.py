@@ -1,69 +1,404 @@
 # Copyright 2017, Inderpreet Singh, All rights reserved.
 
+from __future__ import annotations
+
+import time
+import uuid
+from collections import deque
+from threading import Event, Lock
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+import bottle
 
 from common import overrides
 from controller import Controller
-from model import IModelListener, ModelFile
+from model import IModelListener, Model, ModelFile
 
 from ..serialize import SerializeModel
-from ..utils import StreamQueue
 from ..web_app import IStreamHandler
 
+if TYPE_CHECKING:
+    from ..web_app import WebApp
+
+
+class ModelStreamFilter(NamedTuple):
+    """
+    Root files a model stream subscribes to
+
+    A filtered stream sees the model as if it only contained the accepted
+    files: a file that stops matching is sent as removed, and a file that
+    starts matching is sent as added.
+    """
+
+    pair_ids: frozenset[str] | None = None  # None accepts any pair
+    states: frozenset[ModelFile.State] | None = None  # None accepts any state
+
+    @staticmethod
+    def from_query(pair_id: str, state: str) -> ModelStreamFilter | None:
+        """
+        Parse comma-separated pair ids and states, raises ValueError if a state is invalid
+        :return: the filter, or None if it accepts everything
+        """
+        pair_ids = frozenset(p.strip() for p in pair_id.split(",") if p.strip())
+        try:
+            states = frozenset(ModelFile.State[s.strip().upper()] for s in state.split(",") if s.strip())
+        except KeyError:
+            raise ValueError(f"Invalid state: {state}") from None
+        if not pair_ids and not states:
+            return None
+        return ModelStreamFilter(pair_ids=pair_ids or None, states=states or None)
+
+    def accepts(self, file: ModelFile) -> bool:
+        return (self.pair_ids is None or file.pair_id in self.pair_ids) and (
+            self.states is None or file.state in self.states
+        )
+
+    def apply(self, event: SerializeModel.UpdateEvent) -> SerializeModel.UpdateEvent | None:
+        """Return the event as seen through this filter, or None if the stream shouldn't see it"""
+        old_file = event.old_file if event.old_file is not None and self.accepts(event.old_file) else None
+        new_file = event.new_file if event.new_file is not None and self.accepts(event.new_file) else None
+        if old_file is None and new_file is None:
+            return None
+        if old_file is not None and new_file is not None:
+            return event
+        change = SerializeModel.UpdateEvent.Change.ADDED if new_file else SerializeModel.UpdateEvent.Change.REMOVED
+        if change == event.change:
+            return event
+        return SerializeModel.UpdateEvent(change=change, old_file=old_file, new_file=new_file)
+
+
+class _BacklogEntry:
+    """An update event in the hub backlog, serialized on first read"""
+
+    __slots__ = ("event", "payloads")
+
+    def __init__(self, event: SerializeModel.UpdateEvent):
+        self.event = event
+        # (change as seen by the stream, with_children) -> payload
+        # A filter can only turn the event into an addition or a removal, so the
+        # change identifies the filtered event and streams with any filter share payloads
+        self.payloads: dict[tuple[SerializeModel.UpdateEvent.Change, bool], str] = {}
+
 
-class WebResponseModelListener(IModelListener, StreamQueue[SerializeModel.UpdateEvent]):
+class ModelStreamHub(IModelListener):
     """
-    Model listener used by streams to listen to model updates
-    One listener should be created for each new request
+    Single model listener shared by all model streams
+
+    The hub listens to the model once, no matter how many streams are open,
+    and keeps a bounded backlog of update events. Every event is serialized
+    at most once, by whichever stream reads it first, and the resulting payload
+    is shared by all streams. Each stream only keeps a cursor into the backlog.
+    A stream that falls more than _MAX_BACKLOG events behind is resynced with
+    a fresh model-init event instead of queueing without bound. Streams with a
+    ModelStreamFilter skip the events they don't subscribe to without
+    serializing them.
+
+    Every model event carries an SSE id made of the hub epoch and the stream
+    position after the event. A reconnecting client that presents its last id
+    resumes from the backlog and only receives the events it missed. It gets
+    a full model-init instead if the id is from another epoch or too old.
+
+    The hub attaches to the controller when the first stream subscribes. When
+    the last one leaves, the hub keeps tracking the model for
+    _RESUME_WINDOW_IN_SECS so that the client can resume, then stops tracking.
+    The next stream after that re-attaches with a new epoch.
     """
 
-    def __init__(self):
-        super().__init__()
+    _MAX_BACKLOG = 500
+    _RESUME_WINDOW_IN_SECS = 120.0
+    # Model-init payloads kept per sequence number, one per distinct filter
+    _MAX_INIT_CACHE = 16
+
+    def __init__(self, controller: Controller):
+        self.__controller = controller
+        # Guards subscriber count and attach/detach; never held while waiting on __lock
+        self.__attach_lock = Lock()
+        self.__subscribers = 0
+        self.__attached = False
+        # Wakeups of the subscribed streams, set on every new event
+        self.__wakeups: set[Event] = set()
+        # Guards everything below; model callbacks only ever take this lock
+        self.__lock = Lock()
+        self.__serialize: SerializeModel | None = None
+        self.__files: dict[str, ModelFile] = {}
+        self.__backlog: deque[_BacklogEntry] = deque(maxlen=ModelStreamHub._MAX_BACKLOG)
+        self.__next_seq = 0  # sequence number of the next event
+        # (with_children, filter) -> (seq, model-init payload)
+        self.__init_cache: dict[tuple[bool, ModelStreamFilter | None], tuple[int, str]] = {}
+        self.__epoch = ""  # changes on every attach, so that old ids can't match
+        self.__idle_since: float | None = None  # time the last stream left, None while streams are open
+        self.__stale = False  # resume window expired, events are no longer tracked
+
+    def subscribe(
+        self, wakeup: Event | None = None, last_event_id: str | None = None
+    ) -> tuple[int, list[ModelFile] | None]:
+        """
+        Register a new stream
+        :param wakeup: event to set whenever there is a new event
+        :param last_event_id: SSE id of the last event the client received, if resuming
+        :return: the sequence number of the first event the stream should read,
+                 and the model files as of just before that event. Files is None
+                 if the stream resumes from last_event_id and needs no model-init.
+        """
+        with self.__attach_lock:
+            if self.__subscribers == 0:
+                with self.__lock:
+                    expired = self.__stale or self.__is_idle_expired()
+                    self.__idle_since = None
+                if self.__attached and expired:
+                    self.__detach()
+                if not self.__attached:
+                    self.__attach()
+            self.__subscribers += 1
+        with self.__lock:
+            if wakeup is not None:
+                self.__wakeups.add(wakeup)
+            resume_seq = self.__resume_seq(last_event_id)
+            if resume_seq is not None:
+                return resume_seq, None
+            return self.__next_seq, list(self.__files.values())
+
+    def unsubscribe(self, wakeup: Event | None = None):
+        with self.__attach_lock:
+            with self.__lock:
+                if wakeup is not None:
+                    self.__wakeups.discard(wakeup)
+                if self.__subscribers == 1:
+                    # Keep tracking the model so that the client can resume
+                    self.__idle_since = time.monotonic()
+            self.__subscribers -= 1
+
+    def event_id(self, seq: int) -> str:
+        """SSE id of the stream position seq, i.e. after all events before seq"""
+        return f"{self.__epoch}.{seq}"
+
+    def serialize_model(
+        self,
+        seq: int,
+        files: list[ModelFile],
+        with_children: bool = True,
+        file_filter: ModelStreamFilter | None = None,
+    ) -> str:
+        """
+        Serialize the model-init event for files as of seq
+        Streams that start at the same sequence number share the payload
+        """
+        cache_key = (with_children, file_filter)
+        with self.__lock:
+            cache = self.__init_cache.get(cache_key)
+            if cache is not None and cache[0] == seq:
+                return cache[1]
+            event_id = self.event_id(seq)
+        # Serialize outside the lock, so that model events aren't held up
+        assert self.__serialize is not None
+        if file_filter is not None:
+            files = [f for f in files if file_filter.accepts(f)]
+        payload = self.__serialize.model(files, event_id=event_id, with_children=with_children)
+        with self.__lock:
+            cache = self.__init_cache.get(cache_key)
+            if cache is not None and cache[0] >= seq:
+                # Another stream cached this one, or a newer one, in the meantime
+                return cache[1] if cache[0] == seq else payload
+            if cache is not None or len(self.__init_cache) >= ModelStreamHub._MAX_INIT_CACHE:
+                # Payloads of older sequence numbers won't be asked for again
+                self.__init_cache = {k: v for k, v in self.__init_cache.items() if v[0] == seq}
+            self.__init_cache[cache_key] = (seq, payload)
+        return payload
+
+    def get_payload(
+        self, seq: int, with_children: bool = True, file_filter: ModelStreamFilter | None = None
+    ) -> tuple[str | None, int]:
+        """
+        Return the payload of the next event at or after seq that passes
+        file_filter, and the sequence number to read next
+        Returns (None, seq) if there is no such event yet
+        """
+        while True:
+            with self.__lock:
+                if seq >= self.__next_seq:
+                    return None, seq
+                first_seq = self.__next_seq - len(self.__backlog)
+                if seq < first_seq:
+                    # Stream fell too far behind, start it over from the current model
+                    resync_seq = self.__next_seq
+                    files = list(self.__files.values())
+                    entry = None
+                else:
+                    entry = self.__backlog[seq - first_seq]
+            if entry is None:
+                return self.serialize_model(resync_seq, files, with_children, file_filter), resync_seq
+            event = entry.event if file_filter is None else file_filter.apply(entry.event)
+            if event is None:
+                # Not subscribed to, skip without serializing
+                seq += 1
+                continue
+            # Serialize outside the lock; a concurrent duplicate is harmless
+            payload_key = (event.change, with_children)
+            payload = entry.payloads.get(payload_key)
+            if payload is None:
+                assert self.__serialize is not None
+                if with_children:
+                    payload = self.__serialize.update_event(event, event_id=self.event_id(seq + 1))
+                else:
+                    payload = self.__serialize.update_event(event, event_id=self.event_id(seq + 1), with_children=False)
+                entry.payloads[payload_key] = payload
+            return payload, seq + 1
 
     @overrides(IModelListener)
     def file_added(self, file: ModelFile):
-        self.put(
+        self.__put(
             SerializeModel.UpdateEvent(change=SerializeModel.UpdateEvent.Change.ADDED, old_file=None, new_file=file)
         )
 
     @overrides(IModelListener)
     def file_removed(self, file: ModelFile):
-        self.put(
+        self.__put(
             SerializeModel.UpdateEvent(change=SerializeModel.UpdateEvent.Change.REMOVED, old_file=file, new_file=None)
         )
 
     @overrides(IModelListener)
     def file_updated(self, old_file: ModelFile, new_file: ModelFile):
-        self.put(
+        self.__put(
             SerializeModel.UpdateEvent(
                 change=SerializeModel.UpdateEvent.Change.UPDATED, old_file=old_file, new_file=new_file
             )
         )
 
+    def __attach(self):
+        """Start listening to the model. Caller must hold __attach_lock."""
+        with self.__lock:
+            self.__serialize = SerializeModel()
+            self.__epoch = uuid.uuid4().hex[:8]
+            self.__stale = False
+            start_seq = self.__next_seq
+        # Must not hold __lock here: the model notifies listeners under its own lock
+        initial_files = self.__controller.get_model_files_and_add_listener(self)
+        with self.__lock:
+            # Events may have arrived between registering and taking the lock,
+            # replay them on top of the initial model
+            files = {Model.file_key(f): f for f in initial_files}
+            first_seq = self.__next_seq - len(self.__backlog)
+            for entry in list(self.__backlog)[max(start_seq - first_seq, 0) :]:
+                ModelStreamHub.__apply(files, entry.event)
+            self.__files = files
+        self.__attached = True
+
+    def __detach(self):
+        """Stop listening to the model. Caller must hold __attach_lock."""
+        self.__controller.remove_model_listener(self)
+        self.__attached = False
+        with self.__lock:
+            self.__files.clear()
+            self.__backlog.clear()
+            self.__init_cache.clear()
+
+    def __is_idle_expired(self) -> bool:
+        """Caller must hold __lock"""
+        idle_since = self.__idle_since
+        return idle_since is not None and time.monotonic() - idle_since > ModelStreamHub._RESUME_WINDOW_IN_SECS
+
+    def __resume_seq(self, last_event_id: str | None) -> int | None:
+        """
+        Return the position to resume a stream from, or None if it can't resume
+        Caller must hold __lock
+        """
+        if not last_event_id:
+            return None
+        epoch, _, seq_str = last_event_id.strip().partition(".")
+        if epoch != self.__epoch or not seq_str.isdigit():
+            return None
+        seq = int(seq_str)
+        first_seq = self.__next_seq - len(self.__backlog)
+        if first_seq <= seq <= self.__next_seq:
+            return seq
+        return None
+
+    def __put(self, event: SerializeModel.UpdateEvent):
+        with self.__lock:
+            if self.__stale:
+                return
+            if self.__is_idle_expired():
+                # Nobody resumed in time, stop tracking until the next stream re-attaches
+                self.__stale = True
+                self.__files.clear()
+                self.__backlog.clear()
+                self.__init_cache.clear()
+                return
+            ModelStreamHub.__apply(self.__files, event)
+            self.__backlog.append(_BacklogEntry(event))
+            self.__next_seq += 1
+            for wakeup in self.__wakeups:
+                wakeup.set()
+
+    @staticmethod
+    def __apply(files: dict[str, ModelFile], event: SerializeModel.UpdateEvent):
+        if event.new_file is not None:
+            files[Model.file_key(event.new_file)] = event.new_file
+        elif event.old_file is not None:
+            files.pop(Model.file_key(event.old_file), None)
+
 
 class ModelStreamHandler(IStreamHandler):
+    event_family = "model"
+
+    # Hub shared by all model streams of the registered web app
+    _hub: ModelStreamHub | None = None
+
     def __init__(self, controller: Controller):
         self.controller = controller
-        self.serialize = SerializeModel()
-        self.model_listener = WebResponseModelListener()
-        self.initial_model_files = None
+        self.initial_model_files: list[ModelFile] | None = None
         self.first_run = True
+        # Handlers are created while serving the stream request. EventSource sends
+        # Last-Event-ID when it reconnects on its own; the web client passes it as
+        # a query parameter when it opens a new EventSource.
+        self.__last_event_id = bottle.request.get_header("Last-Event-ID") or bottle.request.query.get("last_event_id")
+        # model_children=false sends root files only; clients fetch subtrees from /server/model/children
+        self.__with_children = bottle.request.query.get("model_children", "").lower() not in ("0", "false")
+        # pair_id and state (comma-separated) subscribe to matching root files only
+        self.__filter = ModelStreamFilter.from_query(
+            bottle.request.query.get("pair_id", ""), bottle.request.query.get("state", "")
+        )
+        self.__seq = 0
+        self.__subscribed = False
+        self.__wakeup: Event | None = None
+
+    # noinspection PyUnresolvedReferences
+    @classmethod
+    @overrides(IStreamHandler)
+    def register(cls, web_app: WebApp, **kwargs: Any) -> None:
+        # Create the shared hub when we register
+        ModelStreamHandler._hub = ModelStreamHub(kwargs["controller"])
+        super().register(web_app=web_app, **kwargs)
+
+    @overrides(IStreamHandler)
+    def set_wakeup(self, wakeup: Event):
+        self.__wakeup = wakeup
 
     @overrides(IStreamHandler)
     def setup(self):
-        self.initial_model_files = self.controller.get_model_files_and_add_listener(self.model_listener)
+        assert ModelStreamHandler._hub is not None
+        self.__seq, self.initial_model_files = ModelStreamHandler._hub.subscribe(self.__wakeup, self.__last_event_id)
+        self.__subscribed = True
+        if self.initial_model_files is None:
+            # Resumed, the client already has the model up to this position
+            self.first_run = False
 
     @overrides(IStreamHandler)
     def get_value(self) -> str | None:
+        assert ModelStreamHandler._hub is not None
         if self.first_run:
             self.first_run = False
             assert self.initial_model_files is not None
-            return self.serialize.model(self.initial_model_files)
-        event = self.model_listener.get_next_event()
-        if event is not None:
-            return self.serialize.update_event(event)
-        return None
+            payload = ModelStreamHandler._hub.serialize_model(
+                self.__seq, self.initial_model_files, self.__with_children, self.__filter
+            )
+            self.initial_model_files = None
+            return payload
+        payload, self.__seq = ModelStreamHandler._hub.get_payload(self.__seq, self.__with_children, self.__filter)
+        return payload
 
     @overrides(IStreamHandler)
     def cleanup(self):
-        if self.model_listener:
-            self.controller.remove_model_listener(self.model_listener)
+        if self.__subscribed and ModelStreamHandler._hub is not None:
+            self.__subscribed = False
+            ModelStreamHandler._hub.unsubscribe(self.__wakeup)
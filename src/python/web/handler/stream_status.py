@@ -1,33 +1,70 @@
 # Copyright 2017, Inderpreet Singh, All rights reserved.
 
+import time
+from threading import Event
+from typing import Any
 
 from common import IStatusListener, Status, overrides
 
-from ..serialize import SerializeStatus
-from ..utils import StreamQueue
+from ..serialize import SerializeStatus, SerializeStatusJson
 from ..web_app import IStreamHandler
 
 
-class StatusListener(IStatusListener, StreamQueue[Status]):
+class StatusListener(IStatusListener):
     """
     Status listener used by status streams to listen to status updates
+
+    Only records that the status changed; the stream reads the status itself
+    when it is ready to send it, so a burst of changes costs one read.
     """
 
-    def __init__(self, status: Status):
-        super().__init__()
-        self.__status = status
+    def __init__(self):
+        self.__dirty = Event()
+        self.__wakeup: Event | None = None
+
+    def set_wakeup(self, wakeup: Event | None):
+        self.__wakeup = wakeup
+
+    @property
+    def is_dirty(self) -> bool:
+        return self.__dirty.is_set()
+
+    def clear(self):
+        self.__dirty.clear()
 
     @overrides(IStatusListener)
     def notify(self):
-        self.put(self.__status.copy())
+        if self.__dirty.is_set():
+            # The stream already knows
+            return
+        self.__dirty.set()
+        wakeup = self.__wakeup
+        if wakeup is not None:
+            wakeup.set()
 
 
 class StatusStreamHandler(IStreamHandler):
+    """
+    Streams the full status once, then the changed components as "status-delta"
+    events, at most one every _MIN_INTERVAL_IN_SECS
+    """
+
+    event_family = "status"
+
+    _MIN_INTERVAL_IN_SECS = 0.5
+
     def __init__(self, status: Status):
         self.status = status
         self.serialize = SerializeStatus()
-        self.status_listener = StatusListener(status)
+        self.status_listener = StatusListener()
         self.first_run = True
+        # Last sent value of each component
+        self.__sent: dict[str, Any] = {}
+        self.__last_send_time = 0.0
+
+    @overrides(IStreamHandler)
+    def set_wakeup(self, wakeup: Event):
+        self.status_listener.set_wakeup(wakeup)
 
     @overrides(IStreamHandler)
     def setup(self):
@@ -37,12 +74,29 @@ class StatusStreamHandler(IStreamHandler):
     def get_value(self) -> str | None:
         if self.first_run:
             self.first_run = False
-            status = self.status.copy()
+            # Changes from here on are sent as deltas
+            self.status_listener.clear()
+            status = self.status.snapshot()
+            self.__sent = SerializeStatusJson.status_dict(status)
+            self.__last_send_time = time.monotonic()
             return self.serialize.status(status)
-        status = self.status_listener.get_next_event()
-        if status is not None:
-            return self.serialize.status(status)
-        return None
+        time_to_send = self.time_to_next_value()
+        if time_to_send is None or time_to_send > 0:
+            return None
+        self.status_listener.clear()
+        status_dict = SerializeStatusJson.status_dict(self.status.snapshot())
+        changed = {key: value for key, value in status_dict.items() if self.__sent.get(key) != value}
+        if not changed:
+            return None
+        self.__sent.update(changed)
+        self.__last_send_time = time.monotonic()
+        return self.serialize.status_delta(changed)
+
+    @overrides(IStreamHandler)
+    def time_to_next_value(self) -> float | None:
+        if not self.status_listener.is_dirty:
+            return None
+        return max(self.__last_send_time + StatusStreamHandler._MIN_INTERVAL_IN_SECS - time.monotonic(), 0)
 
     @overrides(IStreamHandler)
     def cleanup(self):
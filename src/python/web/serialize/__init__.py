@@ -6,3 +6,4 @@ from .serialize_status import SerializeStatus as SerializeStatus, SerializeStatu
 from .serialize_config import SerializeConfig as SerializeConfig
 from .serialize_auto_queue import SerializeAutoQueue as SerializeAutoQueue
 from .serialize_log_record import SerializeLogRecord as SerializeLogRecord
+from .serialize_command_result import SerializeCommandResult as SerializeCommandResult
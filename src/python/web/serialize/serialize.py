@@ -9,9 +9,11 @@ class Serialize(ABC):
     """
 
     # noinspection PyMethodMayBeStatic
-    def _sse_pack(self, event: str, data: str) -> str:
+    def _sse_pack(self, event: str, data: str, event_id: str | None = None) -> str:
         """Pack data in SSE format"""
         buffer = ""
+        if event_id is not None:
+            buffer += f"id: {event_id}\n"
         buffer += f"event: {event}\n"
         buffer += f"data: {data}\n"
         buffer += "\n"
@@ -0,0 +1,44 @@
+# Copyright 2017, Inderpreet Singh, All rights reserved.
+
+import json
+from typing import Any
+
+from ..command_results import CommandResult
+from .serialize import Serialize
+
+
+class SerializeCommandResult(Serialize):
+    """
+    This class defines the serialization interface between python backend
+    and the frontend for asynchronously submitted commands.
+    """
+
+    # Event keys
+    __EVENT_RESULT = "command-result"
+
+    # Data keys
+    __KEY_COMMAND_ID = "command_id"
+    __KEY_ACTION = "action"
+    __KEY_FILE = "file"
+    __KEY_PAIR_ID = "pair_id"
+    __KEY_STATE = "state"
+    __KEY_ERROR = "error"
+
+    def result(self, result: CommandResult) -> str:
+        """Serialize a result as an SSE event"""
+        return self._sse_pack(
+            event=SerializeCommandResult.__EVENT_RESULT, data=SerializeCommandResult.result_json(result)
+        )
+
+    @staticmethod
+    def result_json(result: CommandResult) -> str:
+        """Serialize a result as plain JSON, for polling clients"""
+        json_dict: dict[str, Any] = {
+            SerializeCommandResult.__KEY_COMMAND_ID: result.command_id,
+            SerializeCommandResult.__KEY_ACTION: result.action,
+            SerializeCommandResult.__KEY_FILE: result.file_name,
+            SerializeCommandResult.__KEY_PAIR_ID: result.pair_id,
+            SerializeCommandResult.__KEY_STATE: result.state.name.lower(),
+            SerializeCommandResult.__KEY_ERROR: result.error,
+        }
+        return json.dumps(json_dict)
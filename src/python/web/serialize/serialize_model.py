@@ -36,6 +36,12 @@ class SerializeModel(Serialize):
     __KEY_UPDATE_OLD_FILE = "old_file"
     __KEY_UPDATE_NEW_FILE = "new_file"
 
+    # REST response keys
+    __KEY_VERSION = "version"
+    __KEY_TOTAL = "total"
+    __KEY_FILES = "files"
+    __KEY_NEXT_CURSOR = "next_cursor"
+
     # Model file keys
     __KEY_FILE_NAME = "name"
     __KEY_FILE_PAIR_ID = "pair_id"
@@ -58,6 +64,10 @@ class SerializeModel(Serialize):
     __KEY_FILE_LOCAL_SIZE = "local_size"
     __KEY_FILE_DOWNLOADING_SPEED = "downloading_speed"
     __KEY_FILE_ETA = "eta"
+    __KEY_FILE_ETA_LOW = "eta_low"
+    __KEY_FILE_ETA_HIGH = "eta_high"
+    __KEY_FILE_THROUGHPUT = "throughput"
+    __KEY_FILE_PRIORITY = "priority"
     __KEY_FILE_IS_EXTRACTABLE = "is_extractable"
     __KEY_FILE_LOCAL_CREATED_TIMESTAMP = "local_created_timestamp"
     __KEY_FILE_LOCAL_MODIFIED_TIMESTAMP = "local_modified_timestamp"
@@ -67,7 +77,7 @@ class SerializeModel(Serialize):
     __KEY_FILE_CHILDREN = "children"
 
     @staticmethod
-    def __model_file_to_json_dict(model_file: ModelFile) -> dict[str, Any]:
+    def __model_file_to_json_dict(model_file: ModelFile, with_children: bool = True) -> dict[str, Any]:
         json_dict: dict[str, Any] = {}
         json_dict[SerializeModel.__KEY_FILE_NAME] = model_file.name
         json_dict[SerializeModel.__KEY_FILE_PAIR_ID] = model_file.pair_id
@@ -77,6 +87,10 @@ class SerializeModel(Serialize):
         json_dict[SerializeModel.__KEY_FILE_LOCAL_SIZE] = model_file.local_size
         json_dict[SerializeModel.__KEY_FILE_DOWNLOADING_SPEED] = model_file.downloading_speed
         json_dict[SerializeModel.__KEY_FILE_ETA] = model_file.eta
+        json_dict[SerializeModel.__KEY_FILE_ETA_LOW] = model_file.eta_low
+        json_dict[SerializeModel.__KEY_FILE_ETA_HIGH] = model_file.eta_high
+        json_dict[SerializeModel.__KEY_FILE_THROUGHPUT] = model_file.throughput
+        json_dict[SerializeModel.__KEY_FILE_PRIORITY] = model_file.priority
         json_dict[SerializeModel.__KEY_FILE_IS_EXTRACTABLE] = model_file.is_extractable
         json_dict[SerializeModel.__KEY_FILE_LOCAL_CREATED_TIMESTAMP] = (
             str(model_file.local_created_timestamp.timestamp()) if model_file.local_created_timestamp else None
@@ -92,27 +106,65 @@ class SerializeModel(Serialize):
         )
         json_dict[SerializeModel.__KEY_FILE_FULL_PATH] = model_file.full_path
         json_dict[SerializeModel.__KEY_FILE_CHILDREN] = []
-        for child in model_file.get_children():
-            json_dict[SerializeModel.__KEY_FILE_CHILDREN].append(SerializeModel.__model_file_to_json_dict(child))
+        if with_children:
+            for child in model_file.get_children():
+                json_dict[SerializeModel.__KEY_FILE_CHILDREN].append(SerializeModel.__model_file_to_json_dict(child))
         return json_dict
 
-    def model(self, model_files: list[ModelFile]) -> str:
+    def model(self, model_files: list[ModelFile], event_id: str | None = None, with_children: bool = True) -> str:
         """
         Serialize the model
+        :param model_files:
+        :param event_id: SSE id of the event, used by clients to resume the stream
+        :param with_children: if False, files are sent without their children
         :return:
         """
-        model_json_list = [SerializeModel.__model_file_to_json_dict(f) for f in model_files]
+        model_json_list = [SerializeModel.__model_file_to_json_dict(f, with_children) for f in model_files]
         model_json = json.dumps(model_json_list)
-        return self._sse_pack(event=SerializeModel.__EVENT_INIT, data=model_json)
+        return self._sse_pack(event=SerializeModel.__EVENT_INIT, data=model_json, event_id=event_id)
 
-    def update_event(self, event: UpdateEvent):
+    def update_event(self, event: UpdateEvent, event_id: str | None = None, with_children: bool = True):
         model_file_json_dict = {
-            SerializeModel.__KEY_UPDATE_OLD_FILE: SerializeModel.__model_file_to_json_dict(event.old_file)
+            SerializeModel.__KEY_UPDATE_OLD_FILE: SerializeModel.__model_file_to_json_dict(
+                event.old_file, with_children
+            )
             if event.old_file
             else None,
-            SerializeModel.__KEY_UPDATE_NEW_FILE: SerializeModel.__model_file_to_json_dict(event.new_file)
+            SerializeModel.__KEY_UPDATE_NEW_FILE: SerializeModel.__model_file_to_json_dict(
+                event.new_file, with_children
+            )
             if event.new_file
             else None,
         }
         model_file_json = json.dumps(model_file_json_dict)
-        return self._sse_pack(event=SerializeModel.__EVENT_UPDATE[event.change], data=model_file_json)
+        return self._sse_pack(
+            event=SerializeModel.__EVENT_UPDATE[event.change], data=model_file_json, event_id=event_id
+        )
+
+    def files_page(
+        self,
+        version: int,
+        total: int,
+        model_files: list[ModelFile],
+        next_cursor: str | None,
+        with_children: bool = False,
+    ) -> str:
+        """
+        Serialize a page of files as plain JSON, for the REST model API
+        :param version: model version the page was taken from
+        :param total: number of files matching the query, across all pages
+        :param model_files: files in this page
+        :param next_cursor: cursor of the next page, None on the last page
+        :param with_children: if False, files are sent without their children
+        :return:
+        """
+        return json.dumps(
+            {
+                SerializeModel.__KEY_VERSION: version,
+                SerializeModel.__KEY_TOTAL: total,
+                SerializeModel.__KEY_FILES: [
+                    SerializeModel.__model_file_to_json_dict(f, with_children) for f in model_files
+                ],
+                SerializeModel.__KEY_NEXT_CURSOR: next_cursor,
+            }
+        )
@@ -19,9 +19,22 @@ class SerializeStatusJson:
     __KEY_CONTROLLER_LATEST_REMOTE_SCAN_FAILED = "latest_remote_scan_failed"
     __KEY_CONTROLLER_LATEST_REMOTE_SCAN_ERROR = "latest_remote_scan_error"
     __KEY_CONTROLLER_NO_ENABLED_PAIRS = "no_enabled_pairs"
+    __KEY_TRANSFER = "transfer"
+    __KEY_TRANSFER_DOWNLOAD_SPEED = "download_speed"
+    __KEY_TRANSFER_PAIR_DOWNLOAD_SPEEDS = "pair_download_speeds"
+    __KEY_TRANSFER_AUTO_TUNE = "auto_tune"
+    __KEY_TRANSFER_RATE_LIMIT = "rate_limit"
+    __KEY_TRANSFER_MAX_TOTAL_CONNECTIONS = "max_total_connections"
+    __KEY_TRANSFER_SCHEDULE_WINDOW = "schedule_window"
+    __KEY_TRANSFER_LFTP_LATENCY = "lftp_latency"
 
     @staticmethod
     def status(status: Status) -> str:
+        return json.dumps(SerializeStatusJson.status_dict(status))
+
+    @staticmethod
+    def status_dict(status: Status) -> dict[str, Any]:
+        """Status as a JSON-compatible dict, keyed by component"""
         json_dict: dict[str, Any] = {}
 
         json_dict[SerializeStatusJson.__KEY_SERVER] = {}
@@ -53,8 +66,30 @@ class SerializeStatusJson:
             status.controller.no_enabled_pairs
         )
 
-        status_json = json.dumps(json_dict)
-        return status_json
+        json_dict[SerializeStatusJson.__KEY_TRANSFER] = {}
+        json_dict[SerializeStatusJson.__KEY_TRANSFER][SerializeStatusJson.__KEY_TRANSFER_DOWNLOAD_SPEED] = (
+            status.transfer.download_speed
+        )
+        json_dict[SerializeStatusJson.__KEY_TRANSFER][SerializeStatusJson.__KEY_TRANSFER_PAIR_DOWNLOAD_SPEEDS] = dict(
+            status.transfer.pair_download_speeds
+        )
+        json_dict[SerializeStatusJson.__KEY_TRANSFER][SerializeStatusJson.__KEY_TRANSFER_AUTO_TUNE] = {
+            host: dict(state) for host, state in status.transfer.auto_tune.items()
+        }
+        json_dict[SerializeStatusJson.__KEY_TRANSFER][SerializeStatusJson.__KEY_TRANSFER_RATE_LIMIT] = (
+            status.transfer.rate_limit
+        )
+        json_dict[SerializeStatusJson.__KEY_TRANSFER][SerializeStatusJson.__KEY_TRANSFER_MAX_TOTAL_CONNECTIONS] = (
+            status.transfer.max_total_connections
+        )
+        json_dict[SerializeStatusJson.__KEY_TRANSFER][SerializeStatusJson.__KEY_TRANSFER_SCHEDULE_WINDOW] = (
+            status.transfer.schedule_window
+        )
+        json_dict[SerializeStatusJson.__KEY_TRANSFER][SerializeStatusJson.__KEY_TRANSFER_LFTP_LATENCY] = {
+            host: dict(latency) for host, latency in status.transfer.lftp_latency.items()
+        }
+
+        return json_dict
 
 
 class SerializeStatus(Serialize):
@@ -65,7 +100,16 @@ class SerializeStatus(Serialize):
 
     # Event keys
     __EVENT_STATUS = "status"
+    __EVENT_STATUS_DELTA = "status-delta"
 
     def status(self, status: Status) -> str:
         status_json = SerializeStatusJson.status(status)
         return self._sse_pack(event=SerializeStatus.__EVENT_STATUS, data=status_json)
+
+    def status_delta(self, components: dict[str, Any]) -> str:
+        """
+        Serialize the components that changed since the last status event
+        :param components: component key -> component dict, as in SerializeStatusJson.status_dict()
+        :return:
+        """
+        return self._sse_pack(event=SerializeStatus.__EVENT_STATUS_DELTA, data=json.dumps(components))
@@ -0,0 +1,92 @@
+# Copyright 2017, Inderpreet Singh, All rights reserved.
+
+"""In-memory cache of the web client's static assets.
+
+Assets are read and gzip-compressed once, when the web app starts, instead
+of being read from disk on every request. Each asset gets a strong ETag from
+its content. Files with a content hash in their name (as produced by the
+Angular build) never change under the same name, so browsers may cache them
+forever; everything else is revalidated with the ETag.
+"""
+
+import hashlib
+import logging
+import mimetypes
+import os
+import posixpath
+import re
+from typing import NamedTuple
+
+from .compression import compress, is_compressible
+
+# e.g. main-QTQ3FMLD.js, chunk-2A6NWDYJ.js, styles.8a3f0c1e9b2d4f67.css
+_HASHED_NAME_PATTERN = re.compile(r"[.-](?=[A-Za-z]*[0-9])[A-Za-z0-9]{8,}\.[A-Za-z0-9]+$")
+
+
+class StaticAsset(NamedTuple):
+    body: bytes
+    gzip_body: bytes | None  # None if compression doesn't pay off
+    content_type: str
+    etag: str
+    immutable: bool
+
+
+class StaticAssetCache:
+    """
+    Static assets under a root directory, keyed by their "/"-separated relative path
+
+    Files larger than _MAX_FILE_SIZE, and files beyond a total of
+    _MAX_TOTAL_SIZE, are not cached; callers serve them from disk.
+    """
+
+    _MAX_FILE_SIZE = 8 * 1024 * 1024
+    _MAX_TOTAL_SIZE = 64 * 1024 * 1024
+
+    def __init__(self):
+        self.__assets: dict[str, StaticAsset] = {}
+
+    def load(self, root: str, logger: logging.Logger):
+        """Read, compress and cache all files under root, replacing any cached assets"""
+        assets: dict[str, StaticAsset] = {}
+        total_size = 0
+        for dir_path, dir_names, file_names in os.walk(root):
+            dir_names.sort()
+            for file_name in sorted(file_names):
+                path = os.path.join(dir_path, file_name)
+                try:
+                    size = os.path.getsize(path)
+                    if size > StaticAssetCache._MAX_FILE_SIZE or total_size + size > StaticAssetCache._MAX_TOTAL_SIZE:
+                        continue
+                    with open(path, "rb") as f:
+                        body = f.read()
+                except OSError:
+                    continue
+                total_size += len(body)
+                key = os.path.relpath(path, root).replace(os.sep, "/")
+                assets[key] = StaticAssetCache.__make_asset(file_name, body)
+        self.__assets = assets
+        logger.info(f"Cached {len(assets)} static assets ({total_size} bytes)")
+
+    def get(self, file_path: str) -> StaticAsset | None:
+        return self.__assets.get(posixpath.normpath(file_path).lstrip("/"))
+
+    def __len__(self) -> int:
+        return len(self.__assets)
+
+    @staticmethod
+    def __make_asset(file_name: str, body: bytes) -> StaticAsset:
+        content_type = mimetypes.guess_type(file_name)[0] or "application/octet-stream"
+        gzip_body = None
+        if is_compressible(content_type):
+            if content_type.startswith("text/") or content_type == "application/javascript":
+                content_type += "; charset=UTF-8"
+            compressed = compress(body, "gzip", level=9)
+            if len(compressed) < len(body):
+                gzip_body = compressed
+        return StaticAsset(
+            body=body,
+            gzip_body=gzip_body,
+            content_type=content_type,
+            etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"',
+            immutable=_HASHED_NAME_PATTERN.search(file_name) is not None,
+        )
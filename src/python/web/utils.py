@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 from queue import Empty, Queue
+from threading import Event
 from typing import Generic, TypeVar
 
 T = TypeVar("T")
@@ -14,13 +15,22 @@ class StreamQueue(Generic[T]):
     Useful for web streams that wait for listener events from other threads.
     The producer thread calls put() to insert events. The consumer stream
     calls get_next_event() to receive event in its own thread.
+    If a wakeup is set, put() also signals it so that a consumer blocked
+    on the wakeup returns immediately.
     """
 
     def __init__(self):
         self.__queue: Queue[T] = Queue()
+        self.__wakeup: Event | None = None
+
+    def set_wakeup(self, wakeup: Event | None):
+        self.__wakeup = wakeup
 
     def put(self, event: T):
         self.__queue.put(event)
+        wakeup = self.__wakeup
+        if wakeup is not None:
+            wakeup.set()
 
     def get_next_event(self) -> T | None:
         """
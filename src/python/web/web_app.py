@@ -1,5 +1,6 @@
 # Copyright 2017, Inderpreet Singh, All rights reserved.
 
+import os
 import threading
 import time
 from abc import ABC, abstractmethod
@@ -7,11 +8,14 @@ from collections.abc import Callable, Iterator
 from typing import Any
 
 import bottle
-from bottle import static_file
+from bottle import HTTPResponse, static_file
 
 from common import Context
 from controller import Controller
 
+from .compression import choose_encoding
+from .static_cache import StaticAsset, StaticAssetCache
+
 
 class IHandler(ABC):
     """
@@ -31,8 +35,15 @@ class IHandler(ABC):
 class IStreamHandler(ABC):
     """
     Abstract class that defines a streaming data provider
+
+    Handlers are created while serving the stream request, so they may read
+    their own subscription parameters from the request query. A handler
+    raises ValueError if those parameters are invalid.
     """
 
+    # Name clients use in the "events" stream parameter to subscribe to this handler
+    event_family = ""
+
     @abstractmethod
     def setup(self):
         pass
@@ -45,6 +56,24 @@ class IStreamHandler(ABC):
     def cleanup(self):
         pass
 
+    @abstractmethod
+    def set_wakeup(self, wakeup: threading.Event):
+        """
+        Called before setup() with the event the stream blocks on
+        Handlers must set it whenever get_value() has something new to return
+        :param wakeup:
+        :return:
+        """
+        pass
+
+    def time_to_next_value(self) -> float | None:
+        """
+        Seconds until get_value() will have a value held back for later,
+        or None if there is no such value
+        Handlers that rate limit their values use this instead of the wakeup.
+        """
+        return None
+
     @classmethod
     def register(cls, web_app: "WebApp", **kwargs: Any) -> None:
         """
@@ -56,12 +85,82 @@ class IStreamHandler(ABC):
         web_app.add_streaming_handler(cls, **kwargs)
 
 
+class StreamSession:
+    """
+    State of one open /server/stream connection
+
+    Owns the stream handlers and the wakeup event they set when they have
+    new values. The server drives the session: it calls poll() whenever the
+    wakeup is set or time_to_next_poll() runs out, until is_stopped.
+    """
+
+    # Environ key under which a server that drives streams itself passes the
+    # wakeup event to use; the route then returns the session in STREAM_SESSION_ENVIRON_KEY
+    STREAM_WAKEUP_ENVIRON_KEY = "seedsync.stream_wakeup"
+    STREAM_SESSION_ENVIRON_KEY = "seedsync.stream_session"
+
+    def __init__(self, web_app: "WebApp", handlers: list[IStreamHandler], wakeup: threading.Event):
+        self.__web_app = web_app
+        self.__handlers = handlers
+        self.wakeup = wakeup
+        self.__last_data_time = time.monotonic()
+
+    @property
+    def is_stopped(self) -> bool:
+        return self.__web_app._stop_event.is_set()
+
+    def open(self):
+        self.__web_app._add_stream_wakeup(self.wakeup)
+        for handler in self.__handlers:
+            handler.set_wakeup(self.wakeup)
+            handler.setup()
+
+    def poll(self) -> list[str]:
+        """
+        Return all pending values, or a heartbeat if one is due
+        """
+        # Clear before draining so that a value arriving mid-drain
+        # sets the wakeup again
+        self.wakeup.clear()
+        values: list[str] = []
+        for handler in self.__handlers:
+            # Process all values from this handler
+            while True:
+                value = handler.get_value()
+                if value:
+                    values.append(value)
+                else:
+                    break
+
+        if values:
+            self.__last_data_time = time.monotonic()
+        elif (time.monotonic() - self.__last_data_time) >= WebApp._HEARTBEAT_INTERVAL_IN_SECS:
+            values.append(": heartbeat\n\n")
+            self.__last_data_time = time.monotonic()
+        return values
+
+    def time_to_next_poll(self) -> float:
+        """Seconds until a heartbeat or a held back handler value is due"""
+        timeout = self.__last_data_time + WebApp._HEARTBEAT_INTERVAL_IN_SECS - time.monotonic()
+        for handler in self.__handlers:
+            handler_timeout = handler.time_to_next_value()
+            if handler_timeout is not None:
+                timeout = min(timeout, handler_timeout)
+        return max(timeout, 0)
+
+    def close(self):
+        self.__web_app._remove_stream_wakeup(self.wakeup)
+        self.__web_app.logger.debug("Stream connection stopped by {}".format("server" if self.is_stopped else "client"))
+        # Cleanup all handlers
+        for handler in self.__handlers:
+            handler.cleanup()
+
+
 class WebApp(bottle.Bottle):
     """
     Web app implementation
     """
 
-    _STREAM_POLL_INTERVAL_IN_MS = 250
     _HEARTBEAT_INTERVAL_IN_SECS = 15
 
     def __init__(self, context: Context, controller: Controller):
@@ -69,10 +168,14 @@ class WebApp(bottle.Bottle):
         self.logger = context.logger.getChild("WebApp")
         self.__controller = controller
         self.__html_path = context.args.html_path
+        self.__static_cache = StaticAssetCache()
         self.__status = context.status
         self.logger.info(f"Html path set to: {self.__html_path}")
         self._stop_event = threading.Event()
         self._streaming_handlers: list[tuple[type[IStreamHandler], dict[str, Any]]] = []
+        # Wakeup events of the open streams, so that stop() can release them
+        self._stream_wakeups: set[threading.Event] = set()
+        self._stream_wakeups_lock = threading.Lock()
 
     def add_default_routes(self):
         """
@@ -92,6 +195,8 @@ class WebApp(bottle.Bottle):
         self.route("/about")(self.__index)  # type: ignore[operator]
         # For static files
         self.route("/<file_path:path>")(self.__static)  # type: ignore[operator]
+        if self.__html_path is not None and os.path.isdir(self.__html_path):
+            self.__static_cache.load(self.__html_path, self.logger)
 
     def add_handler(self, path: str, handler: Callable[..., Any]) -> None:
         self.get(path)(handler)  # type: ignore[operator]
@@ -121,6 +226,17 @@ class WebApp(bottle.Bottle):
         :return:
         """
         self._stop_event.set()
+        with self._stream_wakeups_lock:
+            for wakeup in self._stream_wakeups:
+                wakeup.set()
+
+    def _add_stream_wakeup(self, wakeup: threading.Event):
+        with self._stream_wakeups_lock:
+            self._stream_wakeups.add(wakeup)
+
+    def _remove_stream_wakeup(self, wakeup: threading.Event):
+        with self._stream_wakeups_lock:
+            self._stream_wakeups.discard(wakeup)
 
     def __index(self):
         """
@@ -137,49 +253,73 @@ class WebApp(bottle.Bottle):
         :return:
         """
         assert self.__html_path is not None
-        return static_file(file_path, root=self.__html_path)
+        asset = self.__static_cache.get(file_path)
+        if asset is None:
+            return static_file(file_path, root=self.__html_path)
+        return WebApp.__serve_asset(asset)
+
+    @staticmethod
+    def __serve_asset(asset: StaticAsset) -> HTTPResponse:
+        """Serve a cached static asset, gzipped if the client accepts it"""
+        accept_encoding = bottle.request.get_header("Accept-Encoding")
+        use_gzip = asset.gzip_body is not None and choose_encoding(accept_encoding) == "gzip"
+        # Strong ETags must differ between the gzipped and the identity representation
+        gzip_etag = asset.etag[:-1] + '-gzip"'
+        headers = {
+            "ETag": gzip_etag if use_gzip else asset.etag,
+            "Vary": "Accept-Encoding",
+            "Cache-Control": "public, max-age=31536000, immutable" if asset.immutable else "no-cache",
+        }
+        if_none_match = bottle.request.get_header("If-None-Match")
+        if if_none_match is not None:
+            tags = {t.strip().removeprefix("W/") for t in if_none_match.split(",")}
+            if "*" in tags or asset.etag in tags or gzip_etag in tags:
+                return HTTPResponse(status=304, headers=headers)
+        headers["Content-Type"] = asset.content_type
+        if use_gzip:
+            headers["Content-Encoding"] = "gzip"
+        return HTTPResponse(body=asset.gzip_body if use_gzip else asset.body, headers=headers)
+
+    def __web_stream(self) -> Iterator[str] | list[str] | HTTPResponse:
+        # Only the requested event families, e.g. events=model,status; all of them by default
+        streaming_handlers = self._streaming_handlers
+        families = {f.strip().lower() for f in bottle.request.query.get("events", "").split(",") if f.strip()}
+        if families:
+            unknown = families - {cls.event_family for (cls, _) in streaming_handlers}
+            if unknown:
+                return HTTPResponse(body="Unknown event family: {}".format(", ".join(sorted(unknown))), status=400)
+            streaming_handlers = [(cls, kwargs) for (cls, kwargs) in streaming_handlers if cls.event_family in families]
 
-    def __web_stream(self) -> Iterator[str]:
         # Initialize all the handlers
-        handlers: list[IStreamHandler] = [cls(**kwargs) for (cls, kwargs) in self._streaming_handlers]
-
         try:
-            # Setup the response header
-            bottle.response.content_type = "text/event-stream"
-            bottle.response.cache_control = "no-cache"  # type: ignore[assignment]
-            bottle.response.set_header("X-Accel-Buffering", "no")
-
-            # Call setup on all handlers
-            for handler in handlers:
-                handler.setup()
-
+            handlers: list[IStreamHandler] = [cls(**kwargs) for (cls, kwargs) in streaming_handlers]
+        except ValueError as e:
+            return HTTPResponse(body=str(e), status=400)
+
+        # Setup the response header
+        bottle.response.content_type = "text/event-stream"
+        bottle.response.cache_control = "no-cache"  # type: ignore[assignment]
+        bottle.response.set_header("X-Accel-Buffering", "no")
+
+        environ = bottle.request.environ
+        async_wakeup = environ.get(StreamSession.STREAM_WAKEUP_ENVIRON_KEY)
+        if isinstance(async_wakeup, threading.Event):
+            # The server drives the session itself (see AsyncWebServer)
+            session = StreamSession(self, handlers, async_wakeup)
+            session.open()
+            environ[StreamSession.STREAM_SESSION_ENVIRON_KEY] = session
+            return []
+        return self.__run_stream(StreamSession(self, handlers, threading.Event()))
+
+    @staticmethod
+    def __run_stream(session: StreamSession) -> Iterator[str]:
+        """Drive a stream session on the current thread until it stops"""
+        try:
+            session.open()
             # Get streaming values until the connection closes
-            last_data_time = time.monotonic()
-            while not self._stop_event.is_set():
-                had_data = False
-                for handler in handlers:
-                    # Process all values from this handler
-                    while True:
-                        value = handler.get_value()
-                        if value:
-                            yield value
-                            had_data = True
-                        else:
-                            break
-
-                if had_data:
-                    last_data_time = time.monotonic()
-                elif (time.monotonic() - last_data_time) >= WebApp._HEARTBEAT_INTERVAL_IN_SECS:
-                    yield ": heartbeat\n\n"
-                    last_data_time = time.monotonic()
-
-                time.sleep(WebApp._STREAM_POLL_INTERVAL_IN_MS / 1000)
-
+            while not session.is_stopped:
+                yield from session.poll()
+                # Block until a handler has data, or until the next heartbeat is due
+                session.wakeup.wait(session.time_to_next_poll())
         finally:
-            self.logger.debug(
-                "Stream connection stopped by {}".format("server" if self._stop_event.is_set() else "client")
-            )
-
-            # Cleanup all handlers
-            for handler in handlers:
-                handler.cleanup()
+            session.close()
@@ -5,15 +5,18 @@ import os
 from common import Constants, Context
 from controller import AutoQueuePersist, Controller
 
+from .command_results import CommandResultStore
 from .handler.auto_queue import AutoQueueHandler
 from .handler.config import ConfigHandler
 from .handler.controller import ControllerHandler
 from .handler.integrations import IntegrationsHandler
 from .handler.logs import LogsHandler
+from .handler.model import ModelHandler
 from .handler.notifications import NotificationsHandler
 from .handler.path_pairs import PathPairsHandler
 from .handler.server import ServerHandler
 from .handler.status import StatusHandler
+from .handler.stream_command import CommandResultStreamHandler
 from .handler.stream_log import LogStreamHandler
 from .handler.stream_model import ModelStreamHandler
 from .handler.stream_status import StatusStreamHandler
@@ -39,7 +42,10 @@ class WebAppBuilder:
         if context.auto_queue_persist_path is None:
             raise RuntimeError("Context.auto_queue_persist_path must be set before building WebApp")
 
-        self.controller_handler = ControllerHandler(controller)
+        # Results of asynchronously submitted commands, shared by the handler and the streams
+        self.command_results = CommandResultStore()
+        self.controller_handler = ControllerHandler(controller, self.command_results)
+        self.model_handler = ModelHandler(controller)
         self.server_handler = ServerHandler(context)
         self.config_handler = ConfigHandler(
             context.config, context.config_path, on_lftp_config_change=controller.request_lftp_reconfigure
@@ -71,7 +77,10 @@ class WebAppBuilder:
 
         ModelStreamHandler.register(web_app=web_app, controller=self.__controller)
 
+        CommandResultStreamHandler.register(web_app=web_app, command_results=self.command_results)
+
         self.controller_handler.add_routes(web_app)
+        self.model_handler.add_routes(web_app)
         self.server_handler.add_routes(web_app)
         self.config_handler.add_routes(web_app)
         self.auto_queue_handler.add_routes(web_app)
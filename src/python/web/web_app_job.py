@@ -1,11 +1,18 @@
 # Copyright 2017, Inderpreet Singh, All rights reserved.
 
+import asyncio
+import contextlib
+import io
 import logging
+import sys
+import threading
 import time
 from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
 from socketserver import ThreadingMixIn
 from threading import Thread
 from typing import Any
+from urllib.parse import unquote
 from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
 from wsgiref.types import StartResponse, WSGIApplication, WSGIEnvironment
 
@@ -13,7 +20,8 @@ import bottle
 
 from common import Context, Job, overrides
 
-from .web_app import WebApp
+from .compression import CompressionMiddleware, StreamCompressor, choose_encoding
+from .web_app import StreamSession, WebApp
 
 
 class WebAppJob(Job):
@@ -27,13 +35,16 @@ class WebAppJob(Job):
         self.web_access_logger = context.web_access_logger
         self.__context = context
         self.__app = web_app
-        self.__server = None
+        self.__server: MyWSGIRefServer | AsyncWebServer | None = None
         self.__server_thread = None
 
     @overrides(Job)
     def setup(self):
         # Note: do not use requestlogger.WSGILogger as it breaks SSE
-        self.__server = MyWSGIRefServer(self.web_access_logger, host="0.0.0.0", port=self.__context.config.web.port)
+        if self.__context.config.web.server_mode == "asyncio":
+            self.__server = AsyncWebServer(self.web_access_logger, host="0.0.0.0", port=self.__context.config.web.port)
+        else:
+            self.__server = MyWSGIRefServer(self.web_access_logger, host="0.0.0.0", port=self.__context.config.web.port)
         self.__server_thread = Thread(
             target=bottle.run, kwargs={"app": self.__app, "server": self.__server, "debug": self.__context.args.debug}
         )
@@ -107,7 +118,7 @@ class MyWSGIRefServer(bottle.ServerAdapter):
     @overrides(bottle.ServerAdapter)
     def run(self, handler: WSGIApplication) -> None:
         self.logger.debug("Starting web server")
-        handler = _RequestLoggingMiddleware(handler, logger=self.logger, level=logging.DEBUG)
+        handler = _RequestLoggingMiddleware(CompressionMiddleware(handler), logger=self.logger, level=logging.DEBUG)
         self.server = make_server(
             self.host, self.port, handler, server_class=_ThreadingWSGIServer, handler_class=_QuietHandler
         )
@@ -120,3 +131,329 @@ class MyWSGIRefServer(bottle.ServerAdapter):
         self.logger.debug("Stopping web server")
         self.server.shutdown()
         self.server.server_close()
+
+
+class _LoopWakeup(threading.Event):
+    """
+    Stream wakeup that can also be awaited on an event loop
+    Handlers set it from any thread, like a plain threading.Event
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        super().__init__()
+        self.__loop = loop
+        self.__async_event = asyncio.Event()
+
+    @overrides(threading.Event)
+    def set(self):
+        super().set()
+        # RuntimeError: loop is closed, nobody is waiting anymore
+        with contextlib.suppress(RuntimeError):
+            self.__loop.call_soon_threadsafe(self.__async_event.set)
+
+    async def wait_async(self, timeout: float):
+        """Wait until set or until timeout expires. Must be called on the loop."""
+        self.__async_event.clear()
+        if self.is_set():
+            return
+        with contextlib.suppress(TimeoutError):
+            await asyncio.wait_for(self.__async_event.wait(), timeout)
+
+
+class AsyncWebServer(bottle.ServerAdapter):
+    """
+    Web server that handles all connections on a single asyncio event loop
+
+    Regular requests run the WSGI app on a small bounded worker pool.
+    /server/stream sessions are driven by the event loop itself (see
+    StreamSession), so an open stream holds no thread while it waits for
+    events; only each poll briefly borrows a worker. Polls, and requests
+    that open an event stream, have a pool of their own, so requests that
+    block for a while, like commands waiting on the controller, can't hold
+    up the streams.
+
+    A connection is closed when no request starts within _IDLE_TIMEOUT_IN_SECS,
+    or when the rest of a request's head and its body don't arrive within
+    _REQUEST_TIMEOUT_IN_SECS. Bodies must come with a Content-Length of at
+    most _MAX_BODY_SIZE; chunked bodies are refused with 411 and larger ones
+    with 413, before any of the body is read.
+    """
+
+    quiet = True  # disable logging to stdout
+
+    _MAX_WORKERS = 8
+    _MAX_STREAM_WORKERS = 4
+    _MAX_HEADER_SIZE = 64 * 1024
+    # Room for the largest request the app takes, a full batch of commands
+    _MAX_BODY_SIZE = 1024 * 1024
+    _IDLE_TIMEOUT_IN_SECS = 60.0
+    _REQUEST_TIMEOUT_IN_SECS = 30.0
+
+    def __init__(self, logger: logging.Logger, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.logger = logger
+        self.__loop: asyncio.AbstractEventLoop | None = None
+        self.__stopping: asyncio.Event | None = None
+        self.__pool: ThreadPoolExecutor | None = None
+        self.__stream_pool: ThreadPoolExecutor | None = None
+        self.__connections: set[asyncio.Task[None]] = set()
+
+    @overrides(bottle.ServerAdapter)
+    def run(self, handler: WSGIApplication) -> None:
+        self.logger.debug("Starting asyncio web server")
+        # Streams driven by the event loop are compressed in __stream instead
+        app = _RequestLoggingMiddleware(
+            CompressionMiddleware(handler, skip_environ_key=StreamSession.STREAM_SESSION_ENVIRON_KEY),
+            logger=self.logger,
+            level=logging.DEBUG,
+        )
+        self.__pool = ThreadPoolExecutor(max_workers=AsyncWebServer._MAX_WORKERS, thread_name_prefix="WebRequest")
+        self.__stream_pool = ThreadPoolExecutor(
+            max_workers=AsyncWebServer._MAX_STREAM_WORKERS, thread_name_prefix="WebStream"
+        )
+        loop = asyncio.new_event_loop()
+        try:
+            loop.run_until_complete(self.__serve(app))
+        finally:
+            self.__loop = None
+            loop.close()
+            self.__pool.shutdown(wait=False, cancel_futures=True)
+            self.__stream_pool.shutdown(wait=False, cancel_futures=True)
+
+    def stop(self):
+        loop, stopping = self.__loop, self.__stopping
+        if loop is None or stopping is None:
+            self.logger.warning("Web server was never initialized; skipping shutdown")
+            return
+        self.logger.debug("Stopping web server")
+        # RuntimeError: loop already finished
+        with contextlib.suppress(RuntimeError):
+            loop.call_soon_threadsafe(stopping.set)
+
+    async def __serve(self, app: WSGIApplication):
+        stopping = asyncio.Event()
+        server = await asyncio.start_server(
+            lambda reader, writer: self.__on_connection(app, reader, writer),
+            self.host,
+            self.port,
+            limit=AsyncWebServer._MAX_HEADER_SIZE,
+        )
+        self.__stopping = stopping
+        self.__loop = asyncio.get_running_loop()
+        await stopping.wait()
+        server.close()
+        for task in list(self.__connections):
+            task.cancel()
+        if self.__connections:
+            await asyncio.wait(self.__connections)
+
+    async def __on_connection(self, app: WSGIApplication, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        task = asyncio.current_task()
+        assert task is not None
+        self.__connections.add(task)
+        loop = asyncio.get_running_loop()
+        try:
+            keep_alive = True
+            while keep_alive:
+                environ = await self.__read_request(reader, writer)
+                if environ is None:
+                    break
+                environ[StreamSession.STREAM_WAKEUP_ENVIRON_KEY] = _LoopWakeup(loop)
+                pool = self.__stream_pool if "text/event-stream" in environ.get("HTTP_ACCEPT", "") else self.__pool
+                status, headers, content = await loop.run_in_executor(pool, AsyncWebServer.__call_app, app, environ)
+                session = environ.get(StreamSession.STREAM_SESSION_ENVIRON_KEY)
+                if isinstance(session, StreamSession):
+                    encoding = choose_encoding(environ.get("HTTP_ACCEPT_ENCODING"))
+                    compressor = StreamCompressor(encoding) if encoding is not None else None
+                    if encoding is not None:
+                        headers = [*headers, ("Content-Encoding", encoding), ("Vary", "Accept-Encoding")]
+                    writer.write(AsyncWebServer.__response_head(status, headers, None, keep_alive=False))
+                    await self.__stream(reader, writer, session, compressor)
+                    break
+                keep_alive = AsyncWebServer.__wants_keep_alive(environ)
+                writer.write(AsyncWebServer.__response_head(status, headers, len(content), keep_alive))
+                if environ["REQUEST_METHOD"] != "HEAD":
+                    writer.write(content)
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except Exception:
+            self.logger.exception("Unhandled error in asyncio web server connection")
+        finally:
+            self.__connections.discard(task)
+            writer.close()
+
+    async def __stream(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        session: StreamSession,
+        compressor: StreamCompressor | None,
+    ):
+        loop = asyncio.get_running_loop()
+        wakeup = session.wakeup
+        assert isinstance(wakeup, _LoopWakeup)
+        # SSE clients never send anything, so the read only completes on disconnect
+        disconnected = asyncio.ensure_future(reader.read())
+        try:
+            while not session.is_stopped and not disconnected.done():
+                values = await loop.run_in_executor(self.__stream_pool, session.poll)
+                if values:
+                    data = "".join(values).encode()
+                    writer.write(compressor.compress(data) if compressor is not None else data)
+                    await writer.drain()
+                waiting = asyncio.ensure_future(wakeup.wait_async(session.time_to_next_poll()))
+                await asyncio.wait({waiting, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+                waiting.cancel()
+        finally:
+            disconnected.cancel()
+            session.close()
+
+    async def __read_request(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> WSGIEnvironment | None:
+        """
+        Read the next request, its head and body, and build its environ
+        Returns None if the connection should be closed; bad requests are answered first
+        """
+        try:
+            request_line = await asyncio.wait_for(
+                AsyncWebServer.__read_request_line(reader), AsyncWebServer._IDLE_TIMEOUT_IN_SECS
+            )
+            head = await asyncio.wait_for(
+                AsyncWebServer.__read_headers(reader, request_line), AsyncWebServer._REQUEST_TIMEOUT_IN_SECS
+            )
+        except (TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            return None
+        try:
+            environ = self.__make_environ(head, writer)
+            length = int(environ.get("CONTENT_LENGTH") or 0)
+            if length < 0:
+                raise ValueError("Negative Content-Length")
+        except ValueError:
+            await AsyncWebServer.__refuse(writer, "400 Bad Request")
+            return None
+        if "HTTP_TRANSFER_ENCODING" in environ:
+            await AsyncWebServer.__refuse(writer, "411 Length Required")
+            return None
+        if length > AsyncWebServer._MAX_BODY_SIZE:
+            await AsyncWebServer.__refuse(writer, "413 Content Too Large")
+            return None
+        try:
+            body = (
+                await asyncio.wait_for(reader.readexactly(length), AsyncWebServer._REQUEST_TIMEOUT_IN_SECS)
+                if length > 0
+                else b""
+            )
+        except TimeoutError:
+            return None
+        environ["wsgi.input"] = io.BytesIO(body)
+        return environ
+
+    @staticmethod
+    async def __read_request_line(reader: asyncio.StreamReader) -> bytes:
+        """Wait for the next request line, skipping blank lines before it"""
+        line = b"\r\n"
+        while line == b"\r\n":
+            line = await reader.readuntil(b"\r\n")
+        return line
+
+    @staticmethod
+    async def __read_headers(reader: asyncio.StreamReader, request_line: bytes) -> bytes:
+        """Read the headers after the request line, up to the blank line that ends them"""
+        head = request_line
+        line = b""
+        while line != b"\r\n":
+            line = await reader.readuntil(b"\r\n")
+            head += line
+            if len(head) > AsyncWebServer._MAX_HEADER_SIZE:
+                raise asyncio.LimitOverrunError("Request head too large", len(head))
+        return head
+
+    @staticmethod
+    async def __refuse(writer: asyncio.StreamWriter, status: str):
+        writer.write(f"HTTP/1.1 {status}\r\nContent-Length: 0\r\nConnection: close\r\n\r\n".encode("iso-8859-1"))
+        await writer.drain()
+
+    @staticmethod
+    def __call_app(app: WSGIApplication, environ: WSGIEnvironment) -> tuple[str, list[tuple[str, str]], bytes]:
+        """Run the WSGI app to completion. Called on a worker thread."""
+        response: list[Any] = []
+        chunks: list[bytes] = []
+
+        def start_response(status: str, headers: list[tuple[str, str]], exc_info: Any = None) -> Any:
+            if exc_info is not None and response:
+                raise exc_info[1].with_traceback(exc_info[2])
+            response[:] = [status, headers]
+            return chunks.append
+
+        result = app(environ, start_response)
+        try:
+            chunks.extend(result)
+        finally:
+            close = getattr(result, "close", None)
+            if close is not None:
+                close()
+        return response[0], response[1], b"".join(chunks)
+
+    def __make_environ(self, head: bytes, writer: asyncio.StreamWriter) -> WSGIEnvironment:
+        """Build the WSGI environ from a request head. Raises ValueError if malformed."""
+        lines = head.decode("iso-8859-1").split("\r\n")
+        method, target, version = lines[0].split(" ", 2)
+        if not version.startswith("HTTP/"):
+            raise ValueError(f"Bad request line: {lines[0]}")
+        path, _, query = target.partition("?")
+        peer = writer.get_extra_info("peername")
+        environ: WSGIEnvironment = {
+            "REQUEST_METHOD": method,
+            "SCRIPT_NAME": "",
+            "PATH_INFO": unquote(path, "iso-8859-1"),
+            "QUERY_STRING": query,
+            "SERVER_NAME": self.host,
+            "SERVER_PORT": str(self.port),
+            "SERVER_PROTOCOL": version,
+            "REMOTE_ADDR": peer[0] if peer else "",
+            "wsgi.version": (1, 0),
+            "wsgi.url_scheme": "http",
+            "wsgi.errors": sys.stderr,
+            "wsgi.multithread": True,
+            "wsgi.multiprocess": False,
+            "wsgi.run_once": False,
+        }
+        for line in lines[1:]:
+            if not line:
+                continue
+            name, sep, value = line.partition(":")
+            if not sep:
+                raise ValueError(f"Bad header line: {line}")
+            if "_" in name:
+                continue  # same as wsgiref, so that headers can't spoof each other
+            key = name.strip().upper().replace("-", "_")
+            value = value.strip()
+            if key not in ("CONTENT_TYPE", "CONTENT_LENGTH"):
+                key = "HTTP_" + key
+                if key in environ:
+                    value = environ[key] + "," + value
+            environ[key] = value
+        return environ
+
+    @staticmethod
+    def __wants_keep_alive(environ: WSGIEnvironment) -> bool:
+        connection = environ.get("HTTP_CONNECTION", "").lower()
+        if environ["SERVER_PROTOCOL"] == "HTTP/1.1":
+            return "close" not in connection
+        return "keep-alive" in connection
+
+    @staticmethod
+    def __response_head(
+        status: str, headers: list[tuple[str, str]], content_length: int | None, keep_alive: bool
+    ) -> bytes:
+        lines = [f"HTTP/1.1 {status}"]
+        for name, value in headers:
+            if name.lower() in ("content-length", "connection", "transfer-encoding"):
+                continue
+            lines.append(f"{name}: {value}")
+        if content_length is not None:
+            lines.append(f"Content-Length: {content_length}")
+        lines.append("Connection: keep-alive" if keep_alive else "Connection: close")
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("iso-8859-1")